@@ -0,0 +1,124 @@
+// Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+// Micro benchmark of the CPU preprocessing, compare the separated processors
+// with the fused ResizeNormalizeAndPermute processor.
+// Usage: benchmark_preprocess --image test.jpg --warmup 20 --repeat 200
+
+#include <functional>
+
+#include "flags.h"
+#include "fastdeploy/utils/perf.h"
+#include "fastdeploy/vision.h"
+
+namespace vision = fastdeploy::vision;
+
+DEFINE_int32(warmup, 20, "Number of warmup runs.");
+DEFINE_int32(repeat, 200, "Number of repeated runs.");
+
+using Processors = std::vector<std::shared_ptr<vision::Processor>>;
+
+static double TimeProcessors(const cv::Mat& im, const Processors& processors) {
+  auto run_once = [&im, &processors]() {
+    vision::FDMat mat = vision::WrapMat(im.clone());
+    for (auto& processor : processors) {
+      if (!(*processor)(&mat, vision::ProcLib::OPENCV)) {
+        std::cerr << "Failed to run " << processor->Name() << std::endl;
+        return false;
+      }
+    }
+    return true;
+  };
+  for (int i = 0; i < FLAGS_warmup; ++i) {
+    if (!run_once()) return -1.0;
+  }
+  // The time of cloning the input image is excluded
+  fastdeploy::TimeCounter tc;
+  double total = 0.0;
+  for (int i = 0; i < FLAGS_repeat; ++i) {
+    vision::FDMat mat = vision::WrapMat(im.clone());
+    tc.Start();
+    for (auto& processor : processors) {
+      (*processor)(&mat, vision::ProcLib::OPENCV);
+    }
+    tc.End();
+    total += tc.Duration();
+  }
+  return total / FLAGS_repeat * 1000;
+}
+
+static void Compare(const std::string& name, const cv::Mat& im,
+                    const std::function<Processors()>& create) {
+  Processors separated = create();
+  Processors fused = create();
+  vision::FuseResizeNormalizePermute(&fused);
+  double separated_ms = TimeProcessors(im, separated);
+  double fused_ms = TimeProcessors(im, fused);
+  std::cout << name << ": separated " << separated_ms << "ms, fused "
+            << fused_ms << "ms, speedup " << separated_ms / fused_ms << "x."
+            << std::endl;
+}
+
+int main(int argc, char* argv[]) {
+  google::ParseCommandLineFlags(&argc, &argv, true);
+  cv::Mat im = cv::imread(FLAGS_image);
+  if (im.empty()) {
+    std::cerr << "Failed to read image " << FLAGS_image << std::endl;
+    return -1;
+  }
+  std::vector<float> mean({0.485, 0.456, 0.406});
+  std::vector<float> std({0.229, 0.224, 0.225});
+
+  // YOLOv5: letterbox to 640x640, scale to [0, 1], BGR to RGB and HWC to CHW
+  {
+    float scale = std::min(640.0f / im.rows, 640.0f / im.cols);
+    int resize_w = static_cast<int>(round(im.cols * scale));
+    int resize_h = static_cast<int>(round(im.rows * scale));
+    int pad_h = 640 - resize_h;
+    int pad_w = 640 - resize_w;
+    std::vector<float> alpha(3, 1.0f / 255.0f);
+    std::vector<float> beta(3, 0.0f);
+    std::vector<float> pad_value(3, 114.0f);
+    Processors separated = {
+        std::make_shared<vision::Resize>(resize_w, resize_h),
+        std::make_shared<vision::Pad>(pad_h / 2, pad_h - pad_h / 2, pad_w / 2,
+                                      pad_w - pad_w / 2, pad_value),
+        std::make_shared<vision::ConvertAndPermute>(alpha, beta, true)};
+    auto fused = std::make_shared<vision::ResizeNormalizeAndPermute>(
+        separated[0], alpha, beta, true);
+    fused->SetPadding(pad_h / 2, pad_h - pad_h / 2, pad_w / 2,
+                      pad_w - pad_w / 2, pad_value);
+    double separated_ms = TimeProcessors(im, separated);
+    double fused_ms = TimeProcessors(im, {fused});
+    std::cout << "YOLOv5 letterbox: separated " << separated_ms
+              << "ms, fused " << fused_ms << "ms, speedup "
+              << separated_ms / fused_ms << "x." << std::endl;
+  }
+
+  // PPYOLOE/PaddleSeg: resize to fixed size, normalize and permute
+  Compare("PPYOLOE resize 640x640", im, [&mean, &std]() {
+    return Processors{std::make_shared<vision::Resize>(640, 640, -1.0, -1.0, 2),
+                      std::make_shared<vision::NormalizeAndPermute>(mean, std,
+                                                                    true)};
+  });
+
+  // PaddleClas: resize by short, center crop, normalize and permute
+  Compare("PaddleClas resize_short 256 + crop 224", im, [&mean, &std]() {
+    return Processors{
+        std::make_shared<vision::ResizeByShort>(256),
+        std::make_shared<vision::CenterCrop>(224, 224),
+        std::make_shared<vision::NormalizeAndPermute>(mean, std, true)};
+  });
+  return 0;
+}
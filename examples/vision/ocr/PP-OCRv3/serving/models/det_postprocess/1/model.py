@@ -26,46 +26,6 @@ import fastdeploy as fd
 import triton_python_backend_utils as pb_utils
 
 
-def get_rotate_crop_image(img, box):
-    '''
-    img_height, img_width = img.shape[0:2]
-    left = int(np.min(points[:, 0]))
-    right = int(np.max(points[:, 0]))
-    top = int(np.min(points[:, 1]))
-    bottom = int(np.max(points[:, 1]))
-    img_crop = img[top:bottom, left:right, :].copy()
-    points[:, 0] = points[:, 0] - left
-    points[:, 1] = points[:, 1] - top
-    '''
-    points = []
-    for i in range(4):
-        points.append([box[2 * i], box[2 * i + 1]])
-    points = np.array(points, dtype=np.float32)
-    img = img.astype(np.float32)
-    assert len(points) == 4, "shape of points must be 4*2"
-    img_crop_width = int(
-        max(
-            np.linalg.norm(points[0] - points[1]),
-            np.linalg.norm(points[2] - points[3])))
-    img_crop_height = int(
-        max(
-            np.linalg.norm(points[0] - points[3]),
-            np.linalg.norm(points[1] - points[2])))
-    pts_std = np.float32([[0, 0], [img_crop_width, 0],
-                          [img_crop_width, img_crop_height],
-                          [0, img_crop_height]])
-    M = cv2.getPerspectiveTransform(points, pts_std)
-    dst_img = cv2.warpPerspective(
-        img,
-        M, (img_crop_width, img_crop_height),
-        borderMode=cv2.BORDER_REPLICATE,
-        flags=cv2.INTER_CUBIC)
-    dst_img_height, dst_img_width = dst_img.shape[0:2]
-    if dst_img_height * 1.0 / dst_img_width >= 1.5:
-        dst_img = np.rot90(dst_img)
-    return dst_img
-
-
 class TritonPythonModel:
     """Your Python model must use the same class name. Every Python model
     that is created must have "TritonPythonModel" as the class name.
@@ -151,14 +111,11 @@ class TritonPythonModel:
                 rec_scores = []
 
                 box_list = fd.vision.ocr.sort_boxes(results[i_batch])
-                image_list = []
                 if len(box_list) == 0:
-                    image_list.append(ori_imgs[i_batch])
+                    image_list = [ori_imgs[i_batch]]
                 else:
-                    for box in box_list:
-                        crop_img = get_rotate_crop_image(ori_imgs[i_batch],
-                                                         box)
-                        image_list.append(crop_img)
+                    image_list = fd.vision.ocr.crop_text_regions(
+                        ori_imgs[i_batch], box_list, num_threads=4)
 
                 batch_box_list.append(box_list)
 
@@ -188,9 +145,7 @@ class TritonPythonModel:
                 for index in range(len(image_list)):
                     if cls_labels[index] == 1 and cls_scores[
                             index] > self.cls_threshold:
-                        image_list[index] = cv2.rotate(
-                            image_list[index].astype(np.float32), 1)
-                        image_list[index] = image_list[index].astype(np.uint8)
+                        image_list[index] = cv2.rotate(image_list[index], 1)
 
                 rec_pre_tensors = self.rec_preprocessor.run(image_list)
                 rec_dlpack_tensor = rec_pre_tensors[0].to_dlpack()
@@ -420,6 +420,11 @@ bool FastDeployModel::CreateIpuBackend() {
 
 bool FastDeployModel::Infer(std::vector<FDTensor>& input_tensors,
                             std::vector<FDTensor>* output_tensors) {
+  int64_t batch_size = 0;
+  if (!input_tensors.empty() && !input_tensors[0].shape.empty()) {
+    batch_size = input_tensors[0].shape[0];
+  }
+  TraceScope trace(tracer_, trace_stage_.c_str(), "runtime", batch_size);
   TimeCounter tc;
   if (enable_record_time_of_runtime_) {
     tc.Start();
@@ -13,6 +13,7 @@
 // limitations under the License.
 #pragma once
 #include "fastdeploy/runtime.h"
+#include "fastdeploy/utils/trace.h"
 
 namespace fastdeploy {
 
@@ -140,10 +141,30 @@ class FASTDEPLOY_DECL FastDeployModel {
     return nullptr;
   }
 
+  /** \brief Set the tracer to record the time of preprocess, runtime and postprocess, it's usually set by the pipeline which owns the model
+   *
+   * \param[in] tracer The tracer, nullptr to stop tracing, the model shares the ownership so the tracer is valid even if the pipeline is released before the model
+   * \param[in] stage Prefix of the recorded stage names, e.g. det
+   */
+  virtual void SetTracer(const std::shared_ptr<PipelineTracer>& tracer,
+                         const std::string& stage) {
+    tracer_owner_ = tracer;
+    tracer_ = tracer.get();
+    trace_stage_ = stage;
+  }
+
+  /// Get the tracer set by `SetTracer()`, nullptr if not set
+  virtual PipelineTracer* GetTracer() const { return tracer_; }
+
  protected:
   virtual bool InitRuntime();
 
   bool initialized = false;
+  // Tracer of the pipeline which owns the model, tracer_ is the raw pointer
+  // of tracer_owner_ used by the traced stages
+  std::shared_ptr<PipelineTracer> tracer_owner_;
+  PipelineTracer* tracer_ = nullptr;
+  std::string trace_stage_;
   // Reused input tensors
   std::vector<FDTensor> reused_input_tensors_;
   // Reused output tensors
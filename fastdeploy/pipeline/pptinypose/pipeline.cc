@@ -21,6 +21,24 @@ PPTinyPose::PPTinyPose(
     fastdeploy::vision::keypointdetection::PPTinyPose* pptinypose_model)
     : detector_(det_model), pptinypose_model_(pptinypose_model) {}
 
+void PPTinyPose::EnableTrace(bool enable) {
+  if (enable && pipeline_tracer_ == nullptr) {
+    pipeline_tracer_ = std::make_shared<PipelineTracer>();
+  }
+  if (pipeline_tracer_ != nullptr) {
+    pipeline_tracer_->Enable(enable);
+  }
+  std::shared_ptr<PipelineTracer> tracer =
+      enable ? pipeline_tracer_ : nullptr;
+  tracer_ = tracer.get();
+  if (detector_ != nullptr) {
+    detector_->SetTracer(tracer, "det");
+  }
+  if (pptinypose_model_ != nullptr) {
+    pptinypose_model_->SetTracer(tracer, "keypoint");
+  }
+}
+
 bool PPTinyPose::Detect(
     cv::Mat* img, fastdeploy::vision::DetectionResult* detection_res) {
   if (!detector_->Predict(img, detection_res)) {
@@ -44,20 +62,28 @@ bool PPTinyPose::KeypointDetect(
 
 bool PPTinyPose::Predict(
     cv::Mat* img, fastdeploy::vision::KeyPointDetectionResult* result) {
+  TraceScope pipeline_trace(tracer_, "pptinypose");
   result->Clear();
   fastdeploy::vision::DetectionResult detection_res;
-  if (nullptr != detector_ && !Detect(img, &detection_res)) {
-    FDERROR << "Failed to detect image." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, "det");
+    if (nullptr != detector_ && !Detect(img, &detection_res)) {
+      FDERROR << "Failed to detect image." << std::endl;
+      return false;
+    }
   }
   fastdeploy::vision::DetectionResult filter_detection_res;
-  for (size_t i = 0; i < detection_res.boxes.size(); ++i) {
-    if (detection_res.scores[i] > detection_model_score_threshold) {
-      filter_detection_res.boxes.push_back(detection_res.boxes[i]);
-      filter_detection_res.scores.push_back(detection_res.scores[i]);
-      filter_detection_res.label_ids.push_back(detection_res.label_ids[i]);
+  {
+    TraceScope trace(tracer_, "filter", "", detection_res.boxes.size());
+    for (size_t i = 0; i < detection_res.boxes.size(); ++i) {
+      if (detection_res.scores[i] > detection_model_score_threshold) {
+        filter_detection_res.boxes.push_back(detection_res.boxes[i]);
+        filter_detection_res.scores.push_back(detection_res.scores[i]);
+        filter_detection_res.label_ids.push_back(detection_res.label_ids[i]);
+      }
     }
   }
+  TraceScope trace(tracer_, "keypoint", "", filter_detection_res.boxes.size());
   if (nullptr != pptinypose_model_ &&
       !KeypointDetect(img, result, filter_detection_res)) {
     FDERROR << "Failed to detect keypoint in image " << std::endl;
@@ -14,6 +14,8 @@
 
 #pragma once
 
+#include <memory>
+
 #include "fastdeploy/fastdeploy_model.h"
 #include "fastdeploy/vision/common/result.h"
 #include "fastdeploy/vision/detection/ppdet/model.h"
@@ -51,10 +53,22 @@ class FASTDEPLOY_DECL PPTinyPose {
    */
   float detection_model_score_threshold = 0;
 
+  /** \brief Enable or disable the tracing of the pipeline stages, e.g. det.preprocess, det.runtime, filter, keypoint.crop and keypoint.runtime, the events are kept while disabled
+   *
+   * \param[in] enable Whether to record the stages
+   */
+  void EnableTrace(bool enable = true);
+
+  /// Get the tracer of the pipeline, nullptr if the tracing has never been enabled
+  PipelineTracer* GetTracer() const { return pipeline_tracer_.get(); }
+
  protected:
   fastdeploy::vision::detection::PicoDet* detector_ = nullptr;
   fastdeploy::vision::keypointdetection::PPTinyPose* pptinypose_model_ =
       nullptr;
+  std::shared_ptr<PipelineTracer> pipeline_tracer_;
+  // Same with pipeline_tracer_ while the tracing is enabled, otherwise nullptr
+  PipelineTracer* tracer_ = nullptr;
 
   virtual bool Detect(cv::Mat* img,
                       fastdeploy::vision::DetectionResult* result);
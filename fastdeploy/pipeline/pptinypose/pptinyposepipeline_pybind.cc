@@ -28,6 +28,9 @@ void BindPPTinyPosePipeline(pybind11::module& m) {
         return res;
       })
 
+      .def("enable_trace", &pipeline::PPTinyPose::EnableTrace)
+      .def("get_tracer", &pipeline::PPTinyPose::GetTracer,
+           pybind11::return_value_policy::reference_internal)
       .def_readwrite("detection_model_score_threshold", 
                      &pipeline::PPTinyPose::detection_model_score_threshold);
 }
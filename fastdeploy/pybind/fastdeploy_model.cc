@@ -18,6 +18,44 @@
 namespace fastdeploy {
 
 void BindFDModel(pybind11::module& m) {
+  pybind11::class_<PipelineTracer>(m, "PipelineTracer")
+      .def("enabled", &PipelineTracer::Enabled)
+      .def("clear", &PipelineTracer::Clear)
+      .def("summary",
+           [](const PipelineTracer& self) {
+             pybind11::dict stages;
+             for (const auto& item : self.Summary()) {
+               const auto& stage = item.second;
+               pybind11::dict info;
+               info["count"] = stage.count;
+               info["total_ms"] = stage.total_ms;
+               info["mean_ms"] =
+                   stage.count > 0 ? stage.total_ms / stage.count : 0.0;
+               info["max_ms"] = stage.max_ms;
+               info["items"] = stage.items;
+               info["max_items"] = stage.max_items;
+               stages[pybind11::str(item.first)] = info;
+             }
+             return stages;
+           })
+      .def("events",
+           [](const PipelineTracer& self) {
+             pybind11::list events;
+             for (const auto& event : self.Events()) {
+               pybind11::dict info;
+               info["name"] = event.name;
+               info["begin_us"] = event.begin_us;
+               info["duration_us"] = event.duration_us;
+               info["items"] = event.items;
+               info["thread_id"] = event.thread_id;
+               events.append(info);
+             }
+             return events;
+           })
+      .def("to_chrome_trace", &PipelineTracer::ToChromeTrace)
+      .def("save_chrome_trace", &PipelineTracer::SaveChromeTrace)
+      .def_readwrite("max_events", &PipelineTracer::max_events);
+
   pybind11::class_<FastDeployModel>(m, "FastDeployModel")
       .def(pybind11::init<>(), "Default Constructor")
       .def("model_name", &FastDeployModel::ModelName)
@@ -32,6 +70,8 @@ void BindFDModel(pybind11::module& m) {
            &FastDeployModel::PrintStatisInfoOfRuntime)
       .def("get_profile_time",
            &FastDeployModel::GetProfileTime)     
+      .def("get_tracer", &FastDeployModel::GetTracer,
+           pybind11::return_value_policy::reference_internal)
       .def("initialized", &FastDeployModel::Initialized)
       .def_readwrite("runtime_option", &FastDeployModel::runtime_option)
       .def_readwrite("valid_cpu_backends", &FastDeployModel::valid_cpu_backends)
@@ -19,7 +19,10 @@
 #include <pybind11/stl.h>
 #include <pybind11/eval.h>
 
+#include <functional>
+#include <string>
 #include <type_traits>
+#include <unordered_map>
 
 #include "fastdeploy/runtime/runtime.h"
 
@@ -57,6 +60,48 @@ void PyArrayToTensorList(std::vector<pybind11::array>& pyarray,
                          bool share_buffer = false);
 pybind11::array TensorToPyArray(const FDTensor& tensor);
 
+// Number of the live numpy views created by BufferToPyArrayView on the
+// members of the python object `owner`.
+int PyArrayViewCount(pybind11::handle owner);
+
+// Keep `owner` alive and count the view until the returned object is released.
+pybind11::capsule TrackPyArrayView(pybind11::handle owner);
+
+// Raise an exception if there are live numpy views on the members of `owner`,
+// the members must not be reallocated while they are viewed.
+void CheckNoPyArrayView(pybind11::handle owner, const std::string& name);
+
+// Create a read-only numpy array which shares the memory with `data`, the
+// `owner` object owns the memory and is kept alive as long as the array is
+// referenced. The setters guarded by CheckNoPyArrayView refuse to reallocate
+// the memory while the array exists.
+template <typename T>
+pybind11::array_t<T> BufferToPyArrayView(
+    const T* data, const std::vector<pybind11::ssize_t>& shape,
+    pybind11::handle owner) {
+  pybind11::array_t<T> arr(shape, data, TrackPyArrayView(owner));
+  pybind11::detail::array_proxy(arr.ptr())->flags &=
+      ~pybind11::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+  return arr;
+}
+
+template <typename T>
+pybind11::array_t<T> VectorToPyArrayView(const std::vector<T>& vec,
+                                         pybind11::handle owner) {
+  return BufferToPyArrayView<T>(
+      vec.data(), {static_cast<pybind11::ssize_t>(vec.size())}, owner);
+}
+
+// The setter of a member which numpy views may be created on
+template <typename C, typename D>
+std::function<void(pybind11::object, const D&)> ViewGuardedSetter(
+    D C::*member, const std::string& name) {
+  return [member, name](pybind11::object self, const D& value) {
+    CheckNoPyArrayView(self, name);
+    self.cast<C&>().*member = value;
+  };
+}
+
 #ifdef ENABLE_VISION
 cv::Mat PyArrayToCvMat(pybind11::array& pyarray);
 #endif
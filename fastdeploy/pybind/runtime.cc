@@ -18,6 +18,36 @@ namespace fastdeploy {
 
 void BindOption(pybind11::module& m);
 
+// The output tensors kept across the Runtime.infer calls, the buffers of the
+// tensors are reused while the shape and dtype of the outputs are not changed.
+// The arrays returned as views hold the generation of the tensors they point
+// to, a generation is only reused after all its arrays are released, so a
+// realloc of the next call never moves or frees the memory of a living array
+struct OutputArena {
+  using Generation = std::shared_ptr<std::vector<FDTensor>>;
+
+  // Get a generation which is not referenced by any array
+  Generation Acquire() {
+    for (auto& generation : generations) {
+      if (generation.use_count() == 1) {
+        return generation;
+      }
+    }
+    auto generation = std::make_shared<std::vector<FDTensor>>();
+    // The generations beyond the limit are released with their arrays
+    if (generations.size() < max_generations) {
+      generations.push_back(generation);
+    }
+    return generation;
+  }
+
+  std::vector<Generation> generations;
+  size_t max_generations = 4;
+  int64_t num_calls = 0;
+  int64_t num_allocations = 0;
+  int64_t bytes_allocated = 0;
+};
+
 void BindRuntime(pybind11::module& m) {
   BindOption(m);
 
@@ -26,6 +56,18 @@ void BindRuntime(pybind11::module& m) {
       .def_readwrite("shape", &TensorInfo::shape)
       .def_readwrite("dtype", &TensorInfo::dtype);
 
+  pybind11::class_<OutputArena>(m, "OutputArena")
+      .def(pybind11::init())
+      .def_readonly("num_calls", &OutputArena::num_calls)
+      .def_readonly("num_allocations", &OutputArena::num_allocations)
+      .def_readonly("bytes_allocated", &OutputArena::bytes_allocated)
+      .def("reset", [](OutputArena& self) {
+        self.generations.clear();
+        self.num_calls = 0;
+        self.num_allocations = 0;
+        self.bytes_allocated = 0;
+      });
+
   pybind11::class_<Runtime>(m, "Runtime")
       .def(pybind11::init())
       .def("init", &Runtime::Init)
@@ -85,6 +127,127 @@ void BindRuntime(pybind11::module& m) {
              }
              return results;
            })
+      .def("infer_no_copy",
+           [](Runtime& self, std::map<std::string, pybind11::array>& data) {
+             std::vector<FDTensor> inputs(data.size());
+             int index = 0;
+             for (auto iter = data.begin(); iter != data.end(); ++iter) {
+               // Only C-contiguous arrays can be shared with the backend
+               bool share_buffer =
+                   (iter->second.flags() & pybind11::array::c_style) != 0;
+               PyArrayToTensor(iter->second, &inputs[index], share_buffer);
+               inputs[index].name = iter->first;
+               index += 1;
+             }
+
+             // The outputs are moved to the heap and owned by a capsule, which
+             // is the base object of all the returned arrays
+             auto outputs = new std::vector<FDTensor>(self.NumOutputs());
+             pybind11::capsule owner(outputs, [](void* ptr) {
+               delete reinterpret_cast<std::vector<FDTensor>*>(ptr);
+             });
+             if (!self.Infer(inputs, outputs)) {
+               throw std::runtime_error("Failed to inference with Runtime.");
+             }
+
+             std::vector<pybind11::array> results;
+             results.reserve(outputs->size());
+             for (auto& output : *outputs) {
+               if (output.device != Device::CPU) {
+                 results.emplace_back(TensorToPyArray(output));
+                 continue;
+               }
+               auto numpy_dtype = FDDataTypeToNumpyDataType(output.dtype);
+               results.emplace_back(pybind11::array(
+                   numpy_dtype, output.shape, output.MutableData(), owner));
+             }
+             return results;
+           })
+      .def("infer_with_arena",
+           [](Runtime& self, std::map<std::string, pybind11::array>& data,
+              OutputArena& arena, std::vector<pybind11::array>& outs) {
+             std::vector<FDTensor> inputs(data.size());
+             int index = 0;
+             for (auto iter = data.begin(); iter != data.end(); ++iter) {
+               bool share_buffer =
+                   (iter->second.flags() & pybind11::array::c_style) != 0;
+               PyArrayToTensor(iter->second, &inputs[index], share_buffer);
+               inputs[index].name = iter->first;
+               index += 1;
+             }
+
+             auto generation = arena.Acquire();
+             auto& tensors = *generation;
+             std::vector<const void*> old_buffers;
+             std::vector<size_t> old_nbytes;
+             for (auto& tensor : tensors) {
+               old_buffers.push_back(tensor.Data());
+               old_nbytes.push_back(tensor.nbytes_allocated);
+             }
+             if (!self.Infer(inputs, &tensors)) {
+               throw std::runtime_error("Failed to inference with Runtime.");
+             }
+             arena.num_calls += 1;
+             for (size_t i = 0; i < tensors.size(); ++i) {
+               // A realloc may grow the buffer in place, so the capacity is
+               // compared as well as the address
+               if (i >= old_buffers.size() ||
+                   old_buffers[i] != tensors[i].Data() ||
+                   old_nbytes[i] != tensors[i].nbytes_allocated) {
+                 arena.num_allocations += 1;
+                 arena.bytes_allocated += tensors[i].Nbytes();
+               }
+             }
+
+             std::vector<pybind11::array> results;
+             results.reserve(tensors.size());
+             if (outs.empty()) {
+               // Return the views of the arena tensors, the capsule keeps the
+               // generation referenced until all the views are released
+               pybind11::capsule owner(
+                   new OutputArena::Generation(generation), [](void* ptr) {
+                     delete reinterpret_cast<OutputArena::Generation*>(ptr);
+                   });
+               for (auto& tensor : tensors) {
+                 if (tensor.device != Device::CPU) {
+                   results.emplace_back(TensorToPyArray(tensor));
+                   continue;
+                 }
+                 auto numpy_dtype = FDDataTypeToNumpyDataType(tensor.dtype);
+                 results.emplace_back(pybind11::array(
+                     numpy_dtype, tensor.shape, tensor.MutableData(), owner));
+               }
+               return results;
+             }
+
+             FDASSERT(outs.size() == tensors.size(),
+                      "The number of out arrays(%d) must be equal to the "
+                      "number of outputs(%d).",
+                      static_cast<int>(outs.size()),
+                      static_cast<int>(tensors.size()));
+             for (size_t i = 0; i < outs.size(); ++i) {
+               auto& tensor = tensors[i];
+               std::vector<int64_t> out_shape(outs[i].shape(),
+                                              outs[i].shape() + outs[i].ndim());
+               FDASSERT(NumpyDataTypeToFDDataType(outs[i].dtype()) ==
+                            tensor.dtype,
+                        "The dtype of out array %d doesn't match the output "
+                        "%s, expected %s.",
+                        static_cast<int>(i), tensor.name.c_str(),
+                        Str(tensor.dtype).c_str());
+               FDASSERT(out_shape == tensor.shape,
+                        "The shape of out array %d doesn't match the output "
+                        "%s.",
+                        static_cast<int>(i), tensor.name.c_str());
+               FDASSERT((outs[i].flags() & pybind11::array::c_style) != 0,
+                        "The out array %d must be C-contiguous.",
+                        static_cast<int>(i));
+               memcpy(outs[i].mutable_data(), tensor.CpuData(),
+                      tensor.Nbytes());
+               results.push_back(outs[i]);
+             }
+             return results;
+           })
       .def("infer",
            [](Runtime& self, std::map<std::string, FDTensor>& data) {
              std::vector<FDTensor> inputs;
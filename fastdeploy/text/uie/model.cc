@@ -17,13 +17,11 @@
 #include <algorithm>
 #include <codecvt>
 #include <locale>
-#include <queue>
+#include <numeric>
 #include <sstream>
 
 #include "fast_tokenizer/pretokenizers/pretokenizer.h"
 #include "fast_tokenizer/utils/utf8.h"
-#include "fastdeploy/function/concat.h"
-#include "fastdeploy/function/split.h"
 
 namespace fastdeploy {
 namespace text {
@@ -240,14 +238,17 @@ void UIEModel::SetValidBackend() {
 }
 
 void UIEModel::SetSchema(const std::vector<std::string>& schema) {
+  std::lock_guard<std::mutex> lock(predict_mutex_);
   schema_ = fastdeploy::utils::make_unique<Schema>(schema);
 }
 
 void UIEModel::SetSchema(const std::vector<SchemaNode>& schema) {
+  std::lock_guard<std::mutex> lock(predict_mutex_);
   schema_ = fastdeploy::utils::make_unique<Schema>(schema);
 }
 
 void UIEModel::SetSchema(const SchemaNode& schema) {
+  std::lock_guard<std::mutex> lock(predict_mutex_);
   schema_ = fastdeploy::utils::make_unique<Schema>(schema);
 }
 
@@ -719,82 +720,276 @@ void UIEModel::ConstructChildRelations(
   }
 }
 
+void UIEModel::TokenizePairs(
+    const std::vector<std::string>& texts,
+    const std::vector<std::string>& prompts,
+    std::unordered_map<std::string, TokenizedText>* token_cache,
+    std::vector<TokenizedPair>* pairs) {
+  // 1. Tokenize the texts and prompts which are not cached yet, the same text
+  // is paired with many prompts, and the same prompt with many texts
+  std::vector<std::string> uncached;
+  std::set<std::string> uncached_set;
+  for (size_t i = 0; i < texts.size(); ++i) {
+    for (const std::string* str : {&texts[i], &prompts[i]}) {
+      if (token_cache->count(*str) == 0 && uncached_set.insert(*str).second) {
+        uncached.push_back(*str);
+      }
+    }
+  }
+  if (!uncached.empty()) {
+    std::vector<fast_tokenizer::core::EncodeInput> single_input(
+        uncached.begin(), uncached.end());
+    std::vector<fast_tokenizer::core::Encoding> encodings;
+    tokenizer_.EncodeBatchStrings(single_input, &encodings);
+    batch_statistics_.num_tokenized += uncached.size();
+    for (size_t i = 0; i < uncached.size(); ++i) {
+      auto&& ids = encodings[i].GetIds();
+      auto&& offsets = encodings[i].GetOffsets();
+      auto&& attn_mask = encodings[i].GetAttentionMask();
+      size_t len = std::count_if(attn_mask.begin(), attn_mask.end(),
+                                 [](uint32_t mask) { return mask != 0; });
+      // Remove the [CLS] and [SEP] of the single string
+      auto& tokens = (*token_cache)[uncached[i]];
+      if (len >= 2) {
+        cls_token_id_ = ids[0];
+        sep_token_id_ = ids[len - 1];
+        tokens.ids_.assign(ids.begin() + 1, ids.begin() + len - 1);
+        tokens.offsets_.assign(offsets.begin() + 1,
+                               offsets.begin() + len - 1);
+      }
+    }
+  }
+
+  // 2. Concatenate the tokens of the pairs, the short texts are split to fit
+  // in max_length_ with the prompts, so the truncation is hardly needed, the
+  // pairs which need it are tokenized as pairs instead
+  pairs->resize(texts.size());
+  std::vector<size_t> truncated;
+  for (size_t i = 0; i < texts.size(); ++i) {
+    const auto& prompt_tokens = (*token_cache)[prompts[i]];
+    const auto& text_tokens = (*token_cache)[texts[i]];
+    size_t len = prompt_tokens.ids_.size() + text_tokens.ids_.size() + 3;
+    if (len > max_length_ || cls_token_id_ < 0) {
+      truncated.push_back(i);
+      continue;
+    }
+    auto& pair = (*pairs)[i];
+    size_t prompt_len = prompt_tokens.ids_.size() + 2;
+    pair.ids_.reserve(len);
+    pair.ids_.push_back(cls_token_id_);
+    pair.ids_.insert(pair.ids_.end(), prompt_tokens.ids_.begin(),
+                     prompt_tokens.ids_.end());
+    pair.ids_.push_back(sep_token_id_);
+    pair.ids_.insert(pair.ids_.end(), text_tokens.ids_.begin(),
+                     text_tokens.ids_.end());
+    pair.ids_.push_back(sep_token_id_);
+    pair.type_ids_.assign(len, 1);
+    std::fill(pair.type_ids_.begin(), pair.type_ids_.begin() + prompt_len, 0);
+    pair.offsets_.reserve(len);
+    pair.offsets_.emplace_back(0, 0);
+    pair.offsets_.insert(pair.offsets_.end(), prompt_tokens.offsets_.begin(),
+                         prompt_tokens.offsets_.end());
+    pair.offsets_.emplace_back(0, 0);
+    pair.offsets_.insert(pair.offsets_.end(), text_tokens.offsets_.begin(),
+                         text_tokens.offsets_.end());
+    pair.offsets_.emplace_back(0, 0);
+  }
+  if (truncated.empty()) {
+    return;
+  }
+  std::vector<fast_tokenizer::core::EncodeInput> pair_input;
+  for (auto idx : truncated) {
+    pair_input.emplace_back(
+        std::pair<std::string, std::string>(prompts[idx], texts[idx]));
+  }
+  std::vector<fast_tokenizer::core::Encoding> encodings;
+  tokenizer_.EncodeBatchStrings(pair_input, &encodings);
+  batch_statistics_.num_tokenized += truncated.size();
+  for (size_t i = 0; i < truncated.size(); ++i) {
+    auto&& ids = encodings[i].GetIds();
+    auto&& type_ids = encodings[i].GetTypeIds();
+    auto&& offsets = encodings[i].GetOffsets();
+    auto&& attn_mask = encodings[i].GetAttentionMask();
+    size_t len = std::count_if(attn_mask.begin(), attn_mask.end(),
+                               [](uint32_t mask) { return mask != 0; });
+    auto& pair = (*pairs)[truncated[i]];
+    pair.ids_.assign(ids.begin(), ids.begin() + len);
+    pair.type_ids_.assign(type_ids.begin(), type_ids.begin() + len);
+    pair.offsets_.assign(offsets.begin(), offsets.begin() + len);
+  }
+}
+
+void UIEModel::PredictPairs(
+    const std::vector<std::string>& texts,
+    const std::vector<std::string>& prompts,
+    std::unordered_map<std::string, TokenizedText>* token_cache,
+    std::vector<std::vector<SpanIdx>>* span_idxs,
+    std::vector<std::vector<float>>* probs) {
+  std::vector<TokenizedPair> pairs;
+  TokenizePairs(texts, prompts, token_cache, &pairs);
+  span_idxs->assign(pairs.size(), {});
+  probs->assign(pairs.size(), {});
+  batch_statistics_.num_pairs += pairs.size();
+
+  // Sort the pairs by length, so the pairs in a batch are padded less
+  std::vector<size_t> order(pairs.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(), [&pairs](size_t a, size_t b) {
+    return pairs[a].ids_.size() < pairs[b].ids_.size();
+  });
+
+  size_t total_tokens = 0;
+  size_t padding_tokens = 0;
+  for (size_t batch_start = 0; batch_start < order.size();
+       batch_start += batch_size_) {
+    size_t batch_end = batch_start + static_cast<size_t>(batch_size_);
+    batch_end = (std::min)(order.size(), batch_end);
+    int64_t batch_size = batch_end - batch_start;
+    int64_t seq_len = pairs[order[batch_end - 1]].ids_.size();
+
+    std::vector<FDTensor> inputs(NumInputsOfRuntime());
+    for (int i = 0; i < NumInputsOfRuntime(); ++i) {
+      inputs[i].Allocate({batch_size, seq_len}, fastdeploy::FDDataType::INT64,
+                         InputInfoOfRuntime(i).name);
+    }
+    int64_t* input_ids_ptr =
+        reinterpret_cast<int64_t*>(inputs[0].MutableData());
+    int64_t* type_ids_ptr = reinterpret_cast<int64_t*>(inputs[1].MutableData());
+    int64_t* pos_ids_ptr = reinterpret_cast<int64_t*>(inputs[2].MutableData());
+    int64_t* attn_mask_ptr =
+        reinterpret_cast<int64_t*>(inputs[3].MutableData());
+    std::fill(input_ids_ptr, input_ids_ptr + batch_size * seq_len, 0);
+    std::fill(type_ids_ptr, type_ids_ptr + batch_size * seq_len, 0);
+    std::fill(attn_mask_ptr, attn_mask_ptr + batch_size * seq_len, 0);
+    for (int64_t i = 0; i < batch_size; ++i) {
+      const auto& pair = pairs[order[batch_start + i]];
+      size_t start = i * seq_len;
+      std::copy(pair.ids_.begin(), pair.ids_.end(), input_ids_ptr + start);
+      std::copy(pair.type_ids_.begin(), pair.type_ids_.end(),
+                type_ids_ptr + start);
+      std::iota(pos_ids_ptr + start, pos_ids_ptr + start + seq_len, 0);
+      std::fill(attn_mask_ptr + start, attn_mask_ptr + start + pair.ids_.size(),
+                1);
+      padding_tokens += seq_len - pair.ids_.size();
+    }
+    total_tokens += batch_size * seq_len;
+
+    std::vector<FDTensor> outputs(NumOutputsOfRuntime());
+    ++batch_statistics_.num_runtime_calls;
+    if (!Infer(inputs, &outputs)) {
+      FDERROR << "Failed to inference while using model:" << ModelName()
+              << "." << std::endl;
+      continue;
+    }
+
+    auto* start_prob = reinterpret_cast<const float*>(outputs[0].Data());
+    auto* end_prob = reinterpret_cast<const float*>(outputs[1].Data());
+    std::vector<std::vector<IDX_PROB>> start_candidate_idx_prob,
+        end_candidate_idx_prob;
+    GetCandidateIdx(start_prob, outputs[0].shape[0], outputs[0].shape[1],
+                    &start_candidate_idx_prob, position_prob_);
+    GetCandidateIdx(end_prob, outputs[1].shape[0], outputs[1].shape[1],
+                    &end_candidate_idx_prob, position_prob_);
+    SPAN_SET span_set;
+    for (int64_t i = 0; i < batch_size; ++i) {
+      size_t idx = order[batch_start + i];
+      // The padding tokens have empty offsets as the special tokens
+      std::vector<fast_tokenizer::core::Offset> offset_mapping =
+          pairs[idx].offsets_;
+      offset_mapping.resize(seq_len, fast_tokenizer::core::Offset(0, 0));
+      GetSpan(start_candidate_idx_prob[i], end_candidate_idx_prob[i],
+              &span_set);
+      GetSpanIdxAndProbs(span_set, offset_mapping, &(*span_idxs)[idx],
+                         &(*probs)[idx]);
+      span_set.clear();
+    }
+  }
+  num_batch_tokens_ += total_tokens;
+  num_padding_tokens_ += padding_tokens;
+  if (num_batch_tokens_ > 0) {
+    batch_statistics_.padding_ratio =
+        static_cast<double>(num_padding_tokens_) / num_batch_tokens_;
+  }
+}
+
 void UIEModel::Predict(
     const std::vector<std::string>& texts,
     std::vector<std::unordered_map<std::string, std::vector<UIEResult>>>*
         results) {
-  std::queue<SchemaNode> nodes;
-  for (auto& node : schema_->root_->children_) {
-    nodes.push(node);
-  }
+  std::lock_guard<std::mutex> lock(predict_mutex_);
+  batch_statistics_ = UIEBatchStatistics();
+  num_batch_tokens_ = 0;
+  num_padding_tokens_ = 0;
+  std::unordered_map<std::string, TokenizedText> token_cache;
+  // The nodes in the same level only depend on the results of their parents,
+  // so the prompts of all the nodes in a level are predicted together
+  std::vector<SchemaNode> level_nodes(schema_->root_->children_.begin(),
+                                      schema_->root_->children_.end());
   results->resize(texts.size());
-  while (!nodes.empty()) {
-    auto node = nodes.front();
-    nodes.pop();
-    std::vector<std::vector<size_t>> input_mapping_with_raw_texts;
-    std::vector<std::vector<size_t>> input_mapping_with_short_text;
-    std::vector<std::string> short_input_texts;
-    std::vector<std::string> short_prompts;
-    // 1. Construct texts and prompts from raw text
-    bool has_prompt = ConstructTextsAndPrompts(
-        texts, node.name_, node.prefix_, &short_input_texts, &short_prompts,
-        &input_mapping_with_raw_texts, &input_mapping_with_short_text);
-    std::vector<std::vector<UIEResult>> results_list;
-    if (has_prompt) {
-      // 2. Convert texts and prompts to FDTensor
-      std::vector<FDTensor> inputs;
-      std::vector<fast_tokenizer::core::Encoding> encodings;
-      Preprocess(short_input_texts, short_prompts, &encodings, &inputs);
-
-      std::vector<std::vector<FDTensor>> inputs_vec(NumInputsOfRuntime());
-      int encoding_size = encodings.size();
-      std::vector<int> num_or_sections;
-      for (int i = 0; i < encoding_size; i += batch_size_) {
-        int actual_batch_size = (std::min)(batch_size_, encoding_size - i);
-        num_or_sections.push_back(actual_batch_size);
-      }
-      for (int i = 0; i < NumInputsOfRuntime(); ++i) {
-        function::Split(inputs[i], num_or_sections, &inputs_vec[i]);
-      }
-
-      // 3. Infer
-      std::vector<fastdeploy::FDTensor> outputs(NumOutputsOfRuntime());
-      std::vector<fastdeploy::FDTensor> outputs0, outputs1;
+  while (!level_nodes.empty()) {
+    ++batch_statistics_.num_levels;
+    size_t node_num = level_nodes.size();
+    std::vector<std::vector<std::vector<size_t>>> input_mapping_with_raw_texts(
+        node_num);
+    std::vector<std::vector<std::vector<size_t>>> input_mapping_with_short_text(
+        node_num);
+    std::vector<std::vector<std::string>> short_input_texts(node_num);
+    std::vector<std::vector<std::string>> short_prompts(node_num);
+    // 1. Construct texts and prompts from raw text for every node
+    std::vector<std::string> level_texts;
+    std::vector<std::string> level_prompts;
+    std::vector<size_t> node_offsets(node_num + 1, 0);
+    for (size_t i = 0; i < node_num; ++i) {
+      auto& node = level_nodes[i];
+      ConstructTextsAndPrompts(texts, node.name_, node.prefix_,
+                               &short_input_texts[i], &short_prompts[i],
+                               &input_mapping_with_raw_texts[i],
+                               &input_mapping_with_short_text[i]);
+      level_texts.insert(level_texts.end(), short_input_texts[i].begin(),
+                         short_input_texts[i].end());
+      level_prompts.insert(level_prompts.end(), short_prompts[i].begin(),
+                           short_prompts[i].end());
+      node_offsets[i + 1] = level_texts.size();
+    }
 
-      for (int i = 0; i < inputs_vec[0].size(); ++i) {
-        std::vector<fastdeploy::FDTensor> curr_inputs(NumInputsOfRuntime());
-        std::vector<fastdeploy::FDTensor> curr_outputs(NumOutputsOfRuntime());
-        for (int j = 0; j < NumInputsOfRuntime(); ++j) {
-          curr_inputs[j] = std::move(inputs_vec[j][i]);
-          curr_inputs[j].name = inputs[j].name;
-        }
-        if (!Infer(curr_inputs, &curr_outputs)) {
-          FDERROR << "Failed to inference while using model:" << ModelName()
-                  << "." << std::endl;
-        }
-        outputs0.push_back(curr_outputs[0]);
-        outputs1.push_back(curr_outputs[1]);
+    // 2. Infer all the prompts of the level in length sorted batches
+    std::vector<std::vector<SpanIdx>> span_idxs;
+    std::vector<std::vector<float>> probs;
+    PredictPairs(level_texts, level_prompts, &token_cache, &span_idxs, &probs);
+
+    std::vector<SchemaNode> next_level_nodes;
+    for (size_t i = 0; i < node_num; ++i) {
+      auto& node = level_nodes[i];
+      std::vector<std::vector<UIEResult>> results_list;
+      if (!short_prompts[i].empty()) {
+        // 3. Convert the spans of the node to UIEResult
+        std::vector<std::vector<SpanIdx>> node_span_idxs(
+            span_idxs.begin() + node_offsets[i],
+            span_idxs.begin() + node_offsets[i + 1]);
+        std::vector<std::vector<float>> node_probs(
+            probs.begin() + node_offsets[i],
+            probs.begin() + node_offsets[i + 1]);
+        ConvertSpanToUIEResult(short_input_texts[i], short_prompts[i],
+                               node_span_idxs, node_probs, &results_list);
+        AutoJoiner(short_input_texts[i], input_mapping_with_short_text[i],
+                   &results_list);
+      }
+      // 4. Construct the new relation of the UIEResult
+      std::vector<std::vector<UIEResult*>> relations;
+      ConstructChildRelations(node.relations_, input_mapping_with_raw_texts[i],
+                              results_list, node.name_, results, &relations);
+
+      // 5. Construct the next prompt prefix
+      std::vector<std::vector<std::string>> prefix(texts.size());
+      ConstructChildPromptPrefix(input_mapping_with_raw_texts[i], results_list,
+                                 &prefix);
+      for (auto& node_child : node.children_) {
+        node_child.relations_ = relations;
+        node_child.prefix_ = prefix;
+        next_level_nodes.push_back(node_child);
       }
-      function::Concat(outputs0, &outputs[0]);
-      function::Concat(outputs1, &outputs[1]);
-      // 4. Convert FDTensor to UIEResult
-      Postprocess(outputs, encodings, short_input_texts, short_prompts,
-                  input_mapping_with_short_text, &results_list);
-    }
-    // 5. Construct the new relation of the UIEResult
-    std::vector<std::vector<UIEResult*>> relations;
-    ConstructChildRelations(node.relations_, input_mapping_with_raw_texts,
-                            results_list, node.name_, results, &relations);
-
-    // 6. Construct the next prompt prefix
-    std::vector<std::vector<std::string>> prefix(texts.size());
-    ConstructChildPromptPrefix(input_mapping_with_raw_texts, results_list,
-                               &prefix);
-    for (auto& node_child : node.children_) {
-      node_child.relations_ = relations;
-      node_child.prefix_ = prefix;
-      nodes.push(node_child);
     }
+    level_nodes = std::move(next_level_nodes);
   }
 }
 
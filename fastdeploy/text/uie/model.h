@@ -17,6 +17,7 @@
 #include "fast_tokenizer/tokenizers/ernie_fast_tokenizer.h"
 #include "fastdeploy/fastdeploy_model.h"
 #include "fastdeploy/utils/unique_ptr.h"
+#include <mutex>  // NOLINT
 #include <ostream>
 #include <set>
 #include <string>
@@ -94,6 +95,21 @@ struct Schema {
   friend class UIEModel;
 };
 
+/*! @brief Statistics of the runtime calls of the last UIEModel::Predict
+ */
+struct FASTDEPLOY_DECL UIEBatchStatistics {
+  /// Number of the schema levels, the prompts of all the schema nodes in a level are batched together
+  size_t num_levels = 0;
+  /// Number of the prompt and short text pairs
+  size_t num_pairs = 0;
+  /// Number of the runtime calls
+  size_t num_runtime_calls = 0;
+  /// Number of the strings tokenized, the texts and prompts are tokenized once and cached
+  size_t num_tokenized = 0;
+  /// Ratio of the padding tokens in all the batches
+  double padding_ratio = 0.0;
+};
+
 struct FASTDEPLOY_DECL UIEModel : public FastDeployModel {
  public:
   UIEModel(const std::string& model_file, const std::string& params_file,
@@ -156,11 +172,18 @@ struct FASTDEPLOY_DECL UIEModel : public FastDeployModel {
       std::vector<std::unordered_map<std::string, std::vector<UIEResult>>>*
           results,
       std::vector<std::vector<UIEResult*>>* new_relations);
+  /// Predict the texts, the concurrent calls on the same model are serialized,
+  /// use one model per thread to predict in parallel
   void
   Predict(const std::vector<std::string>& texts,
           std::vector<std::unordered_map<std::string, std::vector<UIEResult>>>*
               results);
 
+  /// Get the statistics of the runtime calls of the last Predict
+  const UIEBatchStatistics& GetBatchStatistics() const {
+    return batch_statistics_;
+  }
+
  protected:
   using IDX_PROB = std::pair<int64_t, float>;
   struct IdxProbCmp {
@@ -172,6 +195,27 @@ struct FASTDEPLOY_DECL UIEModel : public FastDeployModel {
     fast_tokenizer::core::Offset offset_;
     bool is_prompt_;
   };
+  // The tokens of a text or a prompt, without the special tokens
+  struct TokenizedText {
+    std::vector<int64_t> ids_;
+    std::vector<fast_tokenizer::core::Offset> offsets_;
+  };
+  // The tokens of a prompt and text pair, i.e. [CLS] prompt [SEP] text [SEP]
+  struct TokenizedPair {
+    std::vector<int64_t> ids_;
+    std::vector<int64_t> type_ids_;
+    std::vector<fast_tokenizer::core::Offset> offsets_;
+  };
+  void TokenizePairs(
+      const std::vector<std::string>& texts,
+      const std::vector<std::string>& prompts,
+      std::unordered_map<std::string, TokenizedText>* token_cache,
+      std::vector<TokenizedPair>* pairs);
+  void PredictPairs(const std::vector<std::string>& texts,
+                    const std::vector<std::string>& prompts,
+                    std::unordered_map<std::string, TokenizedText>* token_cache,
+                    std::vector<std::vector<SpanIdx>>* span_idxs,
+                    std::vector<std::vector<float>>* probs);
   void SetValidBackend();
   bool Initialize();
   void AutoSplitter(const std::vector<std::string>& texts, size_t max_length,
@@ -204,6 +248,14 @@ struct FASTDEPLOY_DECL UIEModel : public FastDeployModel {
   int batch_size_;
   SchemaLanguage schema_language_;
   fast_tokenizer::tokenizers_impl::ErnieFastTokenizer tokenizer_;
+  UIEBatchStatistics batch_statistics_;
+  size_t num_batch_tokens_ = 0;
+  size_t num_padding_tokens_ = 0;
+  // The ids of the special tokens, got from the tokenized texts
+  int64_t cls_token_id_ = -1;
+  int64_t sep_token_id_ = -1;
+  // Guards the schema, the statistics and the runtime while predicting
+  std::mutex predict_mutex_;
 };
 
 }  // namespace text
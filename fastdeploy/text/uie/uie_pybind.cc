@@ -80,10 +80,26 @@ void BindUIE(pybind11::module& m) {
             std::vector<
                 std::unordered_map<std::string, std::vector<text::UIEResult>>>
                 results;
-            self.Predict(texts, &results);
+            {
+              // Release the GIL so that the next texts can be read and the
+              // previous results can be converted while predicting, the
+              // concurrent calls on the same model wait in Predict
+              pybind11::gil_scoped_release release;
+              self.Predict(texts, &results);
+            }
             return results;
           },
-          py::arg("text"));
+          py::arg("text"))
+      .def("get_batch_statistics", [](text::UIEModel& self) {
+        const auto& stats = self.GetBatchStatistics();
+        py::dict result;
+        result["num_levels"] = stats.num_levels;
+        result["num_pairs"] = stats.num_pairs;
+        result["num_runtime_calls"] = stats.num_runtime_calls;
+        result["num_tokenized"] = stats.num_tokenized;
+        result["padding_ratio"] = stats.padding_ratio;
+        return result;
+      });
 }
 
 }  // namespace fastdeploy
@@ -0,0 +1,98 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "fastdeploy/utils/thread_pool.h"
+
+namespace fastdeploy {
+
+ThreadPool::ThreadPool(int num_threads) {
+  for (int i = 1; i < num_threads; ++i) {
+    workers_.emplace_back(&ThreadPool::Loop, this);
+  }
+}
+
+ThreadPool::~ThreadPool() {
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    stop_ = true;
+  }
+  start_cv_.notify_all();
+  for (auto& worker : workers_) {
+    worker.join();
+  }
+}
+
+void ThreadPool::RunTasks() {
+  for (int i = next_task_.fetch_add(1); i < num_tasks_;
+       i = next_task_.fetch_add(1)) {
+    if (!(*task_)(i)) {
+      failed_ = true;
+    }
+  }
+}
+
+void ThreadPool::Loop() {
+  uint64_t seen_generation = 0;
+  while (true) {
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      start_cv_.wait(lock, [this, seen_generation] {
+        return stop_ || generation_ != seen_generation;
+      });
+      if (stop_) {
+        return;
+      }
+      seen_generation = generation_;
+    }
+    RunTasks();
+    {
+      std::lock_guard<std::mutex> lock(mutex_);
+      if (--active_workers_ == 0) {
+        done_cv_.notify_one();
+      }
+    }
+  }
+}
+
+bool ThreadPool::ParallelFor(int num_tasks,
+                             const std::function<bool(int)>& task) {
+  if (workers_.empty() || num_tasks <= 1) {
+    for (int i = 0; i < num_tasks; ++i) {
+      if (!task(i)) {
+        return false;
+      }
+    }
+    return true;
+  }
+  std::lock_guard<std::mutex> call_lock(call_mutex_);
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    task_ = &task;
+    num_tasks_ = num_tasks;
+    next_task_ = 0;
+    failed_ = false;
+    active_workers_ = static_cast<int>(workers_.size());
+    ++generation_;
+  }
+  start_cv_.notify_all();
+  RunTasks();
+  {
+    std::unique_lock<std::mutex> lock(mutex_);
+    done_cv_.wait(lock, [this] { return active_workers_ == 0; });
+    task_ = nullptr;
+  }
+  return !failed_;
+}
+
+}  // namespace fastdeploy
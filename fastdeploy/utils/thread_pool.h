@@ -0,0 +1,70 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <condition_variable>  // NOLINT
+#include <functional>
+#include <mutex>   // NOLINT
+#include <thread>  // NOLINT
+#include <vector>
+
+#include "fastdeploy/utils/utils.h"
+
+namespace fastdeploy {
+
+/*! @brief A fixed size pool of threads to run the iterations of a loop in parallel
+ */
+class FASTDEPLOY_DECL ThreadPool {
+ public:
+  /** \brief Create the thread pool
+   *
+   * \param[in] num_threads Number of threads, including the thread calling ParallelFor()
+   */
+  explicit ThreadPool(int num_threads);
+
+  ~ThreadPool();
+
+  /// Get the number of threads, including the thread calling ParallelFor()
+  int NumThreads() const { return static_cast<int>(workers_.size()) + 1; }
+
+  /** \brief Run task(0) ... task(num_tasks - 1) in parallel, and wait until all of them are finished
+   *
+   * \param[in] num_tasks Number of tasks
+   * \param[in] task The task function, returns false if failed
+   * \return true if all the tasks successed, otherwise false
+   */
+  bool ParallelFor(int num_tasks, const std::function<bool(int)>& task);
+
+ private:
+  void Loop();
+  void RunTasks();
+
+  std::vector<std::thread> workers_;
+  // Serialize the ParallelFor() calls
+  std::mutex call_mutex_;
+  std::mutex mutex_;
+  std::condition_variable start_cv_;
+  std::condition_variable done_cv_;
+  const std::function<bool(int)>* task_ = nullptr;
+  int num_tasks_ = 0;
+  int active_workers_ = 0;
+  uint64_t generation_ = 0;
+  bool stop_ = false;
+  std::atomic<int> next_task_{0};
+  std::atomic<bool> failed_{false};
+};
+
+}  // namespace fastdeploy
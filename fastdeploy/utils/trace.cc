@@ -0,0 +1,164 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "fastdeploy/utils/trace.h"
+
+#include <algorithm>
+#include <fstream>
+#include <sstream>
+
+namespace fastdeploy {
+
+namespace {
+
+void WriteJsonString(const std::string& str, std::ostream* out) {
+  *out << '"';
+  for (char c : str) {
+    if (c == '"' || c == '\\') {
+      *out << '\\' << c;
+    } else if (static_cast<unsigned char>(c) < 0x20) {
+      *out << ' ';
+    } else {
+      *out << c;
+    }
+  }
+  *out << '"';
+}
+
+}  // namespace
+
+PipelineTracer::PipelineTracer() : origin_(std::chrono::steady_clock::now()) {}
+
+void PipelineTracer::Clear() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  events_.clear();
+  thread_ids_.clear();
+  origin_ = std::chrono::steady_clock::now();
+}
+
+int PipelineTracer::ThreadIndex() {
+  auto id = std::this_thread::get_id();
+  auto iter = thread_ids_.find(id);
+  if (iter != thread_ids_.end()) {
+    return iter->second;
+  }
+  int index = static_cast<int>(thread_ids_.size());
+  thread_ids_[id] = index;
+  return index;
+}
+
+void PipelineTracer::Record(const std::string& name,
+                            std::chrono::steady_clock::time_point begin,
+                            std::chrono::steady_clock::time_point end,
+                            int64_t items) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  if (events_.size() >= max_events) {
+    FDWARNING << "There are already " << max_events
+              << " trace events, will force to disable the tracing now."
+              << std::endl;
+    enabled_ = false;
+    return;
+  }
+  TraceEvent event;
+  event.name = name;
+  event.begin_us =
+      std::chrono::duration_cast<std::chrono::microseconds>(begin - origin_)
+          .count();
+  event.duration_us =
+      std::chrono::duration_cast<std::chrono::microseconds>(end - begin)
+          .count();
+  event.items = items;
+  event.thread_id = ThreadIndex();
+  events_.push_back(std::move(event));
+}
+
+std::vector<TraceEvent> PipelineTracer::Events() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return events_;
+}
+
+std::map<std::string, TraceStageSummary> PipelineTracer::Summary() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  std::map<std::string, TraceStageSummary> summary;
+  for (const auto& event : events_) {
+    auto& stage = summary[event.name];
+    double ms = event.duration_us / 1000.0;
+    stage.count += 1;
+    stage.total_ms += ms;
+    stage.max_ms = std::max(stage.max_ms, ms);
+    stage.items += event.items;
+    stage.max_items = std::max(stage.max_items, event.items);
+  }
+  return summary;
+}
+
+std::string PipelineTracer::ToChromeTrace() const {
+  std::vector<TraceEvent> events = Events();
+  std::ostringstream out;
+  out << "{\"displayTimeUnit\":\"ms\",\"traceEvents\":[";
+  for (size_t i = 0; i < events.size(); ++i) {
+    const auto& event = events[i];
+    if (i > 0) {
+      out << ",";
+    }
+    // Complete events, the nested stages are shown as a flame graph
+    out << "{\"name\":";
+    WriteJsonString(event.name, &out);
+    auto dot = event.name.find('.');
+    out << ",\"cat\":";
+    WriteJsonString(event.name.substr(0, dot), &out);
+    out << ",\"ph\":\"X\",\"pid\":0,\"tid\":" << event.thread_id
+        << ",\"ts\":" << event.begin_us << ",\"dur\":" << event.duration_us
+        << ",\"args\":{\"items\":" << event.items << "}}";
+  }
+  out << "]}";
+  return out.str();
+}
+
+bool PipelineTracer::SaveChromeTrace(const std::string& path) const {
+  std::ofstream fout(path);
+  if (!fout.is_open()) {
+    FDERROR << "Failed to open " << path << " to save the trace."
+            << std::endl;
+    return false;
+  }
+  fout << ToChromeTrace();
+  return fout.good();
+}
+
+TraceScope::TraceScope(PipelineTracer* tracer, const char* stage,
+                       const char* step, int64_t items)
+    : tracer_(tracer != nullptr && tracer->Enabled() ? tracer : nullptr),
+      stage_(stage),
+      step_(step),
+      items_(items) {
+  if (tracer_ != nullptr) {
+    begin_ = std::chrono::steady_clock::now();
+  }
+}
+
+TraceScope::~TraceScope() {
+  if (tracer_ == nullptr || !tracer_->Enabled()) {
+    return;
+  }
+  auto end = std::chrono::steady_clock::now();
+  std::string name(stage_);
+  if (step_ != nullptr && step_[0] != '\0') {
+    name += ".";
+    name += step_;
+  }
+  tracer_->Record(name, begin_, end, items_);
+}
+
+}  // namespace fastdeploy
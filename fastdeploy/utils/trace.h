@@ -0,0 +1,135 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include <atomic>
+#include <chrono>  // NOLINT
+#include <map>
+#include <memory>
+#include <mutex>  // NOLINT
+#include <string>
+#include <thread>  // NOLINT
+#include <vector>
+
+#include "fastdeploy/utils/utils.h"
+
+namespace fastdeploy {
+
+/*! @brief One traced span of a pipeline stage
+ */
+struct FASTDEPLOY_DECL TraceEvent {
+  /// Name of the stage, e.g. det.preprocess, rec.runtime or crop
+  std::string name;
+  /// Start time in microseconds since the tracer is created or cleared
+  int64_t begin_us = 0;
+  /// Duration in microseconds
+  int64_t duration_us = 0;
+  /// Number of items processed in the span, e.g. the batch size or the number of crops
+  int64_t items = 0;
+  /// Index of the thread which recorded the span
+  int thread_id = 0;
+};
+
+/*! @brief Aggregated statistics of one pipeline stage
+ */
+struct FASTDEPLOY_DECL TraceStageSummary {
+  /// Number of the spans
+  int64_t count = 0;
+  /// Total time of the spans in milliseconds
+  double total_ms = 0.0;
+  /// Max time of the spans in milliseconds
+  double max_ms = 0.0;
+  /// Total number of the processed items
+  int64_t items = 0;
+  /// Max number of the items in one span, e.g. the max batch size
+  int64_t max_items = 0;
+};
+
+/*! @brief Record the time of the stages of a pipeline, e.g. the preprocess, runtime and postprocess of every model, and the crop and sort between them
+ */
+class FASTDEPLOY_DECL PipelineTracer {
+ public:
+  PipelineTracer();
+
+  /// Enable or disable the recording, nothing is recorded while disabled
+  void Enable(bool enable = true) { enabled_ = enable; }
+  /// Check if the recording is enabled
+  bool Enabled() const { return enabled_; }
+  /// Remove all the recorded events and reset the start time
+  void Clear();
+
+  /** \brief Record a span, it's safe to call from multiple threads
+   *
+   * \param[in] name Name of the stage
+   * \param[in] begin Start time of the span
+   * \param[in] end End time of the span
+   * \param[in] items Number of items processed in the span
+   */
+  void Record(const std::string& name,
+              std::chrono::steady_clock::time_point begin,
+              std::chrono::steady_clock::time_point end, int64_t items);
+
+  /// Get a copy of all the recorded events
+  std::vector<TraceEvent> Events() const;
+  /// Get the statistics of every stage
+  std::map<std::string, TraceStageSummary> Summary() const;
+  /// Get the events in the Chrome trace event format, which can be loaded by chrome://tracing or Perfetto
+  std::string ToChromeTrace() const;
+  /// Save the events to a Chrome trace JSON file
+  bool SaveChromeTrace(const std::string& path) const;
+
+  /// Max number of the kept events, the recording stops once reached
+  size_t max_events = 100000;
+
+ private:
+  int ThreadIndex();
+
+  std::atomic<bool> enabled_{false};
+  mutable std::mutex mutex_;
+  std::chrono::steady_clock::time_point origin_;
+  std::vector<TraceEvent> events_;
+  std::map<std::thread::id, int> thread_ids_;
+};
+
+/*! @brief Record the lifetime of the object as a span of the stage, nothing is done if the tracer is null or disabled
+ */
+class FASTDEPLOY_DECL TraceScope {
+ public:
+  /** \brief Start the span
+   *
+   * \param[in] tracer The tracer, may be null
+   * \param[in] stage Prefix of the stage name, e.g. det
+   * \param[in] step Name of the step in the stage, e.g. preprocess, the stage name is "det.preprocess", or "det" while step is empty
+   * \param[in] items Number of items processed in the span
+   */
+  TraceScope(PipelineTracer* tracer, const char* stage, const char* step = "",
+             int64_t items = 1);
+  ~TraceScope();
+
+  /// Update the number of the processed items, e.g. once the number of the crops is known
+  void SetItems(int64_t items) { items_ = items; }
+
+  TraceScope(const TraceScope&) = delete;
+  TraceScope& operator=(const TraceScope&) = delete;
+
+ private:
+  PipelineTracer* tracer_;
+  const char* stage_;
+  const char* step_;
+  int64_t items_;
+  std::chrono::steady_clock::time_point begin_;
+};
+
+}  // namespace fastdeploy
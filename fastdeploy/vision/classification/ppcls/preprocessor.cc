@@ -95,7 +95,15 @@ bool PaddleClasPreprocessor::BuildPreprocessPipelineFromConfig() {
   }
 
   // Fusion will improve performance
-  FuseTransforms(&processors_);
+  if (initial_resize_on_cpu_) {
+    // The initial resize runs on CPU, so it's not fused with the normalize and
+    // permute, which run on the device
+    FuseNormalizeCast(&processors_);
+    FuseNormalizeHWC2CHW(&processors_);
+    FuseNormalizeColorConvert(&processors_);
+  } else {
+    FuseTransforms(&processors_);
+  }
   return true;
 }
 
@@ -118,6 +126,19 @@ void PaddleClasPreprocessor::DisablePermute() {
   }
 }
 
+void PaddleClasPreprocessor::InitialResizeOnCpu(bool v) {
+  if (initial_resize_on_cpu_ == v) {
+    return;
+  }
+  this->initial_resize_on_cpu_ = v;
+  // Rebuild the pipeline, since the initial resize can only be fused while it
+  // runs on the same device with the other processors
+  if (!BuildPreprocessPipelineFromConfig()) {
+    FDERROR << "Failed to build preprocess pipeline from configuration file."
+            << std::endl;
+  }
+}
+
 bool PaddleClasPreprocessor::Apply(FDMatBatch* image_batch,
                                    std::vector<FDTensor>* outputs) {
   if (!initialized_) {
@@ -127,7 +148,8 @@ bool PaddleClasPreprocessor::Apply(FDMatBatch* image_batch,
   for (size_t j = 0; j < processors_.size(); ++j) {
     image_batch->proc_lib = proc_lib_;
     if (initial_resize_on_cpu_ && j == 0 &&
-        processors_[j]->Name().find("Resize") == 0) {
+        (processors_[j]->Name() == "Resize" ||
+         processors_[j]->Name() == "ResizeByShort")) {
       image_batch->proc_lib = ProcLib::OPENCV;
     }
     if (!(*(processors_[j].get()))(image_batch)) {
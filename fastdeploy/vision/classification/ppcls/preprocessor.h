@@ -51,7 +51,7 @@ class FASTDEPLOY_DECL PaddleClasPreprocessor : public ProcessorManager {
    *
    * \param[in] v ture or false
    */
-  void InitialResizeOnCpu(bool v) { initial_resize_on_cpu_ = v; }
+  void InitialResizeOnCpu(bool v);
 
  private:
   bool BuildPreprocessPipelineFromConfig();
@@ -53,6 +53,12 @@ class FASTDEPLOY_DECL Processor {
   }
 
   virtual bool ImplByOpenCV(FDMatBatch* mat_batch) {
+    if (mat_batch->thread_pool != nullptr) {
+      return mat_batch->thread_pool->ParallelFor(
+          static_cast<int>(mat_batch->mats->size()), [this, mat_batch](int i) {
+            return ImplByOpenCV(&(*(mat_batch->mats))[i]);
+          });
+    }
     for (size_t i = 0; i < mat_batch->mats->size(); ++i) {
       if (ImplByOpenCV(&(*(mat_batch->mats))[i]) != true) {
         return false;
@@ -66,6 +72,12 @@ class FASTDEPLOY_DECL Processor {
   }
 
   virtual bool ImplByFlyCV(FDMatBatch* mat_batch) {
+    if (mat_batch->thread_pool != nullptr) {
+      return mat_batch->thread_pool->ParallelFor(
+          static_cast<int>(mat_batch->mats->size()), [this, mat_batch](int i) {
+            return ImplByFlyCV(&(*(mat_batch->mats))[i]);
+          });
+    }
     for (size_t i = 0; i < mat_batch->mats->size(); ++i) {
       if (ImplByFlyCV(&(*(mat_batch->mats))[i]) != true) {
         return false;
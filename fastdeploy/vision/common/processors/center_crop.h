@@ -40,6 +40,10 @@ class FASTDEPLOY_DECL CenterCrop : public Processor {
   static bool Run(FDMat* mat, const int& width, const int& height,
                   ProcLib lib = ProcLib::DEFAULT);
 
+  std::tuple<int, int> GetWidthAndHeight() {
+    return std::make_tuple(width_, height_);
+  }
+
  private:
   int height_;
   int width_;
@@ -45,6 +45,14 @@ void ProcessorManager::UseCuda(bool enable_cv_cuda, int gpu_id) {
   }
 }
 
+void ProcessorManager::UseCpuThreads(int num_threads) {
+  if (num_threads > 1) {
+    thread_pool_.reset(new ThreadPool(num_threads));
+  } else {
+    thread_pool_.reset();
+  }
+}
+
 bool ProcessorManager::CudaUsed() {
   return (proc_lib_ == ProcLib::CUDA || proc_lib_ == ProcLib::CVCUDA);
 }
@@ -66,6 +74,7 @@ bool ProcessorManager::Run(std::vector<FDMat>* images,
   image_batch.input_cache = &batch_input_cache_;
   image_batch.output_cache = &batch_output_cache_;
   image_batch.proc_lib = proc_lib_;
+  image_batch.thread_pool = thread_pool_.get();
 
   for (size_t i = 0; i < images->size(); ++i) {
     if (CudaUsed()) {
@@ -14,6 +14,9 @@
 
 #pragma once
 
+#include <memory>
+
+#include "fastdeploy/utils/thread_pool.h"
 #include "fastdeploy/utils/utils.h"
 #include "fastdeploy/vision/common/processors/mat.h"
 #include "fastdeploy/vision/common/processors/mat_batch.h"
@@ -61,6 +64,17 @@ class FASTDEPLOY_DECL ProcessorManager {
 
   int DeviceId() { return device_id_; }
 
+  /** \brief Process the images of a batch in parallel on CPU
+   *
+   * \param[in] num_threads Number of threads to run the CPU processors, the images are processed serially if it's not greater than 1
+   */
+  void UseCpuThreads(int num_threads);
+
+  /// Get the number of threads to run the CPU processors
+  int CpuThreads() const {
+    return thread_pool_ == nullptr ? 1 : thread_pool_->NumThreads();
+  }
+
   /** \brief Process the input images and prepare input tensors for runtime
    *
    * \param[in] images The input image data list, all the elements are returned by cv::imread()
@@ -86,6 +100,7 @@ class FASTDEPLOY_DECL ProcessorManager {
   cudaStream_t stream_ = nullptr;
 #endif
   int device_id_ = -1;
+  std::unique_ptr<ThreadPool> thread_pool_;
 
   std::vector<FDTensor> input_caches_;
   std::vector<FDTensor> output_caches_;
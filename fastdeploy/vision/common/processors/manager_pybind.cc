@@ -36,6 +36,8 @@ void BindProcessorManager(pybind11::module& m) {
            })
       .def("use_cuda",
            [](vision::ProcessorManager& self, bool enable_cv_cuda = false,
-              int gpu_id = -1) { self.UseCuda(enable_cv_cuda, gpu_id); });
+              int gpu_id = -1) { self.UseCuda(enable_cv_cuda, gpu_id); })
+      .def("use_cpu_threads", &vision::ProcessorManager::UseCpuThreads)
+      .def("cpu_threads", &vision::ProcessorManager::CpuThreads);
 }
 }  // namespace fastdeploy
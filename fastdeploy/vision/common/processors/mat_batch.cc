@@ -32,7 +32,9 @@ FDTensor* FDMatBatch::Tensor() {
   FDASSERT(mats != nullptr, "Failed to get batched tensor, Mats are empty.");
   FDASSERT(CheckShapeConsistency(mats), "Mats shapes are not consistent.");
   // Each mat has its own tensor,
-  // to get a batched tensor, we need copy these tensors to a batched tensor
+  // to get a batched tensor, we need copy these tensors to a batched tensor.
+  // Note the processors still write their outputs to the mats, so this copy
+  // is not saved by the thread pool, it's only spread over the threads
   FDTensor* src = (*mats)[0].Tensor();
   device = src->device;
   auto new_shape = src->Shape();
@@ -41,10 +43,21 @@ FDTensor* FDMatBatch::Tensor() {
   for (size_t i = 0; i < mats->size(); ++i) {
     FDASSERT(device == (*mats)[i].Tensor()->device,
              "Mats and MatBatch are not on the same device");
-    uint8_t* p = reinterpret_cast<uint8_t*>(input_cache->Data());
+  }
+  uint8_t* p = reinterpret_cast<uint8_t*>(input_cache->Data());
+  auto copy_slice = [this, p](int i) {
     int num_bytes = (*mats)[i].Tensor()->Nbytes();
     FDTensor::CopyBuffer(p + i * num_bytes, (*mats)[i].Tensor()->Data(),
                          num_bytes, device, false);
+    return true;
+  };
+  if (thread_pool != nullptr && device == Device::CPU) {
+    // Each worker writes its own slice of the batched tensor
+    thread_pool->ParallelFor(static_cast<int>(mats->size()), copy_slice);
+  } else {
+    for (size_t i = 0; i < mats->size(); ++i) {
+      copy_slice(static_cast<int>(i));
+    }
   }
   SetTensor(input_cache);
   return fd_tensor.get();
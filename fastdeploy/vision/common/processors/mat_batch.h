@@ -12,6 +12,7 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 #pragma once
+#include "fastdeploy/utils/thread_pool.h"
 #include "fastdeploy/vision/common/processors/mat.h"
 
 #ifdef WITH_GPU
@@ -62,6 +63,10 @@ struct FASTDEPLOY_DECL FDMatBatch {
   Device device = Device::CPU;
   ProcLib proc_lib = ProcLib::DEFAULT;
 
+  // When it's set, the CPU processors process the mats in parallel,
+  // refer to ProcessorManager::UseCpuThreads()
+  ThreadPool* thread_pool = nullptr;
+
   // False: the data is stored in the mats separately
   // True: the data is stored in the fd_tensor continuously in 4 dimensions
   bool has_batched_tensor = false;
@@ -61,6 +61,9 @@ class FASTDEPLOY_DECL NormalizeAndPermute : public Processor {
     alpha_.assign(alpha.begin(), alpha.end());
   }
 
+  std::vector<float> GetAlpha() const { return alpha_; }
+  std::vector<float> GetBeta() const { return beta_; }
+
   void SetBeta(const std::vector<float>& beta) {
     beta_.clear();
     std::vector<float>().swap(beta_);
@@ -0,0 +1,249 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "fastdeploy/vision/common/processors/resize_normalize_and_permute.h"
+
+#include "fastdeploy/vision/common/processors/center_crop.h"
+#include "fastdeploy/vision/common/processors/normalize_and_permute.h"
+#include "fastdeploy/vision/common/processors/pad.h"
+#include "fastdeploy/vision/common/processors/resize.h"
+
+namespace fastdeploy {
+namespace vision {
+
+ResizeNormalizeAndPermute::ResizeNormalizeAndPermute(
+    std::shared_ptr<Processor> resize, const std::vector<float>& alpha,
+    const std::vector<float>& beta, bool swap_rb) {
+  FDASSERT(alpha.size() == beta.size(),
+           "ResizeNormalizeAndPermute: requires the size of alpha equal to "
+           "the size of beta.");
+  resize_ = resize;
+  alpha_.assign(alpha.begin(), alpha.end());
+  beta_.assign(beta.begin(), beta.end());
+  swap_rb_ = swap_rb;
+  BuildSeparated();
+}
+
+void ResizeNormalizeAndPermute::SetCenterCrop(int width, int height) {
+  crop_w_ = width;
+  crop_h_ = height;
+  BuildSeparated();
+}
+
+void ResizeNormalizeAndPermute::SetPadding(int top, int bottom, int left,
+                                           int right,
+                                           const std::vector<float>& value) {
+  pad_ = {top, bottom, left, right};
+  pad_value_ = value;
+  BuildSeparated();
+}
+
+void ResizeNormalizeAndPermute::BuildSeparated() {
+  separated_.clear();
+  if (crop_w_ > 0 && crop_h_ > 0) {
+    separated_.push_back(std::make_shared<CenterCrop>(crop_w_, crop_h_));
+  }
+  if (pad_[0] > 0 || pad_[1] > 0 || pad_[2] > 0 || pad_[3] > 0) {
+    separated_.push_back(
+        std::make_shared<Pad>(pad_[0], pad_[1], pad_[2], pad_[3], pad_value_));
+  }
+  std::vector<float> mean(alpha_.size(), 0.0);
+  std::vector<float> std(alpha_.size(), 1.0);
+  auto normalize = std::make_shared<NormalizeAndPermute>(mean, std, false);
+  normalize->SetAlpha(alpha_);
+  normalize->SetBeta(beta_);
+  normalize->SetSwapRB(swap_rb_);
+  separated_.push_back(normalize);
+}
+
+template <typename T>
+void ResizeNormalizeAndPermute::FusedKernel(const cv::Mat& im, int crop_x,
+                                            int crop_y, int crop_w,
+                                            int crop_h, float* out) {
+  const int channels = im.channels();
+  const int out_w = crop_w + pad_[2] + pad_[3];
+  const int out_h = crop_h + pad_[0] + pad_[1];
+  const int plane = out_w * out_h;
+  // The output channel c is read from the input channel src_c[c]
+  std::vector<int> src_c(channels);
+  for (int c = 0; c < channels; ++c) {
+    src_c[c] = c;
+  }
+  if (swap_rb_) {
+    std::swap(src_c[0], src_c[2]);
+  }
+
+  bool has_pad = pad_[0] > 0 || pad_[1] > 0 || pad_[2] > 0 || pad_[3] > 0;
+  for (int c = 0; has_pad && c < channels; ++c) {
+    // The padding is done before normalization in the separated processors,
+    // so the value is saturated to the input data type first.
+    float value =
+        static_cast<float>(cv::saturate_cast<T>(pad_value_[src_c[c]]));
+    value = value * alpha_[c] + beta_[c];
+    float* dst = out + c * plane;
+    std::fill(dst, dst + pad_[0] * out_w, value);
+    std::fill(dst + (pad_[0] + crop_h) * out_w, dst + plane, value);
+    for (int y = pad_[0]; y < pad_[0] + crop_h; ++y) {
+      std::fill(dst + y * out_w, dst + y * out_w + pad_[2], value);
+      std::fill(dst + y * out_w + pad_[2] + crop_w, dst + (y + 1) * out_w,
+                value);
+    }
+  }
+
+  if (channels == 3) {
+    const float a0 = alpha_[0], a1 = alpha_[1], a2 = alpha_[2];
+    const float b0 = beta_[0], b1 = beta_[1], b2 = beta_[2];
+    const int s0 = src_c[0], s1 = src_c[1], s2 = src_c[2];
+    for (int y = 0; y < crop_h; ++y) {
+      const T* src = im.ptr<T>(crop_y + y) + crop_x * 3;
+      int offset = (y + pad_[0]) * out_w + pad_[2];
+      float* dst0 = out + offset;
+      float* dst1 = dst0 + plane;
+      float* dst2 = dst1 + plane;
+      for (int x = 0; x < crop_w; ++x) {
+        dst0[x] = static_cast<float>(src[x * 3 + s0]) * a0 + b0;
+        dst1[x] = static_cast<float>(src[x * 3 + s1]) * a1 + b1;
+        dst2[x] = static_cast<float>(src[x * 3 + s2]) * a2 + b2;
+      }
+    }
+    return;
+  }
+  for (int y = 0; y < crop_h; ++y) {
+    const T* src = im.ptr<T>(crop_y + y) + crop_x * channels;
+    int offset = (y + pad_[0]) * out_w + pad_[2];
+    for (int x = 0; x < crop_w; ++x) {
+      for (int c = 0; c < channels; ++c) {
+        out[c * plane + offset + x] =
+            static_cast<float>(src[x * channels + src_c[c]]) * alpha_[c] +
+            beta_[c];
+      }
+    }
+  }
+}
+
+bool ResizeNormalizeAndPermute::ImplByOpenCV(FDMat* mat) {
+  if (mat->layout != Layout::HWC) {
+    FDERROR << "Only supports input with HWC layout." << std::endl;
+    return false;
+  }
+  cv::Mat* im = mat->GetOpenCVMat();
+  int channels = im->channels();
+  bool has_pad = pad_[0] > 0 || pad_[1] > 0 || pad_[2] > 0 || pad_[3] > 0;
+  bool fusible = (im->depth() == CV_8U || im->depth() == CV_32F) &&
+                 channels == static_cast<int>(alpha_.size()) &&
+                 (!swap_rb_ || channels >= 3) &&
+                 (!has_pad || static_cast<int>(pad_value_.size()) == channels);
+  if (!fusible) {
+    return RunSeparately(mat);
+  }
+  if (resize_ != nullptr && !resize_->ImplByOpenCV(mat)) {
+    return false;
+  }
+  im = mat->GetOpenCVMat();
+
+  int crop_w = crop_w_ > 0 ? crop_w_ : im->cols;
+  int crop_h = crop_h_ > 0 ? crop_h_ : im->rows;
+  if (im->cols < crop_w || im->rows < crop_h) {
+    FDERROR << "[CenterCrop] Image size less than crop size" << std::endl;
+    return false;
+  }
+  int crop_x = (im->cols - crop_w) / 2;
+  int crop_y = (im->rows - crop_h) / 2;
+  int out_w = crop_w + pad_[2] + pad_[3];
+  int out_h = crop_h + pad_[0] + pad_[1];
+
+  cv::Mat res(out_h, out_w, CV_32FC(channels));
+  float* out = reinterpret_cast<float*>(res.ptr());
+  if (im->depth() == CV_8U) {
+    FusedKernel<uint8_t>(*im, crop_x, crop_y, crop_w, crop_h, out);
+  } else {
+    FusedKernel<float>(*im, crop_x, crop_y, crop_w, crop_h, out);
+  }
+  mat->SetMat(res);
+  mat->SetWidth(out_w);
+  mat->SetHeight(out_h);
+  mat->layout = Layout::CHW;
+  return true;
+}
+
+bool ResizeNormalizeAndPermute::RunSeparately(FDMat* mat) {
+  if (resize_ != nullptr && !(*resize_)(mat)) {
+    return false;
+  }
+  for (auto& processor : separated_) {
+    if (!(*processor)(mat)) {
+      return false;
+    }
+  }
+  return true;
+}
+
+bool ResizeNormalizeAndPermute::RunSeparately(FDMatBatch* mat_batch) {
+  if (resize_ != nullptr && !(*resize_)(mat_batch)) {
+    return false;
+  }
+  for (auto& processor : separated_) {
+    if (!(*processor)(mat_batch)) {
+      return false;
+    }
+  }
+  return true;
+}
+
+#ifdef ENABLE_FLYCV
+bool ResizeNormalizeAndPermute::ImplByFlyCV(FDMat* mat) {
+  return RunSeparately(mat);
+}
+#endif
+
+#ifdef WITH_GPU
+bool ResizeNormalizeAndPermute::ImplByCuda(FDMat* mat) {
+  return RunSeparately(mat);
+}
+
+bool ResizeNormalizeAndPermute::ImplByCuda(FDMatBatch* mat_batch) {
+  return RunSeparately(mat_batch);
+}
+#endif
+
+#ifdef ENABLE_CVCUDA
+bool ResizeNormalizeAndPermute::ImplByCvCuda(FDMat* mat) {
+  return RunSeparately(mat);
+}
+
+bool ResizeNormalizeAndPermute::ImplByCvCuda(FDMatBatch* mat_batch) {
+  return RunSeparately(mat_batch);
+}
+#endif
+
+bool ResizeNormalizeAndPermute::Run(FDMat* mat, int resize_w, int resize_h,
+                                    const std::vector<int>& pad,
+                                    const std::vector<float>& pad_value,
+                                    const std::vector<float>& alpha,
+                                    const std::vector<float>& beta,
+                                    bool swap_rb, int interp, ProcLib lib) {
+  std::shared_ptr<Processor> resize;
+  if (resize_w != mat->Width() || resize_h != mat->Height()) {
+    resize = std::make_shared<Resize>(resize_w, resize_h, -1.0, -1.0, interp);
+  }
+  auto op = ResizeNormalizeAndPermute(resize, alpha, beta, swap_rb);
+  if (pad.size() == 4 &&
+      (pad[0] > 0 || pad[1] > 0 || pad[2] > 0 || pad[3] > 0)) {
+    op.SetPadding(pad[0], pad[1], pad[2], pad[3], pad_value);
+  }
+  return op(mat, lib);
+}
+
+}  // namespace vision
+}  // namespace fastdeploy
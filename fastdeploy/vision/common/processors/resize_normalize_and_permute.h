@@ -0,0 +1,108 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#pragma once
+
+#include "fastdeploy/vision/common/processors/base.h"
+
+namespace fastdeploy {
+namespace vision {
+
+/*! @brief Fused processor of Resize -> CenterCrop/Pad -> Normalize -> HWC2CHW
+ *
+ * The resized image is cropped, padded, normalized, channel swapped and
+ * permuted to CHW layout in one pass, without the intermediate Mats of the
+ * separated processors. On the other processing libraries, the separated
+ * processors are run instead.
+ */
+class FASTDEPLOY_DECL ResizeNormalizeAndPermute : public Processor {
+ public:
+  /** \brief Create the fused processor
+   *
+   * \param[in] resize The resize processor, e.g. Resize or ResizeByShort, nullptr means no resize
+   * \param[in] alpha The scale of the normalization, result = pixel * alpha + beta
+   * \param[in] beta The offset of the normalization
+   * \param[in] swap_rb Whether to swap the first and the third channels
+   */
+  ResizeNormalizeAndPermute(std::shared_ptr<Processor> resize,
+                            const std::vector<float>& alpha,
+                            const std::vector<float>& beta,
+                            bool swap_rb = false);
+
+  bool ImplByOpenCV(FDMat* mat);
+#ifdef ENABLE_FLYCV
+  bool ImplByFlyCV(FDMat* mat);
+#endif
+#ifdef WITH_GPU
+  bool ImplByCuda(FDMat* mat);
+  bool ImplByCuda(FDMatBatch* mat_batch);
+#endif
+#ifdef ENABLE_CVCUDA
+  bool ImplByCvCuda(FDMat* mat);
+  bool ImplByCvCuda(FDMatBatch* mat_batch);
+#endif
+  std::string Name() { return "ResizeNormalizeAndPermute"; }
+
+  /// Crop the center area with size (width, height) after resize
+  void SetCenterCrop(int width, int height);
+
+  /// Pad the image with value after resize and crop
+  void SetPadding(int top, int bottom, int left, int right,
+                  const std::vector<float>& value);
+
+  std::shared_ptr<Processor> GetResize() { return resize_; }
+
+  /** \brief Letterbox the image to the target size, i.e. resize, pad, normalize and permute it in one pass
+   *
+   * \param[in] mat The input image
+   * \param[in] resize_w The width after resize, no resize while it's equal to the width of mat
+   * \param[in] resize_h The height after resize, no resize while it's equal to the height of mat
+   * \param[in] pad The padding size of [top, bottom, left, right]
+   * \param[in] pad_value The padding value of each channel
+   * \param[in] alpha The scale of the normalization
+   * \param[in] beta The offset of the normalization
+   * \param[in] swap_rb Whether to swap the first and the third channels
+   * \param[in] interp The interpolation method of resize
+   * \param[in] lib The processing library
+   * \return true if the process successed, otherwise false
+   */
+  static bool Run(FDMat* mat, int resize_w, int resize_h,
+                  const std::vector<int>& pad,
+                  const std::vector<float>& pad_value,
+                  const std::vector<float>& alpha,
+                  const std::vector<float>& beta, bool swap_rb = false,
+                  int interp = 1, ProcLib lib = ProcLib::DEFAULT);
+
+ private:
+  // Run the separated processors on the other processing libraries
+  bool RunSeparately(FDMat* mat);
+  bool RunSeparately(FDMatBatch* mat_batch);
+  void BuildSeparated();
+  template <typename T>
+  void FusedKernel(const cv::Mat& im, int crop_x, int crop_y, int crop_w,
+                   int crop_h, float* out);
+
+  std::shared_ptr<Processor> resize_;
+  std::vector<std::shared_ptr<Processor>> separated_;
+  std::vector<float> alpha_;
+  std::vector<float> beta_;
+  bool swap_rb_;
+  int crop_w_ = -1;
+  int crop_h_ = -1;
+  std::vector<int> pad_ = {0, 0, 0, 0};
+  std::vector<float> pad_value_;
+};
+
+}  // namespace vision
+}  // namespace fastdeploy
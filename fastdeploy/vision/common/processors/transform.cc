@@ -161,11 +161,58 @@ void FuseNormalizeColorConvert(
          << " with swap_rb=" << !swap_rb << std::endl;
 }
 
+void FuseResizeNormalizePermute(
+    std::vector<std::shared_ptr<Processor>>* processors) {
+  // Fuse Resize/ResizeByShort + CenterCrop(optional) + NormalizeAndPermute
+  int normalize_index = -1;
+  for (size_t i = 0; i < processors->size(); ++i) {
+    if ((*processors)[i]->Name() == "NormalizeAndPermute") {
+      normalize_index = i;
+      break;
+    }
+  }
+  if (normalize_index < 1) {
+    return;
+  }
+  int resize_index = normalize_index - 1;
+  int crop_w = -1;
+  int crop_h = -1;
+  if ((*processors)[resize_index]->Name() == "CenterCrop") {
+    std::tie(crop_w, crop_h) =
+        dynamic_cast<CenterCrop*>((*processors)[resize_index].get())
+            ->GetWidthAndHeight();
+    resize_index -= 1;
+  }
+  if (resize_index < 0 || ((*processors)[resize_index]->Name() != "Resize" &&
+                           (*processors)[resize_index]->Name() !=
+                               "ResizeByShort")) {
+    return;
+  }
+
+  auto normalize = dynamic_cast<NormalizeAndPermute*>(
+      (*processors)[normalize_index].get());
+  auto fused = std::make_shared<ResizeNormalizeAndPermute>(
+      (*processors)[resize_index], normalize->GetAlpha(),
+      normalize->GetBeta(), normalize->GetSwapRB());
+  if (crop_w > 0) {
+    fused->SetCenterCrop(crop_w, crop_h);
+  }
+  std::string resize_name = (*processors)[resize_index]->Name();
+  processors->erase(processors->begin() + resize_index,
+                    processors->begin() + normalize_index + 1);
+  processors->insert(processors->begin() + resize_index, fused);
+  FDINFO << resize_name << (crop_w > 0 ? ", CenterCrop" : "")
+         << " and NormalizeAndPermute are fused to ResizeNormalizeAndPermute"
+            " in preprocessing pipeline."
+         << std::endl;
+}
+
 void FuseTransforms(
     std::vector<std::shared_ptr<Processor>>* processors) {
   FuseNormalizeCast(processors);
   FuseNormalizeHWC2CHW(processors);
   FuseNormalizeColorConvert(processors);
+  FuseResizeNormalizePermute(processors);
 }
 
 
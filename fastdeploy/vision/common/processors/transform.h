@@ -29,6 +29,7 @@
 #include "fastdeploy/vision/common/processors/pad_to_size.h"
 #include "fastdeploy/vision/common/processors/resize.h"
 #include "fastdeploy/vision/common/processors/resize_by_short.h"
+#include "fastdeploy/vision/common/processors/resize_normalize_and_permute.h"
 #include "fastdeploy/vision/common/processors/stride_pad.h"
 #include "fastdeploy/vision/common/processors/warp_affine.h"
 #include <unordered_set>
@@ -44,6 +45,10 @@ void FuseNormalizeHWC2CHW(std::vector<std::shared_ptr<Processor>>* processors);
 // Fuse Normalize + Color Convert
 void FuseNormalizeColorConvert(
     std::vector<std::shared_ptr<Processor>>* processors);
+// Fuse Resize/ResizeByShort + CenterCrop + NormalizeAndPermute to
+// ResizeNormalizeAndPermute
+void FuseResizeNormalizePermute(
+    std::vector<std::shared_ptr<Processor>>* processors);
 
 }  // namespace vision
 }  // namespace fastdeploy
@@ -29,38 +29,57 @@ YOLOv5Preprocessor::YOLOv5Preprocessor() {
   max_wh_ = 7680.0;
 }
 
-void YOLOv5Preprocessor::LetterBox(FDMat* mat) {
+void YOLOv5Preprocessor::GetLetterBoxShape(const FDMat& mat, int* resize_w,
+                                           int* resize_h,
+                                           std::vector<int>* pad) {
   float scale =
-      std::min(size_[1] * 1.0 / mat->Height(), size_[0] * 1.0 / mat->Width());
+      std::min(size_[1] * 1.0 / mat.Height(), size_[0] * 1.0 / mat.Width());
   if (!is_scale_up_) {
     scale = std::min(scale, 1.0f);
   }
 
-  int resize_h = int(round(mat->Height() * scale));
-  int resize_w = int(round(mat->Width() * scale));
+  int new_h = int(round(mat.Height() * scale));
+  int new_w = int(round(mat.Width() * scale));
 
-  int pad_w = size_[0] - resize_w;
-  int pad_h = size_[1] - resize_h;
+  int pad_w = size_[0] - new_w;
+  int pad_h = size_[1] - new_h;
   if (is_mini_pad_) {
     pad_h = pad_h % stride_;
     pad_w = pad_w % stride_;
   } else if (is_no_pad_) {
     pad_h = 0;
     pad_w = 0;
-    resize_h = size_[1];
-    resize_w = size_[0];
+    new_h = size_[1];
+    new_w = size_[0];
   }
+  // No resize while the scale is 1.0
+  *resize_w = mat.Width();
+  *resize_h = mat.Height();
   if (std::fabs(scale - 1.0f) > 1e-06) {
-    Resize::Run(mat, resize_w, resize_h);
+    *resize_w = new_w;
+    *resize_h = new_h;
   }
+  pad->assign(4, 0);
   if (pad_h > 0 || pad_w > 0) {
     float half_h = pad_h * 1.0 / 2;
-    int top = int(round(half_h - 0.1));
-    int bottom = int(round(half_h + 0.1));
+    (*pad)[0] = int(round(half_h - 0.1));
+    (*pad)[1] = int(round(half_h + 0.1));
     float half_w = pad_w * 1.0 / 2;
-    int left = int(round(half_w - 0.1));
-    int right = int(round(half_w + 0.1));
-    Pad::Run(mat, top, bottom, left, right, padding_value_);
+    (*pad)[2] = int(round(half_w - 0.1));
+    (*pad)[3] = int(round(half_w + 0.1));
+  }
+}
+
+void YOLOv5Preprocessor::LetterBox(FDMat* mat) {
+  int resize_w = mat->Width();
+  int resize_h = mat->Height();
+  std::vector<int> pad;
+  GetLetterBoxShape(*mat, &resize_w, &resize_h, &pad);
+  if (resize_w != mat->Width() || resize_h != mat->Height()) {
+    Resize::Run(mat, resize_w, resize_h);
+  }
+  if (pad[0] > 0 || pad[1] > 0 || pad[2] > 0 || pad[3] > 0) {
+    Pad::Run(mat, pad[0], pad[1], pad[2], pad[3], padding_value_);
   }
 }
 
@@ -73,10 +92,18 @@ bool YOLOv5Preprocessor::Preprocess(
   // yolov5's preprocess steps
   // 1. letterbox
   // 2. convert_and_permute(swap_rb=true)
-  LetterBox(mat);
+  // they are fused to one pass over the image
+  int resize_w = mat->Width();
+  int resize_h = mat->Height();
+  std::vector<int> pad;
+  GetLetterBoxShape(*mat, &resize_w, &resize_h, &pad);
   std::vector<float> alpha = {1.0f / 255.0f, 1.0f / 255.0f, 1.0f / 255.0f};
   std::vector<float> beta = {0.0f, 0.0f, 0.0f};
-  ConvertAndPermute::Run(mat, alpha, beta, true);
+  if (!ResizeNormalizeAndPermute::Run(mat, resize_w, resize_h, pad,
+                                      padding_value_, alpha, beta, true)) {
+    FDERROR << "Failed to letterbox and normalize the image." << std::endl;
+    return false;
+  }
 
   // Record output shape of preprocessed image
   (*im_info)["output_shape"] = {static_cast<float>(mat->Height()),
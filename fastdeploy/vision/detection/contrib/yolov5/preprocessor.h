@@ -84,6 +84,11 @@ class FASTDEPLOY_DECL YOLOv5Preprocessor {
 
   void LetterBox(FDMat* mat);
 
+  // Get the size after resize and the padding size of [top, bottom, left,
+  // right] for letterbox
+  void GetLetterBoxShape(const FDMat& mat, int* resize_w, int* resize_h,
+                         std::vector<int>* pad);
+
   // target size, tuple of (width, height), default size = {640, 640}
   std::vector<int> size_;
 
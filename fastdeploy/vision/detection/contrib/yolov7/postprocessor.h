@@ -58,7 +58,6 @@ class FASTDEPLOY_DECL YOLOv7Postprocessor {
  protected:
   float conf_threshold_;
   float nms_threshold_;
-  float max_wh_;
 };
 
 }  // namespace detection
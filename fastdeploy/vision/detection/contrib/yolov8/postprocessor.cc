@@ -23,7 +23,6 @@ YOLOv8Postprocessor::YOLOv8Postprocessor() {
   conf_threshold_ = 0.25;
   nms_threshold_ = 0.5;
   multi_label_ = true;
-  max_wh_ = 7680.0;
 }
 
 bool YOLOv8Postprocessor::Run(
@@ -65,10 +64,10 @@ bool YOLOv8Postprocessor::Run(
 
           // convert from [x, y, w, h] to [x1, y1, x2, y2]
           (*results)[bs].boxes.emplace_back(std::array<float, 4>{
-              data[s] - data[s + 2] / 2.0f + label_id * max_wh_,
-              data[s + 1] - data[s + 3] / 2.0f + label_id * max_wh_,
-              data[s + 0] + data[s + 2] / 2.0f + label_id * max_wh_,
-              data[s + 1] + data[s + 3] / 2.0f + label_id * max_wh_});
+              data[s] - data[s + 2] / 2.0f,
+              data[s + 1] - data[s + 3] / 2.0f,
+              data[s + 0] + data[s + 2] / 2.0f,
+              data[s + 1] + data[s + 3] / 2.0f});
           (*results)[bs].label_ids.push_back(label_id);
           (*results)[bs].scores.push_back(confidence);
         }
@@ -83,21 +82,21 @@ bool YOLOv8Postprocessor::Run(
         int32_t label_id = std::distance(data + s + 4, max_class_score);
         // convert from [x, y, w, h] to [x1, y1, x2, y2]
         (*results)[bs].boxes.emplace_back(std::array<float, 4>{
-            data[s] - data[s + 2] / 2.0f + label_id * max_wh_,
-            data[s + 1] - data[s + 3] / 2.0f + label_id * max_wh_,
-            data[s + 0] + data[s + 2] / 2.0f + label_id * max_wh_,
-            data[s + 1] + data[s + 3] / 2.0f + label_id * max_wh_});
+            data[s] - data[s + 2] / 2.0f,
+            data[s + 1] - data[s + 3] / 2.0f,
+            data[s + 0] + data[s + 2] / 2.0f,
+            data[s + 1] + data[s + 3] / 2.0f});
         (*results)[bs].label_ids.push_back(label_id);
         (*results)[bs].scores.push_back(confidence);
       }
     }
 
-    if ((*results)[bs].boxes.size() == 0) {
-      return true;
-    }
+  }
 
-    utils::NMS(&((*results)[bs]), nms_threshold_);
+  // Class aware NMS over the candidate boxes of all the images in one pass
+  utils::BatchedNMS(results, nms_threshold_, true);
 
+  for (size_t bs = 0; bs < batch; ++bs) {
     // scale the boxes to the origin image shape
     auto iter_out = ims_info[bs].find("output_shape");
     auto iter_ipt = ims_info[bs].find("input_shape");
@@ -111,16 +110,7 @@ bool YOLOv8Postprocessor::Run(
     float pad_h = (out_h - ipt_h * scale) / 2;
     float pad_w = (out_w - ipt_w * scale) / 2;
     for (size_t i = 0; i < (*results)[bs].boxes.size(); ++i) {
-      int32_t label_id = ((*results)[bs].label_ids)[i];
       // clip box
-      (*results)[bs].boxes[i][0] =
-          (*results)[bs].boxes[i][0] - max_wh_ * label_id;
-      (*results)[bs].boxes[i][1] =
-          (*results)[bs].boxes[i][1] - max_wh_ * label_id;
-      (*results)[bs].boxes[i][2] =
-          (*results)[bs].boxes[i][2] - max_wh_ * label_id;
-      (*results)[bs].boxes[i][3] =
-          (*results)[bs].boxes[i][3] - max_wh_ * label_id;
       (*results)[bs].boxes[i][0] =
           std::max(((*results)[bs].boxes[i][0] - pad_w) / scale, 0.0f);
       (*results)[bs].boxes[i][1] =
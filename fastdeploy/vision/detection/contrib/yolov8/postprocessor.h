@@ -67,7 +67,6 @@ class FASTDEPLOY_DECL YOLOv8Postprocessor {
   float conf_threshold_;
   float nms_threshold_;
   bool multi_label_;
-  float max_wh_;
 };
 
 }  // namespace detection
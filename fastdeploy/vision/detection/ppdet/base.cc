@@ -51,9 +51,13 @@ bool PPDetBase::Predict(const cv::Mat& im, DetectionResult* result) {
 bool PPDetBase::BatchPredict(const std::vector<cv::Mat>& imgs,
                              std::vector<DetectionResult>* results) {
   std::vector<FDMat> fd_images = WrapMat(imgs);
-  if (!preprocessor_.Run(&fd_images, &reused_input_tensors_)) {
-    FDERROR << "Failed to preprocess the input image." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, trace_stage_.c_str(), "preprocess",
+                     imgs.size());
+    if (!preprocessor_.Run(&fd_images, &reused_input_tensors_)) {
+      FDERROR << "Failed to preprocess the input image." << std::endl;
+      return false;
+    }
   }
   reused_input_tensors_[0].name = "image";
   reused_input_tensors_[1].name = "scale_factor";
@@ -74,6 +78,8 @@ bool PPDetBase::BatchPredict(const std::vector<cv::Mat>& imgs,
     return false;
   }
 
+  TraceScope trace(tracer_, trace_stage_.c_str(), "postprocess",
+                   imgs.size());
   if (!postprocessor_.Run(reused_output_tensors_, results)) {
     FDERROR << "Failed to postprocess the inference results by runtime."
             << std::endl;
@@ -88,8 +88,8 @@ void PaddleMultiClassNMS::FastNMS(const float* boxes, const float* scores,
                    &sorted_indices);
 
   float adaptive_threshold = nms_threshold;
-  while (sorted_indices.size() != 0) {
-    const int idx = sorted_indices.front().second;
+  for (size_t i = 0; i < sorted_indices.size(); ++i) {
+    const int idx = sorted_indices[i].second;
     bool keep = true;
     for (size_t k = 0; k < keep_indices->size(); ++k) {
       if (!keep) {
@@ -103,7 +103,6 @@ void PaddleMultiClassNMS::FastNMS(const float* boxes, const float* scores,
     if (keep) {
       keep_indices->push_back(idx);
     }
-    sorted_indices.erase(sorted_indices.begin());
     if (keep && nms_eta<1.0 & adaptive_threshold> 0.5) {
       adaptive_threshold *= nms_eta;
     }
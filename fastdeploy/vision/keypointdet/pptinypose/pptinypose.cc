@@ -226,30 +226,37 @@ bool PPTinyPose::Predict(cv::Mat* im, KeyPointDetectionResult* result,
   std::vector<std::vector<float>> scale_bs;
   int crop_imgs_num = 0;
   int box_num = detection_result.boxes.size();
-  for (int i = 0; i < box_num; i++) {
-    auto box = detection_result.boxes[i];
-    auto label_id = detection_result.label_ids[i];
-    int channel = im->channels();
-    cv::Mat cv_crop_img(0, 0, CV_32SC(channel));
-    Mat crop_img(cv_crop_img);
-    std::vector<float> rect(box.begin(), box.end());
-    std::vector<float> center;
-    std::vector<float> scale;
-    if (label_id == 0) {
-      Mat mat(*im);
-      utils::CropImageByBox(mat, &crop_img, rect, &center, &scale);
-      center_bs.emplace_back(center);
-      scale_bs.emplace_back(scale);
-      crop_imgs.emplace_back(crop_img);
-      crop_imgs_num += 1;
+  {
+    TraceScope crop_trace(tracer_, trace_stage_.c_str(), "crop", box_num);
+    for (int i = 0; i < box_num; i++) {
+      auto box = detection_result.boxes[i];
+      auto label_id = detection_result.label_ids[i];
+      int channel = im->channels();
+      cv::Mat cv_crop_img(0, 0, CV_32SC(channel));
+      Mat crop_img(cv_crop_img);
+      std::vector<float> rect(box.begin(), box.end());
+      std::vector<float> center;
+      std::vector<float> scale;
+      if (label_id == 0) {
+        Mat mat(*im);
+        utils::CropImageByBox(mat, &crop_img, rect, &center, &scale);
+        center_bs.emplace_back(center);
+        scale_bs.emplace_back(scale);
+        crop_imgs.emplace_back(crop_img);
+        crop_imgs_num += 1;
+      }
     }
+    crop_trace.SetItems(crop_imgs_num);
   }
   for (int i = 0; i < crop_imgs_num; i++) {
     std::vector<FDTensor> processed_data;
-    if (!Preprocess(&crop_imgs[i], &processed_data)) {
-      FDERROR << "Failed to preprocess input data while using model:"
-              << ModelName() << "." << std::endl;
-      return false;
+    {
+      TraceScope trace(tracer_, trace_stage_.c_str(), "preprocess");
+      if (!Preprocess(&crop_imgs[i], &processed_data)) {
+        FDERROR << "Failed to preprocess input data while using model:"
+                << ModelName() << "." << std::endl;
+        return false;
+      }
     }
     std::vector<FDTensor> infer_result;
     if (!Infer(processed_data, &infer_result)) {
@@ -258,11 +265,14 @@ bool PPTinyPose::Predict(cv::Mat* im, KeyPointDetectionResult* result,
       return false;
     }
     KeyPointDetectionResult one_cropimg_result;
-    if (!Postprocess(infer_result, &one_cropimg_result, center_bs[i],
-                     scale_bs[i])) {
-      FDERROR << "Failed to postprocess while using model:" << ModelName()
-              << "." << std::endl;
-      return false;
+    {
+      TraceScope trace(tracer_, trace_stage_.c_str(), "postprocess");
+      if (!Postprocess(infer_result, &one_cropimg_result, center_bs[i],
+                       scale_bs[i])) {
+        FDERROR << "Failed to postprocess while using model:" << ModelName()
+                << "." << std::endl;
+        return false;
+      }
     }
     if (result->num_joints == -1) {
       result->num_joints = one_cropimg_result.num_joints;
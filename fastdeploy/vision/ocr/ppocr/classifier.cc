@@ -103,10 +103,14 @@ bool Classifier::BatchPredict(const std::vector<cv::Mat>& images,
                               size_t start_index, size_t end_index) {
   size_t total_size = images.size();
   std::vector<FDMat> fd_images = WrapMat(images);
-  if (!preprocessor_.Run(&fd_images, &reused_input_tensors_, start_index,
-                         end_index)) {
-    FDERROR << "Failed to preprocess the input image." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, trace_stage_.c_str(), "preprocess",
+                     end_index - start_index);
+    if (!preprocessor_.Run(&fd_images, &reused_input_tensors_, start_index,
+                           end_index)) {
+      FDERROR << "Failed to preprocess the input image." << std::endl;
+      return false;
+    }
   }
   reused_input_tensors_[0].name = InputInfoOfRuntime(0).name;
   if (!Infer(reused_input_tensors_, &reused_output_tensors_)) {
@@ -114,6 +118,8 @@ bool Classifier::BatchPredict(const std::vector<cv::Mat>& images,
     return false;
   }
 
+  TraceScope trace(tracer_, trace_stage_.c_str(), "postprocess",
+                   end_index - start_index);
   if (!postprocessor_.Run(reused_output_tensors_, cls_labels, cls_scores,
                           start_index, total_size)) {
     FDERROR << "Failed to postprocess the inference cls_results by runtime."
@@ -96,9 +96,13 @@ bool DBDetector::BatchPredict(
     const std::vector<cv::Mat>& images,
     std::vector<std::vector<std::array<int, 8>>>* det_results) {
   std::vector<FDMat> fd_images = WrapMat(images);
-  if (!preprocessor_.Run(&fd_images, &reused_input_tensors_)) {
-    FDERROR << "Failed to preprocess input image." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, trace_stage_.c_str(), "preprocess",
+                     images.size());
+    if (!preprocessor_.Run(&fd_images, &reused_input_tensors_)) {
+      FDERROR << "Failed to preprocess input image." << std::endl;
+      return false;
+    }
   }
   auto batch_det_img_info = preprocessor_.GetBatchImgInfo();
 
@@ -108,6 +112,8 @@ bool DBDetector::BatchPredict(
     return false;
   }
 
+  TraceScope trace(tracer_, trace_stage_.c_str(), "postprocess",
+                   images.size());
   if (!postprocessor_.Run(reused_output_tensors_, det_results,
                           *batch_det_img_info)) {
     FDERROR << "Failed to postprocess the inference cls_results by runtime."
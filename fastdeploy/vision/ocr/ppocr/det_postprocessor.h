@@ -67,6 +67,13 @@ class FASTDEPLOY_DECL DBDetectorPostprocessor {
   /// Get use_dilation of the detection postprocess
   int GetUseDilation() const { return use_dilation_; }
 
+  /// Set use_fast_postprocess for the detection postprocess, default is true. The scores of the axis-aligned boxes are got from the integral image, and the rectangle boxes are unclipped analytically instead of by Clipper, the other boxes always go through the original path
+  void SetUseFastPostprocess(bool use_fast_postprocess) {
+    use_fast_postprocess_ = use_fast_postprocess;
+  }
+  /// Get use_fast_postprocess of the detection postprocess
+  bool GetUseFastPostprocess() const { return use_fast_postprocess_; }
+
 
  private:
   double det_db_thresh_ = 0.3;
@@ -74,6 +81,7 @@ class FASTDEPLOY_DECL DBDetectorPostprocessor {
   double det_db_unclip_ratio_ = 1.5;
   std::string det_db_score_mode_ = "slow";
   bool use_dilation_ = false;
+  bool use_fast_postprocess_ = true;
   PostProcessor util_post_processor_;
   bool SingleBatchPostprocessor(const float* out_data, int n2, int n3,
                                 const std::array<int, 4>& det_img_info,
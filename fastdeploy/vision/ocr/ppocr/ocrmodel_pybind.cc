@@ -13,14 +13,81 @@
 // limitations under the License.
 #include <pybind11/stl.h>
 
+#include <memory>
+#include <mutex>  // NOLINT
+
 #include "fastdeploy/pybind/main.h"
+#include "fastdeploy/vision/ocr/ppocr/utils/ocr_utils.h"
 
 namespace fastdeploy {
+namespace {
+// The thread pool shared by the crop functions, a new pool is created once
+// another number of threads is required
+std::shared_ptr<ThreadPool> GetCropThreadPool(int num_threads) {
+  static std::mutex mutex;
+  static std::shared_ptr<ThreadPool> pool;
+  if (num_threads <= 1) {
+    return nullptr;
+  }
+  std::lock_guard<std::mutex> lock(mutex);
+  if (pool == nullptr || pool->NumThreads() != num_threads) {
+    pool = std::make_shared<ThreadPool>(num_threads);
+  }
+  return pool;
+}
+}  // namespace
+
 void BindPPOCRModel(pybind11::module& m) {
   m.def("sort_boxes", [](std::vector<std::array<int, 8>>& boxes) {
     vision::ocr::SortBoxes(&boxes);
     return boxes;
   });
+  m.def("crop_text_regions",
+        [](pybind11::array& data, std::vector<std::array<int, 8>>& boxes,
+           int num_threads) {
+          auto mat = PyArrayToCvMat(data);
+          std::vector<cv::Mat> crops;
+          {
+            pybind11::gil_scoped_release release;
+            auto pool = GetCropThreadPool(num_threads);
+            FDASSERT(vision::ocr::GetRotateCropImages(mat, boxes, &crops,
+                                                      pool.get()),
+                     "Failed to crop the text regions.");
+          }
+          std::vector<pybind11::array> results;
+          for (auto& crop : crops) {
+            FDTensor out;
+            vision::Mat(crop).ShareWithTensor(&out);
+            results.push_back(TensorToPyArray(out));
+          }
+          return results;
+        });
+  m.def("crop_text_regions_to_batch",
+        [](pybind11::array& data, std::vector<std::array<int, 8>>& boxes,
+           std::vector<int>& rec_image_shape, pybind11::object& out,
+           int num_threads) {
+          auto mat = PyArrayToCvMat(data);
+          FDTensor batch;
+          void* out_data = nullptr;
+          if (!out.is_none()) {
+            auto out_array = out.cast<pybind11::array>();
+            std::vector<int64_t> shape(out_array.shape(),
+                                       out_array.shape() + out_array.ndim());
+            out_data = out_array.mutable_data();
+            batch.SetExternalData(shape, FDDataType::FP32, out_data);
+          }
+          {
+            pybind11::gil_scoped_release release;
+            auto pool = GetCropThreadPool(num_threads);
+            FDASSERT(vision::ocr::CropTextRegionsToBatch(
+                         mat, boxes, rec_image_shape, &batch, pool.get()),
+                     "Failed to crop the text regions.");
+          }
+          if (out_data != nullptr && batch.Data() == out_data) {
+            return out.cast<pybind11::array>();
+          }
+          return TensorToPyArray(batch);
+        });
 
   // DBDetector
   pybind11::class_<vision::ocr::DBDetectorPreprocessor,
@@ -77,6 +144,10 @@ void BindPPOCRModel(pybind11::module& m) {
       .def_property("use_dilation",
                     &vision::ocr::DBDetectorPostprocessor::GetUseDilation,
                     &vision::ocr::DBDetectorPostprocessor::SetUseDilation)
+      .def_property(
+          "use_fast_postprocess",
+          &vision::ocr::DBDetectorPostprocessor::GetUseFastPostprocess,
+          &vision::ocr::DBDetectorPostprocessor::SetUseFastPostprocess)
 
       .def("run",
            [](vision::ocr::DBDetectorPostprocessor& self,
@@ -27,6 +27,18 @@ void BindPPOCRv3(pybind11::module& m) {
                           fastdeploy::vision::ocr::Recognizer*>())
       .def_property("cls_batch_size", &pipeline::PPOCRv3::GetClsBatchSize, &pipeline::PPOCRv3::SetClsBatchSize)
       .def_property("rec_batch_size", &pipeline::PPOCRv3::GetRecBatchSize, &pipeline::PPOCRv3::SetRecBatchSize)
+      .def_property("rec_batch_max_pixels", &pipeline::PPOCRv3::GetRecBatchMaxPixels, &pipeline::PPOCRv3::SetRecBatchMaxPixels)
+      .def("get_batch_statistics", [](pipeline::PPOCRv3& self) {
+        const auto& stats = self.GetBatchStatistics();
+        pybind11::dict result;
+        result["num_images"] = stats.num_images;
+        result["num_crops"] = stats.num_crops;
+        result["cls_batch_num"] = stats.cls_batch_num;
+        result["rec_batch_num"] = stats.rec_batch_num;
+        result["rec_padding_ratio"] = stats.rec_padding_ratio;
+        return result;
+      })
+      .def("enable_trace", &pipeline::PPOCRv3::EnableTrace)
       .def("clone", [](pipeline::PPOCRv3& self) {
         return self.Clone();
       })
@@ -59,6 +71,18 @@ void BindPPOCRv2(pybind11::module& m) {
                           fastdeploy::vision::ocr::Recognizer*>())
       .def_property("cls_batch_size", &pipeline::PPOCRv2::GetClsBatchSize, &pipeline::PPOCRv2::SetClsBatchSize)
       .def_property("rec_batch_size", &pipeline::PPOCRv2::GetRecBatchSize, &pipeline::PPOCRv2::SetRecBatchSize)
+      .def_property("rec_batch_max_pixels", &pipeline::PPOCRv2::GetRecBatchMaxPixels, &pipeline::PPOCRv2::SetRecBatchMaxPixels)
+      .def("get_batch_statistics", [](pipeline::PPOCRv2& self) {
+        const auto& stats = self.GetBatchStatistics();
+        pybind11::dict result;
+        result["num_images"] = stats.num_images;
+        result["num_crops"] = stats.num_crops;
+        result["cls_batch_num"] = stats.cls_batch_num;
+        result["rec_batch_num"] = stats.rec_batch_num;
+        result["rec_padding_ratio"] = stats.rec_padding_ratio;
+        return result;
+      })
+      .def("enable_trace", &pipeline::PPOCRv2::EnableTrace)
       .def("clone", [](pipeline::PPOCRv2& self) {
         return self.Clone();
       })
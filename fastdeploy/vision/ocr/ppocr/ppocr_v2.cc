@@ -13,6 +13,9 @@
 // limitations under the License.
 
 #include "fastdeploy/vision/ocr/ppocr/ppocr_v2.h"
+
+#include <iterator>
+
 #include "fastdeploy/utils/perf.h"
 #include "fastdeploy/vision/ocr/ppocr/utils/ocr_utils.h"
 
@@ -63,6 +66,19 @@ int PPOCRv2::GetRecBatchSize() {
   return rec_batch_size_;
 }
 
+bool PPOCRv2::SetRecBatchMaxPixels(int64_t rec_batch_max_pixels) {
+  if (rec_batch_max_pixels < -1 || rec_batch_max_pixels == 0) {
+    FDERROR << "rec_batch_max_pixels > 0 or rec_batch_max_pixels == -1." << std::endl;
+    return false;
+  }
+  rec_batch_max_pixels_ = rec_batch_max_pixels;
+  return true;
+}
+
+int64_t PPOCRv2::GetRecBatchMaxPixels() {
+  return rec_batch_max_pixels_;
+}
+
 bool PPOCRv2::Initialized() const {
   
   if (detector_ != nullptr && !detector_->Initialized()) {
@@ -86,9 +102,28 @@ std::unique_ptr<PPOCRv2> PPOCRv2::Clone() const {
     clone_model->classifier_ = classifier_->Clone().release();
   }
   clone_model->recognizer_ = recognizer_->Clone().release();
+  clone_model->pipeline_tracer_.reset();
+  clone_model->EnableTrace(false);
   return clone_model;
 }
 
+void PPOCRv2::EnableTrace(bool enable) {
+  if (enable && pipeline_tracer_ == nullptr) {
+    pipeline_tracer_ = std::make_shared<PipelineTracer>();
+  }
+  if (pipeline_tracer_ != nullptr) {
+    pipeline_tracer_->Enable(enable);
+  }
+  std::shared_ptr<PipelineTracer> tracer =
+      enable ? pipeline_tracer_ : nullptr;
+  SetTracer(tracer, "ppocr");
+  detector_->SetTracer(tracer, "det");
+  if (classifier_ != nullptr) {
+    classifier_->SetTracer(tracer, "cls");
+  }
+  recognizer_->SetTracer(tracer, "rec");
+}
+
 bool PPOCRv2::Predict(cv::Mat* img,
                             fastdeploy::vision::OCRResult* result) {
   return Predict(*img, result);
@@ -107,69 +142,111 @@ bool PPOCRv2::Predict(const cv::Mat& img,
 
 bool PPOCRv2::BatchPredict(const std::vector<cv::Mat>& images,
                            std::vector<fastdeploy::vision::OCRResult>* batch_result) {
+  TraceScope pipeline_trace(tracer_, "ppocr", "", images.size());
   batch_result->clear();
   batch_result->resize(images.size());
   std::vector<std::vector<std::array<int, 8>>> batch_boxes(images.size());
 
-  if (!detector_->BatchPredict(images, &batch_boxes)) {
-    FDERROR << "There's error while detecting image in PPOCR." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, "det", "", images.size());
+    if (!detector_->BatchPredict(images, &batch_boxes)) {
+      FDERROR << "There's error while detecting image in PPOCR." << std::endl;
+      return false;
+    }
   }
 
-  for(int i_batch = 0; i_batch < batch_boxes.size(); ++i_batch) {
-    vision::ocr::SortBoxes(&(batch_boxes[i_batch]));
-    (*batch_result)[i_batch].boxes = batch_boxes[i_batch];
+  {
+    TraceScope trace(tracer_, "sort");
+    size_t num_boxes = 0;
+    for(int i_batch = 0; i_batch < batch_boxes.size(); ++i_batch) {
+      vision::ocr::SortBoxes(&(batch_boxes[i_batch]));
+      (*batch_result)[i_batch].boxes = batch_boxes[i_batch];
+      num_boxes += batch_boxes[i_batch].size();
+    }
+    trace.SetItems(num_boxes);
   }
   
-  for(int i_batch = 0; i_batch < images.size(); ++i_batch) {
-    fastdeploy::vision::OCRResult& ocr_result = (*batch_result)[i_batch];
-    // Get croped images by detection result
-    const std::vector<std::array<int, 8>>& boxes = ocr_result.boxes;
-    const cv::Mat& img = images[i_batch];
-    std::vector<cv::Mat> image_list;
-    if (boxes.size() == 0) {
-      image_list.emplace_back(img);
-    }else{
-      image_list.resize(boxes.size());
-      for (size_t i_box = 0; i_box < boxes.size(); ++i_box) {
-        image_list[i_box] = vision::ocr::GetRotateCropImage(img, boxes[i_box]);
+  // Crops of all the images are pooled, so the cls and rec batches are
+  // filled even if every image has only a few texts
+  std::vector<cv::Mat> image_list;
+  std::vector<size_t> image_offsets(images.size() + 1, 0);
+  {
+    TraceScope trace(tracer_, "crop");
+    for(size_t i_batch = 0; i_batch < images.size(); ++i_batch) {
+      const std::vector<std::array<int, 8>>& boxes = (*batch_result)[i_batch].boxes;
+      const cv::Mat& img = images[i_batch];
+      if (boxes.size() == 0) {
+        image_list.emplace_back(img);
+      }else{
+        for (size_t i_box = 0; i_box < boxes.size(); ++i_box) {
+          image_list.emplace_back(vision::ocr::GetRotateCropImage(img, boxes[i_box]));
+        }
       }
+      image_offsets[i_batch + 1] = image_list.size();
     }
-    std::vector<int32_t>* cls_labels_ptr = &ocr_result.cls_labels;
-    std::vector<float>* cls_scores_ptr = &ocr_result.cls_scores;
-
-    std::vector<std::string>* text_ptr = &ocr_result.text;
-    std::vector<float>* rec_scores_ptr = &ocr_result.rec_scores;
-
-    if (nullptr != classifier_) {
-      for(size_t start_index = 0; start_index < image_list.size(); start_index+=cls_batch_size_) {
-        size_t end_index = std::min(start_index + cls_batch_size_, image_list.size());
-        if (!classifier_->BatchPredict(image_list, cls_labels_ptr, cls_scores_ptr, start_index, end_index)) {
-          FDERROR << "There's error while recognizing image in PPOCR." << std::endl;
-          return false;
-        }else{
-          for (size_t i_img = start_index; i_img < end_index; ++i_img) {
-            if(cls_labels_ptr->at(i_img) % 2 == 1 && cls_scores_ptr->at(i_img) > classifier_->GetPostprocessor().GetClsThresh()) {
-              cv::rotate(image_list[i_img], image_list[i_img], 1);
-            }
+    trace.SetItems(image_list.size());
+  }
+  batch_statistics_ = OCRBatchStatistics();
+  batch_statistics_.num_images = images.size();
+  batch_statistics_.num_crops = image_list.size();
+
+  std::vector<int32_t> cls_labels;
+  std::vector<float> cls_scores;
+  if (nullptr != classifier_) {
+    size_t cls_batch_size = cls_batch_size_ > 0 ? cls_batch_size_ : image_list.size();
+    for(size_t start_index = 0; start_index < image_list.size(); start_index+=cls_batch_size) {
+      size_t end_index = std::min(start_index + cls_batch_size, image_list.size());
+      TraceScope trace(tracer_, "cls", "", end_index - start_index);
+      if (!classifier_->BatchPredict(image_list, &cls_labels, &cls_scores, start_index, end_index)) {
+        FDERROR << "There's error while recognizing image in PPOCR." << std::endl;
+        return false;
+      }else{
+        for (size_t i_img = start_index; i_img < end_index; ++i_img) {
+          if(cls_labels[i_img] % 2 == 1 && cls_scores[i_img] > classifier_->GetPostprocessor().GetClsThresh()) {
+            cv::rotate(image_list[i_img], image_list[i_img], 1);
           }
         }
       }
+      batch_statistics_.cls_batch_num += 1;
     }
+  }
 
-    std::vector<float> width_list;
-    for (int i = 0; i < image_list.size(); i++) {
-      width_list.push_back(float(image_list[i].cols) / image_list[i].rows);
+  std::vector<float> width_list;
+  for (int i = 0; i < image_list.size(); i++) {
+    width_list.push_back(float(image_list[i].cols) / image_list[i].rows);
+  }
+  std::vector<int> indices = vision::ocr::ArgSort(width_list);
+  auto& rec_preprocessor = recognizer_->GetPreprocessor();
+  std::vector<size_t> batch_ends = vision::ocr::PlanRecBatches(
+      width_list, indices, rec_preprocessor.GetRecImageShape(),
+      rec_preprocessor.GetStaticShapeInfer(), rec_batch_size_,
+      rec_batch_max_pixels_, &batch_statistics_.rec_padding_ratio);
+  batch_statistics_.rec_batch_num = batch_ends.size();
+
+  std::vector<std::string> texts;
+  std::vector<float> rec_scores;
+  size_t start_index = 0;
+  for (size_t end_index : batch_ends) {
+    TraceScope trace(tracer_, "rec", "", end_index - start_index);
+    if (!recognizer_->BatchPredict(image_list, &texts, &rec_scores, start_index, end_index, indices)) {
+      FDERROR << "There's error while recognizing image in PPOCR." << std::endl;
+      return false;
     }
-    std::vector<int> indices = vision::ocr::ArgSort(width_list);
+    start_index = end_index;
+  }
 
-    for(size_t start_index = 0; start_index < image_list.size(); start_index+=rec_batch_size_) {
-      size_t end_index = std::min(start_index + rec_batch_size_, image_list.size());
-      if (!recognizer_->BatchPredict(image_list, text_ptr, rec_scores_ptr, start_index, end_index, indices)) {
-        FDERROR << "There's error while recognizing image in PPOCR." << std::endl;
-        return false;
-      }
+  // Scatter the results back to the box order of every image
+  for(size_t i_batch = 0; i_batch < images.size(); ++i_batch) {
+    fastdeploy::vision::OCRResult& ocr_result = (*batch_result)[i_batch];
+    auto begin = image_offsets[i_batch];
+    auto end = image_offsets[i_batch + 1];
+    if (nullptr != classifier_) {
+      ocr_result.cls_labels.assign(cls_labels.begin() + begin, cls_labels.begin() + end);
+      ocr_result.cls_scores.assign(cls_scores.begin() + begin, cls_scores.begin() + end);
     }
+    ocr_result.text.assign(std::make_move_iterator(texts.begin() + begin),
+                           std::make_move_iterator(texts.begin() + end));
+    ocr_result.rec_scores.assign(rec_scores.begin() + begin, rec_scores.begin() + end);
   }
   return true;
 }
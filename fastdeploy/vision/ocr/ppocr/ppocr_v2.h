@@ -14,6 +14,7 @@
 
 #pragma once
 
+#include <memory>
 #include <vector>
 
 #include "fastdeploy/fastdeploy_model.h"
@@ -31,6 +32,21 @@ namespace fastdeploy {
  *
  */
 namespace pipeline {
+/*! @brief Statistics of the classification and recognition batches of the last BatchPredict
+ */
+struct FASTDEPLOY_DECL OCRBatchStatistics {
+  /// Number of the input images
+  size_t num_images = 0;
+  /// Number of the text crops of all the images
+  size_t num_crops = 0;
+  /// Number of the classification batches
+  size_t cls_batch_num = 0;
+  /// Number of the recognition batches
+  size_t rec_batch_num = 0;
+  /// Ratio of the padded pixels in the recognition batches
+  double rec_padding_ratio = 0.0;
+};
+
 /*! @brief PPOCRv2 is used to load PP-OCRv2 series models provided by PaddleOCR.
  */
 class FASTDEPLOY_DECL PPOCRv2 : public FastDeployModel {
@@ -68,7 +84,7 @@ class FASTDEPLOY_DECL PPOCRv2 : public FastDeployModel {
   virtual bool Predict(cv::Mat* img, fastdeploy::vision::OCRResult* result);
   virtual bool Predict(const cv::Mat& img,
                       fastdeploy::vision::OCRResult* result);
-  /** \brief BatchPredict the input image and get OCR result.
+  /** \brief BatchPredict the input image and get OCR result. The text crops of all the images are classified and recognized together, so the batches are filled even if there are few texts in an image.
    *
    * \param[in] images The list of input image data, comes from cv::imread(), is a 3-D array with layout HWC, BGR format.
    * \param[in] batch_result The output list of OCR result will be writen to this structure.
@@ -78,19 +94,45 @@ class FASTDEPLOY_DECL PPOCRv2 : public FastDeployModel {
                std::vector<fastdeploy::vision::OCRResult>* batch_result);
   
   bool Initialized() const override;
+
+  /** \brief Enable or disable the tracing of the pipeline stages, e.g. det.preprocess, det.runtime, sort, crop, cls and rec.runtime, the events are kept while disabled
+   *
+   * \param[in] enable Whether to record the stages
+   */
+  void EnableTrace(bool enable = true);
+
+  /// Get the tracer of the pipeline, nullptr if the tracing has never been enabled
+  PipelineTracer* GetTracer() const override { return pipeline_tracer_.get(); }
+
   bool SetClsBatchSize(int cls_batch_size);
   int GetClsBatchSize();
   bool SetRecBatchSize(int rec_batch_size);
   int GetRecBatchSize();
+  /** \brief Set the max pixels of a recognition batch, i.e. batch_size * H * padded_W, so that a few wide crops don't pad the whole batch, -1 means no limit
+   *
+   * \param[in] rec_batch_max_pixels The max pixels of a recognition batch
+   * \return true if the value is valid, otherwise false
+   */
+  bool SetRecBatchMaxPixels(int64_t rec_batch_max_pixels);
+  int64_t GetRecBatchMaxPixels();
+
+  /// Get the batch statistics of the last BatchPredict
+  const OCRBatchStatistics& GetBatchStatistics() const {
+    return batch_statistics_;
+  }
 
  protected:
   fastdeploy::vision::ocr::DBDetector* detector_ = nullptr;
   fastdeploy::vision::ocr::Classifier* classifier_ = nullptr;
   fastdeploy::vision::ocr::Recognizer* recognizer_ = nullptr;
+  // The tracer shared by the pipeline and the models, a clone starts without tracing
+  std::shared_ptr<PipelineTracer> pipeline_tracer_;
 
  private:
   int cls_batch_size_ = 1;
   int rec_batch_size_ = 6;
+  int64_t rec_batch_max_pixels_ = -1;
+  OCRBatchStatistics batch_statistics_;
 };
 
 namespace application {
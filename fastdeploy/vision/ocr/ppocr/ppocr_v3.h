@@ -65,6 +65,8 @@ class FASTDEPLOY_DECL PPOCRv3 : public PPOCRv2 {
       clone_model->classifier_ = classifier_->Clone().release();
     }
     clone_model->recognizer_ = recognizer_->Clone().release();
+    clone_model->pipeline_tracer_.reset();
+    clone_model->EnableTrace(false);
   return clone_model;
   }
 };
@@ -110,10 +110,14 @@ bool Recognizer::BatchPredict(const std::vector<cv::Mat>& images,
     return false;
   }
   std::vector<FDMat> fd_images = WrapMat(images);
-  if (!preprocessor_.Run(&fd_images, &reused_input_tensors_, start_index,
-                         end_index, indices)) {
-    FDERROR << "Failed to preprocess the input image." << std::endl;
-    return false;
+  {
+    TraceScope trace(tracer_, trace_stage_.c_str(), "preprocess",
+                     end_index - start_index);
+    if (!preprocessor_.Run(&fd_images, &reused_input_tensors_, start_index,
+                           end_index, indices)) {
+      FDERROR << "Failed to preprocess the input image." << std::endl;
+      return false;
+    }
   }
 
   reused_input_tensors_[0].name = InputInfoOfRuntime(0).name;
@@ -122,6 +126,8 @@ bool Recognizer::BatchPredict(const std::vector<cv::Mat>& images,
     return false;
   }
 
+  TraceScope trace(tracer_, trace_stage_.c_str(), "postprocess",
+                   end_index - start_index);
   if (!postprocessor_.Run(reused_output_tensors_, texts, rec_scores,
                           start_index, total_size, indices)) {
     FDERROR << "Failed to postprocess the inference cls_results by runtime."
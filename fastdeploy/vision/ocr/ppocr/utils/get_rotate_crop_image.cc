@@ -18,19 +18,30 @@ namespace fastdeploy {
 namespace vision {
 namespace ocr {
 
-cv::Mat GetRotateCropImage(const cv::Mat& srcimage,
-                           const std::array<int, 8>& box) {
-  cv::Mat image;
-  srcimage.copyTo(image);
+namespace {
 
-  std::vector<std::vector<int>> points;
+bool IsAxisAlignedBox(const std::array<int, 8>& box) {
+  // Clockwise from the top left point, so the perspective transform is an
+  // identity mapping
+  return box[1] == box[3] && box[2] == box[4] && box[5] == box[7] &&
+         box[6] == box[0] && box[2] > box[0] && box[7] > box[1];
+}
 
-  for (int i = 0; i < 4; ++i) {
-    std::vector<int> tmp;
-    tmp.push_back(box[2 * i]);
-    tmp.push_back(box[2 * i + 1]);
-    points.push_back(tmp);
-  }
+// The size of the crop before it's rotated
+cv::Size GetCropSize(const std::array<int, 8>& box) {
+  int width = int(sqrt(pow(box[0] - box[2], 2) + pow(box[1] - box[3], 2)));
+  int height = int(sqrt(pow(box[0] - box[6], 2) + pow(box[1] - box[7], 2)));
+  return cv::Size(width, height);
+}
+
+bool NeedRotate(const cv::Size& size) {
+  return float(size.height) >= float(size.width) * 1.5;
+}
+
+}  // namespace
+
+cv::Mat GetRotateCropImage(const cv::Mat& srcimage,
+                           const std::array<int, 8>& box) {
   int x_collect[4] = {box[0], box[2], box[4], box[6]};
   int y_collect[4] = {box[1], box[3], box[5], box[7]};
   int left = int(*std::min_element(x_collect, x_collect + 4));
@@ -38,39 +49,31 @@ cv::Mat GetRotateCropImage(const cv::Mat& srcimage,
   int top = int(*std::min_element(y_collect, y_collect + 4));
   int bottom = int(*std::max_element(y_collect, y_collect + 4));
 
-  cv::Mat img_crop;
-  image(cv::Rect(left, top, right - left, bottom - top)).copyTo(img_crop);
-
-  for (int i = 0; i < points.size(); i++) {
-    points[i][0] -= left;
-    points[i][1] -= top;
-  }
-
-  int img_crop_width = int(sqrt(pow(points[0][0] - points[1][0], 2) +
-                                pow(points[0][1] - points[1][1], 2)));
-  int img_crop_height = int(sqrt(pow(points[0][0] - points[3][0], 2) +
-                                 pow(points[0][1] - points[3][1], 2)));
+  // Only the region of the box is read, so the source image is not copied
+  cv::Mat img_crop = srcimage(cv::Rect(left, top, right - left, bottom - top));
+  cv::Size crop_size = GetCropSize(box);
 
-  cv::Point2f pts_std[4];
-  pts_std[0] = cv::Point2f(0., 0.);
-  pts_std[1] = cv::Point2f(img_crop_width, 0.);
-  pts_std[2] = cv::Point2f(img_crop_width, img_crop_height);
-  pts_std[3] = cv::Point2f(0.f, img_crop_height);
-
-  cv::Point2f pointsf[4];
-  pointsf[0] = cv::Point2f(points[0][0], points[0][1]);
-  pointsf[1] = cv::Point2f(points[1][0], points[1][1]);
-  pointsf[2] = cv::Point2f(points[2][0], points[2][1]);
-  pointsf[3] = cv::Point2f(points[3][0], points[3][1]);
+  cv::Mat dst_img;
+  if (IsAxisAlignedBox(box)) {
+    img_crop.copyTo(dst_img);
+  } else {
+    cv::Point2f pts_std[4];
+    pts_std[0] = cv::Point2f(0., 0.);
+    pts_std[1] = cv::Point2f(crop_size.width, 0.);
+    pts_std[2] = cv::Point2f(crop_size.width, crop_size.height);
+    pts_std[3] = cv::Point2f(0.f, crop_size.height);
 
-  cv::Mat M = cv::getPerspectiveTransform(pointsf, pts_std);
+    cv::Point2f pointsf[4];
+    for (int i = 0; i < 4; ++i) {
+      pointsf[i] = cv::Point2f(box[2 * i] - left, box[2 * i + 1] - top);
+    }
 
-  cv::Mat dst_img;
-  cv::warpPerspective(img_crop, dst_img, M,
-                      cv::Size(img_crop_width, img_crop_height),
-                      cv::BORDER_REPLICATE);
+    cv::Mat M = cv::getPerspectiveTransform(pointsf, pts_std);
+    cv::warpPerspective(img_crop, dst_img, M, crop_size,
+                        cv::BORDER_REPLICATE);
+  }
 
-  if (float(dst_img.rows) >= float(dst_img.cols) * 1.5) {
+  if (NeedRotate(cv::Size(dst_img.cols, dst_img.rows))) {
     cv::Mat srcCopy = cv::Mat(dst_img.rows, dst_img.cols, dst_img.depth());
     cv::transpose(dst_img, srcCopy);
     cv::flip(srcCopy, srcCopy, 0);
@@ -80,6 +83,105 @@ cv::Mat GetRotateCropImage(const cv::Mat& srcimage,
   }
 }
 
+bool GetRotateCropImages(const cv::Mat& srcimage,
+                         const std::vector<std::array<int, 8>>& boxes,
+                         std::vector<cv::Mat>* crops,
+                         ThreadPool* thread_pool) {
+  for (const auto& box : boxes) {
+    cv::Size size = GetCropSize(box);
+    if (size.width <= 0 || size.height <= 0) {
+      FDERROR << "The width and height of the text box must be positive."
+              << std::endl;
+      return false;
+    }
+  }
+  crops->resize(boxes.size());
+  auto task = [&](int i) {
+    (*crops)[i] = GetRotateCropImage(srcimage, boxes[i]);
+    return true;
+  };
+  if (thread_pool != nullptr) {
+    return thread_pool->ParallelFor(boxes.size(), task);
+  }
+  for (size_t i = 0; i < boxes.size(); ++i) {
+    task(i);
+  }
+  return true;
+}
+
+bool CropTextRegionsToBatch(const cv::Mat& srcimage,
+                            const std::vector<std::array<int, 8>>& boxes,
+                            const std::vector<int>& rec_image_shape,
+                            FDTensor* batch, ThreadPool* thread_pool) {
+  if (srcimage.channels() != rec_image_shape[0] ||
+      srcimage.depth() != CV_8U) {
+    FDERROR << "The image must be uint8 with " << rec_image_shape[0]
+            << " channels." << std::endl;
+    return false;
+  }
+  int img_h = rec_image_shape[1];
+  int img_w = rec_image_shape[2];
+  // The same as RecognizerPreprocessor, every crop is resized to img_h and
+  // padded to the widest crop, which is computed from the boxes before any
+  // crop is made
+  std::vector<float> ratios(boxes.size());
+  float max_wh_ratio = img_w * 1.0 / img_h;
+  for (size_t i = 0; i < boxes.size(); ++i) {
+    cv::Size size = GetCropSize(boxes[i]);
+    if (size.width <= 0 || size.height <= 0) {
+      FDERROR << "The width and height of the text box must be positive."
+              << std::endl;
+      return false;
+    }
+    if (NeedRotate(size)) {
+      std::swap(size.width, size.height);
+    }
+    ratios[i] = float(size.width) / float(size.height);
+    max_wh_ratio = std::max(max_wh_ratio, float(size.width * 1.0 / size.height));
+  }
+  int batch_w = int(img_h * max_wh_ratio);
+  int channels = rec_image_shape[0];
+  std::vector<int64_t> shape = {static_cast<int64_t>(boxes.size()), channels,
+                                img_h, batch_w};
+  if (batch->Shape() != shape || batch->Dtype() != FDDataType::FP32) {
+    batch->Resize(shape, FDDataType::FP32);
+  }
+  float* batch_data = reinterpret_cast<float*>(batch->MutableData());
+
+  auto task = [&](int i) {
+    cv::Mat crop = GetRotateCropImage(srcimage, boxes[i]);
+    int resize_w = std::min(int(ceilf(img_h * ratios[i])), batch_w);
+    cv::Mat resized;
+    cv::resize(crop, resized, cv::Size(resize_w, img_h));
+    // Normalize with mean 0.5 and std 0.5, and write every channel into its
+    // plane of the batch, the padding is the normalized value of 127
+    std::vector<cv::Mat> planes(channels);
+    for (int c = 0; c < channels; ++c) {
+      cv::Mat plane(img_h, batch_w, CV_32FC1,
+                    batch_data + (int64_t(i) * channels + c) * img_h * batch_w);
+      plane.setTo(cv::Scalar(127.0 / 127.5 - 1.0));
+      planes[c] = plane(cv::Rect(0, 0, resize_w, img_h));
+    }
+    cv::Mat normalized;
+    resized.convertTo(normalized, CV_32F, 1.0 / 127.5, -1.0);
+    std::vector<int> from_to;
+    for (int c = 0; c < channels; ++c) {
+      from_to.push_back(c);
+      from_to.push_back(c);
+    }
+    cv::mixChannels(&normalized, 1, planes.data(), channels, from_to.data(),
+                    channels);
+    return true;
+  };
+  if (thread_pool != nullptr) {
+    return thread_pool->ParallelFor(boxes.size(), task);
+  }
+  for (size_t i = 0; i < boxes.size(); ++i) {
+    task(i);
+  }
+  return true;
+}
+
 }  // namesoace ocr
 }  // namespace vision
 }  // namespace fastdeploy
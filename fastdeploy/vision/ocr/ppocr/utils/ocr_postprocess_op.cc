@@ -242,9 +242,101 @@ float PostProcessor::BoxScoreFast(std::vector<std::vector<float>> box_array,
   return score;
 }
 
+bool PostProcessor::RectScoreIntegral(const std::vector<cv::Point> &points,
+                                      const cv::Mat &pred_integral,
+                                      float *score) {
+  if (points.size() != 4) {
+    return false;
+  }
+  int x0 = std::min(points[0].x, points[2].x);
+  int x1 = std::max(points[0].x, points[2].x);
+  int y0 = std::min(points[0].y, points[2].y);
+  int y1 = std::max(points[0].y, points[2].y);
+  // The points must be the 4 corners of the rectangle in either direction,
+  // i.e. points[0] and points[2] are diagonal, and so are points[1] and
+  // points[3]
+  if (x0 == x1 || y0 == y1 || points[1].x == points[3].x ||
+      points[1].y == points[3].y || points[1] == points[0] ||
+      points[1] == points[2]) {
+    return false;
+  }
+  for (const auto &pt : points) {
+    if ((pt.x != x0 && pt.x != x1) || (pt.y != y0 && pt.y != y1)) {
+      return false;
+    }
+  }
+  // The pixels out of pred are clipped differently by fillPoly
+  if (x0 < 0 || y0 < 0 || x1 >= pred_integral.cols - 1 ||
+      y1 >= pred_integral.rows - 1) {
+    return false;
+  }
+  // fillPoly covers the rectangle including its borders
+  double sum = pred_integral.at<double>(y1 + 1, x1 + 1) -
+               pred_integral.at<double>(y0, x1 + 1) -
+               pred_integral.at<double>(y1 + 1, x0) +
+               pred_integral.at<double>(y0, x0);
+  *score = static_cast<float>(sum / ((x1 - x0 + 1) * (y1 - y0 + 1)));
+  return true;
+}
+
+bool PostProcessor::UnClipRect(const std::vector<std::vector<float>> &box,
+                               const float &unclip_ratio,
+                               cv::RotatedRect *rect) {
+  float distance = 1.0;
+  GetContourArea(box, unclip_ratio, distance);
+  if (distance < 1.0f) {
+    return false;
+  }
+  // Same as the Path passed to Clipper in UnClip
+  cv::Point2f pts[4];
+  for (int i = 0; i < 4; ++i) {
+    pts[i] = cv::Point2f(int(box[i][0]), int(box[i][1]));
+  }
+  cv::Point2f e1 = pts[1] - pts[0];
+  cv::Point2f e2 = pts[3] - pts[0];
+  float len1 = std::sqrt(e1.dot(e1));
+  float len2 = std::sqrt(e2.dot(e2));
+  if (len1 < 1.0f || len2 < 1.0f) {
+    return false;
+  }
+  // A parallelogram with right angles, the truncation of the corners to
+  // int is allowed
+  cv::Point2f diff = pts[2] - (pts[1] + e2);
+  if (diff.dot(diff) > 2.0f || std::fabs(e1.dot(e2)) > 0.02f * len1 * len2) {
+    return false;
+  }
+
+  if (e1.y == 0 && e2.x == 0 && diff.x == 0 && diff.y == 0) {
+    // Axis-aligned, the same as the bounding rectangle of the rounded offset
+    // polygon, whose points are rounded half away from zero by Clipper
+    auto round = [](double v) {
+      return v < 0 ? static_cast<int64_t>(v - 0.5)
+                   : static_cast<int64_t>(v + 0.5);
+    };
+    float left = round(std::min(pts[0].x, pts[1].x) - double(distance));
+    float right = round(std::max(pts[0].x, pts[1].x) + double(distance));
+    float top = round(std::min(pts[0].y, pts[3].y) - double(distance));
+    float bottom = round(std::max(pts[0].y, pts[3].y) + double(distance));
+    *rect = cv::RotatedRect(
+        cv::Point2f((left + right) / 2.0f, (top + bottom) / 2.0f),
+        cv::Size2f(right - left, bottom - top), 0);
+    return true;
+  }
+  // The offset polygon is the box dilated by a disk, so its bounding
+  // rectangle in any direction grows by distance on every side
+  std::vector<cv::Point2f> quad(pts, pts + 4);
+  cv::RotatedRect base = cv::minAreaRect(quad);
+  *rect = cv::RotatedRect(base.center,
+                          cv::Size2f(base.size.width + 2 * distance,
+                                     base.size.height + 2 * distance),
+                          base.angle);
+  return true;
+}
+
 std::vector<std::vector<std::vector<int>>> PostProcessor::BoxesFromBitmap(
     const cv::Mat pred, const cv::Mat bitmap, const float &box_thresh,
-    const float &det_db_unclip_ratio, const std::string &det_db_score_mode) {
+    const float &det_db_unclip_ratio, const std::string &det_db_score_mode,
+    bool use_fast_path) {
   const int min_size = 3;
   const int max_candidates = 1000;
 
@@ -262,6 +354,11 @@ std::vector<std::vector<std::vector<int>>> PostProcessor::BoxesFromBitmap(
 
   std::vector<std::vector<std::vector<int>>> boxes;
 
+  cv::Mat pred_integral;
+  if (use_fast_path) {
+    cv::integral(pred, pred_integral, CV_64F);
+  }
+
   for (int _i = 0; _i < num_contours; _i++) {
     if (contours[_i].size() <= 2) {
       continue;
@@ -278,15 +375,32 @@ std::vector<std::vector<std::vector<int>>> PostProcessor::BoxesFromBitmap(
     }
 
     float score;
-    if (det_db_score_mode == "slow") /* compute using polygon*/
-      score = PolygonScoreAcc(contours[_i], pred);
-    else
-      score = BoxScoreFast(array, pred);
+    if (det_db_score_mode == "slow") { /* compute using polygon*/
+      if (!use_fast_path ||
+          !RectScoreIntegral(contours[_i], pred_integral, &score)) {
+        score = PolygonScoreAcc(contours[_i], pred);
+      }
+    } else {
+      std::vector<cv::Point> box_points;
+      if (use_fast_path) {
+        for (const auto &pt : array) {
+          box_points.emplace_back(int(pt[0]), int(pt[1]));
+        }
+      }
+      if (!use_fast_path ||
+          !RectScoreIntegral(box_points, pred_integral, &score)) {
+        score = BoxScoreFast(array, pred);
+      }
+    }
 
     if (score < box_thresh) continue;
 
     // start for unclip
-    cv::RotatedRect points = UnClip(box_for_unclip, det_db_unclip_ratio);
+    cv::RotatedRect points;
+    if (!use_fast_path ||
+        !UnClipRect(box_for_unclip, det_db_unclip_ratio, &points)) {
+      points = UnClip(box_for_unclip, det_db_unclip_ratio);
+    }
     if (points.size.height < 1.001 && points.size.width < 1.001) {
       continue;
     }
@@ -51,9 +51,21 @@ class PostProcessor {
   float BoxScoreFast(std::vector<std::vector<float>> box_array, cv::Mat pred);
   float PolygonScoreAcc(std::vector<cv::Point> contour, cv::Mat pred);
 
+  // Fast path of BoxScoreFast and PolygonScoreAcc, the mean score of an
+  // axis-aligned rectangle is got from the integral image of pred in O(1),
+  // returns false if the points are not an axis-aligned rectangle
+  bool RectScoreIntegral(const std::vector<cv::Point> &points,
+                         const cv::Mat &pred_integral, float *score);
+
+  // Fast path of UnClip, the rectangles are offset analytically instead of by
+  // Clipper, returns false if the box is not close to a rectangle
+  bool UnClipRect(const std::vector<std::vector<float>> &box,
+                  const float &unclip_ratio, cv::RotatedRect *rect);
+
   std::vector<std::vector<std::vector<int>>> BoxesFromBitmap(
       const cv::Mat pred, const cv::Mat bitmap, const float &box_thresh,
-      const float &det_db_unclip_ratio, const std::string &det_db_score_mode);
+      const float &det_db_unclip_ratio, const std::string &det_db_score_mode,
+      bool use_fast_path = false);
 
   std::vector<std::vector<std::vector<int>>> FilterTagDetRes(
       std::vector<std::vector<std::vector<int>>> boxes,
@@ -17,6 +17,7 @@
 #include <set>
 #include <vector>
 #include "fastdeploy/core/fd_tensor.h"
+#include "fastdeploy/utils/thread_pool.h"
 #include "fastdeploy/utils/utils.h"
 #include "fastdeploy/vision/common/result.h"
 
@@ -30,10 +31,53 @@ namespace ocr {
 FASTDEPLOY_DECL cv::Mat GetRotateCropImage(const cv::Mat& srcimage,
                            const std::array<int, 8>& box);
 
+/** \brief Crop the text regions of an image, the same as calling GetRotateCropImage() for every box. The source image is never copied, the axis-aligned boxes are copied without the perspective transform, and the boxes are cropped in parallel if the thread pool is set
+ *
+ * \param[in] srcimage The source image
+ * \param[in] boxes The text boxes, 4 points clockwise from the top left point
+ * \param[out] crops The cropped images in the order of the boxes
+ * \param[in] thread_pool The thread pool to crop the boxes, may be nullptr
+ * \return true if all the boxes are cropped, otherwise false
+ */
+FASTDEPLOY_DECL bool GetRotateCropImages(
+    const cv::Mat& srcimage, const std::vector<std::array<int, 8>>& boxes,
+    std::vector<cv::Mat>* crops, ThreadPool* thread_pool = nullptr);
+
+/** \brief Crop the text regions and write them into the input batch of the recognition model. Every crop is resized to the height of rec_image_shape, padded to the widest crop and normalized with mean 0.5 and std 0.5, the same as RecognizerPreprocessor with the default parameters
+ *
+ * \param[in] srcimage The source image, uint8 with C channels
+ * \param[in] boxes The text boxes, 4 points clockwise from the top left point
+ * \param[in] rec_image_shape The input shape [C, H, W] of the recognition model
+ * \param[out] batch The float32 NCHW batch, the memory is reused if the tensor has the same shape
+ * \param[in] thread_pool The thread pool to crop the boxes, may be nullptr
+ * \return true if all the boxes are cropped, otherwise false
+ */
+FASTDEPLOY_DECL bool CropTextRegionsToBatch(
+    const cv::Mat& srcimage, const std::vector<std::array<int, 8>>& boxes,
+    const std::vector<int>& rec_image_shape, FDTensor* batch,
+    ThreadPool* thread_pool = nullptr);
+
 FASTDEPLOY_DECL void SortBoxes(std::vector<std::array<int, 8>>* boxes);
 
 FASTDEPLOY_DECL std::vector<int> ArgSort(const std::vector<float> &array);
 
+/** \brief Split the crops sorted by the aspect ratio into the recognition batches, a batch is limited by both the number of crops and the total pixels after being padded to the widest crop of the batch
+ *
+ * \param[in] wh_ratios The width / height ratio of every crop
+ * \param[in] indices The crop indices sorted by the ratio in ascending order, e.g. the result of ArgSort(wh_ratios)
+ * \param[in] rec_image_shape The input shape [C, H, W] of the recognition model
+ * \param[in] static_shape_infer Whether all the crops are padded to the width of rec_image_shape
+ * \param[in] max_batch_size Max number of crops in a batch, -1 means no limit
+ * \param[in] max_batch_pixels Max of batch_size * H * padded_W of a batch, -1 means no limit, a crop wider than the limit is put into its own batch
+ * \param[out] padding_ratio The ratio of the padded pixels in all the batches, may be nullptr
+ * \return The end positions in indices of every batch, the first batch starts from 0
+ */
+FASTDEPLOY_DECL std::vector<size_t> PlanRecBatches(
+    const std::vector<float>& wh_ratios, const std::vector<int>& indices,
+    const std::vector<int>& rec_image_shape, bool static_shape_infer,
+    int max_batch_size, int64_t max_batch_pixels,
+    double* padding_ratio = nullptr);
+
 }  // namespace ocr
 }  // namespace vision
 }  // namespace fastdeploy
@@ -0,0 +1,84 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <cmath>
+
+#include "fastdeploy/vision/ocr/ppocr/utils/ocr_utils.h"
+
+namespace fastdeploy {
+namespace vision {
+namespace ocr {
+
+std::vector<size_t> PlanRecBatches(const std::vector<float>& wh_ratios,
+                                   const std::vector<int>& indices,
+                                   const std::vector<int>& rec_image_shape,
+                                   bool static_shape_infer, int max_batch_size,
+                                   int64_t max_batch_pixels,
+                                   double* padding_ratio) {
+  std::vector<size_t> batch_ends;
+  int img_h = rec_image_shape[1];
+  int img_w = rec_image_shape[2];
+  // Same as RecognizerPreprocessor, the batch is padded to the widest crop,
+  // but never narrower than the width of rec_image_shape
+  auto padded_width = [&](float max_wh_ratio) {
+    if (static_shape_infer) {
+      return img_w;
+    }
+    return static_cast<int>(
+        img_h * std::max(max_wh_ratio, img_w * 1.0f / img_h));
+  };
+  auto crop_width = [&](float wh_ratio, int batch_width) {
+    return std::min(static_cast<int>(ceilf(img_h * wh_ratio)), batch_width);
+  };
+
+  int64_t valid_width = 0;
+  int64_t total_width = 0;
+  size_t start = 0;
+  while (start < indices.size()) {
+    float max_ratio = wh_ratios[indices[start]];
+    size_t end = start + 1;
+    while (end < indices.size()) {
+      if (max_batch_size > 0 &&
+          end - start >= static_cast<size_t>(max_batch_size)) {
+        break;
+      }
+      float ratio = std::max(max_ratio, wh_ratios[indices[end]]);
+      int64_t pixels = static_cast<int64_t>(end - start + 1) *
+                       padded_width(ratio) * img_h;
+      if (max_batch_pixels > 0 && pixels > max_batch_pixels) {
+        break;
+      }
+      max_ratio = ratio;
+      ++end;
+    }
+    int batch_width = padded_width(max_ratio);
+    for (size_t i = start; i < end; ++i) {
+      valid_width += crop_width(wh_ratios[indices[i]], batch_width);
+      total_width += batch_width;
+    }
+    batch_ends.push_back(end);
+    start = end;
+  }
+  if (padding_ratio != nullptr) {
+    *padding_ratio =
+        total_width > 0 ? 1.0 - static_cast<double>(valid_width) / total_width
+                        : 0.0;
+  }
+  return batch_ends;
+}
+
+}  // namespace ocr
+}  // namespace vision
+}  // namespace fastdeploy
@@ -105,8 +105,17 @@ bool PaddleSegPreprocessor::Run(std::vector<FDMat>* images, std::vector<FDTensor
   }
   (*imgs_info)["shape_info"] = shape_info;
   for (size_t i = 0; i < processors_.size(); ++i) {
+    Resize* processor = nullptr;
     if (processors_[i]->Name() == "Resize") {
-      auto processor = dynamic_cast<Resize*>(processors_[i].get());
+      processor = dynamic_cast<Resize*>(processors_[i].get());
+    } else if (processors_[i]->Name() == "ResizeNormalizeAndPermute") {
+      // Resize is fused with the following processors
+      processor = dynamic_cast<Resize*>(
+          dynamic_cast<ResizeNormalizeAndPermute*>(processors_[i].get())
+              ->GetResize()
+              .get());
+    }
+    if (processor != nullptr) {
       int resize_width = -1;
       int resize_height = -1;
       std::tie(resize_width, resize_height) = processor->GetWidthAndHeight();
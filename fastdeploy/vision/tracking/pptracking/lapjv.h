@@ -43,6 +43,7 @@
     b = _temp_index;       \
   }
 #include <opencv2/opencv.hpp>
+#include "fastdeploy/utils/utils.h"
 
 namespace fastdeploy {
 namespace vision {
@@ -54,11 +55,11 @@ typedef double cost_t;
 typedef char boolean;
 typedef enum fp_t { FP_1 = 1, FP_2 = 2, FP_DYNAMIC = 3 } fp_t;
 
-int lapjv_internal(const cv::Mat &cost,
-                   const bool extend_cost,
-                   const float cost_limit,
-                   int *x,
-                   int *y);
+FASTDEPLOY_DECL int lapjv_internal(const cv::Mat &cost,
+                                   const bool extend_cost,
+                                   const float cost_limit,
+                                   int *x,
+                                   int *y);
 
 } // namespace tracking
 } // namespace vision
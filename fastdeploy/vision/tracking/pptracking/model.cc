@@ -289,6 +289,7 @@ bool PPTracking::Postprocess(std::vector<FDTensor>& infer_result,
     int id = result->ids[i];
     recorder_->Add(id, {int(center_x), int(center_y)});
   }
+  recorder_->NextFrame();
   return true;
 }
 
@@ -299,14 +300,9 @@ void PPTracking::BindRecorder(TrailRecorder* recorder) {
 
 void PPTracking::UnbindRecorder() {
   is_record_trail_ = false;
-  std::map<int, std::vector<std::array<int, 2>>>::iterator iter;
-  for (iter = recorder_->records.begin(); iter != recorder_->records.end();
-       iter++) {
-    iter->second.clear();
-    iter->second.shrink_to_fit();
+  if (recorder_ != nullptr) {
+    recorder_->Clear();
   }
-  recorder_->records.clear();
-  std::map<int, std::vector<std::array<int, 2>>>().swap(recorder_->records);
   recorder_ = nullptr;
 }
 
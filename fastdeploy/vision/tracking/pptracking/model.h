@@ -14,6 +14,8 @@
 
 #pragma once
 
+#include <array>
+#include <deque>
 #include <map>
 #include "fastdeploy/vision/common/processors/transform.h"
 #include "fastdeploy/fastdeploy_model.h"
@@ -23,20 +25,74 @@
 namespace fastdeploy {
 namespace vision {
 namespace tracking {
+/*! @brief Record the trail of every tracked object, the history is bounded so the memory stays flat on long videos
+ */
 struct TrailRecorder{
-  std::map<int, std::vector<std::array<int, 2>>> records;
+  /// The center points of every object id, from the oldest to the newest
+  std::map<int, std::deque<std::array<int, 2>>> records;
+  /// Max number of the points kept for every id, the oldest point is dropped once exceeded, 0 means no limit
+  size_t max_length = 300;
+  /// The trail of an id is removed once it's not updated for max_idle_frames frames, 0 means never removed
+  int max_idle_frames = 300;
+
+  /** \brief Append a point to the trail of an object
+   *
+   * \param[in] id The object id
+   * \param[in] record The center point of the object
+   */
   void Add(int id, const std::array<int, 2>& record);
+  /// Finish the records of the current frame, and remove the idle trails
+  void NextFrame();
+  /// Remove all the trails
+  void Clear();
+
+ private:
+  int frame_ = 0;
+  std::map<int, int> last_frames_;
 };
 
 inline void TrailRecorder::Add(int id, const std::array<int, 2>& record) {
-  auto iter = records.find(id);
-  if (iter != records.end()) {
-    auto trail = records[id];
-    trail.push_back(record);
-    records[id] = trail;
-  } else {
-    records[id] = {record};
+  auto& trail = records[id];
+  trail.push_back(record);
+  if (max_length > 0) {
+    while (trail.size() > max_length) {
+      trail.pop_front();
+    }
+  }
+  last_frames_[id] = frame_;
+}
+
+inline void TrailRecorder::NextFrame() {
+  ++frame_;
+  if (max_idle_frames <= 0) {
+    return;
+  }
+  for (auto iter = records.begin(); iter != records.end();) {
+    // The trails set directly to records are regarded as updated now
+    auto last = last_frames_.insert({iter->first, frame_}).first;
+    if (frame_ - last->second > max_idle_frames) {
+      last_frames_.erase(last);
+      iter = records.erase(iter);
+    } else {
+      ++iter;
+    }
   }
+  // Drop the ids whose trails are removed from records directly
+  if (last_frames_.size() > records.size()) {
+    for (auto iter = last_frames_.begin(); iter != last_frames_.end();) {
+      if (records.find(iter->first) == records.end()) {
+        iter = last_frames_.erase(iter);
+      } else {
+        ++iter;
+      }
+    }
+  }
+}
+
+inline void TrailRecorder::Clear() {
+  std::map<int, std::deque<std::array<int, 2>>>().swap(records);
+  last_frames_.clear();
+  frame_ = 0;
 }
 
 class FASTDEPLOY_DECL PPTracking: public FastDeployModel {
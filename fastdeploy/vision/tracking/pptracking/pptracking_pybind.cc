@@ -19,7 +19,12 @@ void BindPPTracking(pybind11::module &m) {
   pybind11::class_<vision::tracking::TrailRecorder>(m, "TrailRecorder")
     .def(pybind11::init<>())
     .def_readwrite("records", &vision::tracking::TrailRecorder::records)
-    .def("add", &vision::tracking::TrailRecorder::Add);
+    .def_readwrite("max_length", &vision::tracking::TrailRecorder::max_length)
+    .def_readwrite("max_idle_frames",
+                   &vision::tracking::TrailRecorder::max_idle_frames)
+    .def("add", &vision::tracking::TrailRecorder::Add)
+    .def("next_frame", &vision::tracking::TrailRecorder::NextFrame)
+    .def("clear", &vision::tracking::TrailRecorder::Clear);
   pybind11::class_<vision::tracking::PPTracking, FastDeployModel>(
     m, "PPTracking")
     .def(pybind11::init<std::string, std::string, std::string, RuntimeOption,
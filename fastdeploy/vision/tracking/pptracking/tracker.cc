@@ -17,10 +17,12 @@
 // Ths copyright of CnybTseng/JDE is as follows:
 // MIT License
 
+#include <float.h>
 #include <limits.h>
 #include <stdio.h>
 #include <algorithm>
 #include <map>
+#include <unordered_set>
 
 #include "fastdeploy/vision/tracking/pptracking/lapjv.h"
 #include "fastdeploy/vision/tracking/pptracking/tracker.h"
@@ -147,11 +149,13 @@ bool JDETracker::update(const cv::Mat &dets,
     activated_trajectories.push_back(unconfirmed_trajectories[miter->first]);
   }
 
-  TrajectoryPtrPool removed_trajectories;
+  // Keep the ids only, the trajectories may be moved by the erasing below
+  std::vector<int> removed_trajectory_ids;
 
   for (size_t i = 0; i < mismatch_row.size(); ++i) {
     unconfirmed_trajectories[mismatch_row[i]]->mark_removed();
-    removed_trajectories.push_back(unconfirmed_trajectories[mismatch_row[i]]);
+    removed_trajectory_ids.push_back(
+        unconfirmed_trajectories[mismatch_row[i]]->id);
   }
 
   for (size_t i = 0; i < mismatch_col.size(); ++i) {
@@ -164,7 +168,7 @@ bool JDETracker::update(const cv::Mat &dets,
     Trajectory &lt = this->lost_trajectories[i];
     if (timestamp - lt.timestamp > max_lost_time) {
       lt.mark_removed();
-      removed_trajectories.push_back(&lt);
+      removed_trajectory_ids.push_back(lt.id);
     }
   }
 
@@ -182,11 +186,14 @@ bool JDETracker::update(const cv::Mat &dets,
 
   this->lost_trajectories -= this->tracked_trajectories;
   this->lost_trajectories += lost_trajectories;
-  this->lost_trajectories -= this->removed_trajectories;
-  this->removed_trajectories += removed_trajectories;
+  erase_removed_trajectories(&this->lost_trajectories);
+  removed_ids.insert(removed_trajectory_ids.begin(),
+                     removed_trajectory_ids.end());
   remove_duplicate_trajectory(&this->tracked_trajectories,
                               &this->lost_trajectories);
 
+  compact_removed_ids();
+
   tracks->clear();
   for (size_t i = 0; i < this->tracked_trajectories.size(); ++i) {
     if (this->tracked_trajectories[i].is_activated) {
@@ -204,15 +211,47 @@ cv::Mat JDETracker::motion_distance(const TrajectoryPtrPool &a,
   if (0 == a.size() || 0 == b.size())
     return cv::Mat(a.size(), b.size(), CV_32F);
 
-  cv::Mat edists = embedding_distance(a, b);
-  cv::Mat mdists = mahalanobis_distance(a, b);
-  cv::Mat fdists = lambda * edists + (1 - lambda) * mdists;
+  // Gather the state of the detections to contiguous arrays
+  const int dim = b[0].smooth_embedding.cols;
+  std::vector<cv::Vec4f> xyahs(b.size());
+  cv::Mat embeddings(b.size(), dim, CV_32F);
+  std::vector<double> norms(b.size());
+  for (size_t j = 0; j < b.size(); ++j) {
+    xyahs[j] = ltrb2xyah(b[j].ltrb);
+    b[j].smooth_embedding.copyTo(embeddings.row(j));
+    norms[j] = cv::norm(embeddings.row(j));
+  }
 
+  // Gate with the Mahalanobis distance first, the appearance distance is only
+  // computed for the pairs inside the gate
   const float gate_thresh = chi2inv95[4];
-  for (int i = 0; i < fdists.rows; ++i) {
-    for (int j = 0; j < fdists.cols; ++j) {
-      if (*mdists.ptr<float>(i, j) > gate_thresh)
-        *fdists.ptr<float>(i, j) = FLT_MAX;
+  cv::Mat fdists(a.size(), b.size(), CV_32F, cv::Scalar(FLT_MAX));
+  cv::Mat mean, covariance, icovariance;
+  for (size_t i = 0; i < a.size(); ++i) {
+    a[i]->project(&mean, &covariance);
+    cv::invert(covariance, icovariance);
+    const float *m = mean.ptr<float>(0);
+    const float *u = a[i]->smooth_embedding.ptr<float>(0);
+    double uu = a[i]->smooth_embedding.dot(a[i]->smooth_embedding);
+    float *fdistsi = fdists.ptr<float>(i);
+    for (size_t j = 0; j < b.size(); ++j) {
+      float d[4];
+      for (int k = 0; k < 4; ++k) d[k] = xyahs[j][k] - m[k];
+      double mdist = 0;
+      for (int k = 0; k < 4; ++k) {
+        const float *icov = icovariance.ptr<float>(k);
+        double row = 0;
+        for (int l = 0; l < 4; ++l) row += icov[l] * d[l];
+        mdist += row * d[k];
+      }
+      if (mdist > gate_thresh) continue;
+
+      const float *v = embeddings.ptr<float>(j);
+      double uv = 0;
+      for (int k = 0; k < dim; ++k) uv += u[k] * v[k];
+      double edist = std::abs(1. - uv / std::sqrt(uu * norms[j] * norms[j]));
+      edist = std::max(std::min(edist, 2.), 0.);
+      fdistsi[j] = static_cast<float>(lambda * edist + (1 - lambda) * mdist);
     }
   }
 
@@ -233,30 +272,103 @@ void JDETracker::linear_assignment(const cv::Mat &cost,
     return;
   }
 
-  float opt = 0;
-  cv::Mat x(cost.rows, 1, CV_32S);
-  cv::Mat y(cost.cols, 1, CV_32S);
+  // A pair whose cost is not less than cost_limit is never matched, so the
+  // rows and columns are split into the connected blocks of the valid pairs,
+  // and every block is solved independently, which is much cheaper than
+  // solving the whole (rows + cols) extended matrix
+  const int rows = cost.rows;
+  const int cols = cost.cols;
+  std::vector<int> parents(rows + cols);
+  for (int i = 0; i < rows + cols; ++i) parents[i] = i;
+  auto find_root = [&parents](int i) {
+    while (parents[i] != i) {
+      parents[i] = parents[parents[i]];
+      i = parents[i];
+    }
+    return i;
+  };
+  std::vector<int> degrees(rows + cols, 0);
+  for (int i = 0; i < rows; ++i) {
+    const float *costi = cost.ptr<float>(i);
+    for (int j = 0; j < cols; ++j) {
+      if (costi[j] >= cost_limit) continue;
+      ++degrees[i];
+      ++degrees[rows + j];
+      int ra = find_root(i);
+      int rb = find_root(rows + j);
+      if (ra != rb) parents[ra] = rb;
+    }
+  }
 
-  lapjv_internal(cost,
-                 true,
-                 cost_limit,
-                 reinterpret_cast<int *>(x.data),
-                 reinterpret_cast<int *>(y.data));
+  std::map<int, std::pair<std::vector<int>, std::vector<int>>> blocks;
+  for (int i = 0; i < rows; ++i) {
+    if (degrees[i] > 0) blocks[find_root(i)].first.push_back(i);
+  }
+  for (int j = 0; j < cols; ++j) {
+    if (degrees[rows + j] > 0) blocks[find_root(rows + j)].second.push_back(j);
+  }
+
+  std::vector<int> x(rows, -1);
+  std::vector<int> y(cols, -1);
+  for (auto &block : blocks) {
+    const std::vector<int> &brows = block.second.first;
+    const std::vector<int> &bcols = block.second.second;
+    if (brows.size() == 1 && bcols.size() == 1) {
+      x[brows[0]] = bcols[0];
+      y[bcols[0]] = brows[0];
+      continue;
+    }
+    cv::Mat sub(brows.size(), bcols.size(), CV_32F);
+    for (size_t i = 0; i < brows.size(); ++i) {
+      const float *costi = cost.ptr<float>(brows[i]);
+      float *subi = sub.ptr<float>(i);
+      for (size_t j = 0; j < bcols.size(); ++j) subi[j] = costi[bcols[j]];
+    }
+    std::vector<int> bx(brows.size());
+    std::vector<int> by(bcols.size());
+    lapjv_internal(sub, true, cost_limit, bx.data(), by.data());
+    for (size_t i = 0; i < brows.size(); ++i) {
+      if (bx[i] >= 0) {
+        x[brows[i]] = bcols[bx[i]];
+        y[bcols[bx[i]]] = brows[i];
+      }
+    }
+  }
 
-  for (int i = 0; i < x.rows; ++i) {
-    int j = *x.ptr<int>(i);
-    if (j >= 0)
-      matches->insert({i, j});
+  for (int i = 0; i < rows; ++i) {
+    if (x[i] >= 0)
+      matches->insert({i, x[i]});
     else
       mismatch_row->push_back(i);
   }
-
-  for (int i = 0; i < y.rows; ++i) {
-    int j = *y.ptr<int>(i);
-    if (j < 0) mismatch_col->push_back(i);
+  for (int j = 0; j < cols; ++j) {
+    if (y[j] < 0) mismatch_col->push_back(j);
   }
+}
 
-  return;
+void JDETracker::erase_removed_trajectories(TrajectoryPool *pool) {
+  if (removed_ids.empty()) return;
+  pool->erase(std::remove_if(pool->begin(), pool->end(),
+                             [this](const Trajectory &t) {
+                               return removed_ids.count(t.id) > 0;
+                             }),
+              pool->end());
+}
+
+void JDETracker::compact_removed_ids() {
+  // A removed id only matters while a trajectory with the id is still kept,
+  // the others are dropped so the memory doesn't grow with the video length
+  std::unordered_set<int> alive;
+  for (size_t i = 0; i < tracked_trajectories.size(); ++i)
+    alive.insert(tracked_trajectories[i].id);
+  for (size_t i = 0; i < lost_trajectories.size(); ++i)
+    alive.insert(lost_trajectories[i].id);
+  for (auto iter = removed_ids.begin(); iter != removed_ids.end();) {
+    if (alive.count(*iter) == 0)
+      iter = removed_ids.erase(iter);
+    else
+      ++iter;
+  }
 }
 
 void JDETracker::remove_duplicate_trajectory(TrajectoryPool *a,
@@ -20,6 +20,7 @@
 #pragma once
 
 #include <map>
+#include <unordered_set>
 #include <vector>
 
 #include <opencv2/core/core.hpp>
@@ -50,14 +51,16 @@ class FASTDEPLOY_DECL JDETracker {
                       const cv::Mat &emb,
                       std::vector<Track> *tracks);
   virtual ~JDETracker() {}
- private:
 
+ protected:
   cv::Mat motion_distance(const TrajectoryPtrPool &a, const TrajectoryPool &b);
   void linear_assignment(const cv::Mat &cost,
                          float cost_limit,
                          Match *matches,
                          std::vector<int> *mismatch_row,
                          std::vector<int> *mismatch_col);
+  void erase_removed_trajectories(TrajectoryPool *pool);
+  void compact_removed_ids();
   void remove_duplicate_trajectory(TrajectoryPool *a,
                                    TrajectoryPool *b,
                                    float iou_thresh = 0.15f);
@@ -66,7 +69,7 @@ class FASTDEPLOY_DECL JDETracker {
   int timestamp;
   TrajectoryPool tracked_trajectories;
   TrajectoryPool lost_trajectories;
-  TrajectoryPool removed_trajectories;
+  std::unordered_set<int> removed_ids;
   int max_lost_time;
   float lambda;
   float det_thresh;
@@ -230,6 +230,12 @@ inline void Trajectory::mark_lost(void) { state = Lost; }
 
 inline void Trajectory::mark_removed(void) { state = Removed; }
 
+// The distances between the tracked trajectories and the detections
+FASTDEPLOY_DECL cv::Mat embedding_distance(const TrajectoryPtrPool &a,
+                                           const TrajectoryPool &b);
+FASTDEPLOY_DECL cv::Mat mahalanobis_distance(const TrajectoryPtrPool &a,
+                                             const TrajectoryPool &b);
+
 }  // namespace tracking
 }  // namespace vision
 }  // namespace fastdeploy
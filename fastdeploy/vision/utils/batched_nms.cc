@@ -0,0 +1,232 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+
+#include "fastdeploy/vision/utils/utils.h"
+
+namespace fastdeploy {
+namespace vision {
+namespace utils {
+
+namespace {
+
+// Coordinates and areas of the candidates of one group in
+// structure-of-arrays layout, so the IoU loop runs over contiguous memory
+// and can be vectorized by the compiler.
+struct BoxesSoA {
+  std::vector<float> x1;
+  std::vector<float> y1;
+  std::vector<float> x2;
+  std::vector<float> y2;
+  std::vector<float> area;
+  std::vector<uint8_t> suppressed;
+
+  void Load(const float* boxes, const int32_t* indices, int num) {
+    x1.resize(num);
+    y1.resize(num);
+    x2.resize(num);
+    y2.resize(num);
+    area.resize(num);
+    suppressed.assign(num, 0);
+    for (int i = 0; i < num; ++i) {
+      const float* box = boxes + static_cast<int64_t>(indices[i]) * 4;
+      x1[i] = box[0];
+      y1[i] = box[1];
+      x2[i] = box[2];
+      y2[i] = box[3];
+      area[i] = (box[2] - box[0]) * (box[3] - box[1]);
+    }
+  }
+};
+
+// Greedy NMS over candidates sorted by descending score, the kept
+// indices are appended to keep in the same order.
+void SuppressSorted(const float* boxes, const int32_t* indices, int num,
+                    float iou_threshold, int max_output, BoxesSoA* soa,
+                    std::vector<int32_t>* keep) {
+  soa->Load(boxes, indices, num);
+  const float* x1 = soa->x1.data();
+  const float* y1 = soa->y1.data();
+  const float* x2 = soa->x2.data();
+  const float* y2 = soa->y2.data();
+  const float* area = soa->area.data();
+  uint8_t* suppressed = soa->suppressed.data();
+  int num_kept = 0;
+  for (int i = 0; i < num; ++i) {
+    if (suppressed[i]) {
+      continue;
+    }
+    keep->push_back(indices[i]);
+    if (max_output > 0 && ++num_kept >= max_output) {
+      break;
+    }
+    const float ix1 = x1[i];
+    const float iy1 = y1[i];
+    const float ix2 = x2[i];
+    const float iy2 = y2[i];
+    const float iarea = area[i];
+    // No branch in the loop body, a suppressed box is marked again
+    // instead of being skipped.
+    for (int j = i + 1; j < num; ++j) {
+      float w = std::max(0.0f, std::min(ix2, x2[j]) - std::max(ix1, x1[j]));
+      float h = std::max(0.0f, std::min(iy2, y2[j]) - std::max(iy1, y1[j]));
+      float overlap = w * h;
+      float iou = overlap / (iarea + area[j] - overlap);
+      suppressed[j] |= static_cast<uint8_t>(iou > iou_threshold);
+    }
+  }
+}
+
+}  // namespace
+
+void BatchedNMS(const float* boxes, const float* scores,
+                const int32_t* classes, const int32_t* batch_ids,
+                int num_boxes, float iou_threshold,
+                std::vector<int32_t>* keep, float score_threshold, int top_k,
+                int max_output) {
+  keep->clear();
+  std::vector<int32_t> order;
+  order.reserve(num_boxes);
+  for (int32_t i = 0; i < num_boxes; ++i) {
+    if (scores[i] > score_threshold) {
+      order.push_back(i);
+    }
+  }
+  if (order.empty()) {
+    return;
+  }
+
+  // Higher score first, ties are broken by the original order so the
+  // result is the same as a stable sort by score.
+  auto score_greater = [scores](int32_t a, int32_t b) {
+    return scores[a] > scores[b] || (scores[a] == scores[b] && a < b);
+  };
+  if (batch_ids != nullptr) {
+    std::stable_sort(order.begin(), order.end(),
+                     [batch_ids](int32_t a, int32_t b) {
+                       return batch_ids[a] < batch_ids[b];
+                     });
+  }
+
+  BoxesSoA soa;
+  std::vector<int32_t> image_keep;
+  auto image_begin = order.begin();
+  while (image_begin != order.end()) {
+    auto image_end = order.end();
+    if (batch_ids != nullptr) {
+      int32_t batch_id = batch_ids[*image_begin];
+      image_end = std::find_if(
+          image_begin, order.end(),
+          [batch_ids, batch_id](int32_t i) { return batch_ids[i] != batch_id; });
+    }
+    // Only the top_k candidates of each image take part in NMS, select them
+    // before sorting so the sort runs on top_k elements.
+    auto candidate_end = image_end;
+    if (top_k > 0 && image_end - image_begin > top_k) {
+      candidate_end = image_begin + top_k;
+      std::nth_element(image_begin, candidate_end, image_end, score_greater);
+    }
+    std::sort(image_begin, candidate_end, score_greater);
+
+    image_keep.clear();
+    if (classes == nullptr) {
+      SuppressSorted(boxes, &(*image_begin), candidate_end - image_begin,
+                     iou_threshold, max_output, &soa, &image_keep);
+    } else {
+      // Boxes of different classes never suppress each other, this is
+      // the same as offsetting the boxes by class id but keeps the
+      // precision of the coordinates.
+      std::stable_sort(image_begin, candidate_end,
+                       [classes](int32_t a, int32_t b) {
+                         return classes[a] < classes[b];
+                       });
+      auto class_begin = image_begin;
+      while (class_begin != candidate_end) {
+        int32_t class_id = classes[*class_begin];
+        auto class_end = std::find_if(
+            class_begin, candidate_end,
+            [classes, class_id](int32_t i) { return classes[i] != class_id; });
+        SuppressSorted(boxes, &(*class_begin), class_end - class_begin,
+                       iou_threshold, max_output, &soa, &image_keep);
+        class_begin = class_end;
+      }
+      std::sort(image_keep.begin(), image_keep.end(), score_greater);
+    }
+    if (max_output > 0 && static_cast<int>(image_keep.size()) > max_output) {
+      image_keep.resize(max_output);
+    }
+    keep->insert(keep->end(), image_keep.begin(), image_keep.end());
+    image_begin = image_end;
+  }
+}
+
+void BatchedNMS(std::vector<DetectionResult>* results, float iou_threshold,
+                bool class_aware, int top_k) {
+  size_t total = 0;
+  for (const auto& result : *results) {
+    total += result.boxes.size();
+  }
+  if (total == 0) {
+    return;
+  }
+  std::vector<float> boxes;
+  std::vector<float> scores;
+  std::vector<int32_t> classes;
+  std::vector<int32_t> batch_ids;
+  std::vector<std::pair<int32_t, int32_t>> origins;
+  boxes.reserve(total * 4);
+  scores.reserve(total);
+  if (class_aware) {
+    classes.reserve(total);
+  }
+  batch_ids.reserve(total);
+  origins.reserve(total);
+  for (size_t bs = 0; bs < results->size(); ++bs) {
+    const auto& result = (*results)[bs];
+    for (size_t i = 0; i < result.boxes.size(); ++i) {
+      boxes.insert(boxes.end(), result.boxes[i].begin(), result.boxes[i].end());
+      scores.push_back(result.scores[i]);
+      if (class_aware) {
+        classes.push_back(result.label_ids[i]);
+      }
+      batch_ids.push_back(static_cast<int32_t>(bs));
+      origins.emplace_back(static_cast<int32_t>(bs), static_cast<int32_t>(i));
+    }
+  }
+
+  std::vector<int32_t> keep;
+  BatchedNMS(boxes.data(), scores.data(),
+             class_aware ? classes.data() : nullptr, batch_ids.data(),
+             static_cast<int>(total), iou_threshold, &keep,
+             std::numeric_limits<float>::lowest(), top_k);
+
+  std::vector<DetectionResult> backup(results->size());
+  for (size_t bs = 0; bs < results->size(); ++bs) {
+    backup[bs] = std::move((*results)[bs]);
+    (*results)[bs].Clear();
+  }
+  for (auto k : keep) {
+    const auto& src = backup[origins[k].first];
+    int32_t i = origins[k].second;
+    auto& dst = (*results)[origins[k].first];
+    dst.boxes.emplace_back(src.boxes[i]);
+    dst.scores.push_back(src.scores[i]);
+    dst.label_ids.push_back(src.label_ids[i]);
+  }
+}
+
+}  // namespace utils
+}  // namespace vision
+}  // namespace fastdeploy
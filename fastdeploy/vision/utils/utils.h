@@ -15,6 +15,7 @@
 #pragma once
 
 #include <opencv2/opencv.hpp>
+#include <limits>
 #include <set>
 #include <vector>
 
@@ -64,6 +65,37 @@ void NMS(DetectionResult* output, float iou_threshold = 0.5,
 
 void NMS(FaceDetectionResult* result, float iou_threshold = 0.5);
 
+/** \brief Non maximum suppression over the candidate boxes of all the images of a batch in one pass
+ *
+ * \param[in] boxes The candidate boxes with layout [num_boxes, 4], each box is [x1, y1, x2, y2]
+ * \param[in] scores The scores of the candidate boxes
+ * \param[in] classes The class ids of the candidate boxes, boxes of different classes never suppress each other; nullptr means class agnostic NMS
+ * \param[in] batch_ids The indices of the images the candidate boxes belong to; nullptr means all the boxes belong to one image
+ * \param[in] num_boxes Number of the candidate boxes
+ * \param[in] iou_threshold A box overlapping a kept box with IoU greater than this value is suppressed
+ * \param[out] keep The indices of the kept boxes, ordered by image id and then by descending score
+ * \param[in] score_threshold Only the boxes with score greater than this value are candidates
+ * \param[in] top_k Max number of candidates of each image before NMS, -1 means no limit
+ * \param[in] max_output Max number of kept boxes of each image, -1 means no limit
+ */
+FASTDEPLOY_DECL void BatchedNMS(
+    const float* boxes, const float* scores, const int32_t* classes,
+    const int32_t* batch_ids, int num_boxes, float iou_threshold,
+    std::vector<int32_t>* keep,
+    float score_threshold = std::numeric_limits<float>::lowest(),
+    int top_k = -1, int max_output = -1);
+
+/** \brief NMS for the DetectionResults of a batch, all the images are processed in one pass
+ *
+ * \param[in] results The candidate boxes of every image, which are replaced by the kept boxes ordered by descending score
+ * \param[in] iou_threshold A box overlapping a kept box with IoU greater than this value is suppressed
+ * \param[in] class_aware Whether to suppress the boxes within the same label id only
+ * \param[in] top_k Max number of candidates of each image before NMS, -1 means no limit
+ */
+FASTDEPLOY_DECL void BatchedNMS(std::vector<DetectionResult>* results,
+                                float iou_threshold = 0.5,
+                                bool class_aware = false, int top_k = -1);
+
 /// Sort DetectionResult/FaceDetectionResult by score
 FASTDEPLOY_DECL void SortDetectionResult(DetectionResult* result);
 FASTDEPLOY_DECL void SortDetectionResult(FaceDetectionResult* result);
@@ -13,6 +13,7 @@
 // limitations under the License.
 
 #include "fastdeploy/pybind/main.h"
+#include "fastdeploy/vision/utils/utils.h"
 
 namespace fastdeploy {
 
@@ -35,8 +36,15 @@ void BindVisualize(pybind11::module& m);
 void BindVision(pybind11::module& m) {
   pybind11::class_<vision::Mask>(m, "Mask")
       .def(pybind11::init())
-      .def_readwrite("data", &vision::Mask::data)
+      .def_property("data",
+                    [](const vision::Mask& m) { return m.data; },
+                    ViewGuardedSetter(&vision::Mask::data, "data"))
       .def_readwrite("shape", &vision::Mask::shape)
+      .def("data_numpy",
+           [](pybind11::object self) {
+             auto& m = self.cast<vision::Mask&>();
+             return VectorToPyArrayView(m.data, self);
+           })
       .def(pybind11::pickle(
           [](const vision::Mask& m) {
             return pybind11::make_tuple(m.data, m.shape);
@@ -79,11 +87,34 @@ void BindVision(pybind11::module& m) {
 
   pybind11::class_<vision::DetectionResult>(m, "DetectionResult")
       .def(pybind11::init())
-      .def_readwrite("boxes", &vision::DetectionResult::boxes)
-      .def_readwrite("scores", &vision::DetectionResult::scores)
-      .def_readwrite("label_ids", &vision::DetectionResult::label_ids)
+      .def_property("boxes",
+                    [](const vision::DetectionResult& d) { return d.boxes; },
+                    ViewGuardedSetter(&vision::DetectionResult::boxes, "boxes"))
+      .def_property("scores",
+                    [](const vision::DetectionResult& d) { return d.scores; },
+                    ViewGuardedSetter(&vision::DetectionResult::scores, "scores"))
+      .def_property("label_ids",
+                    [](const vision::DetectionResult& d) { return d.label_ids; },
+                    ViewGuardedSetter(&vision::DetectionResult::label_ids, "label_ids"))
       .def_readwrite("masks", &vision::DetectionResult::masks)
       .def_readwrite("contain_masks", &vision::DetectionResult::contain_masks)
+      .def("boxes_numpy",
+           [](pybind11::object self) {
+             auto& d = self.cast<vision::DetectionResult&>();
+             return BufferToPyArrayView(
+                 reinterpret_cast<float*>(d.boxes.data()),
+                 {static_cast<pybind11::ssize_t>(d.boxes.size()), 4}, self);
+           })
+      .def("scores_numpy",
+           [](pybind11::object self) {
+             auto& d = self.cast<vision::DetectionResult&>();
+             return VectorToPyArrayView(d.scores, self);
+           })
+      .def("label_ids_numpy",
+           [](pybind11::object self) {
+             auto& d = self.cast<vision::DetectionResult&>();
+             return VectorToPyArrayView(d.label_ids, self);
+           })
       .def(pybind11::pickle(
           [](const vision::DetectionResult& d) {
             return pybind11::make_tuple(d.boxes, d.scores, d.label_ids, d.masks,
@@ -149,11 +180,25 @@ void BindVision(pybind11::module& m) {
 
   pybind11::class_<vision::SegmentationResult>(m, "SegmentationResult")
       .def(pybind11::init())
-      .def_readwrite("label_map", &vision::SegmentationResult::label_map)
-      .def_readwrite("score_map", &vision::SegmentationResult::score_map)
+      .def_property("label_map",
+                    [](const vision::SegmentationResult& s) { return s.label_map; },
+                    ViewGuardedSetter(&vision::SegmentationResult::label_map, "label_map"))
+      .def_property("score_map",
+                    [](const vision::SegmentationResult& s) { return s.score_map; },
+                    ViewGuardedSetter(&vision::SegmentationResult::score_map, "score_map"))
       .def_readwrite("shape", &vision::SegmentationResult::shape)
       .def_readwrite("contain_score_map",
                      &vision::SegmentationResult::contain_score_map)
+      .def("label_map_numpy",
+           [](pybind11::object self) {
+             auto& s = self.cast<vision::SegmentationResult&>();
+             return VectorToPyArrayView(s.label_map, self);
+           })
+      .def("score_map_numpy",
+           [](pybind11::object self) {
+             auto& s = self.cast<vision::SegmentationResult&>();
+             return VectorToPyArrayView(s.score_map, self);
+           })
       .def(pybind11::pickle(
           [](const vision::SegmentationResult& s) {
             return pybind11::make_tuple(s.label_map, s.score_map, s.shape,
@@ -177,11 +222,25 @@ void BindVision(pybind11::module& m) {
 
   pybind11::class_<vision::MattingResult>(m, "MattingResult")
       .def(pybind11::init())
-      .def_readwrite("alpha", &vision::MattingResult::alpha)
-      .def_readwrite("foreground", &vision::MattingResult::foreground)
+      .def_property("alpha",
+                    [](const vision::MattingResult& r) { return r.alpha; },
+                    ViewGuardedSetter(&vision::MattingResult::alpha, "alpha"))
+      .def_property("foreground",
+                    [](const vision::MattingResult& r) { return r.foreground; },
+                    ViewGuardedSetter(&vision::MattingResult::foreground, "foreground"))
       .def_readwrite("shape", &vision::MattingResult::shape)
       .def_readwrite("contain_foreground",
                      &vision::MattingResult::contain_foreground)
+      .def("alpha_numpy",
+           [](pybind11::object self) {
+             auto& r = self.cast<vision::MattingResult&>();
+             return VectorToPyArrayView(r.alpha, self);
+           })
+      .def("foreground_numpy",
+           [](pybind11::object self) {
+             auto& r = self.cast<vision::MattingResult&>();
+             return VectorToPyArrayView(r.foreground, self);
+           })
       .def("__repr__", &vision::MattingResult::Str)
       .def("__str__", &vision::MattingResult::Str);
 
@@ -205,6 +264,41 @@ void BindVision(pybind11::module& m) {
   m.def("disable_flycv", &vision::DisableFlyCV,
         "Disable image preprocessing by FlyCV, change to use OpenCV.");
 
+  m.def(
+      "batched_nms",
+      [](pybind11::array_t<float, pybind11::array::c_style |
+                                      pybind11::array::forcecast>& boxes,
+         pybind11::array_t<float, pybind11::array::c_style |
+                                      pybind11::array::forcecast>& scores,
+         pybind11::array_t<int32_t, pybind11::array::c_style |
+                                        pybind11::array::forcecast>& classes,
+         pybind11::array_t<int32_t, pybind11::array::c_style |
+                                        pybind11::array::forcecast>& batch_ids,
+         float iou_threshold, float score_threshold, int top_k,
+         int max_output) {
+        int num_boxes = static_cast<int>(scores.size());
+        FDASSERT(boxes.size() == static_cast<pybind11::ssize_t>(num_boxes) * 4,
+                 "The boxes should be in shape [%d, 4], but the size is %d.",
+                 num_boxes, static_cast<int>(boxes.size()));
+        FDASSERT(classes.size() == 0 || classes.size() == num_boxes,
+                 "The size of classes should be equal to scores.");
+        FDASSERT(batch_ids.size() == 0 || batch_ids.size() == num_boxes,
+                 "The size of batch_ids should be equal to scores.");
+        const int32_t* classes_ptr =
+            classes.size() == 0 ? nullptr : classes.data();
+        const int32_t* batch_ids_ptr =
+            batch_ids.size() == 0 ? nullptr : batch_ids.data();
+        std::vector<int32_t> keep;
+        {
+          pybind11::gil_scoped_release release;
+          vision::utils::BatchedNMS(boxes.data(), scores.data(), classes_ptr,
+                                    batch_ids_ptr, num_boxes, iou_threshold,
+                                    &keep, score_threshold, top_k, max_output);
+        }
+        return pybind11::array_t<int32_t>(keep.size(), keep.data());
+      },
+      "Non maximum suppression over the boxes of a batch in one pass.");
+
   BindProcessorManager(m);
   BindDetection(m);
   BindClassification(m);
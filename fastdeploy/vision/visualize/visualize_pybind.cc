@@ -93,9 +93,9 @@ void BindVisualize(pybind11::module& m) {
            })
       .def("vis_mot",
            [](pybind11::array& im_data, vision::MOTResult& result,
-              float score_threshold, vision::tracking::TrailRecorder record) {
+              float score_threshold, vision::tracking::TrailRecorder* record) {
              auto im = PyArrayToCvMat(im_data);
-             auto vis_im = vision::VisMOT(im, result, score_threshold, &record);
+             auto vis_im = vision::VisMOT(im, result, score_threshold, record);
              FDTensor out;
              vision::Mat(vis_im).ShareWithTensor(&out);
              return TensorToPyArray(out);
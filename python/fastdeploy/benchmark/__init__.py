@@ -0,0 +1,20 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .option import build_option
+from .stats import summarize_latency, throughput
+from .monitor import MemoryMonitor, read_rss_mb
+from .runner import run_benchmark
+from .report import collect_environment, flatten, write_json, write_csv
+from .load import LoadGenerator, HttpTarget, HttpTargetFactory, ModelTargetFactory, RuntimeTargetFactory, find_knee
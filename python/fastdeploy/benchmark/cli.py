@@ -0,0 +1,274 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import json
+import argparse
+
+from .option import build_option
+from .runner import run_benchmark
+from .monitor import MemoryMonitor
+from .load import LoadGenerator, HttpTargetFactory, ModelTargetFactory
+from .report import collect_environment, write_json, write_csv
+
+
+def build_parser():
+    from .models import supported_models
+    parser = argparse.ArgumentParser(
+        prog="python -m fastdeploy.benchmark",
+        description="Benchmark the latency, throughput and memory of a FastDeploy model."
+    )
+    parser.add_argument(
+        "--model_type",
+        choices=supported_models(),
+        help="Type of the model.")
+    parser.add_argument(
+        "--model",
+        help="Path of the model directory, or the ONNX file of the YOLO models.")
+    parser.add_argument(
+        "--image", required=True, help="Path of the test image file.")
+    parser.add_argument(
+        "--det_model", help="Directory name of the PPOCR detection model.")
+    parser.add_argument(
+        "--cls_model",
+        help="Directory name of the PPOCR classification model.")
+    parser.add_argument(
+        "--rec_model", help="Directory name of the PPOCR recognition model.")
+    parser.add_argument(
+        "--rec_label_file",
+        default="ppocr_keys_v1.txt",
+        help="File name of the PPOCR recognition label file.")
+    parser.add_argument(
+        "--device",
+        default="cpu",
+        help="Type of inference device, support cpu, gpu, kunlunxin or ascend.")
+    parser.add_argument(
+        "--device_id", type=int, default=0, help="Index of the device.")
+    parser.add_argument(
+        "--backend",
+        default="default",
+        help="Inference backend, default, ort, ov, paddle, lite, trt or paddle_trt.")
+    parser.add_argument(
+        "--cpu_num_thread",
+        type=int,
+        default=8,
+        help="Number of the cpu threads.")
+    parser.add_argument(
+        "--enable_trt_fp16",
+        type=ast.literal_eval,
+        default=False,
+        help="Whether to enable fp16 in the TensorRT backends.")
+    parser.add_argument(
+        "--enable_lite_fp16",
+        type=ast.literal_eval,
+        default=False,
+        help="Whether to enable fp16 in the Paddle Lite backend.")
+    parser.add_argument(
+        "--profile_mode",
+        default="end2end",
+        choices=["end2end", "runtime"],
+        help="Profile the whole predict process or the runtime only.")
+    parser.add_argument(
+        "--include_h2d_d2h",
+        type=ast.literal_eval,
+        default=False,
+        help="Whether the runtime profiling includes H2D and D2H.")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=50,
+        help="Number of the warmup requests of each worker.")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1000,
+        help="Number of the measured requests.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of the concurrent workers, each worker uses a clone of the model.")
+    parser.add_argument(
+        "--percentiles",
+        default="50,90,99",
+        help="Latency percentiles to report, separated by comma.")
+    parser.add_argument(
+        "--collect_memory",
+        type=ast.literal_eval,
+        default=True,
+        help="Whether to sample the resident set size through /proc.")
+    parser.add_argument(
+        "--url",
+        help="Url of a running SimpleServer endpoint, e.g. http://127.0.0.1:8000/fd/ppyoloe, "
+        "the server is load tested instead of a local model.")
+    parser.add_argument(
+        "--load_levels",
+        help="Levels of the load steps separated by comma, the concurrency in the closed mode "
+        "or the arrival rates in the open mode, e.g. 1,2,4,8,16.")
+    parser.add_argument(
+        "--load_mode",
+        default="closed",
+        choices=["closed", "open"],
+        help="Closed-loop workers or open-loop arrivals.")
+    parser.add_argument(
+        "--worker_type",
+        default="thread",
+        choices=["thread", "process"],
+        help="Thread or process load workers, process is only supported with --url.")
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10.0,
+        help="Measured seconds of each load step.")
+    parser.add_argument(
+        "--load_warmup",
+        type=float,
+        default=1.0,
+        help="Seconds of each load step before the measurement.")
+    parser.add_argument(
+        "--knee_latency",
+        default="p99",
+        help="The latency used to find the knee of the load curve, e.g. mean, p50 or p99.")
+    parser.add_argument(
+        "--tag",
+        default="",
+        help="Free-form tag stored with the result, e.g. the release or machine name.")
+    parser.add_argument(
+        "--output_json",
+        help="Write the result to this JSON file, a .jsonl file is appended.")
+    parser.add_argument(
+        "--output_csv", help="Append the result as one row of this CSV file.")
+    return parser
+
+
+def run(args):
+    """Run the benchmark described by the parsed arguments.
+
+    :param args: (argparse.Namespace)The arguments parsed by build_parser()
+    :return: (dict)The result record with the config, the environment and the metrics
+    """
+    import cv2
+
+    if args.url is None:
+        assert args.model_type is not None and args.model is not None, \
+            "The --model_type and --model are required while --url is not set."
+    else:
+        assert args.load_levels is not None, \
+            "The --load_levels is required while --url is set."
+    profile_runtime = args.url is None and args.profile_mode == "runtime"
+    if profile_runtime and args.model_type.startswith("ppocr"):
+        raise Exception(
+            "The runtime profile mode is not supported by the PPOCR pipelines, please use the end2end mode."
+        )
+
+    def option_fn():
+        return build_option(
+            device=args.device,
+            backend=args.backend,
+            device_id=args.device_id,
+            cpu_thread_num=args.cpu_num_thread,
+            enable_trt_fp16=args.enable_trt_fp16,
+            enable_lite_fp16=args.enable_lite_fp16,
+            profile_runtime=profile_runtime,
+            include_h2d_d2h=args.include_h2d_d2h,
+            repeat=args.repeat,
+            warmup=args.warmup)
+
+    percentiles = tuple(int(p) for p in args.percentiles.split(","))
+    config = {
+        k: v
+        for k, v in vars(args).items()
+        if k not in ["output_json", "output_csv"]
+    }
+    record = {"config": config, "environment": collect_environment()}
+
+    image = cv2.imread(args.image)
+    assert image is not None, "Failed to read the image {}.".format(
+        args.image)
+    if args.url is not None:
+        return _run_load(args, record, _server_target_factory(args, image))
+
+    from .models import create_model
+    load_monitor = MemoryMonitor().start() if args.collect_memory else None
+    model = create_model(args.model_type, args, option_fn)
+    if load_monitor is not None:
+        record["load_memory"] = load_monitor.stop()
+
+    if profile_runtime:
+        # The Runtime repeats the inference by itself while profiling
+        model.predict(image)
+        record["runtime_ms"] = model.get_profile_time() * 1000.0
+        return record
+
+    if args.load_levels is not None:
+        assert args.worker_type == "thread", \
+            "The models can't be shared with the process workers, please use the thread workers."
+        return _run_load(args, record, ModelTargetFactory(model, [image]))
+
+    models = [model]
+    if args.concurrency > 1:
+        assert hasattr(
+            model, "clone"
+        ), "The model type {} doesn't support clone, so the concurrency must be 1.".format(
+            args.model_type)
+        models += [model.clone() for _ in range(args.concurrency - 1)]
+    record.update(
+        run_benchmark(
+            [m.predict for m in models], [image],
+            warmup=args.warmup,
+            repeat=args.repeat,
+            concurrency=args.concurrency,
+            percentiles=percentiles,
+            monitor_memory=args.collect_memory))
+    return record
+
+
+def _server_target_factory(args, image):
+    from ..serving.utils import cv2_to_base64
+    payload = {"data": {"image": cv2_to_base64(image)}, "parameters": {}}
+    return HttpTargetFactory(args.url, payload)
+
+
+def _run_load(args, record, target_factory):
+    generator = LoadGenerator(
+        target_factory,
+        mode=args.load_mode,
+        worker_type=args.worker_type,
+        duration=args.duration,
+        warmup=args.load_warmup,
+        percentiles=tuple(int(p) for p in args.percentiles.split(",")))
+    levels = [float(l) for l in args.load_levels.split(",")]
+    if args.load_mode == "closed":
+        levels = [int(l) for l in levels]
+    record["load"] = generator.run_ramp(levels, knee_latency=args.knee_latency)
+    return record
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    record = run(args)
+    if args.output_json:
+        write_json(record, args.output_json)
+    if args.output_csv:
+        if "load" in record:
+            # One row per load step, so the curve can be plotted from the CSV
+            for step in record["load"]["steps"]:
+                row = {k: v for k, v in record.items() if k != "load"}
+                row["step"] = step
+                row["is_knee"] = step is record["load"]["knee"]
+                write_csv(row, args.output_csv)
+        else:
+            write_csv(record, args.output_csv)
+    print(json.dumps(record, indent=2, sort_keys=True))
+    return record
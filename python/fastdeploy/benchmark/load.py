@@ -0,0 +1,441 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import random
+import socket
+import logging
+import threading
+import http.client
+import multiprocessing
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from .stats import summarize_latency, throughput, DEFAULT_PERCENTILES
+
+
+class HttpTarget(object):
+    """Send one POST request to an endpoint of SimpleServer per call.
+
+    The connection is kept alive between the calls, so every worker owns one
+    target. The object is picklable, so it can be used by the process workers.
+
+    Args:
+        url (str): The url of the endpoint, e.g. http://127.0.0.1:8000/fd/ppyoloe
+        payload (dict or bytes): The request body, a dict is sent as JSON
+        headers (dict): Extra headers of the request
+        timeout (float): Timeout of each request in seconds
+    """
+
+    def __init__(self, url, payload, headers=None, timeout=60.0):
+        parsed = urllib.parse.urlsplit(url)
+        assert parsed.scheme in ["http", "https"
+                                 ], "Only http and https url is supported."
+        self.scheme = parsed.scheme
+        self.netloc = parsed.netloc
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += "?" + parsed.query
+        self.headers = {"Content-Type": "application/json"}
+        if headers is not None:
+            self.headers.update(headers)
+        if isinstance(payload, (bytes, bytearray)):
+            self.body = bytes(payload)
+        else:
+            self.body = json.dumps(payload).encode("utf-8")
+        self.timeout = timeout
+        self._conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def _connect(self):
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self.netloc, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(
+                self.netloc, timeout=self.timeout)
+        conn.connect()
+        # The small requests must not wait for the delayed ACK
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def __call__(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            self._conn.request("POST", self.path, self.body, self.headers)
+            resp = self._conn.getresponse()
+            content = resp.read()
+        except Exception:
+            # Reconnect on the next call
+            self._conn.close()
+            self._conn = None
+            raise
+        if resp.status != 200:
+            raise RuntimeError("Request failed with status {}: {}".format(
+                resp.status, content[:200]))
+        return content
+
+
+class HttpTargetFactory(object):
+    """Create one HttpTarget for every worker, the arguments are same with HttpTarget.
+    """
+
+    def __init__(self, url, payload, headers=None, timeout=60.0):
+        self.url = url
+        self.payload = payload
+        self.headers = headers
+        self.timeout = timeout
+
+    def __call__(self, worker_id):
+        return HttpTarget(self.url, self.payload, self.headers, self.timeout)
+
+
+class ModelTargetFactory(object):
+    """Create the request functions of a FastDeployModel, the first worker uses the model
+    and the others use clones of it, which are kept for the following steps.
+
+    Args:
+        model (FastDeployModel): The model, it must support clone() while more than one worker is used
+        inputs (list): The inputs, the requests of a worker cycle through them
+    """
+
+    def __init__(self, model, inputs):
+        self.model = model
+        self.inputs = inputs
+        self._models = [model]
+        self._lock = threading.Lock()
+
+    def _get_model(self, worker_id):
+        with self._lock:
+            while len(self._models) <= worker_id:
+                assert hasattr(
+                    self.model, "clone"
+                ), "The model doesn't support clone, only one worker can be used."
+                self._models.append(self.model.clone())
+            return self._models[worker_id]
+
+    def __call__(self, worker_id):
+        model = self._get_model(worker_id)
+        inputs = self.inputs
+        state = {"index": worker_id}
+
+        def predict():
+            data = inputs[state["index"] % len(inputs)]
+            state["index"] += 1
+            return model.predict(data)
+
+        return predict
+
+
+class RuntimeTargetFactory(object):
+    """Create the request functions of fastdeploy.Runtime, every worker owns one Runtime
+    created from the option, which is kept for the following steps.
+
+    Args:
+        runtime_option (fastdeploy.RuntimeOption): The option to create the Runtime
+        inputs (dict): The input data of Runtime.infer
+    """
+
+    def __init__(self, runtime_option, inputs):
+        self.runtime_option = runtime_option
+        self.inputs = inputs
+        self._runtimes = dict()
+        self._lock = threading.Lock()
+
+    def __call__(self, worker_id):
+        from ..runtime import Runtime
+        with self._lock:
+            if worker_id not in self._runtimes:
+                self._runtimes[worker_id] = Runtime(self.runtime_option)
+            runtime = self._runtimes[worker_id]
+        inputs = self.inputs
+        return lambda: runtime.infer(inputs)
+
+
+def _closed_loop(target, duration, warmup, start_event, samples):
+    start_event.wait()
+    now = time.monotonic()
+    measure_start = now + warmup
+    end = measure_start + duration
+    while now < end:
+        ok = True
+        try:
+            target()
+        except Exception as e:
+            ok = False
+            logging.debug("Request failed: {}".format(e))
+        finished = time.monotonic()
+        if now >= measure_start:
+            samples.append((now, finished, ok))
+        now = finished
+
+
+def _closed_loop_process(target_factory, worker_id, duration, warmup,
+                         barrier, queue):
+    samples = list()
+    try:
+        target = target_factory(worker_id)
+        barrier.wait()
+    except Exception as e:
+        barrier.abort()
+        queue.put((worker_id, None, str(e)))
+        return
+    event = threading.Event()
+    event.set()
+    _closed_loop(target, duration, warmup, event, samples)
+    queue.put((worker_id, samples, None))
+
+
+def find_knee(steps, latency_key="p99"):
+    """Find the knee of the throughput-latency curve, it's the step with the maximum
+    power, the throughput divided by the latency. Beyond the knee more load only adds
+    queueing delay, so it's the suggested operating point.
+
+    :param steps: (list of dict)The results of the steps returned by LoadGenerator.run_step
+    :param latency_key: (str)The latency used to compute the power, e.g. mean, p50, p90 or p99
+    :return: (int)Index of the knee step, -1 if there is no successful step
+    """
+    knee, best = -1, 0.0
+    for i, step in enumerate(steps):
+        latency = step["latency_ms"].get(latency_key, 0.0)
+        if step["requests"] == 0 or latency <= 0:
+            continue
+        power = step["throughput"] / latency
+        if power > best:
+            knee, best = i, power
+    return knee
+
+
+class LoadGenerator(object):
+    """Drive a target with concurrent load and measure the throughput and latency.
+
+    While the mode is closed, the level of a step is the number of workers, each
+    sends the next request once the previous one returns. While the mode is open,
+    the level is the arrival rate in requests per second, the requests are sent at
+    the scheduled time no matter how many are in flight, and the latency includes
+    the time waiting for a free worker, so an overloaded target shows up as the
+    growing latency instead of a lower sending rate.
+
+    Args:
+        target_factory (callable): Called with the worker id and returns a callable which
+            sends one request, e.g. HttpTargetFactory, ModelTargetFactory or
+            RuntimeTargetFactory
+        mode (str): closed or open
+        worker_type (str): thread or process, the process workers avoid the GIL of the
+            client side, and are only supported in the closed mode with a picklable
+            target_factory
+        duration (float): Measured seconds of each step
+        warmup (float): Seconds of each step before the measurement
+        max_workers (int): Max number of the in-flight requests in the open mode
+        poisson (bool): Whether the arrivals are a Poisson process in the open mode,
+            otherwise they are evenly spaced
+        percentiles (tuple of int): The latency percentiles to report
+    """
+
+    def __init__(self,
+                 target_factory,
+                 mode="closed",
+                 worker_type="thread",
+                 duration=10.0,
+                 warmup=1.0,
+                 max_workers=64,
+                 poisson=True,
+                 percentiles=DEFAULT_PERCENTILES):
+        assert mode in ["closed", "open"
+                        ], "The mode must be closed or open, but received {}.".format(
+                            mode)
+        assert worker_type in [
+            "thread", "process"
+        ], "The worker_type must be thread or process, but received {}.".format(
+            worker_type)
+        assert not (
+            mode == "open" and worker_type == "process"
+        ), "The process workers are only supported in the closed mode."
+        assert duration > 0, "The duration must be positive, but received {}.".format(
+            duration)
+        self.target_factory = target_factory
+        self.mode = mode
+        self.worker_type = worker_type
+        self.duration = duration
+        self.warmup = max(warmup, 0.0)
+        self.max_workers = max_workers
+        self.poisson = poisson
+        self.percentiles = percentiles
+
+    def _run_closed_threads(self, concurrency):
+        start_event = threading.Event()
+        samples = list()
+        targets = [self.target_factory(i) for i in range(concurrency)]
+        workers = [
+            threading.Thread(
+                target=_closed_loop,
+                args=(target, self.duration, self.warmup, start_event,
+                      samples),
+                name="fd-load-{}".format(i),
+                daemon=True) for i, target in enumerate(targets)
+        ]
+        for w in workers:
+            w.start()
+        start_event.set()
+        for w in workers:
+            w.join()
+        return samples
+
+    def _run_closed_processes(self, concurrency):
+        ctx = multiprocessing.get_context()
+        barrier = ctx.Barrier(concurrency + 1)
+        queue = ctx.Queue()
+        workers = [
+            ctx.Process(
+                target=_closed_loop_process,
+                args=(self.target_factory, i, self.duration, self.warmup,
+                      barrier, queue),
+                daemon=True) for i in range(concurrency)
+        ]
+        for w in workers:
+            w.start()
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        samples = list()
+        errors = list()
+        for _ in range(concurrency):
+            _, worker_samples, error = queue.get()
+            if error is not None:
+                errors.append(error)
+            else:
+                samples.extend(worker_samples)
+        for w in workers:
+            w.join()
+        if len(errors) > 0:
+            raise RuntimeError("Failed to start the load worker: {}".format(
+                errors[0]))
+        return samples
+
+    def _run_open(self, rate):
+        assert rate > 0, "The arrival rate must be positive, but received {}.".format(
+            rate)
+        local = threading.local()
+        worker_ids = {"next": 0}
+        id_lock = threading.Lock()
+        samples = list()
+
+        def send(scheduled, measured):
+            if not hasattr(local, "target"):
+                with id_lock:
+                    worker_id = worker_ids["next"]
+                    worker_ids["next"] += 1
+                local.target = self.target_factory(worker_id)
+            ok = True
+            try:
+                local.target()
+            except Exception as e:
+                ok = False
+                logging.debug("Request failed: {}".format(e))
+            if measured:
+                samples.append((scheduled, time.monotonic(), ok))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            start = time.monotonic()
+            measure_start = start + self.warmup
+            end = measure_start + self.duration
+            scheduled = start
+            while scheduled < end:
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(send, scheduled, scheduled >= measure_start)
+                if self.poisson:
+                    scheduled += random.expovariate(rate)
+                else:
+                    scheduled += 1.0 / rate
+        return samples
+
+    def run_step(self, level):
+        """Run one step of load.
+
+        :param level: (int or float)Number of the workers in the closed mode, or the arrival rate in the open mode
+        :return: (dict)The level, number of the successful and failed requests, throughput and latency of the step
+        """
+        if self.mode == "open":
+            samples = self._run_open(level)
+        else:
+            assert int(
+                level
+            ) >= 1, "The concurrency must be positive, but received {}.".format(
+                level)
+            if self.worker_type == "process":
+                samples = self._run_closed_processes(int(level))
+            else:
+                samples = self._run_closed_threads(int(level))
+        latencies = [end - start for start, end, ok in samples if ok]
+        errors = sum(1 for _, _, ok in samples if not ok)
+        if len(samples) > 0:
+            wall_time = max(end for _, end, _ in samples) - min(
+                start for start, _, _ in samples)
+        else:
+            wall_time = 0.0
+        return {
+            "level": level,
+            "mode": self.mode,
+            "requests": len(latencies),
+            "errors": errors,
+            "wall_time_s": wall_time,
+            "throughput": throughput(len(latencies), wall_time),
+            "latency_ms": summarize_latency(latencies, self.percentiles),
+        }
+
+    def run_ramp(self,
+                 levels,
+                 knee_latency="p99",
+                 max_latency_ms=None,
+                 max_error_rate=None):
+        """Run the steps from the lowest to the highest level and find the knee of the curve.
+
+        :param levels: (list)Levels of the steps, the concurrency in the closed mode or the arrival rates in the open mode
+        :param knee_latency: (str)The latency used to find the knee, e.g. mean, p50, p90 or p99
+        :param max_latency_ms: (float)Stop the ramp once this latency is exceeded, None means never stop
+        :param max_error_rate: (float)Stop the ramp once the ratio of the failed requests exceeds it, None means never stop
+        :return: (dict)The mode, all the steps and the knee step
+        """
+        steps = list()
+        for level in levels:
+            step = self.run_step(level)
+            steps.append(step)
+            logging.info(
+                "Load level {}: {:.2f} req/s, {} {:.3f} ms, {} errors".format(
+                    level, step["throughput"], knee_latency, step["latency_ms"]
+                    .get(knee_latency, 0.0), step["errors"]))
+            total = step["requests"] + step["errors"]
+            if max_error_rate is not None and total > 0 and step[
+                    "errors"] / total > max_error_rate:
+                break
+            if max_latency_ms is not None and step["latency_ms"].get(
+                    knee_latency, 0.0) > max_latency_ms:
+                break
+        knee = find_knee(steps, knee_latency)
+        return {
+            "mode": self.mode,
+            "worker_type": self.worker_type,
+            "knee_latency": knee_latency,
+            "steps": steps,
+            "knee": steps[knee] if knee >= 0 else None,
+        }
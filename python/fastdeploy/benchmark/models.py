@@ -0,0 +1,128 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from .. import vision
+from ..c_lib_wrap import ModelFormat
+
+# Model type -> (model class, model file, params file, config file)
+_PADDLE_MODELS = {
+    "ppcls": (vision.classification.PaddleClasModel, "inference.pdmodel",
+              "inference.pdiparams", "inference_cls.yaml"),
+    "ppyoloe": (vision.detection.PPYOLOE, "model.pdmodel", "model.pdiparams",
+                "infer_cfg.yml"),
+    "picodet": (vision.detection.PicoDet, "model.pdmodel", "model.pdiparams",
+                "infer_cfg.yml"),
+    "paddle_yolox": (vision.detection.PaddleYOLOX, "model.pdmodel",
+                     "model.pdiparams", "infer_cfg.yml"),
+    "yolov3": (vision.detection.YOLOv3, "model.pdmodel", "model.pdiparams",
+               "infer_cfg.yml"),
+    "paddle_yolov8": (vision.detection.PaddleYOLOv8, "model.pdmodel",
+                      "model.pdiparams", "infer_cfg.yml"),
+    "ppyolo": (vision.detection.PPYOLO, "model.pdmodel", "model.pdiparams",
+               "infer_cfg.yml"),
+    "faster_rcnn": (vision.detection.FasterRCNN, "model.pdmodel",
+                    "model.pdiparams", "infer_cfg.yml"),
+    "ppseg": (vision.segmentation.PaddleSegModel, "model.pdmodel",
+              "model.pdiparams", "deploy.yaml"),
+}
+
+# Model type -> model class, loaded from an ONNX file or a Paddle model directory
+_YOLO_MODELS = {
+    "yolox": vision.detection.YOLOX,
+    "yolov5": vision.detection.YOLOv5,
+    "yolov6": vision.detection.YOLOv6,
+    "yolov7": vision.detection.YOLOv7,
+}
+
+# OCR version -> dynamic shapes (min, opt, max) of det, cls and rec for TensorRT
+_PPOCR_TRT_SHAPES = {
+    "ppocrv2": ([[1, 3, 64, 64], [1, 3, 640, 640], [1, 3, 960, 960]],
+                [[1, 3, 48, 10], [10, 3, 48, 320], [64, 3, 48, 1024]],
+                [[1, 3, 32, 10], [10, 3, 32, 320], [32, 3, 32, 2304]]),
+    "ppocrv3": ([[1, 3, 64, 64], [1, 3, 640, 640], [1, 3, 960, 960]],
+                [[1, 3, 48, 10], [10, 3, 48, 320], [64, 3, 48, 1024]],
+                [[1, 3, 48, 10], [10, 3, 48, 320], [64, 3, 48, 2304]]),
+}
+
+
+def supported_models():
+    """Get the model types supported by the benchmark.
+    """
+    return sorted(
+        list(_PADDLE_MODELS.keys()) + list(_YOLO_MODELS.keys()) + list(
+            _PPOCR_TRT_SHAPES.keys()))
+
+
+def _create_ppocr(model_type, args, option_fn):
+    use_trt = args.backend in ["trt", "paddle_trt"]
+    det_shapes, cls_shapes, rec_shapes = _PPOCR_TRT_SHAPES[model_type]
+
+    def _option(shapes):
+        # Every model has its own option, the dynamic shapes are different
+        option = option_fn()
+        if use_trt:
+            option.trt_option.set_shape("x", *shapes)
+        return option
+
+    def _files(name):
+        return (os.path.join(args.model, name, "inference.pdmodel"),
+                os.path.join(args.model, name, "inference.pdiparams"))
+
+    det_model = vision.ocr.DBDetector(
+        *_files(args.det_model), runtime_option=_option(det_shapes))
+    cls_model = vision.ocr.Classifier(
+        *_files(args.cls_model), runtime_option=_option(cls_shapes))
+    rec_model = vision.ocr.Recognizer(
+        *_files(args.rec_model),
+        os.path.join(args.model, args.rec_label_file),
+        runtime_option=_option(rec_shapes))
+    pipeline = vision.ocr.PPOCRv2 if model_type == "ppocrv2" else vision.ocr.PPOCRv3
+    model = pipeline(
+        det_model=det_model, cls_model=cls_model, rec_model=rec_model)
+    # Keep the sub models alive as long as the pipeline
+    model._sub_models = [det_model, cls_model, rec_model]
+    return model
+
+
+def create_model(model_type, args, option_fn):
+    """Create the model to benchmark.
+
+    :param model_type: (str)The model type, one of supported_models()
+    :param args: (argparse.Namespace)The arguments of the benchmark, args.model is the model directory or file
+    :param option_fn: (callable)Create a new fastdeploy.RuntimeOption
+    :return: The model
+    """
+    if model_type in _PADDLE_MODELS:
+        model_class, model_file, params_file, config_file = _PADDLE_MODELS[
+            model_type]
+        return model_class(
+            os.path.join(args.model, model_file),
+            os.path.join(args.model, params_file),
+            os.path.join(args.model, config_file),
+            runtime_option=option_fn())
+    if model_type in _YOLO_MODELS:
+        model_class = _YOLO_MODELS[model_type]
+        if args.model.endswith(".onnx"):
+            return model_class(args.model, runtime_option=option_fn())
+        return model_class(
+            os.path.join(args.model, "model.pdmodel"),
+            os.path.join(args.model, "model.pdiparams"),
+            runtime_option=option_fn(),
+            model_format=ModelFormat.PADDLE)
+    if model_type in _PPOCR_TRT_SHAPES:
+        return _create_ppocr(model_type, args, option_fn)
+    raise Exception("Model type {} is not supported, supported types are {}.".
+                    format(model_type, ", ".join(supported_models())))
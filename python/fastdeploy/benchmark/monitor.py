@@ -0,0 +1,115 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+
+
+def read_proc_status(pid=None, keys=("VmRSS", "VmHWM")):
+    """Read the memory fields of /proc/<pid>/status in MB.
+
+    :param pid: (int)The process id, default is the current process
+    :param keys: (tuple of str)The fields to read
+    :return: (dict)The value of each field in MB, empty if /proc is not available
+    """
+    if pid is None:
+        pid = os.getpid()
+    values = dict()
+    try:
+        with open("/proc/{}/status".format(pid), "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in keys:
+                    # The values are reported in kB
+                    values[name] = int(value.split()[0]) / 1024.0
+    except (IOError, OSError, ValueError, IndexError):
+        return dict()
+    return values
+
+
+def read_rss_mb(pid=None):
+    """Read the resident set size of the process in MB, None if /proc is not available.
+    """
+    return read_proc_status(pid, ("VmRSS", )).get("VmRSS")
+
+
+class MemoryMonitor(object):
+    """Sample the resident set size of a process through /proc in a background thread.
+
+    Reading /proc/<pid>/status costs a few microseconds, so unlike psutil based
+    monitors no extra process is needed and the sampling barely disturbs the
+    measured workload.
+
+    Args:
+        pid (int): The process to monitor, default is the current process.
+        interval (float): Sampling interval in seconds.
+    """
+
+    def __init__(self, pid=None, interval=0.05):
+        self.pid = os.getpid() if pid is None else pid
+        self.interval = interval
+        self._samples = list()
+        self._start_rss = None
+        self._stop_event = threading.Event()
+        self._worker = None
+
+    def _sample(self):
+        rss = read_rss_mb(self.pid)
+        if rss is not None:
+            self._samples.append(rss)
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._samples = list()
+        self._start_rss = read_rss_mb(self.pid)
+        self._stop_event.clear()
+        self._worker = threading.Thread(
+            target=self._loop, name="fd-memory-monitor", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        if self._worker is None:
+            return self.output()
+        self._stop_event.set()
+        self._worker.join()
+        self._worker = None
+        self._sample()
+        return self.output()
+
+    def output(self):
+        """Get the sampled memory usage, all the values are in MB and None if /proc is not available.
+
+        :return: (dict)rss_mb_start, rss_mb_end, rss_mb_mean and rss_mb_max of the sampled period, and
+            rss_mb_peak, the peak resident set size of the whole process lifetime
+        """
+        samples = self._samples
+        status = read_proc_status(self.pid, ("VmHWM", ))
+        return {
+            "rss_mb_start": self._start_rss,
+            "rss_mb_end": samples[-1] if len(samples) > 0 else None,
+            "rss_mb_mean": sum(samples) / len(samples)
+            if len(samples) > 0 else None,
+            "rss_mb_max": max(samples) if len(samples) > 0 else None,
+            "rss_mb_peak": status.get("VmHWM"),
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,86 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..runtime import RuntimeOption
+
+SUPPORTED_BACKENDS = {
+    "cpu": ["default", "ort", "ov", "paddle", "lite"],
+    "gpu": ["default", "ort", "paddle", "ov", "trt", "paddle_trt"],
+    "kunlunxin": ["default", "lite", "ort", "paddle"],
+    "ascend": ["default", "lite"],
+}
+
+
+def build_option(device="cpu",
+                 backend="default",
+                 device_id=0,
+                 cpu_thread_num=8,
+                 enable_trt_fp16=False,
+                 enable_lite_fp16=False,
+                 profile_runtime=False,
+                 include_h2d_d2h=False,
+                 repeat=1000,
+                 warmup=50):
+    """Build the RuntimeOption of a benchmark.
+
+    :param device: (str)The inference device, cpu, gpu, kunlunxin or ascend
+    :param backend: (str)The inference backend, default, ort, ov, paddle, lite, trt or paddle_trt
+    :param device_id: (int)The index of the device
+    :param cpu_thread_num: (int)Number of the cpu threads
+    :param enable_trt_fp16: (bool)Whether to enable fp16 in the TensorRT backends
+    :param enable_lite_fp16: (bool)Whether to enable fp16 in the Paddle Lite backend
+    :param profile_runtime: (bool)Whether to profile the runtime only, the Runtime repeats the inference itself
+    :param include_h2d_d2h: (bool)Whether the profiled runtime includes the time of H2D and D2H
+    :param repeat: (int)Repeat times of the runtime profiling
+    :param warmup: (int)Warmup times of the runtime profiling
+    :return: (fastdeploy.RuntimeOption)The option
+    """
+    if device not in SUPPORTED_BACKENDS:
+        raise Exception(
+            "Only support device {} now, {} is not supported.".format(
+                "/".join(SUPPORTED_BACKENDS.keys()), device))
+    if backend not in SUPPORTED_BACKENDS[device]:
+        raise Exception(
+            "While inference with {}, only support {} now, {} is not supported.".
+            format(device, "/".join(SUPPORTED_BACKENDS[device]), backend))
+
+    option = RuntimeOption()
+    if profile_runtime:
+        option.enable_profiling(include_h2d_d2h, repeat, warmup)
+    option.set_cpu_thread_num(cpu_thread_num)
+    if device == "gpu":
+        option.use_gpu(device_id)
+    elif device == "kunlunxin":
+        option.use_kunlunxin(device_id)
+    elif device == "ascend":
+        option.use_ascend()
+
+    if backend == "ort":
+        option.use_ort_backend()
+    elif backend == "ov":
+        option.use_openvino_backend()
+    elif backend == "paddle":
+        option.use_paddle_backend()
+    elif backend == "lite":
+        option.use_lite_backend()
+        if enable_lite_fp16:
+            option.enable_lite_fp16()
+    elif backend in ["trt", "paddle_trt"]:
+        option.use_trt_backend()
+        if backend == "paddle_trt":
+            option.use_paddle_infer_backend()
+            option.paddle_infer_option.enable_trt = True
+        if enable_trt_fp16:
+            option.enable_trt_fp16()
+    return option
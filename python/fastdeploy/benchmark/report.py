@@ -0,0 +1,107 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import csv
+import json
+import socket
+import platform
+import datetime
+
+
+def _cpu_name():
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except (IOError, OSError):
+        pass
+    return platform.processor()
+
+
+def collect_environment():
+    """Collect the information of the software and the machine, which is stored with
+    the results so the records of different runs and releases can be compared.
+
+    :return: (dict)The environment information
+    """
+    try:
+        from ..code_version import version, git_version
+    except ImportError:
+        version, git_version = "unknown", "unknown"
+    return {
+        "fastdeploy_version": version,
+        "git_version": git_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "hostname": socket.gethostname(),
+        "cpu": _cpu_name(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def flatten(record, prefix=""):
+    """Flatten the nested dict, the keys are joined by '.', e.g. {"latency_ms": {"p50": 1.0}}
+    turns into {"latency_ms.p50": 1.0}.
+    """
+    flat = dict()
+    for k, v in record.items():
+        key = prefix + str(k)
+        if isinstance(v, dict):
+            flat.update(flatten(v, key + "."))
+        else:
+            flat[key] = v
+    return flat
+
+
+def write_json(record, path):
+    """Write the record to a JSON file, while the file name ends with .jsonl the record is
+    appended as one line, otherwise the file is overwritten.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "a") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+    else:
+        with open(path, "w") as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+
+
+def write_csv(record, path):
+    """Append the flattened record as one row of a CSV file, the file is rewritten with
+    the union of the columns if the record has columns the file doesn't have yet.
+    """
+    row = flatten(record)
+    rows = list()
+    fieldnames = list()
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "r", newline="") as f:
+            reader = csv.DictReader(f)
+            fieldnames = list(reader.fieldnames or [])
+            if all(k in fieldnames for k in row):
+                rows = None
+            else:
+                rows = list(reader)
+    if rows is None:
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writerow(row)
+        return
+    fieldnames += [k for k in row if k not in fieldnames]
+    rows.append(row)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,127 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import threading
+
+from .stats import summarize_latency, throughput, DEFAULT_PERCENTILES
+from .monitor import MemoryMonitor
+
+
+def _worker(predict_fn, inputs, warmup, barrier, counter, repeat, latencies,
+            errors):
+    try:
+        for i in range(warmup):
+            predict_fn(inputs[i % len(inputs)])
+    except Exception as e:
+        errors.append(e)
+        barrier.abort()
+        return
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        return
+    local = list()
+    try:
+        while True:
+            with counter["lock"]:
+                index = counter["next"]
+                if index >= repeat:
+                    break
+                counter["next"] = index + 1
+            data = inputs[index % len(inputs)]
+            start = time.perf_counter()
+            predict_fn(data)
+            local.append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(e)
+    latencies.extend(local)
+
+
+def run_benchmark(predict_fns,
+                  inputs,
+                  warmup=50,
+                  repeat=1000,
+                  concurrency=1,
+                  percentiles=DEFAULT_PERCENTILES,
+                  monitor_memory=True,
+                  memory_interval=0.05):
+    """Measure the latency and throughput of a predict function.
+
+    Every worker thread runs `warmup` requests first, then all the workers start together
+    and share `repeat` requests, the latency is measured per request and the throughput
+    over the wall time of the measured phase.
+
+    :param predict_fns: (callable or list of callable)The predict function of each worker, a single callable
+        is shared by all the workers, so it must be thread safe while concurrency is larger than 1
+    :param inputs: (list)The inputs, request i uses inputs[i % len(inputs)]
+    :param warmup: (int)Number of warmup requests of each worker, they are not measured
+    :param repeat: (int)Total number of measured requests
+    :param concurrency: (int)Number of workers
+    :param percentiles: (tuple of int)The latency percentiles to report
+    :param monitor_memory: (bool)Whether to sample the resident set size during the measured phase
+    :param memory_interval: (float)Sampling interval of the memory in seconds
+    :return: (dict)The benchmark result
+    """
+    assert concurrency >= 1, "The concurrency must be positive, but received {}.".format(
+        concurrency)
+    assert repeat >= 1, "The repeat must be positive, but received {}.".format(
+        repeat)
+    assert len(inputs) > 0, "At least one input is required."
+    if callable(predict_fns):
+        predict_fns = [predict_fns] * concurrency
+    assert len(
+        predict_fns
+    ) == concurrency, "The number of predict functions {} must be same with the concurrency {}.".format(
+        len(predict_fns), concurrency)
+
+    barrier = threading.Barrier(concurrency + 1)
+    counter = {"lock": threading.Lock(), "next": 0}
+    latencies = list()
+    errors = list()
+    workers = [
+        threading.Thread(
+            target=_worker,
+            args=(fn, inputs, warmup, barrier, counter, repeat, latencies,
+                  errors),
+            name="fd-benchmark-{}".format(i),
+            daemon=True) for i, fn in enumerate(predict_fns)
+    ]
+    for w in workers:
+        w.start()
+
+    monitor = MemoryMonitor(interval=memory_interval) if monitor_memory else None
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    if monitor is not None:
+        monitor.start()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    wall_time = time.perf_counter() - start
+    memory = monitor.stop() if monitor is not None else None
+    if len(errors) > 0:
+        raise errors[0]
+
+    return {
+        "concurrency": concurrency,
+        "warmup": warmup,
+        "repeat": repeat,
+        "wall_time_s": wall_time,
+        "throughput": throughput(len(latencies), wall_time),
+        "latency_ms": summarize_latency(latencies, percentiles),
+        "memory": memory,
+    }
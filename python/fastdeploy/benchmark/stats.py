@@ -0,0 +1,52 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def summarize_latency(latencies, percentiles=DEFAULT_PERCENTILES):
+    """Summarize the latencies of the requests, all the returned values are in milliseconds.
+
+    :param latencies: (list of float)Latency of each request in seconds
+    :param percentiles: (tuple of int)The percentiles to report, e.g. (50, 90, 99) reports p50, p90 and p99
+    :return: (dict)count, mean, std, min, max and the percentiles
+    """
+    summary = {"count": len(latencies)}
+    keys = ["mean", "std", "min", "max"
+            ] + ["p{}".format(p) for p in percentiles]
+    if len(latencies) == 0:
+        summary.update({k: 0.0 for k in keys})
+        return summary
+    arr = np.asarray(latencies, dtype=np.float64) * 1000.0
+    summary["mean"] = float(arr.mean())
+    summary["std"] = float(arr.std())
+    summary["min"] = float(arr.min())
+    summary["max"] = float(arr.max())
+    for p, value in zip(percentiles, np.percentile(arr, percentiles)):
+        summary["p{}".format(p)] = float(value)
+    return summary
+
+
+def throughput(num_requests, wall_time):
+    """Number of requests per second.
+
+    :param num_requests: (int)Number of the finished requests
+    :param wall_time: (float)Elapsed wall time in seconds
+    :return: (float)The throughput, 0 if the wall time is not positive
+    """
+    if wall_time <= 0:
+        return 0.0
+    return num_requests / wall_time
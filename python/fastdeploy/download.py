@@ -17,9 +17,11 @@ import os.path as osp
 import shutil
 import requests
 import time
+import json
 import zipfile
 import tarfile
 import hashlib
+import threading
 import tqdm
 import logging
 
@@ -27,6 +29,18 @@ from fastdeploy.utils.hub_model_server import model_server
 import fastdeploy.utils.hub_env as hubenv
 
 DOWNLOAD_RETRY_LIMIT = 3
+# Size of the chunks read from the connection and of the write buffer
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_BUFFER_SIZE = 8 << 20
+# Files smaller than this are downloaded with one connection
+PARALLEL_DOWNLOAD_MIN_SIZE = 16 << 20
+DOWNLOAD_NUM_CONNECTIONS = 4
+DOWNLOAD_TIMEOUT = 60
+# Seconds between the saves of the parallel download state
+DOWNLOAD_STATE_INTERVAL = 1.0
+CACHE_INDEX_FILE = osp.join(hubenv.HUB_HOME, 'download_cache.json')
+
+_cache_lock = threading.Lock()
 
 
 def md5check(fullname, md5sum=None):
@@ -36,7 +50,7 @@ def md5check(fullname, md5sum=None):
     logging.info("File {} md5 checking...".format(fullname))
     md5 = hashlib.md5()
     with open(fullname, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
             md5.update(chunk)
     calc_md5sum = md5.hexdigest()
 
@@ -47,6 +61,66 @@ def md5check(fullname, md5sum=None):
     return True
 
 
+def _load_cache_index():
+    if not osp.exists(CACHE_INDEX_FILE):
+        return {"blobs": {}, "models": {}}
+    try:
+        with open(CACHE_INDEX_FILE, 'r') as f:
+            index = json.load(f)
+    except (IOError, ValueError):
+        logging.warning("The download cache index {} is broken, ignore it.".
+                        format(CACHE_INDEX_FILE))
+        return {"blobs": {}, "models": {}}
+    index.setdefault("blobs", {})
+    index.setdefault("models", {})
+    return index
+
+
+def _update_cache_index(update_fn):
+    with _cache_lock:
+        index = _load_cache_index()
+        update_fn(index)
+        os.makedirs(osp.dirname(CACHE_INDEX_FILE), exist_ok=True)
+        tmp_file = CACHE_INDEX_FILE + ".{}_tmp".format(os.getpid())
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_file, CACHE_INDEX_FILE)
+
+
+def _cache_blob(md5sum, fullname, url):
+    """Record the verified file in the content-addressed cache index.
+    """
+    size = osp.getsize(fullname)
+
+    def update(index):
+        index["blobs"][md5sum] = {
+            "path": osp.abspath(fullname),
+            "size": size,
+            "url": url
+        }
+
+    _update_cache_index(update)
+
+
+def _lookup_blob(md5sum):
+    """Find a downloaded file by its md5, None is returned while there's no valid copy.
+    """
+    if md5sum is None:
+        return None
+    with _cache_lock:
+        entry = _load_cache_index()["blobs"].get(md5sum)
+    if entry is None:
+        return None
+    if not osp.isfile(entry["path"]) or osp.getsize(entry[
+            "path"]) != entry["size"]:
+        return None
+    return entry["path"]
+
+
+def _model_cache_key(name, format, version):
+    return "{}|{}|{}".format(name, format or "", version or "")
+
+
 def move_and_merge_tree(src, dst):
     """
     Move src directory to dst, if dst is already exists,
@@ -71,11 +145,212 @@ def move_and_merge_tree(src, dst):
                 shutil.move(src_fp, dst_fp)
 
 
-def download(url, path, rename=None, md5sum=None, show_progress=False):
+def _probe(url):
+    """Get the content length and whether the server supports range requests.
+    """
+    try:
+        resp = requests.head(
+            url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+    except requests.RequestException:
+        return None, False
+    if resp.status_code != 200:
+        return None, False
+    size = resp.headers.get('content-length')
+    size = int(size) if size is not None else None
+    accept_ranges = resp.headers.get('accept-ranges', '').lower() == 'bytes'
+    return size, accept_ranges
+
+
+def _hash_file_range(hasher, fullname, start, end):
+    with open(fullname, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise IOError("Unexpected end of file {}.".format(fullname))
+            hasher.update(chunk)
+            remaining -= len(chunk)
+
+
+class _RangeNotSupportedError(IOError):
+    """The server answers a range request with the whole content."""
+    pass
+
+
+def _download_single(url, tmp_fullname, accept_ranges, progress):
+    """Download with one connection, continue from the partial file while the
+    server supports range requests. The md5 is computed while downloading.
+    """
+    md5 = hashlib.md5()
+    offset = 0
+    headers = {}
+    if accept_ranges and osp.exists(tmp_fullname):
+        offset = osp.getsize(tmp_fullname)
+        headers['Range'] = 'bytes={}-'.format(offset)
+    req = requests.get(
+        url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+    if req.status_code == 206:
+        logging.info("Resume downloading {} from byte {}".format(url, offset))
+        _hash_file_range(md5, tmp_fullname, 0, offset)
+        progress.update(offset)
+        mode = 'ab'
+    elif req.status_code == 200:
+        mode = 'wb'
+    elif req.status_code == 416:
+        # The partial file is not a prefix of the content, restart from zero
+        os.remove(tmp_fullname)
+        raise IOError("Invalid range of the partial file {}.".format(
+            tmp_fullname))
+    else:
+        raise RuntimeError("Downloading from {} failed with code "
+                           "{}!".format(url, req.status_code))
+    with open(tmp_fullname, mode, buffering=DOWNLOAD_BUFFER_SIZE) as f:
+        for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if chunk:
+                f.write(chunk)
+                md5.update(chunk)
+                progress.update(len(chunk))
+    return md5.hexdigest()
+
+
+def _download_parallel(url, tmp_fullname, total_size, num_connections,
+                       progress):
+    """Download the byte ranges with multiple connections into the preallocated
+    partial file. The progress of every range is kept in a state file, so that an
+    interrupted download continues from where it stops. The md5 is computed in the
+    calling thread over the contiguous downloaded prefix while downloading.
+    """
+    state_file = tmp_fullname + ".state"
+    segment_size = (total_size + num_connections - 1) // num_connections
+    segments = [[start, min(start + segment_size, total_size), 0]
+                for start in range(0, total_size, segment_size)]
+    resumed = False
+    if osp.exists(tmp_fullname) and osp.exists(state_file):
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+            if state["size"] == total_size and len(state["segments"]) == len(
+                    segments):
+                segments = state["segments"]
+                resumed = True
+                logging.info("Resume downloading {} from {} bytes".format(
+                    url, sum(s[2] for s in segments)))
+        except (IOError, ValueError, KeyError, TypeError):
+            pass
+    if not resumed or osp.getsize(tmp_fullname) != total_size:
+        # Recreate the partial file, the stale bytes of a previous download
+        # must not be kept
+        with open(tmp_fullname, 'wb') as f:
+            f.truncate(total_size)
+        segments = [[start, end, 0] for start, end, _ in segments]
+    progress.update(sum(s[2] for s in segments))
+
+    state_lock = threading.Lock()
+    errors = []
+    # Set to stop the workers after their current chunks, e.g. on Ctrl-C
+    stop = threading.Event()
+
+    def save_state():
+        with state_lock:
+            data = json.dumps({"size": total_size, "segments": segments})
+        with open(state_file, 'w') as f:
+            f.write(data)
+
+    def fetch(segment):
+        start, end, done = segment
+        if start + done >= end:
+            return
+        headers = {'Range': 'bytes={}-{}'.format(start + done, end - 1)}
+        try:
+            req = requests.get(
+                url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+            if req.status_code == 200:
+                raise _RangeNotSupportedError(
+                    "The server doesn't support the range requests of "
+                    "{}.".format(url))
+            if req.status_code != 206:
+                raise IOError("Downloading range {} from {} failed with "
+                                   "code {}!".format(headers['Range'], url,
+                                                     req.status_code))
+            with open(tmp_fullname, 'r+b', buffering=0) as f:
+                f.seek(start + done)
+                for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if stop.is_set():
+                        return
+                    if not chunk:
+                        continue
+                    chunk = chunk[:end - start - segment[2]]
+                    f.write(chunk)
+                    with state_lock:
+                        segment[2] += len(chunk)
+                    progress.update(len(chunk))
+                    if start + segment[2] >= end:
+                        break
+            if start + segment[2] < end:
+                raise IOError("Connection closed while downloading range {} "
+                              "from {}.".format(headers['Range'], url))
+        except Exception as e:
+            errors.append(e)
+
+    workers = [
+        threading.Thread(
+            target=fetch, args=(segment, ), daemon=True)
+        for segment in segments
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Hash the contiguous downloaded prefix while the workers are running
+    md5 = hashlib.md5()
+    hashed = 0
+    saved_time = time.time()
+    try:
+        while True:
+            alive = any(worker.is_alive() for worker in workers)
+            with state_lock:
+                frontier = 0
+                for start, end, done in segments:
+                    frontier = start + done
+                    if start + done < end:
+                        break
+            if frontier > hashed:
+                _hash_file_range(md5, tmp_fullname, hashed, frontier)
+                hashed = frontier
+            if not alive:
+                break
+            # Save the progress periodically, so that a killed process loses
+            # at most the last interval
+            if time.time() - saved_time >= DOWNLOAD_STATE_INTERVAL:
+                save_state()
+                saved_time = time.time()
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        save_state()
+    if len(errors) > 0:
+        raise errors[0]
+    if hashed != total_size:
+        raise IOError("Downloaded {} bytes of {} from {}.".format(
+            hashed, total_size, url))
+    os.remove(state_file)
+    return md5.hexdigest()
+
+
+def download(url,
+             path,
+             rename=None,
+             md5sum=None,
+             show_progress=False,
+             num_connections=DOWNLOAD_NUM_CONNECTIONS):
     """
     Download from url, save to path.
     url (str): download url
     path (str): download to given path
+    md5sum (str): expected md5 of the file, it's computed while downloading
+    num_connections (int): number of the http range connections to download large files
     """
     if not osp.exists(path):
         os.makedirs(path)
@@ -84,8 +359,24 @@ def download(url, path, rename=None, md5sum=None, show_progress=False):
     fullname = osp.join(path, fname)
     if rename is not None:
         fullname = osp.join(path, rename)
+    if osp.exists(fullname) and md5check(fullname, md5sum):
+        return fullname
+
+    # The same content is already downloaded to another path
+    cached = _lookup_blob(md5sum)
+    if cached is not None and osp.abspath(cached) != osp.abspath(fullname):
+        logging.info("Copying {} from the download cache {}".format(fname,
+                                                                  cached))
+        shutil.copyfile(cached, fullname)
+        return fullname
+
+    # For protecting download interupted, download to
+    # tmp_fullname firstly, move tmp_fullname to fullname
+    # after download finished, the tmp_fullname is kept
+    # to continue the download while retrying
+    tmp_fullname = fullname + "_tmp"
     retry_cnt = 0
-    while not (osp.exists(fullname) and md5check(fullname, md5sum)):
+    while True:
         if retry_cnt < DOWNLOAD_RETRY_LIMIT:
             retry_cnt += 1
         else:
@@ -94,31 +385,44 @@ def download(url, path, rename=None, md5sum=None, show_progress=False):
                                "Retry limit reached".format(url))
 
         logging.info("Downloading {} from {}".format(fname, url))
-
-        req = requests.get(url, stream=True)
-        if req.status_code != 200:
-            raise RuntimeError("Downloading from {} failed with code "
-                               "{}!".format(url, req.status_code))
-
-        # For protecting download interupted, download to
-        # tmp_fullname firstly, move tmp_fullname to fullname
-        # after download finished
-        tmp_fullname = fullname + "_tmp"
-        total_size = req.headers.get('content-length')
-        with open(tmp_fullname, 'wb') as f:
-            if total_size and show_progress:
-                for chunk in tqdm.tqdm(
-                        req.iter_content(chunk_size=1024),
-                        total=(int(total_size) + 1023) // 1024,
-                        unit='KB'):
-                    f.write(chunk)
+        total_size, accept_ranges = _probe(url)
+        progress = tqdm.tqdm(
+            total=total_size,
+            unit='B',
+            unit_scale=True,
+            disable=not show_progress)
+        try:
+            if accept_ranges and total_size is not None and \
+                    total_size >= PARALLEL_DOWNLOAD_MIN_SIZE and num_connections > 1:
+                calc_md5sum = _download_parallel(
+                    url, tmp_fullname, total_size, num_connections, progress)
             else:
-                for chunk in req.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-        shutil.move(tmp_fullname, fullname)
-        logging.debug("{} download completed.".format(fname))
-
+                calc_md5sum = _download_single(url, tmp_fullname,
+                                               accept_ranges, progress)
+        except _RangeNotSupportedError as e:
+            logging.info("{} Fall back to download with one connection.".
+                         format(e))
+            num_connections = 1
+            for stale_file in [tmp_fullname, tmp_fullname + ".state"]:
+                if osp.exists(stale_file):
+                    os.remove(stale_file)
+            continue
+        except (requests.RequestException, IOError) as e:
+            logging.info("Downloading {} interrupted: {}".format(fname, e))
+            continue
+        finally:
+            progress.close()
+
+        if md5sum is not None and calc_md5sum != md5sum:
+            logging.info("File {} md5 check failed, {}(calc) != "
+                         "{}(base)".format(fname, calc_md5sum, md5sum))
+            os.remove(tmp_fullname)
+            continue
+        break
+
+    shutil.move(tmp_fullname, fullname)
+    _cache_blob(calc_md5sum, fullname, url)
+    logging.debug("{} download completed.".format(fname))
     return fullname
 
 
@@ -240,7 +544,8 @@ def get_model_list(category: str=None):
 def download_model(name: str,
                    path: str=None,
                    format: str=None,
-                   version: str=None):
+                   version: str=None,
+                   use_cache: bool=True):
     '''
     Download pre-trained model for FastDeploy inference engine.
     Args:
@@ -248,15 +553,28 @@ def download_model(name: str,
         path(str): local path for saving model. If not set, default is hubenv.MODEL_HOME
         format(str): FastDeploy model format
         version(str) : FastDeploy model version
+        use_cache(bool): Whether to resolve the model from the local download cache index without
+            contacting the hub server, the model downloaded before is returned while it still exists
     '''
-    result = model_server.search_model(name, format, version)
     if path is None:
         path = hubenv.MODEL_HOME
+    cache_key = _model_cache_key(name, format, version)
+    if use_cache:
+        with _cache_lock:
+            entry = _load_cache_index()["models"].get(cache_key)
+        if entry is not None and osp.exists(entry["path"]) and osp.abspath(
+                osp.dirname(entry["path"])) == osp.abspath(path):
+            print('Successfully download model at path: {}'.format(entry[
+                "path"]))
+            return entry["path"]
+
+    result = model_server.search_model(name, format, version)
     if result:
         url = result[0]['url']
         format = result[0]['format']
         version = result[0]['version']
-        fullpath = download(url, path, show_progress=True)
+        fullpath = download(
+            url, path, md5sum=result[0].get('md5'), show_progress=True)
         model_server.stat_model(name, format, version)
         if format == 'paddle':
             if url.count(".tgz") > 0 or url.count(".tar") > 0 or url.count(
@@ -270,6 +588,16 @@ def download_model(name: str,
                     os.remove(archive_path)
                 except FileExistsError:
                     pass
+
+        def update(index):
+            index["models"][cache_key] = {
+                "path": osp.abspath(fullpath),
+                "url": url,
+                "format": format,
+                "version": version
+            }
+
+        _update_cache_index(update)
         print('Successfully download model at path: {}'.format(fullpath))
         return fullpath
     else:
@@ -14,9 +14,12 @@
 
 from __future__ import absolute_import
 from ... import c_lib_wrap as C
+from ...utils.trace import PipelineTraceMixin
 
 
-class PPTinyPose(object):
+class PPTinyPose(PipelineTraceMixin):
+    trace_attr = "_pipeline"
+
     def __init__(self, det_model=None, pptinypose_model=None):
         """Set initialized detection model object and pptinypose model object
 
@@ -29,6 +29,8 @@ class Runtime:
         """
 
         self._runtime = C.Runtime()
+        self._output_arena = None
+        self._recycle_outputs = False
         self.runtime_option = runtime_option
         assert self._runtime.init(
             self.runtime_option._option), "Initialize Runtime Failed!"
@@ -48,10 +50,15 @@ class Runtime:
             inputs_dict["x" + str(i)] = inputs[i]
         return self.infer(inputs_dict)
 
-    def infer(self, data):
+    def infer(self, data, copy=True, out=None):
         """Inference with input data.
 
         :param data: (dict[str : numpy.ndarray])The input data dict, key value must keep same with the loaded model
+        :param copy: (bool)Whether to copy the input and output data, while it's False, the C-contiguous input arrays are passed to the backend without copy,
+            and the output arrays share the memory with the output tensors of the backend, which is released after all the output arrays are released.
+            Only the input data of dict[str : numpy.ndarray] is supported while copy is False
+        :param out: (list[numpy.ndarray])The preallocated C-contiguous arrays to write the outputs, the shape and dtype must match the outputs,
+            the output buffers of the backend are reused across the calls, so there's no heap allocation with fixed shapes
         :return list of numpy.ndarray
         """
         assert isinstance(data, dict) or isinstance(
@@ -61,8 +68,46 @@ class Runtime:
                 if isinstance(v, np.ndarray) and not v.data.contiguous:
                     data[k] = np.ascontiguousarray(data[k])
 
+        if out is not None or self._recycle_outputs:
+            assert isinstance(data, dict) and all(
+                isinstance(v, np.ndarray) for v in data.values(
+                )), "Only dict[str : numpy.ndarray] is supported while using the output arena."
+            if self._output_arena is None:
+                self._output_arena = C.OutputArena()
+            return self._runtime.infer_with_arena(
+                data, self._output_arena, list(out) if out is not None else [])
+        if not copy:
+            assert isinstance(data, dict) and all(
+                isinstance(v, np.ndarray) for v in data.values(
+                )), "Only dict[str : numpy.ndarray] is supported while copy is False."
+            return self._runtime.infer_no_copy(data)
         return self._runtime.infer(data)
 
+    def enable_output_recycling(self):
+        """Reuse the output buffers across the infer calls, the arrays returned by infer share the memory
+        with the recycled buffers. The buffers are reused once all the arrays of a call are released, the arrays
+        still alive keep their own buffers, so a loop keeping the outputs of the previous call alternates between two sets of buffers
+        """
+        self._recycle_outputs = True
+
+    def disable_output_recycling(self):
+        """Disable the output recycling, infer returns new arrays for every call
+        """
+        self._recycle_outputs = False
+
+    def get_output_arena_stats(self):
+        """Get the allocation counters of the output arena, which is used while output recycling is enabled or `out` is passed to infer
+
+        :return: (dict)The number of infer calls, the number of output buffer allocations and the allocated bytes
+        """
+        if self._output_arena is None:
+            return {"num_calls": 0, "num_allocations": 0, "bytes_allocated": 0}
+        return {
+            "num_calls": self._output_arena.num_calls,
+            "num_allocations": self._output_arena.num_allocations,
+            "bytes_allocated": self._output_arena.bytes_allocated,
+        }
+
     def bind_input_tensor(self, name, fdtensor):
         """Bind FDTensor by name, no copy and share input memory
 
@@ -0,0 +1,199 @@
+# coding:utf-8
+# Copyright (c) 2022  PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import queue
+import logging
+import threading
+import collections
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _PendingRequest:
+    __slots__ = ("data", "parameters", "future", "enqueue_time")
+
+    def __init__(self, data, parameters):
+        self.data = data
+        self.parameters = parameters
+        self.future = Future()
+        self.enqueue_time = time.perf_counter()
+
+
+class DynamicBatcher:
+    """Coalesce concurrent requests into one batch_process call of the model handler.
+
+    Requests are gathered until either `max_batch_size` requests are queued or
+    the oldest queued request has waited `max_queue_delay_ms`, then the batch is
+    run once and every result is handed back to its caller.
+
+    Args:
+        model_handler: Subclass of BaseModelHandler which implements batch_process
+        predictor: The predictor passed to model_handler.batch_process
+        predictor_lock: (threading.Lock)Lock which guards the predictor
+        max_batch_size: (int)Max number of requests in one batch
+        max_queue_delay_ms: (float)Max time in milliseconds to wait for a batch to fill
+        stats_window: (int)Number of latest batches kept for the statistics
+    """
+
+    def __init__(self,
+                 model_handler,
+                 predictor,
+                 predictor_lock,
+                 max_batch_size=8,
+                 max_queue_delay_ms=5.0,
+                 stats_window=1000):
+        assert max_batch_size >= 1, "The max_batch_size must be positive, but received {}.".format(
+            max_batch_size)
+        assert max_queue_delay_ms >= 0, "The max_queue_delay_ms must not be negative, but received {}.".format(
+            max_queue_delay_ms)
+        self._model_handler = model_handler
+        self._predictor = predictor
+        self._predictor_lock = predictor_lock
+        self._max_batch_size = max_batch_size
+        self._max_queue_delay = max_queue_delay_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = collections.deque(maxlen=stats_window)
+        self._batch_times = collections.deque(maxlen=stats_window)
+        self._request_latencies = collections.deque(
+            maxlen=stats_window * max_batch_size)
+        self._num_batches = 0
+        self._num_requests = 0
+        self._stopped = False
+        self._worker = threading.Thread(
+            target=self._loop, name="fd-dynamic-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, data, parameters):
+        """Enqueue one request and return a concurrent.futures.Future of its result.
+        """
+        if self._stopped:
+            raise RuntimeError("The DynamicBatcher has been stopped.")
+        request = _PendingRequest(data, parameters)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, data, parameters):
+        """Enqueue one request and block until its result is ready.
+        """
+        return self.submit(data, parameters).result()
+
+    def stop(self):
+        self._stopped = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first.enqueue_time + self._max_queue_delay
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                if timeout <= 0:
+                    request = self._queue.get_nowait()
+                else:
+                    request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if len(batch) == 0:
+                continue
+            start = time.perf_counter()
+            try:
+                with self._predictor_lock:
+                    outputs = self._model_handler.batch_process(
+                        self._predictor, [r.data for r in batch],
+                        [r.parameters for r in batch])
+                if len(outputs) != len(batch):
+                    raise RuntimeError(
+                        "The model handler returned {} results for a batch of {} requests.".
+                        format(len(outputs), len(batch)))
+            except Exception as e:
+                logging.warning(
+                    "Error occurred while running a batch of {} requests: {}".
+                    format(len(batch), e))
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+            end = time.perf_counter()
+            for r, output in zip(batch, outputs):
+                # Only the failed request gets the error of its own
+                if isinstance(output, Exception):
+                    r.future.set_exception(output)
+                else:
+                    r.future.set_result(output)
+            self._record(batch, start, end)
+
+    def _record(self, batch, start, end):
+        with self._stats_lock:
+            self._num_batches += 1
+            self._num_requests += len(batch)
+            self._batch_sizes.append(len(batch))
+            self._batch_times.append(end - start)
+            for r in batch:
+                self._request_latencies.append(end - r.enqueue_time)
+
+    def get_stats(self):
+        """Get the statistics of the latest batches, all the time values are in milliseconds.
+
+        :return: (dict)The number of batches and requests, the batch size distribution, the batch execution time and the request latency percentiles
+        """
+
+        def _percentiles(values):
+            if len(values) == 0:
+                return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+            arr = np.array(values) * 1000.0
+            p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+            return {
+                "mean": float(arr.mean()),
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99)
+            }
+
+        with self._stats_lock:
+            batch_sizes = list(self._batch_sizes)
+            batch_times = list(self._batch_times)
+            latencies = list(self._request_latencies)
+            num_batches = self._num_batches
+            num_requests = self._num_requests
+        total_time = sum(batch_times)
+        return {
+            "num_batches": num_batches,
+            "num_requests": num_requests,
+            "avg_batch_size": float(np.mean(batch_sizes))
+            if len(batch_sizes) > 0 else 0.0,
+            "max_batch_size": self._max_batch_size,
+            "throughput": sum(batch_sizes) / total_time
+            if total_time > 0 else 0.0,
+            "batch_time": _percentiles(batch_times),
+            "request_latency": _percentiles(latencies),
+        }
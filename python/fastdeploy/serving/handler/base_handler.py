@@ -26,3 +26,18 @@ class BaseModelHandler(metaclass=ABCMeta):
     def process(cls, predictor, data, parameters):
         pass
 
+    @classmethod
+    def batch_process(cls, predictor, data_list, parameters_list):
+        """Process a batch of requests, the results must keep the order of data_list.
+        The result of a failed request is the exception raised by it, so that one
+        bad request doesn't fail the others in the same batch.
+        Override it to run the predictor once for the whole batch.
+        """
+        outputs = []
+        for data, parameters in zip(data_list, parameters_list):
+            try:
+                outputs.append(cls.process(predictor, data, parameters))
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+
@@ -13,18 +13,65 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from .base_handler import BaseModelHandler
-from ..utils import base64_to_cv2
-from ...vision.utils import fd_result_to_json
+from ..utils import base64_to_cv2, bytes_to_cv2, ndarrays_to_bytes
+from ...vision.utils import (fd_result_to_json, fd_result_to_ndarrays,
+                             fd_result_supports_ndarrays)
 
 
 class VisionModelHandler(BaseModelHandler):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def decode_image(cls, image):
+        # Raw bytes come from the multipart upload, otherwise it's base64 string
+        if isinstance(image, (bytes, bytearray)):
+            im = bytes_to_cv2(image)
+        else:
+            im = base64_to_cv2(image)
+        # cv2.imdecode returns None instead of raising for invalid images
+        if im is None:
+            raise ValueError("Failed to decode the image of the request.")
+        return im
+
+    @classmethod
+    def encode_result(cls, result, parameters):
+        response_format = parameters.get("response_format", "json")
+        # The results without the ndarrays conversion are returned as JSON, the
+        # router decides whether JSON is acceptable for the request
+        if response_format == "json" or not fd_result_supports_ndarrays(
+                result):
+            return fd_result_to_json(
+                result, compress=bool(parameters.get("compress", False)))
+        return ndarrays_to_bytes(
+            fd_result_to_ndarrays(result), response_format)
+
     @classmethod
     def process(cls, predictor, data, parameters):
-        # TODO: support batch predict
-        im = base64_to_cv2(data['image'])
+        im = cls.decode_image(data['image'])
         result = predictor.predict(im)
-        r_str = fd_result_to_json(result)
-        return r_str
+        return cls.encode_result(result, parameters)
+
+    @classmethod
+    def batch_process(cls, predictor, data_list, parameters_list):
+        if len(data_list) == 1 or not hasattr(predictor, "batch_predict"):
+            return super().batch_process(predictor, data_list,
+                                         parameters_list)
+        # Decode the requests one by one, the requests failed to decode get
+        # their own errors and are left out of the batch
+        outputs = [None] * len(data_list)
+        ims, indices = [], []
+        for i, data in enumerate(data_list):
+            try:
+                ims.append(cls.decode_image(data['image']))
+                indices.append(i)
+            except Exception as e:
+                outputs[i] = e
+        if len(ims) > 0:
+            results = predictor.batch_predict(ims)
+            for i, result in zip(indices, results):
+                try:
+                    outputs[i] = cls.encode_result(result, parameters_list[i])
+                except Exception as e:
+                    outputs[i] = e
+        return outputs
@@ -18,40 +18,165 @@ import time
 import json
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 # from .predictor import Predictor
 from .handler import BaseModelHandler
 from .utils import lock_predictor
+from .batcher import DynamicBatcher
+
+# The default max number of in-flight requests for each request which can run
+# at the same time, i.e. num_instances * max_batch_size of them
+DEFAULT_INFLIGHT_PER_SLOT = 8
+
+
+class ServerBusyError(RuntimeError):
+    """Raised while the number of in-flight requests reaches max_inflight.
+    """
+    pass
 
 
 class ModelManager:
-    def __init__(self, model_handler, predictor):
+    def __init__(self,
+                 model_handler,
+                 predictor,
+                 max_batch_size=1,
+                 max_queue_delay_ms=5.0,
+                 num_instances=1,
+                 max_inflight=None):
         self._model_handler = model_handler
         self._predictors = []
         self._predictor_locks = []
-        self._register(predictor)
+        self._batchers = []
+        self._max_batch_size = max_batch_size
+        self._max_queue_delay_ms = max_queue_delay_ms
+        # Number of requests which are queued or running on each predictor
+        self._inflight = []
+        self._inflight_lock = threading.Lock()
+        self._next_id = 0
+        # The queue is bounded by default, so that the requests beyond the
+        # capacity are rejected instead of waiting without limit. 0 means the
+        # number of in-flight requests is unlimited
+        if max_inflight is None:
+            max_inflight = DEFAULT_INFLIGHT_PER_SLOT * max(
+                num_instances, 1) * max(max_batch_size, 1)
+        if max_inflight < 0:
+            raise ValueError(
+                "The max_inflight must not be negative, but received {}.".
+                format(max_inflight))
+        self._max_inflight = max_inflight
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._register(predictor, num_instances)
 
-    def _register(self, predictor):
+    def _register(self, predictor, num_instances=1):
         # Get the model handler
         if not issubclass(self._model_handler, BaseModelHandler):
             raise TypeError(
                 "The model_handler must be subclass of BaseModelHandler, please check the type."
             )
+        if num_instances < 1:
+            raise ValueError(
+                "The num_instances must be positive, but received {}.".format(
+                    num_instances))
+        if num_instances > 1 and not hasattr(predictor, "clone"):
+            raise TypeError(
+                "The predictor {} doesn't support clone(), cannot create {} instances of it.".
+                format(type(predictor), num_instances))
 
-        # TODO: Create multiple predictors to run on different GPUs or different CPU threads
-        self._predictors.append(predictor)
-        self._predictor_locks.append(threading.Lock())
+        # The cloned predictors share the weights with the original predictor
+        predictors = [predictor]
+        for i in range(num_instances - 1):
+            predictors.append(predictor.clone())
+        for p in predictors:
+            self._predictors.append(p)
+            self._predictor_locks.append(threading.Lock())
+            self._inflight.append(0)
+            if self._max_batch_size > 1:
+                self._batchers.append(
+                    DynamicBatcher(self._model_handler, p,
+                                   self._predictor_locks[-1],
+                                   self._max_batch_size,
+                                   self._max_queue_delay_ms))
 
     def _get_predict_id(self):
-        t = time.time()
-        t = int(round(t * 1000))
-        predictor_id = t % len(self._predictors)
-        logging.info("The predictor id: {} is selected by running the model.".
-                     format(predictor_id))
+        # Select the least loaded predictor, the search starts from a rotating
+        # offset so that idle predictors are used in turn
+        with self._inflight_lock:
+            if self._max_inflight > 0 and sum(
+                    self._inflight) >= self._max_inflight:
+                raise ServerBusyError(
+                    "The number of in-flight requests reaches the limit {}.".
+                    format(self._max_inflight))
+            num = len(self._predictors)
+            start = self._next_id
+            self._next_id = (self._next_id + 1) % num
+            predictor_id = min(
+                ((start + i) % num for i in range(num)),
+                key=lambda idx: self._inflight[idx])
+            self._inflight[predictor_id] += 1
+        logging.debug("The predictor id: {} is selected by running the model.".
+                      format(predictor_id))
         return predictor_id
 
+    def _release_predict_id(self, predictor_id):
+        with self._inflight_lock:
+            self._inflight[predictor_id] -= 1
+
     def predict(self, data, parameters):
         predictor_id = self._get_predict_id()
+        try:
+            if len(self._batchers) > 0:
+                return self._batchers[predictor_id].predict(data, parameters)
+            with lock_predictor(self._predictor_locks[predictor_id]):
+                model_output = self._model_handler.process(
+                    self._predictors[predictor_id], data, parameters)
+                return model_output
+        finally:
+            self._release_predict_id(predictor_id)
+
+    def _run(self, predictor_id, data, parameters):
         with lock_predictor(self._predictor_locks[predictor_id]):
-            model_output = self._model_handler.process(
-                self._predictors[predictor_id], data, parameters)
-            return model_output
+            return self._model_handler.process(self._predictors[predictor_id],
+                                               data, parameters)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # Every predictor runs one request at a time, more threads
+                # would only wait on the predictor locks
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(self._predictors),
+                    thread_name_prefix="fd-model-manager")
+            return self._executor
+
+    def submit(self, data, parameters):
+        """Submit one request without blocking, the inference runs on the dedicated
+        executor of this model or on the dynamic batcher.
+
+        :return: (concurrent.futures.Future)The future of the result, cancel it to drop a request which has not started yet
+        """
+        predictor_id = self._get_predict_id()
+        try:
+            if len(self._batchers) > 0:
+                future = self._batchers[predictor_id].submit(data, parameters)
+            else:
+                future = self._get_executor().submit(self._run, predictor_id,
+                                                     data, parameters)
+        except Exception:
+            self._release_predict_id(predictor_id)
+            raise
+        future.add_done_callback(
+            lambda f: self._release_predict_id(predictor_id))
+        return future
+
+    def get_load(self):
+        """Get the number of queued and running requests on every predictor instance.
+        """
+        with self._inflight_lock:
+            return list(self._inflight)
+
+    def get_batch_stats(self):
+        """Get the statistics of dynamic batching for every predictor,
+        an empty list is returned while dynamic batching is disabled.
+        """
+        return [batcher.get_stats() for batcher in self._batchers]
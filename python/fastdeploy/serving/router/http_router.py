@@ -12,15 +12,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+import asyncio
 import hashlib
 import typing
+import importlib.util
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, Response, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Extra, create_model
 
 from .base_router import BaseRouterManager
+from ..model_manager import ServerBusyError
+from ..utils import negotiate_response_format, accepts_json, RESPONSE_MEDIA_TYPES
 
 
 class ResponseBase(BaseModel):
@@ -31,8 +37,67 @@ class RequestBase(BaseModel, extra=Extra.forbid):
     parameters: Optional[dict] = {}
 
 
+def _with_response_format(request, parameters):
+    # The response format is negotiated by the Accept header, JSON is the default
+    response_format = negotiate_response_format(
+        request.headers.get("accept"))
+    if response_format == "json":
+        return parameters
+    parameters = dict(parameters)
+    parameters["response_format"] = response_format
+    return parameters
+
+
+def _make_response(request, result, parameters):
+    if isinstance(result, (bytes, bytearray)):
+        media_type = RESPONSE_MEDIA_TYPES[parameters.get("response_format",
+                                                         "json")]
+        return Response(content=bytes(result), media_type=media_type)
+    # A binary format is requested, but the result can only be encoded as JSON
+    if parameters.get("response_format", "json") != "json" and \
+            not accepts_json(request.headers.get("accept")):
+        raise HTTPException(
+            status_code=406,
+            detail="The result of the model can only be returned as "
+            "application/json.")
+    return {"result": result}
+
+
 class HttpRouterManager(BaseRouterManager):
-    def register_models_router(self, task_name):
+    def _predict(self, data, parameters):
+        try:
+            return self._app._model_manager.predict(data, parameters)
+        except ServerBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error occurred while running predict: {str(e)}")
+
+    async def _async_predict(self, data, parameters):
+        try:
+            future = self._app._model_manager.submit(data, parameters)
+        except ServerBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The client is gone, drop the request if it has not started
+            future.cancel()
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error occurred while running predict: {str(e)}")
+
+    def register_models_router(self, task_name, async_mode=False):
+        # The multipart form of the upload endpoint is parsed by python-multipart
+        if importlib.util.find_spec("python_multipart") is None and \
+                importlib.util.find_spec("multipart") is None:
+            raise ImportError(
+                "The upload endpoint of FastDeploy SimpleServer requires "
+                "python-multipart, please install it by `pip install python-multipart`."
+            )
 
         # Url path to register the model
         paths = [f"/{task_name}"]
@@ -57,24 +122,59 @@ class HttpRouterManager(BaseRouterManager):
 
         # Template predict endpoint function to dynamically serve different models
         def predict(request: Request, inference_request: req_model):
+            parameters = _with_response_format(request,
+                                               inference_request.parameters)
+            result = self._predict(inference_request.data, parameters)
+            return _make_response(request, result, parameters)
+
+        # Async predict endpoint, the inference runs on the executor of the model
+        # manager so that the event loop is never blocked
+        async def async_predict(request: Request, inference_request: req_model):
+            parameters = _with_response_format(request,
+                                               inference_request.parameters)
+            result = await self._async_predict(inference_request.data,
+                                               parameters)
+            return _make_response(request, result, parameters)
+
+        # Multipart endpoint, the raw image file is uploaded in the "image" field
+        # and the optional "parameters" field is a JSON string
+        async def upload_predict(request: Request):
             try:
-                result = self._app._model_manager.predict(
-                    inference_request.data, inference_request.parameters)
+                form = await request.form()
+                data = {"image": await form["image"].read()}
+                parameters = json.loads(form.get("parameters") or "{}")
             except Exception as e:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Error occurred while running predict: {str(e)}")
-            return {"result": result}
+                    detail=f"Error occurred while parsing the multipart request: {str(e)}"
+                )
+            parameters = _with_response_format(request, parameters)
+            # The same as the JSON endpoint, the sync mode runs the inference
+            # on the default threadpool of FastAPI
+            if async_mode:
+                result = await self._async_predict(data, parameters)
+            else:
+                result = await run_in_threadpool(self._predict, data,
+                                                 parameters)
+            return _make_response(request, result, parameters)
 
         # Register the route and add to the app
         router = APIRouter()
         for path in paths:
             router.add_api_route(
                 path,
-                predict,
+                async_predict if async_mode else predict,
                 methods=["post"],
                 summary=f"{task_name.title()}",
                 response_model=resp_model,
                 response_model_exclude_unset=True,
                 response_model_exclude_none=True, )
+            router.add_api_route(
+                path + "/upload",
+                upload_predict,
+                methods=["post"],
+                summary=f"{task_name.title()} Upload",
+                response_model=resp_model,
+                response_model_exclude_unset=True,
+                response_model_exclude_none=True, )
         self._app.include_router(router)
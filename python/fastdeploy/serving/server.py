@@ -29,7 +29,15 @@ class SimpleServer(FastAPI):
         self._service_name = "FastDeploy SimpleServer"
         self._service_type = None
 
-    def register(self, task_name, model_handler, predictor):
+    def register(self,
+                 task_name,
+                 model_handler,
+                 predictor,
+                 max_batch_size=1,
+                 max_queue_delay_ms=5.0,
+                 num_instances=1,
+                 async_mode=False,
+                 max_inflight=None):
         """
         The register function for the SimpleServer, the main register argrument as follows:
 
@@ -38,9 +46,27 @@ class SimpleServer(FastAPI):
             model_handler: To process request data, run predictor,
                 and can also add your custom post processing on top of the predictor result
             predictor: To run model predict
+            max_batch_size(int): Max number of concurrent requests coalesced into one
+                batch_process call of the model_handler, the dynamic batching is disabled while it's 1
+            max_queue_delay_ms(float): Max time in milliseconds a request waits for the batch to fill
+            num_instances(int): Number of predictor instances, the extra instances are created by
+                predictor.clone() and share the weights, every request is sent to the least loaded instance
+            async_mode(bool): Whether to serve with an async endpoint, which runs the inference on
+                a dedicated executor of this model instead of the default threadpool of FastAPI
+            max_inflight(int): Max number of queued and running requests, the requests beyond it are
+                rejected with HTTP 503. It's 8 * num_instances * max_batch_size if it's None, 0 means unlimited
         """
         self._server_type = "models"
-        model_manager = ModelManager(model_handler, predictor)
+        model_manager = ModelManager(model_handler, predictor, max_batch_size,
+                                     max_queue_delay_ms, num_instances,
+                                     max_inflight)
         self._model_manager = model_manager
         # Register model server router
-        self._router_manager.register_models_router(task_name)
+        self._router_manager.register_models_router(task_name, async_mode)
+
+    def get_batch_stats(self):
+        """Get the statistics of dynamic batching, all the time values are in milliseconds.
+        """
+        if self._model_manager is None:
+            return []
+        return self._model_manager.get_batch_stats()
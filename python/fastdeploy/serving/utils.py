@@ -13,11 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import contextlib
 import base64
 import numpy as np
 import cv2
 
+# Supported response formats and their media types
+RESPONSE_MEDIA_TYPES = {
+    "json": "application/json",
+    "npz": "application/x-npz",
+    "msgpack": "application/x-msgpack",
+}
+
 
 @contextlib.contextmanager
 def lock_predictor(lock):
@@ -35,6 +43,109 @@ def cv2_to_base64(image):
 
 def base64_to_cv2(b64str):
     data = base64.b64decode(b64str.encode('utf8'))
-    data = np.fromstring(data, np.uint8)
+    return bytes_to_cv2(data)
+
+
+def bytes_to_cv2(data):
+    data = np.frombuffer(data, np.uint8)
     data = cv2.imdecode(data, cv2.IMREAD_COLOR)
     return data
+
+
+def _parse_accept(accept):
+    """Parse the Accept header to a list of (media_type, q)."""
+    media_types = []
+    for item in accept.split(","):
+        fields = item.strip().split(";")
+        media_type = fields[0].strip().lower()
+        q = 1.0
+        for field in fields[1:]:
+            key, _, value = field.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_types.append((media_type, q))
+    return media_types
+
+
+def accepts_json(accept):
+    """Whether a JSON response is acceptable by the Accept header of the request.
+    """
+    if not accept:
+        return True
+    for media_type, q in _parse_accept(accept):
+        if media_type in ["application/json", "application/*", "*/*"
+                          ] and q > 0:
+            return True
+    return False
+
+
+def negotiate_response_format(accept):
+    """Select the response format by the Accept header of the request,
+    JSON is returned while no supported binary media type is accepted.
+    """
+    if not accept:
+        return "json"
+    candidates = []
+    for i, (media_type, q) in enumerate(_parse_accept(accept)):
+        for fmt, supported in RESPONSE_MEDIA_TYPES.items():
+            if media_type == supported and q > 0:
+                candidates.append((-q, i, fmt))
+    if len(candidates) == 0:
+        return "json"
+    return min(candidates)[2]
+
+
+def ndarrays_to_bytes(arrays, response_format="npz"):
+    """Encode a dict of numpy arrays to the binary response format.
+
+    :param arrays: (dict)Name to numpy.ndarray
+    :param response_format: (str)"npz" or "msgpack"
+    :return: (bytes)The encoded content
+    """
+    if response_format == "npz":
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        return buf.getvalue()
+    elif response_format == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError(
+                "The msgpack response format requires msgpack, please install it by `pip install msgpack`."
+            )
+        packed = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            packed[name] = {
+                "dtype": arr.dtype.str,
+                "shape": list(arr.shape),
+                "data": arr.tobytes(),
+            }
+        return msgpack.packb(packed, use_bin_type=True)
+    raise ValueError("Unsupported binary response format: {}.".format(
+        response_format))
+
+
+def bytes_to_ndarrays(content, response_format="npz"):
+    """Decode the binary response content to a dict of numpy arrays.
+
+    :param content: (bytes)The response content
+    :param response_format: (str)"npz" or "msgpack"
+    :return: (dict)Name to numpy.ndarray
+    """
+    if response_format == "npz":
+        with np.load(io.BytesIO(content), allow_pickle=False) as f:
+            return {name: f[name] for name in f.files}
+    elif response_format == "msgpack":
+        import msgpack
+        packed = msgpack.unpackb(content, raw=False)
+        return {
+            name: np.frombuffer(
+                v["data"], dtype=np.dtype(v["dtype"])).reshape(v["shape"])
+            for name, v in packed.items()
+        }
+    raise ValueError("Unsupported binary response format: {}.".format(
+        response_format))
@@ -15,6 +15,8 @@
 from __future__ import absolute_import
 
 import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from ... import RuntimeOption, FastDeployModel, ModelFormat
 from ... import c_lib_wrap as C
 
@@ -81,15 +83,55 @@ class UIEModel(FastDeployModel):
         self._model.set_schema(schema)
 
     def predict(self, texts, return_dict=False):
+        """Predict the texts, the concurrent calls on the same model are serialized, create one model per thread to predict in parallel
+
+        :param texts: (list of str)The input texts
+        :param return_dict: (bool)Whether to return the results as dict
+        :return: (list)The result of each text
+        """
         results = self._model.predict(texts)
         if not return_dict:
             return results
-        new_results = []
-        for result in results:
-            uie_result = dict()
-            for key, uie_results in result.items():
-                uie_result[key] = list()
-                for uie_res in uie_results:
-                    uie_result[key].append(uie_res.get_dict())
-            new_results += [uie_result]
-        return new_results
+        return [self._to_dict(result) for result in results]
+
+    def predict_stream(self, texts, batch_size=64, return_dict=False):
+        """Predict a large corpus lazily, the texts are read batch by batch and the results are yielded in order. The next batch is read while the current one is predicted, so only two batches are kept in memory at most
+
+        :param texts: (iterable)The input texts, e.g. a list or a generator reading the lines of a file
+        :param batch_size: (int)The number of texts to predict in one call
+        :param return_dict: (bool)Whether to yield the results as dict
+        :return: (generator)The result of each text
+        """
+        assert batch_size > 0, "The batch_size should be greater than 0."
+        texts = iter(texts)
+
+        def next_batch():
+            return list(itertools.islice(texts, batch_size))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            batch = next_batch()
+            future = executor.submit(self._model.predict,
+                                     batch) if batch else None
+            while future is not None:
+                batch = next_batch()
+                results = future.result()
+                future = executor.submit(self._model.predict,
+                                         batch) if batch else None
+                for result in results:
+                    yield self._to_dict(result) if return_dict else result
+                del results
+
+    def _to_dict(self, result):
+        uie_result = dict()
+        for key, uie_results in result.items():
+            uie_result[key] = list()
+            for uie_res in uie_results:
+                uie_result[key].append(uie_res.get_dict())
+        return uie_result
+
+    def get_batch_statistics(self):
+        """Get the statistics of the runtime calls of the last prediction, the prompts of all the schema nodes in the same level are batched together
+
+        :return: (dict)The number of schema levels, prompt and text pairs, runtime calls and tokenized strings, and the ratio of the padding tokens in the batches
+        """
+        return self._model.get_batch_statistics()
@@ -0,0 +1,80 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+
+class PipelineTraceMixin(object):
+    """Stage tracing of the pipelines, the subclass sets trace_attr to the name of the
+    attribute which holds the C++ pipeline object.
+    """
+    trace_attr = None
+
+    def _trace_target(self):
+        assert self.trace_attr is not None, \
+            "The trace_attr of {} is not set.".format(type(self).__name__)
+        return getattr(self, self.trace_attr)
+
+    def _tracer(self):
+        return self._trace_target().get_tracer()
+
+    def enable_trace(self, enable=True):
+        """Enable or disable the tracing of the pipeline stages, e.g. the preprocess, runtime and postprocess of
+        every model, and the crop and sort between them, the recorded events are kept while disabled
+
+        :param enable: (bool)Whether to record the stages
+        """
+        self._trace_target().enable_trace(enable)
+
+    def clear_trace(self):
+        """Remove all the recorded events
+        """
+        tracer = self._tracer()
+        if tracer is not None:
+            tracer.clear()
+
+    def get_trace(self):
+        """Get the recorded trace of the pipeline stages
+
+        :return: (dict)"stages" maps the stage name to count, total_ms, mean_ms, max_ms, items and max_items,
+            where items is the number of the processed images or crops and max_items is the max batch size,
+            "events" is the list of every span with name, begin_us, duration_us, items and thread_id
+        """
+        tracer = self._tracer()
+        if tracer is None:
+            return {"stages": {}, "events": []}
+        return {"stages": tracer.summary(), "events": tracer.events()}
+
+    def chrome_trace(self):
+        """Get the recorded events in the Chrome trace event format
+
+        :return: (dict)The trace, which can be saved as JSON and loaded by chrome://tracing or Perfetto
+        """
+        tracer = self._tracer()
+        if tracer is None:
+            return {"traceEvents": []}
+        return json.loads(tracer.to_chrome_trace())
+
+    def save_chrome_trace(self, path):
+        """Save the recorded events to a Chrome trace JSON file
+
+        :param path: (str)Path of the JSON file
+        :return: (bool)Whether the file is saved
+        """
+        tracer = self._tracer()
+        if tracer is None:
+            with open(path, "w") as f:
+                json.dump({"traceEvents": []}, f)
+            return True
+        return tracer.save_chrome_trace(path)
@@ -28,6 +28,7 @@ from . import sr
 from . import evaluation
 from . import generation
 from .utils import fd_result_to_json
+from .video import VideoPipeline
 from .visualize import *
 from .. import C
 
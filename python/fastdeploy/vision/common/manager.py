@@ -34,3 +34,16 @@ class ProcessorManager:
         :param: gpu_id: GPU device id
         """
         return self._manager.use_cuda(enable_cv_cuda, gpu_id)
+
+    def use_cpu_threads(self, num_threads):
+        """Process the images of a batch in parallel on CPU, each image runs its processors in one of the threads
+
+        :param: num_threads: (int)Number of threads, the images are processed serially if it's not greater than 1
+        """
+        return self._manager.use_cpu_threads(num_threads)
+
+    @property
+    def cpu_threads(self):
+        """Number of threads to run the CPU processors
+        """
+        return self._manager.cpu_threads()
@@ -24,8 +24,14 @@ def topk_accuracy(topk_list, label_list):
     return topk_acc_score
 
 
-def eval_classify(model, image_file_path, label_file_path, topk=5):
-    from tqdm import trange
+def eval_classify(model,
+                  image_file_path,
+                  label_file_path,
+                  topk=5,
+                  batch_size=1,
+                  num_workers='auto'):
+    from tqdm import tqdm
+    from .utils import ImagePrefetcher, get_num_workers
     import cv2
     import math
 
@@ -48,27 +54,57 @@ def eval_classify(model, image_file_path, label_file_path, topk=5):
             label = items[1]
             image_label_dict[image_name] = int(label)
     images_num = len(image_label_dict)
+    # The first 20% images are used to warm up, they are excluded from the inference time
     twenty_percent_images_num = math.ceil(images_num * 0.2)
-    start_time = 0
-    end_time = 0
-    average_inference_time = 0
+    inference_time = 0
     scores = collections.OrderedDict()
-    for (image, label), i in zip(image_label_dict.items(),
-                                 trange(
-                                     images_num, desc='Inference Progress')):
-        if i == twenty_percent_images_num:
-            start_time = time.time()
+    if batch_size > 1:
+        # The topk of the postprocessor is restored after the evaluation, the
+        # model may be shared with the other callers
+        origin_topk = model.postprocessor.topk
+        model.postprocessor.topk = topk
 
-        label_list.append([label])
-        image_path = os.path.join(image_file_path, image)
-        im = cv2.imread(image_path)
-        result = model.predict(im, topk)
-        result_list.append(result.label_ids)
-        if i == images_num - 1:
-            end_time = time.time()
-    average_inference_time = round(
-        (end_time - start_time) / (images_num - twenty_percent_images_num), 4)
+    # The images are decoded by the worker threads ahead of the inference
+    num_workers = get_num_workers(num_workers)
+    prefetcher = ImagePrefetcher(
+        list(image_label_dict.items()),
+        lambda item: cv2.imread(os.path.join(image_file_path, item[0])),
+        num_workers=num_workers,
+        prefetch_size=max(2 * num_workers, batch_size))
+    try:
+        im_list = []
+        for i, ((image, label), im) in enumerate(
+                tqdm(
+                    prefetcher, total=images_num, desc='Inference Progress')):
+            label_list.append([label])
+            im_list.append(im)
+            # If the batch_size is not satisfied, the remaining pictures are formed into a batch
+            if (i + 1) % batch_size != 0 and i != images_num - 1:
+                continue
+
+            start_time = time.perf_counter()
+            if batch_size == 1:
+                results = [model.predict(im_list[0], topk)]
+            else:
+                results = model.batch_predict(im_list)
+            end_time = time.perf_counter()
+            # Count the images of this batch which are after the warm up images
+            num_timed = min(len(im_list), i + 1 - twenty_percent_images_num)
+            if num_timed > 0:
+                inference_time += (end_time - start_time) * num_timed / len(
+                    im_list)
+            for result in results:
+                result_list.append(result.label_ids)
+            im_list.clear()
+    finally:
+        if batch_size > 1:
+            model.postprocessor.topk = origin_topk
+
+    timed_images_num = max(images_num - twenty_percent_images_num, 1)
+    average_inference_time = round(inference_time / timed_images_num, 4)
+    start_time = time.perf_counter()
     topk_acc_score = topk_accuracy(np.array(result_list), np.array(label_list))
+    metric_time = time.perf_counter() - start_time
     if topk == 1:
         scores.update({'topk1': topk_acc_score})
         scores.update({
@@ -79,4 +115,12 @@ def eval_classify(model, image_file_path, label_file_path, topk=5):
         scores.update({
             'topk5_average_inference_time(s)': average_inference_time
         })
+    scores.update({
+        'average_decode_time(s)': round(prefetcher.decode_time / images_num, 4)
+    })
+    scores.update({
+        'average_decode_wait_time(s)':
+        round(prefetcher.wait_time / images_num, 4)
+    })
+    scores.update({'metric_time(s)': round(metric_time, 4)})
     return scores
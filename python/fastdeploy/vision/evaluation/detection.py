@@ -24,11 +24,13 @@ def eval_detection(model,
                    conf_threshold=None,
                    nms_iou_threshold=None,
                    plot=False,
-                   batch_size=1):
+                   batch_size=1,
+                   num_workers='auto'):
     from .utils import CocoDetection
     from .utils import COCOMetric
+    from .utils import ImagePrefetcher
     import cv2
-    from tqdm import trange
+    from tqdm import tqdm
     import time
 
     if conf_threshold is not None or nms_iou_threshold is not None:
@@ -42,7 +44,10 @@ def eval_detection(model,
             int)), "The nms_iou_threshold:{} need to be int or float".format(
                 nms_iou_threshold)
     eval_dataset = CocoDetection(
-        data_dir=data_dir, ann_file=ann_file, shuffle=False)
+        data_dir=data_dir,
+        ann_file=ann_file,
+        num_workers=num_workers,
+        shuffle=False)
     all_image_info = eval_dataset.file_list
     image_num = eval_dataset.num_samples
     eval_dataset.data_fields = {
@@ -51,63 +56,79 @@ def eval_detection(model,
     eval_metric = COCOMetric(
         coco_gt=copy.deepcopy(eval_dataset.coco_gt), classwise=False)
     scores = collections.OrderedDict()
+    # The first 20% images are used to warm up, they are excluded from the inference time
     twenty_percent_image_num = math.ceil(image_num * 0.2)
-    start_time = 0
-    end_time = 0
-    average_inference_time = 0
+    inference_time = 0
+    metric_time = 0
+    if batch_size > 1 and (conf_threshold is not None or
+                           nms_iou_threshold is not None):
+        model.postprocessor.conf_threshold = conf_threshold
+        model.postprocessor.nms_threshold = nms_iou_threshold
+
+    # The images are decoded by the worker threads ahead of the inference
+    prefetcher = ImagePrefetcher(
+        all_image_info,
+        lambda image_info: cv2.imread(image_info["image"]),
+        num_workers=eval_dataset.num_workers,
+        prefetch_size=max(2 * eval_dataset.num_workers, batch_size))
     im_list = list()
     im_id_list = list()
-    for image_info, i in zip(all_image_info,
-                             trange(
-                                 image_num, desc="Inference Progress")):
-        if i == twenty_percent_image_num:
-            start_time = time.time()
-        im = cv2.imread(image_info["image"])
-        im_id = image_info["im_id"]
+    for i, (image_info, im) in enumerate(
+            tqdm(
+                prefetcher, total=image_num, desc="Inference Progress")):
+        im_list.append(im)
+        im_id_list.append(image_info["im_id"])
+        # If the batch_size is not satisfied, the remaining pictures are formed into a batch
+        if (i + 1) % batch_size != 0 and i != image_num - 1:
+            continue
+
+        start_time = time.perf_counter()
         if batch_size == 1:
             if conf_threshold is None and nms_iou_threshold is None:
-                result = model.predict(im.copy())
+                results = [model.predict(im_list[0].copy())]
             else:
-                result = model.predict(im, conf_threshold, nms_iou_threshold)
+                results = [
+                    model.predict(im_list[0], conf_threshold,
+                                  nms_iou_threshold)
+                ]
+        else:
+            results = model.batch_predict(im_list)
+        end_time = time.perf_counter()
+        # Count the images of this batch which are after the warm up images
+        num_timed = min(len(im_list), i + 1 - twenty_percent_image_num)
+        if num_timed > 0:
+            inference_time += (end_time - start_time) * num_timed / len(
+                im_list)
+
+        start_time = time.perf_counter()
+        for k in range(len(im_list)):
             pred = {
                 'bbox': [[c] + [s] + b
-                         for b, s, c in zip(result.boxes, result.scores,
-                                            result.label_ids)],
-                'bbox_num': len(result.boxes),
-                'im_id': im_id
+                         for b, s, c in zip(results[k].boxes, results[
+                             k].scores, results[k].label_ids)],
+                'bbox_num': len(results[k].boxes),
+                'im_id': im_id_list[k]
             }
-            eval_metric.update(im_id, pred)
-        else:
-            im_list.append(im)
-            im_id_list.append(im_id)
-            # If the batch_size is not satisfied, the remaining pictures are formed into a batch
-            if (i + 1) % batch_size != 0 and i != image_num - 1:
-                continue
-            if conf_threshold is None and nms_iou_threshold is None:
-                results = model.batch_predict(im_list)
-            else:
-                model.postprocessor.conf_threshold = conf_threshold
-                model.postprocessor.nms_threshold = nms_iou_threshold
-                results = model.batch_predict(im_list)
-            for k in range(len(im_list)):
-                pred = {
-                    'bbox': [[c] + [s] + b
-                             for b, s, c in zip(results[k].boxes, results[
-                                 k].scores, results[k].label_ids)],
-                    'bbox_num': len(results[k].boxes),
-                    'im_id': im_id_list[k]
-                }
-                eval_metric.update(im_id_list[k], pred)
-            im_list.clear()
-            im_id_list.clear()
+            eval_metric.update(im_id_list[k], pred)
+        metric_time += time.perf_counter() - start_time
+        im_list.clear()
+        im_id_list.clear()
 
-        if i == image_num - 1:
-            end_time = time.time()
-    average_inference_time = round(
-        (end_time - start_time) / (image_num - twenty_percent_image_num), 4)
+    timed_image_num = max(image_num - twenty_percent_image_num, 1)
+    average_inference_time = round(inference_time / timed_image_num, 4)
+    start_time = time.perf_counter()
     eval_metric.accumulate()
+    metric_time += time.perf_counter() - start_time
     eval_details = eval_metric.details
     scores.update(eval_metric.get())
     scores.update({'average_inference_time(s)': average_inference_time})
+    scores.update({
+        'average_decode_time(s)': round(prefetcher.decode_time / image_num, 4)
+    })
+    scores.update({
+        'average_decode_wait_time(s)':
+        round(prefetcher.wait_time / image_num, 4)
+    })
+    scores.update({'metric_time(s)': round(metric_time, 4)})
     eval_metric.reset()
     return scores
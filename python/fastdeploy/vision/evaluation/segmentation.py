@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from tqdm import trange
+from tqdm import tqdm
 import numpy as np
 import collections
 import os
@@ -20,10 +20,11 @@ import math
 import time
 
 
-def eval_segmentation(model, data_dir, batch_size=1):
+def eval_segmentation(model, data_dir, batch_size=1, num_workers='auto'):
     import cv2
     from .utils import Cityscapes
-    from .utils import f1_score, calculate_area, mean_iou, accuracy, kappa
+    from .utils import ConfusionMatrix
+    from .utils import ImagePrefetcher, get_num_workers
     assert os.path.isdir(
         data_dir), "The image_file_path:{} is not a directory.".format(
             data_dir)
@@ -31,62 +32,73 @@ def eval_segmentation(model, data_dir, batch_size=1):
     file_list = eval_dataset.file_list
     image_num = eval_dataset.num_samples
     num_classes = eval_dataset.num_classes
-    intersect_area_all = 0
-    pred_area_all = 0
-    label_area_all = 0
-    conf_mat_all = []
+    conf_mat = ConfusionMatrix(num_classes)
+    # The first 20% images are used to warm up, they are excluded from the inference time
     twenty_percent_image_num = math.ceil(image_num * 0.2)
-    start_time = 0
-    end_time = 0
-    average_inference_time = 0
-    im_list = []
-    label_list = []
-    for image_label_path, i in zip(file_list,
-                                   trange(
-                                       image_num, desc="Inference Progress")):
-        if i == twenty_percent_image_num:
-            start_time = time.time()
+    inference_time = 0
+    metric_time = 0
+
+    def load_sample(image_label_path):
         im = cv2.imread(image_label_path[0])
         label = cv2.imread(image_label_path[1], cv2.IMREAD_GRAYSCALE)
+        return im, label
+
+    # The images and labels are decoded by the worker threads ahead of the inference
+    num_workers = get_num_workers(num_workers)
+    prefetcher = ImagePrefetcher(
+        file_list,
+        load_sample,
+        num_workers=num_workers,
+        prefetch_size=max(2 * num_workers, batch_size))
+    im_list = []
+    label_list = []
+    for i, (image_label_path, (im, label)) in enumerate(
+            tqdm(
+                prefetcher, total=image_num, desc="Inference Progress")):
+        im_list.append(im)
         label_list.append(label)
+        # If the batch_size is not satisfied, the remaining pictures are formed into a batch
+        if (i + 1) % batch_size != 0 and i != image_num - 1:
+            continue
+
+        start_time = time.perf_counter()
         if batch_size == 1:
-            result = model.predict(im)
-            results = [result]
+            results = [model.predict(im_list[0])]
         else:
-            im_list.append(im)
-            # If the batch_size is not satisfied, the remaining pictures are formed into a batch
-            if (i + 1) % batch_size != 0 and i != image_num - 1:
-                continue
             results = model.batch_predict(im_list)
-        if i == image_num - 1:
-            end_time = time.time()
-            average_inference_time = round(
-                (end_time - start_time) /
-                (image_num - twenty_percent_image_num), 4)
+        end_time = time.perf_counter()
+        # Count the images of this batch which are after the warm up images
+        num_timed = min(len(im_list), i + 1 - twenty_percent_image_num)
+        if num_timed > 0:
+            inference_time += (end_time - start_time) * num_timed / len(
+                im_list)
+
+        start_time = time.perf_counter()
         for result, label in zip(results, label_list):
-            pred = np.array(result.label_map).reshape(result.shape[0],
-                                                      result.shape[1])
-            intersect_area, pred_area, label_area = calculate_area(pred, label,
-                                                                   num_classes)
-            intersect_area_all = intersect_area_all + intersect_area
-            pred_area_all = pred_area_all + pred_area
-            label_area_all = label_area_all + label_area
+            pred = result.label_map_numpy().reshape(result.shape[0],
+                                                    result.shape[1])
+            conf_mat.update(pred, label)
+        metric_time += time.perf_counter() - start_time
         im_list.clear()
         label_list.clear()
 
-    class_iou, miou = mean_iou(intersect_area_all, pred_area_all,
-                               label_area_all)
-    class_acc, oacc = accuracy(intersect_area_all, pred_area_all)
-    kappa_res = kappa(intersect_area_all, pred_area_all, label_area_all)
-    category_f1score = f1_score(intersect_area_all, pred_area_all,
-                                label_area_all)
+    timed_image_num = max(image_num - twenty_percent_image_num, 1)
+    average_inference_time = round(inference_time / timed_image_num, 4)
+    class_iou, miou = conf_mat.mean_iou()
+    class_acc, oacc = conf_mat.accuracy()
+    kappa_res = conf_mat.kappa()
+    category_f1score = conf_mat.f1_score()
 
     eval_metrics = collections.OrderedDict(
         zip([
             'miou', 'category_iou', 'oacc', 'category_acc', 'kappa',
-            'category_F1-score', 'average_inference_time(s)'
+            'category_F1-score', 'average_inference_time(s)',
+            'average_decode_time(s)', 'average_decode_wait_time(s)',
+            'metric_time(s)'
         ], [
             miou, class_iou, oacc, class_acc, kappa_res, category_f1score,
-            average_inference_time
+            average_inference_time,
+            round(prefetcher.decode_time / image_num, 4),
+            round(prefetcher.wait_time / image_num, 4), round(metric_time, 4)
         ]))
     return eval_metrics
@@ -21,3 +21,4 @@ from .map_utils import *
 from .coco_utils import *
 from .coco import *
 from .cityscapes import *
+from .prefetch import ImagePrefetcher
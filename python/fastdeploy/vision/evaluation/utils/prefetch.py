@@ -0,0 +1,81 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ImagePrefetcher(object):
+    """Load the samples in a bounded thread pool ahead of the consumer, the samples
+    are yielded in the original order. cv2.imread releases the GIL, so the images
+    are decoded in parallel with the inference.
+
+    Args:
+        samples (list): The samples to load.
+        load_fn (callable): Load one sample, e.g. read and decode the image.
+        num_workers (int): Number of the decode threads, the samples are loaded in the
+            consumer thread while it's 0.
+        prefetch_size (int): Max number of the samples which are loaded but not consumed,
+            default is 2 times of num_workers.
+    """
+
+    def __init__(self, samples, load_fn, num_workers=2, prefetch_size=None):
+        self.samples = samples
+        self.load_fn = load_fn
+        self.num_workers = max(int(num_workers), 0)
+        if prefetch_size is None:
+            prefetch_size = 2 * self.num_workers
+        self.prefetch_size = max(prefetch_size, self.num_workers, 1)
+        # Accumulated time in seconds spent on loading in the workers
+        self.decode_time = 0.0
+        # Accumulated time in seconds the consumer is blocked on loading
+        self.wait_time = 0.0
+
+    def _timed_load(self, sample):
+        start = time.perf_counter()
+        data = self.load_fn(sample)
+        return data, time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __iter__(self):
+        if self.num_workers == 0:
+            for sample in self.samples:
+                data, cost = self._timed_load(sample)
+                self.decode_time += cost
+                self.wait_time += cost
+                yield sample, data
+            return
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            pending = collections.deque()
+            samples = iter(self.samples)
+            for sample in samples:
+                pending.append(
+                    (sample, executor.submit(self._timed_load, sample)))
+                if len(pending) >= self.prefetch_size:
+                    break
+            while len(pending) > 0:
+                sample, future = pending.popleft()
+                start = time.perf_counter()
+                data, cost = future.result()
+                self.wait_time += time.perf_counter() - start
+                self.decode_time += cost
+                next_sample = next(samples, None)
+                if next_sample is not None:
+                    pending.append((next_sample, executor.submit(
+                        self._timed_load, next_sample)))
+                yield sample, data
@@ -45,35 +45,80 @@ def calculate_area(pred, label, num_classes, ignore_index=255):
         Numpy Array: The prediction area on all class.
         Numpy Array: The ground truth area on all class
     """
-    if not pred.shape == label.shape:
-        raise ValueError('Shape of `pred` and `label should be equal, '
-                         'but there are {} and {}.'.format(pred.shape,
-                                                           label.shape))
-
-    mask = label != ignore_index
-    pred = pred + 1
-    label = label + 1
-    pred = pred * mask
-    label = label * mask
-    pred = np.eye(num_classes + 1)[pred]
-    label = np.eye(num_classes + 1)[label]
-    pred = pred[:, 1:]
-    label = label[:, 1:]
-
-    pred_area = []
-    label_area = []
-    intersect_area = []
-
-    for i in range(num_classes):
-        pred_i = pred[:, :, i]
-        label_i = label[:, :, i]
-        pred_area_i = np.sum(pred_i)
-        label_area_i = np.sum(label_i)
-        intersect_area_i = np.sum(pred_i * label_i)
-        pred_area.append(pred_area_i)
-        label_area.append(label_area_i)
-        intersect_area.append(intersect_area_i)
-    return np.array(intersect_area), np.array(pred_area), np.array(label_area)
+    conf_mat = ConfusionMatrix(num_classes, ignore_index)
+    conf_mat.update(pred, label)
+    return conf_mat.areas()
+
+
+class ConfusionMatrix(object):
+    """
+    Accumulate the confusion matrix of segmentation results across images, all the
+    metrics are derived from the matrix. Each update takes O(HW) time and memory.
+
+    Args:
+        num_classes (int): The unique number of target classes.
+        ignore_index (int): Specifies a target value that is ignored. Default: 255.
+    """
+
+    def __init__(self, num_classes, ignore_index=255):
+        self.num_classes = num_classes
+        self.ignore_index = ignore_index
+        # Rows are the ground truth classes, columns are the predicted classes
+        self.matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+        # The label area also counts the pixels predicted out of the classes
+        self.label_area = np.zeros(num_classes, dtype=np.int64)
+
+    def reset(self):
+        self.matrix[:] = 0
+        self.label_area[:] = 0
+
+    def update(self, pred, label):
+        """
+        Accumulate the prediction and ground truth of one image.
+
+        Args:
+            pred (np.ndarray): The prediction by model.
+            label (np.ndarray): The ground truth of image.
+        """
+        if not pred.shape == label.shape:
+            raise ValueError('Shape of `pred` and `label should be equal, '
+                             'but there are {} and {}.'.format(pred.shape,
+                                                               label.shape))
+        n = self.num_classes
+        pred = pred.ravel().astype(np.int64)
+        label = label.ravel().astype(np.int64)
+        mask = (label != self.ignore_index) & (label >= 0) & (label < n)
+        pred = pred[mask]
+        label = label[mask]
+        self.label_area += np.bincount(label, minlength=n)
+        valid = (pred >= 0) & (pred < n)
+        self.matrix += np.bincount(
+            label[valid] * n + pred[valid], minlength=n * n).reshape(n, n)
+
+    def areas(self):
+        """
+        Returns:
+            Numpy Array: The intersection area of prediction and the ground on all class.
+            Numpy Array: The prediction area on all class.
+            Numpy Array: The ground truth area on all class
+        """
+        intersect_area = np.diag(self.matrix).astype(np.float64)
+        pred_area = self.matrix.sum(axis=0).astype(np.float64)
+        label_area = self.label_area.astype(np.float64)
+        return intersect_area, pred_area, label_area
+
+    def mean_iou(self):
+        return mean_iou(*self.areas())
+
+    def accuracy(self):
+        intersect_area, pred_area, _ = self.areas()
+        return accuracy(intersect_area, pred_area)
+
+    def kappa(self):
+        return kappa(*self.areas())
+
+    def f1_score(self):
+        return f1_score(*self.areas())
 
 
 def mean_iou(intersect_area, pred_area, label_area):
@@ -30,5 +30,5 @@ def get_num_workers(num_workers):
         # on MacOS and Windows currently.
         return 0
     if num_workers == 'auto':
-        num_workers = mp.cpu_count() // 2 if mp.cpu_count() // 2 < 2 else 2
+        num_workers = min(mp.cpu_count() // 2, 8)
     return num_workers
@@ -14,14 +14,41 @@
 
 from __future__ import absolute_import
 import logging
+import numpy as np
 from .... import FastDeployModel, ModelFormat
 from .... import c_lib_wrap as C
+from ....utils.trace import PipelineTraceMixin
 
 
 def sort_boxes(boxes):
     return C.vision.ocr.sort_boxes(boxes)
 
 
+def crop_text_regions(img,
+                      boxes,
+                      rec_image_shape=None,
+                      out=None,
+                      num_threads=1):
+    """Crop the text regions of an image, the image is converted only once and the boxes are cropped in parallel
+
+    :param img: (numpy.ndarray)The source image, 3-D array with layout HWC, BGR format
+    :param boxes: (list of list of int)The text boxes, 8 coordinates of the 4 points clockwise from the top left point, e.g. the boxes of OCRResult
+    :param rec_image_shape: (list of int)The input shape [C, H, W] of the recognition model. If set, the crops are resized, padded and normalized into one float32 NCHW batch the same as RecognizerPreprocessor, otherwise the crops are returned as a list
+    :param out: (numpy.ndarray)The preallocated float32 batch to write into while rec_image_shape is set, it's only used if the shape matches
+    :param num_threads: (int)Number of threads to crop the boxes
+    :return: list of numpy.ndarray, or the numpy.ndarray batch while rec_image_shape is set
+    """
+    img = np.ascontiguousarray(img)
+    boxes = [list(map(int, box)) for box in boxes]
+    if rec_image_shape is None:
+        return C.vision.ocr.crop_text_regions(img, boxes, num_threads)
+    if out is not None:
+        assert out.dtype == np.float32 and out.flags[
+            "C_CONTIGUOUS"], "The `out` must be a C-contiguous float32 array."
+    return C.vision.ocr.crop_text_regions_to_batch(
+        img, boxes, list(rec_image_shape), out, num_threads)
+
+
 class DBDetectorPreprocessor:
     def __init__(self):
         """
@@ -192,6 +219,24 @@ class DBDetectorPostprocessor:
             bool), "The value to set `use_dilation` must be type of bool."
         self._postprocessor.use_dilation = value
 
+    @property
+    def use_fast_postprocess(self):
+        """
+        Return the use_fast_postprocess of DBDetectorPostprocessor
+        """
+        return self._postprocessor.use_fast_postprocess
+
+    @use_fast_postprocess.setter
+    def use_fast_postprocess(self, value):
+        """Set the use_fast_postprocess for DBDetectorPostprocessor, the axis-aligned and rectangle boxes are scored and unclipped without the polygon mask and Clipper
+
+        :param: value : the use_fast_postprocess value
+        """
+        assert isinstance(
+            value, bool
+        ), "The value to set `use_fast_postprocess` must be type of bool."
+        self._postprocessor.use_fast_postprocess = value
+
 
 class DBDetector(FastDeployModel):
     def __init__(self,
@@ -323,6 +368,17 @@ class DBDetector(FastDeployModel):
             bool), "The value to set `use_dilation` must be type of bool."
         self._model.postprocessor.use_dilation = value
 
+    @property
+    def use_fast_postprocess(self):
+        return self._model.postprocessor.use_fast_postprocess
+
+    @use_fast_postprocess.setter
+    def use_fast_postprocess(self, value):
+        assert isinstance(
+            value, bool
+        ), "The value to set `use_fast_postprocess` must be type of bool."
+        self._model.postprocessor.use_fast_postprocess = value
+
 
 class ClassifierPreprocessor:
     def __init__(self):
@@ -666,7 +722,9 @@ class Recognizer(FastDeployModel):
         self._model.preprocessor.rec_image_shape = value
 
 
-class PPOCRv3(FastDeployModel):
+class PPOCRv3(PipelineTraceMixin, FastDeployModel):
+    trace_attr = "system_"
+
     def __init__(self, det_model=None, cls_model=None, rec_model=None):
         """Consruct a pipeline with text detector, direction classifier and text recognizer models
 
@@ -730,6 +788,24 @@ class PPOCRv3(FastDeployModel):
             int), "The value to set `rec_batch_size` must be type of int."
         self.system_.rec_batch_size = value
 
+    @property
+    def rec_batch_max_pixels(self):
+        return self.system_.rec_batch_max_pixels
+
+    @rec_batch_max_pixels.setter
+    def rec_batch_max_pixels(self, value):
+        assert isinstance(
+            value, int
+        ), "The value to set `rec_batch_max_pixels` must be type of int."
+        self.system_.rec_batch_max_pixels = value
+
+    def get_batch_statistics(self):
+        """Get the statistics of the classification and recognition batches of the last prediction, the text crops of all the images in batch_predict are batched together
+
+        :return: (dict)The number of images, crops, cls batches and rec batches, and the ratio of the padded pixels in the rec batches
+        """
+        return self.system_.get_batch_statistics()
+
 
 class PPOCRSystemv3(PPOCRv3):
     def __init__(self, det_model=None, cls_model=None, rec_model=None):
@@ -742,7 +818,9 @@ class PPOCRSystemv3(PPOCRv3):
         return super(PPOCRSystemv3, self).predict(input_image)
 
 
-class PPOCRv2(FastDeployModel):
+class PPOCRv2(PipelineTraceMixin, FastDeployModel):
+    trace_attr = "system_"
+
     def __init__(self, det_model=None, cls_model=None, rec_model=None):
         """Consruct a pipeline with text detector, direction classifier and text recognizer models
 
@@ -808,6 +886,24 @@ class PPOCRv2(FastDeployModel):
             int), "The value to set `rec_batch_size` must be type of int."
         self.system_.rec_batch_size = value
 
+    @property
+    def rec_batch_max_pixels(self):
+        return self.system_.rec_batch_max_pixels
+
+    @rec_batch_max_pixels.setter
+    def rec_batch_max_pixels(self, value):
+        assert isinstance(
+            value, int
+        ), "The value to set `rec_batch_max_pixels` must be type of int."
+        self.system_.rec_batch_max_pixels = value
+
+    def get_batch_statistics(self):
+        """Get the statistics of the classification and recognition batches of the last prediction, the text crops of all the images in batch_predict are batched together
+
+        :return: (dict)The number of images, crops, cls batches and rec batches, and the ratio of the padded pixels in the rec batches
+        """
+        return self.system_.get_batch_statistics()
+
 
 class PPOCRSystemv2(PPOCRv2):
     def __init__(self, det_model=None, cls_model=None, rec_model=None):
@@ -13,25 +13,135 @@
 # limitations under the License.
 from __future__ import absolute_import
 import json
+import base64
+import numpy as np
 from .. import c_lib_wrap as C
 
 
-def mask_to_json(result):
+def rle_encode(arr):
+    """Run-length encode an integer array, e.g. label map or mask.
+
+    :param arr: (numpy.ndarray)The array to encode
+    :return: (dict)JSON serializable RLE encoding, decode it by `decode_array`
+    """
+    flat = np.ascontiguousarray(arr).ravel()
+    if flat.size == 0:
+        starts = np.zeros([0], dtype=np.int64)
+    else:
+        starts = np.concatenate(
+            [[0], np.flatnonzero(flat[1:] != flat[:-1]) + 1])
+    counts = np.diff(np.append(starts, flat.size))
+    return {
+        "encoding": "rle",
+        "dtype": flat.dtype.str,
+        "shape": list(arr.shape),
+        "values": flat[starts].tolist(),
+        "counts": counts.tolist(),
+    }
+
+
+def float16_encode(arr):
+    """Encode a float array to base64 string of float16 data, e.g. alpha or score map.
+
+    :param arr: (numpy.ndarray)The array to encode
+    :return: (dict)JSON serializable float16 encoding, decode it by `decode_array`
+    """
+    data = np.ascontiguousarray(arr, dtype=np.float16)
+    return {
+        "encoding": "float16",
+        "shape": list(arr.shape),
+        "data": base64.b64encode(data.tobytes()).decode('utf8'),
+    }
+
+
+def decode_array(encoded):
+    """Decode the array encoded by `rle_encode` or `float16_encode`, the plain
+    list is returned as it is.
+    """
+    if not isinstance(encoded, dict):
+        return encoded
+    if encoded["encoding"] == "rle":
+        values = np.array(encoded["values"], dtype=np.dtype(encoded["dtype"]))
+        return np.repeat(values, encoded["counts"]).reshape(encoded["shape"])
+    elif encoded["encoding"] == "float16":
+        data = base64.b64decode(encoded["data"].encode('utf8'))
+        return np.frombuffer(
+            data, dtype=np.float16).astype(np.float32).reshape(encoded[
+                "shape"])
+    raise ValueError("Unsupported array encoding: {}.".format(encoded[
+        "encoding"]))
+
+
+def batched_nms(boxes,
+                scores,
+                classes=None,
+                batch_ids=None,
+                iou_threshold=0.5,
+                score_threshold=None,
+                top_k=-1,
+                max_output=-1):
+    """Non maximum suppression over the boxes of several images and classes in one pass.
+
+    :param boxes: (numpy.ndarray)The candidate boxes with shape [N, 4], each box is [x1, y1, x2, y2]
+    :param scores: (numpy.ndarray)The scores of the boxes with shape [N]
+    :param classes: (numpy.ndarray)The class ids of the boxes with shape [N], boxes of different classes never suppress each other, None for class agnostic NMS
+    :param batch_ids: (numpy.ndarray)The image indices of the boxes with shape [N], None while all the boxes belong to one image
+    :param iou_threshold: (float)A box overlapping a kept box with IoU greater than this value is suppressed
+    :param score_threshold: (float)Only the boxes with score greater than this value are candidates, None for no filter
+    :param top_k: (int)Max number of candidates of each image before NMS, -1 means no limit
+    :param max_output: (int)Max number of kept boxes of each image, -1 means no limit
+    :return: (numpy.ndarray)Indices of the kept boxes in int32, ordered by image index and then by descending score
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    assert boxes.ndim == 2 and boxes.shape[1] == 4 and boxes.shape[
+        0] == scores.shape[
+            0], "The boxes should be in shape [N, 4] and scores in shape [N], but received {} and {}.".format(
+                boxes.shape, scores.shape)
+
+    def _int32_or_empty(arr, name):
+        if arr is None:
+            return np.zeros([0], dtype=np.int32)
+        arr = np.asarray(arr, dtype=np.int32).reshape(-1)
+        assert arr.shape[0] == scores.shape[
+            0], "The {} should be in shape [{}], but received {}.".format(
+                name, scores.shape[0], arr.shape)
+        return arr
+
+    classes = _int32_or_empty(classes, "classes")
+    batch_ids = _int32_or_empty(batch_ids, "batch_ids")
+    if score_threshold is None:
+        score_threshold = float(np.finfo(np.float32).min)
+    return C.vision.batched_nms(boxes, scores, classes, batch_ids,
+                                iou_threshold, score_threshold, top_k,
+                                max_output)
+
+
+def _decode_list(encoded):
+    # The pybind vector members accept list only
+    arr = decode_array(encoded)
+    if isinstance(arr, np.ndarray):
+        return arr.ravel().tolist()
+    return arr
+
+
+def mask_to_json(result, compress=False):
+    data = result.data_numpy()
     r_json = {
-        "data": result.data,
+        "data": rle_encode(data) if compress else data.tolist(),
         "shape": result.shape,
     }
     return json.dumps(r_json)
 
 
-def detection_to_json(result):
+def detection_to_json(result, compress=False):
     masks = []
     for mask in result.masks:
-        masks.append(mask_to_json(mask))
+        masks.append(mask_to_json(mask, compress))
     r_json = {
-        "boxes": result.boxes,
-        "scores": result.scores,
-        "label_ids": result.label_ids,
+        "boxes": result.boxes_numpy().tolist(),
+        "scores": result.scores_numpy().tolist(),
+        "label_ids": result.label_ids_numpy().tolist(),
         "masks": masks,
         "contain_masks": result.contain_masks
     }
@@ -96,20 +206,36 @@ def face_recognition_to_json(result):
     return json.dumps(r_json)
 
 
-def segmentation_to_json(result):
+def segmentation_to_json(result, compress=False):
+    label_map = result.label_map_numpy()
+    score_map = result.score_map_numpy()
+    if compress:
+        label_map = rle_encode(label_map)
+        score_map = float16_encode(score_map)
+    else:
+        label_map = label_map.tolist()
+        score_map = score_map.tolist()
     r_json = {
-        "label_map": result.label_map,
-        "score_map": result.score_map,
+        "label_map": label_map,
+        "score_map": score_map,
         "shape": result.shape,
         "contain_score_map": result.contain_score_map,
     }
     return json.dumps(r_json)
 
 
-def matting_to_json(result):
+def matting_to_json(result, compress=False):
+    alpha = result.alpha_numpy()
+    foreground = result.foreground_numpy()
+    if compress:
+        alpha = float16_encode(alpha)
+        foreground = float16_encode(foreground)
+    else:
+        alpha = alpha.tolist()
+        foreground = foreground.tolist()
     r_json = {
-        "alpha": result.alpha,
-        "foreground": result.foreground,
+        "alpha": alpha,
+        "foreground": foreground,
         "shape": result.shape,
         "contain_foreground": result.contain_foreground,
     }
@@ -121,16 +247,23 @@ def head_pose_to_json(result):
     return json.dumps(r_json)
 
 
-def fd_result_to_json(result):
+def fd_result_to_json(result, compress=False):
+    """Convert the FastDeploy result to JSON string.
+
+    :param result: The FastDeploy result or list of results
+    :param compress: (bool)Whether to compress the dense members, the label maps and masks are run-length encoded,
+        the alpha, foreground and score maps are encoded as float16. json_to_* decodes both the compressed and the plain JSON
+    :return: (str)JSON string, or list of JSON strings while the input is a list
+    """
     if isinstance(result, list):
         r_list = []
         for r in result:
-            r_list.append(fd_result_to_json(r))
+            r_list.append(fd_result_to_json(r, compress))
         return r_list
     elif isinstance(result, C.vision.DetectionResult):
-        return detection_to_json(result)
+        return detection_to_json(result, compress)
     elif isinstance(result, C.vision.Mask):
-        return mask_to_json(result)
+        return mask_to_json(result, compress)
     elif isinstance(result, C.vision.ClassifyResult):
         return classify_to_json(result)
     elif isinstance(result, C.vision.KeyPointDetectionResult):
@@ -146,9 +279,9 @@ def fd_result_to_json(result):
     elif isinstance(result, C.vision.FaceRecognitionResult):
         return face_recognition_to_json(result)
     elif isinstance(result, C.vision.SegmentationResult):
-        return segmentation_to_json(result)
+        return segmentation_to_json(result, compress)
     elif isinstance(result, C.vision.MattingResult):
-        return matting_to_json(result)
+        return matting_to_json(result, compress)
     elif isinstance(result, C.vision.HeadPoseResult):
         return head_pose_to_json(result)
     else:
@@ -159,7 +292,7 @@ def fd_result_to_json(result):
 
 def json_to_mask(result):
     mask = C.vision.Mask()
-    mask.data = result['data']
+    mask.data = _decode_list(result['data'])
     mask.shape = result['shape']
     return mask
 
@@ -234,8 +367,8 @@ def json_to_face_recognition(result):
 
 def json_to_segmentation(result):
     seg_result = C.vision.SegmentationResult()
-    seg_result.label_map = result['label_map']
-    seg_result.score_map = result['score_map']
+    seg_result.label_map = _decode_list(result['label_map'])
+    seg_result.score_map = _decode_list(result['score_map'])
     seg_result.shape = result['shape']
     seg_result.contain_score_map = result['contain_score_map']
     return seg_result
@@ -243,8 +376,8 @@ def json_to_segmentation(result):
 
 def json_to_matting(result):
     matting_result = C.vision.MattingResult()
-    matting_result.alpha = result['alpha']
-    matting_result.foreground = result['foreground']
+    matting_result.alpha = _decode_list(result['alpha'])
+    matting_result.foreground = _decode_list(result['foreground'])
     matting_result.shape = result['shape']
     matting_result.contain_foreground = result['contain_foreground']
     return matting_result
@@ -254,3 +387,129 @@ def json_to_head_pose(result):
     hp_result = C.vision.HeadPoseResult()
     hp_result.euler_angles = result['euler_angles']
     return hp_result
+
+
+def detection_to_ndarrays(result):
+    masks = result.masks
+    mask_shapes = np.array(
+        [mask.shape for mask in masks], dtype=np.int64).reshape(-1, 2)
+    mask_data = [mask.data_numpy() for mask in masks]
+    return {
+        "result_type": np.array("DetectionResult"),
+        "boxes": result.boxes_numpy(),
+        "scores": result.scores_numpy(),
+        "label_ids": result.label_ids_numpy(),
+        "mask_shapes": mask_shapes,
+        "mask_data": np.concatenate(mask_data)
+        if len(mask_data) > 0 else np.zeros([0], dtype=np.uint8),
+        "contain_masks": np.array(result.contain_masks),
+    }
+
+
+def segmentation_to_ndarrays(result):
+    shape = [int(s) for s in result.shape]
+    score_map = result.score_map_numpy()
+    return {
+        "result_type": np.array("SegmentationResult"),
+        "label_map": result.label_map_numpy().reshape(shape),
+        "score_map": score_map.reshape(shape)
+        if score_map.size > 0 else score_map,
+        "contain_score_map": np.array(result.contain_score_map),
+    }
+
+
+def matting_to_ndarrays(result):
+    shape = [int(s) for s in result.shape]
+    foreground = result.foreground_numpy()
+    return {
+        "result_type": np.array("MattingResult"),
+        "alpha": result.alpha_numpy().reshape(shape[:2]),
+        "foreground": foreground.reshape(shape[:2] + [-1])
+        if foreground.size > 0 else foreground,
+        "contain_foreground": np.array(result.contain_foreground),
+    }
+
+
+def fd_result_supports_ndarrays(result):
+    """Whether the FastDeploy result can be converted by fd_result_to_ndarrays
+
+    :param result: The FastDeploy result
+    :return: (bool)True for DetectionResult, SegmentationResult and MattingResult
+    """
+    return isinstance(result, (C.vision.DetectionResult,
+                               C.vision.SegmentationResult,
+                               C.vision.MattingResult))
+
+
+def fd_result_to_ndarrays(result):
+    """Convert the FastDeploy result to a dict of numpy arrays, which is used by
+    the binary response formats of the serving.
+
+    :param result: DetectionResult, SegmentationResult or MattingResult
+    :return: (dict)Name to numpy.ndarray
+    """
+    if isinstance(result, C.vision.DetectionResult):
+        return detection_to_ndarrays(result)
+    elif isinstance(result, C.vision.SegmentationResult):
+        return segmentation_to_ndarrays(result)
+    elif isinstance(result, C.vision.MattingResult):
+        return matting_to_ndarrays(result)
+    else:
+        assert False, "{} Conversion to ndarrays is not supported".format(
+            type(result))
+    return {}
+
+
+def ndarrays_to_detection(arrays):
+    masks = []
+    offset = 0
+    for shape in arrays["mask_shapes"]:
+        size = int(np.prod(shape))
+        mask = C.vision.Mask()
+        mask.data = arrays["mask_data"][offset:offset + size].tolist()
+        mask.shape = shape.tolist()
+        masks.append(mask)
+        offset += size
+    det_result = C.vision.DetectionResult()
+    det_result.boxes = arrays["boxes"].tolist()
+    det_result.scores = arrays["scores"].tolist()
+    det_result.label_ids = arrays["label_ids"].tolist()
+    det_result.masks = masks
+    det_result.contain_masks = bool(arrays["contain_masks"])
+    return det_result
+
+
+def ndarrays_to_segmentation(arrays):
+    seg_result = C.vision.SegmentationResult()
+    seg_result.label_map = arrays["label_map"].ravel().tolist()
+    seg_result.score_map = arrays["score_map"].ravel().tolist()
+    seg_result.shape = list(arrays["label_map"].shape)
+    seg_result.contain_score_map = bool(arrays["contain_score_map"])
+    return seg_result
+
+
+def ndarrays_to_matting(arrays):
+    matting_result = C.vision.MattingResult()
+    matting_result.alpha = arrays["alpha"].ravel().tolist()
+    matting_result.foreground = arrays["foreground"].ravel().tolist()
+    shape = list(arrays["alpha"].shape)
+    if arrays["foreground"].ndim == 3:
+        shape.append(arrays["foreground"].shape[2])
+    matting_result.shape = shape
+    matting_result.contain_foreground = bool(arrays["contain_foreground"])
+    return matting_result
+
+
+def ndarrays_to_fd_result(arrays):
+    """Convert the dict of numpy arrays decoded from a binary response back to the FastDeploy result.
+    """
+    result_type = str(arrays["result_type"])
+    if result_type == "DetectionResult":
+        return ndarrays_to_detection(arrays)
+    elif result_type == "SegmentationResult":
+        return ndarrays_to_segmentation(arrays)
+    elif result_type == "MattingResult":
+        return ndarrays_to_matting(arrays)
+    else:
+        assert False, "{} Conversion from ndarrays is not supported".format(
+            result_type)
@@ -0,0 +1,277 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import absolute_import
+
+import time
+import queue
+import threading
+
+# Marks the end of the frames in the queues
+_END = object()
+
+
+class _VideoWriter(object):
+    """Write the frames to a video file, the writer is created with the size of
+    the first frame.
+    """
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.writer = None
+
+    def __call__(self, index, frame, result):
+        if self.writer is None:
+            import cv2
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path,
+                                          cv2.VideoWriter_fourcc(*"mp4v"),
+                                          self.fps, (width, height))
+            assert self.writer.isOpened(
+            ), "Failed to open the video writer {}.".format(self.path)
+        self.writer.write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class _StageStatistics(object):
+    def __init__(self):
+        self.frames = 0
+        self.seconds = 0.0
+
+    def to_dict(self):
+        fps = self.frames / self.seconds if self.seconds > 0 else 0.0
+        return {"frames": self.frames, "seconds": self.seconds, "fps": fps}
+
+
+class VideoPipeline(object):
+    def __init__(self,
+                 model,
+                 source,
+                 sink=None,
+                 visualize=None,
+                 batch_size=1,
+                 stateful=False,
+                 queue_size=8,
+                 skip_frames=False,
+                 fps=None):
+        """Run a vision model over the frames of a video, the frames are decoded in a producer thread, predicted in the calling thread, and visualized and written in a consumer thread, the stages are connected by bounded queues
+
+        :param model: The vision model, e.g. fastdeploy.vision.detection.PPYOLOE or fastdeploy.vision.tracking.PPTracking
+        :param source: (str|int|iterable)The path or url of the video, or the index of the camera, or an iterable of the frames, the frames are numpy.ndarray with layout HWC, BGR format
+        :param sink: (str|callable)The path of the output video, or a function called with (index, frame, result) for every predicted frame in order, the results are dropped while it's None
+        :param visualize: (callable)A function called with (frame, result) which returns the visualized frame passed to the sink, e.g. fastdeploy.vision.vis_detection
+        :param batch_size: (int)The number of frames predicted by one batch_predict call of the stateless models
+        :param stateful: (bool)Whether the model keeps state between the frames, e.g. the tracking and video matting models, the frames are predicted one by one in order then
+        :param queue_size: (int)The max number of the frames waiting in the queues between the stages
+        :param skip_frames: (bool)Whether to skip the frames which are behind the real time of the video, the fps is required, which is meant for the live sources
+        :param fps: (float)The fps of the video, read from the video source if it's None
+        """
+        assert batch_size > 0, "The batch_size should be greater than 0."
+        assert queue_size > 0, "The queue_size should be greater than 0."
+        self.model = model
+        self.source = source
+        self.sink = sink
+        self.visualize = visualize
+        self.batch_size = batch_size
+        self.stateful = stateful
+        self.queue_size = queue_size
+        self.skip_frames = skip_frames
+        self.fps = fps
+        self._reset()
+
+    def _reset(self):
+        self._frames = queue.Queue(maxsize=self.queue_size)
+        self._outputs = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._errors = []
+        self._stages = {
+            "decode": _StageStatistics(),
+            "predict": _StageStatistics(),
+            "encode": _StageStatistics()
+        }
+        self._skipped_frames = 0
+        self._seconds = 0.0
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _guard(self, stage, *args):
+        try:
+            stage(*args)
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _open_source(self):
+        if not isinstance(self.source, (str, int)):
+            return iter(self.source)
+        import cv2
+        capture = cv2.VideoCapture(self.source)
+        assert capture.isOpened(), "Failed to open the video {}.".format(
+            self.source)
+        if self.fps is None and capture.get(cv2.CAP_PROP_FPS) > 0:
+            self.fps = capture.get(cv2.CAP_PROP_FPS)
+
+        def read_frames():
+            try:
+                while True:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    yield frame
+            finally:
+                capture.release()
+
+        return read_frames()
+
+    def _decode(self, frames):
+        stats = self._stages["decode"]
+        index = 0
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            frame = next(frames, None)
+            if frame is None:
+                break
+            stats.seconds += time.perf_counter() - start
+            stats.frames += 1
+            if not self._put(self._frames, (index, frame)):
+                return
+            index += 1
+        self._put(self._frames, _END)
+
+    def _predict(self):
+        stats = self._stages["predict"]
+        batch_size = self.batch_size
+        if self.stateful or not hasattr(self.model, "batch_predict"):
+            batch_size = 1
+        interval = 1.0 / self.fps if self.skip_frames else 0.0
+        # Time of the frame 0 in the real time of the video
+        origin = None
+        finished = False
+        while not finished:
+            batch = []
+            while len(batch) < batch_size:
+                item = self._get(self._frames)
+                if item is _END:
+                    finished = True
+                    break
+                if self.skip_frames:
+                    now = time.perf_counter()
+                    if origin is None:
+                        origin = now - item[0] * interval
+                    # The time of the frame has already passed
+                    if now - origin > (item[0] + 1) * interval:
+                        self._skipped_frames += 1
+                        continue
+                batch.append(item)
+            if len(batch) == 0:
+                continue
+            start = time.perf_counter()
+            if batch_size == 1:
+                results = [self.model.predict(batch[0][1])]
+            else:
+                results = self.model.batch_predict(
+                    [frame for _, frame in batch])
+            stats.seconds += time.perf_counter() - start
+            stats.frames += len(batch)
+            for (index, frame), result in zip(batch, results):
+                if not self._put(self._outputs, (index, frame, result)):
+                    return
+        self._put(self._outputs, _END)
+
+    def _encode(self, sink):
+        stats = self._stages["encode"]
+        while True:
+            item = self._get(self._outputs)
+            if item is _END:
+                break
+            index, frame, result = item
+            start = time.perf_counter()
+            if self.visualize is not None:
+                frame = self.visualize(frame, result)
+            if sink is not None:
+                sink(index, frame, result)
+            stats.seconds += time.perf_counter() - start
+            stats.frames += 1
+
+    def run(self):
+        """Run the pipeline until all the frames of the source are processed
+
+        :return: (dict)The statistics of the pipeline, the same as get_statistics()
+        """
+        self._reset()
+        frames = self._open_source()
+        assert not self.skip_frames or self.fps, \
+            "The fps is required to skip the frames, please set the fps."
+        sink = self.sink
+        if isinstance(sink, str):
+            sink = _VideoWriter(sink, self.fps or 25.0)
+        decoder = threading.Thread(
+            target=self._guard, args=(self._decode, frames), daemon=True)
+        encoder = threading.Thread(
+            target=self._guard, args=(self._encode, sink), daemon=True)
+        start = time.perf_counter()
+        decoder.start()
+        encoder.start()
+        try:
+            self._predict()
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            encoder.join()
+            # Unblock the decoder if the prediction is stopped early
+            self._stop.set()
+            decoder.join()
+            if hasattr(frames, "close"):
+                frames.close()
+            if isinstance(sink, _VideoWriter):
+                sink.close()
+            self._seconds = time.perf_counter() - start
+        if len(self._errors) > 0:
+            raise self._errors[0]
+        return self.get_statistics()
+
+    def get_statistics(self):
+        """Get the statistics of the last run
+
+        :return: (dict)The number of frames, busy seconds and fps of every stage in decode, predict and encode, the number of the skipped frames, and the fps of the whole pipeline
+        """
+        stats = {
+            name: stage.to_dict()
+            for name, stage in self._stages.items()
+        }
+        stats["skipped_frames"] = self._skipped_frames
+        stats["seconds"] = self._seconds
+        stats["fps"] = self._stages["encode"].frames / self._seconds \
+            if self._seconds > 0 else 0.0
+        return stats
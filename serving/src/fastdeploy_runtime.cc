@@ -28,6 +28,8 @@
 
 #include <algorithm>
 #include <mutex>
+#include <string>
+#include <unordered_map>
 #include <vector>
 
 #include "fastdeploy/core/fd_tensor.h"
@@ -82,6 +84,10 @@ class ModelState : public BackendModel {
     return model_outputs_;
   }
 
+  // The inputs fed by the sequence batcher instead of the client, i.e. the
+  // control inputs and the input states
+  const std::vector<std::string>& SequenceInputs() { return sequence_inputs_; }
+
  private:
   ModelState(TRITONBACKEND_Model* triton_model);
   TRITONSERVER_Error* AutoCompleteConfig();
@@ -101,6 +107,8 @@ class ModelState : public BackendModel {
   // is specified both in the output section and state section, it indicates
   // that the backend must return the output state to the client too.
   std::map<std::string, std::pair<int64_t, int64_t>> model_outputs_;
+
+  std::vector<std::string> sequence_inputs_;
 };
 
 TRITONSERVER_Error* ModelState::Create(TRITONBACKEND_Model* triton_model,
@@ -124,15 +132,33 @@ TRITONSERVER_Error* ModelState::Create(TRITONBACKEND_Model* triton_model,
   }
 
   auto& model_outputs = (*state)->model_outputs_;
+  auto& sequence_inputs = (*state)->sequence_inputs_;
 
-  // Parse the output states in the model configuration
+  // Parse the control inputs and the states in the model configuration. The
+  // states are kept by Triton for every sequence, i.e. correlation ID, the
+  // output states of a request are fed as the input states of the next
+  // request in the same sequence
   triton::common::TritonJson::Value sequence_batching;
   if ((*state)->ModelConfig().Find("sequence_batching", &sequence_batching)) {
+    triton::common::TritonJson::Value control_inputs;
+    if (sequence_batching.Find("control_input", &control_inputs)) {
+      for (size_t i = 0; i < control_inputs.ArraySize(); i++) {
+        triton::common::TritonJson::Value control_input;
+        RETURN_IF_ERROR(control_inputs.IndexAsObject(i, &control_input));
+        std::string control_input_name;
+        RETURN_IF_ERROR(
+            control_input.MemberAsString("name", &control_input_name));
+        sequence_inputs.push_back(control_input_name);
+      }
+    }
     triton::common::TritonJson::Value states;
     if (sequence_batching.Find("state", &states)) {
       for (size_t i = 0; i < states.ArraySize(); i++) {
         triton::common::TritonJson::Value state;
         RETURN_IF_ERROR(states.IndexAsObject(i, &state));
+        std::string input_state_name;
+        RETURN_IF_ERROR(state.MemberAsString("input_name", &input_state_name));
+        sequence_inputs.push_back(input_state_name);
         std::string output_state_name;
         RETURN_IF_ERROR(
             state.MemberAsString("output_name", &output_state_name));
@@ -606,6 +632,20 @@ class ModelInstanceState : public BackendModelInstance {
       const uint32_t request_count,
       std::vector<TRITONBACKEND_Response*>* responses);
 
+  // Get the input of all the requests as one buffer without copying, which is
+  // possible if every request holds the input in one buffer of an allowed
+  // memory type, and the buffers are adjacent in the order of the requests,
+  // e.g. the batch only has one request. Return false if not possible.
+  bool GetContiguousInputBuffer(
+      const char* input_name, TRITONBACKEND_Request** requests,
+      const uint32_t request_count,
+      const std::vector<std::pair<TRITONSERVER_MemoryType, int64_t>>&
+          allowed_input_types,
+      const char** buffer, size_t* byte_size,
+      TRITONSERVER_MemoryType* memory_type, int64_t* memory_type_id);
+
+  void ReportCopiedBytes(size_t total_batch_size);
+
   ModelState* model_state_;
 
   // The full path to the model file.
@@ -618,8 +658,37 @@ class ModelInstanceState : public BackendModelInstance {
   std::vector<std::string> output_names_;
   std::vector<fastdeploy::TensorInfo> input_tensor_infos_;
   std::vector<fastdeploy::TensorInfo> output_tensor_infos_;
+
+  // The buffers to gather the inputs of the requests in CPU memory, reused
+  // across the executions
+  std::unordered_map<std::string, std::vector<char>> gather_buffers_;
+  // Bytes copied to gather the inputs and scatter the outputs in the current
+  // execution
+  size_t copied_bytes_ = 0;
+#ifdef TRITON_ENABLE_CUSTOM_METRICS
+  TRITONSERVER_Metric* copied_bytes_metric_ = nullptr;
+#endif
 };
 
+#ifdef TRITON_ENABLE_CUSTOM_METRICS
+// The metric family is shared by all the models served by the backend
+static TRITONSERVER_Error* CopiedBytesMetricFamily(
+    TRITONSERVER_MetricFamily** family) {
+  static std::mutex mutex;
+  static TRITONSERVER_MetricFamily* copied_bytes_family = nullptr;
+  std::lock_guard<std::mutex> lock(mutex);
+  if (copied_bytes_family == nullptr) {
+    RETURN_IF_ERROR(TRITONSERVER_MetricFamilyNew(
+        &copied_bytes_family, TRITONSERVER_METRIC_KIND_COUNTER,
+        "fastdeploy_backend_copied_bytes",
+        "Bytes copied by the FastDeploy backend to gather the inputs and "
+        "scatter the outputs of the requests"));
+  }
+  *family = copied_bytes_family;
+  return nullptr;  // success
+}
+#endif
+
 TRITONSERVER_Error* ModelInstanceState::Create(
     ModelState* model_state, TRITONBACKEND_ModelInstance* triton_model_instance,
     ModelInstanceState** state) {
@@ -648,9 +717,39 @@ ModelInstanceState::ModelInstanceState(
 
   THROW_IF_BACKEND_INSTANCE_ERROR(ValidateInputs());
   THROW_IF_BACKEND_INSTANCE_ERROR(ValidateOutputs());
+
+#ifdef TRITON_ENABLE_CUSTOM_METRICS
+  TRITONSERVER_MetricFamily* family = nullptr;
+  TRITONSERVER_Error* err = CopiedBytesMetricFamily(&family);
+  if (err == nullptr) {
+    std::string version = std::to_string(model_state->Version());
+    std::vector<const TRITONSERVER_Parameter*> labels = {
+        TRITONSERVER_ParameterNew("model", TRITONSERVER_PARAMETER_STRING,
+                                  model_state->Name().c_str()),
+        TRITONSERVER_ParameterNew("version", TRITONSERVER_PARAMETER_STRING,
+                                  version.c_str()),
+        TRITONSERVER_ParameterNew("instance", TRITONSERVER_PARAMETER_STRING,
+                                  Name().c_str())};
+    err = TRITONSERVER_MetricNew(&copied_bytes_metric_, family, labels.data(),
+                                 labels.size());
+    for (auto label : labels) {
+      TRITONSERVER_ParameterDelete(
+          const_cast<TRITONSERVER_Parameter*>(label));
+    }
+  }
+  LOG_IF_ERROR(err, "failed to create the copied bytes metric");
+#endif
 }
 
-ModelInstanceState::~ModelInstanceState() { ReleaseRunResources(); }
+ModelInstanceState::~ModelInstanceState() {
+  ReleaseRunResources();
+#ifdef TRITON_ENABLE_CUSTOM_METRICS
+  if (copied_bytes_metric_ != nullptr) {
+    LOG_IF_ERROR(TRITONSERVER_MetricDelete(copied_bytes_metric_),
+                 "failed to delete the copied bytes metric");
+  }
+#endif
+}
 
 void ModelInstanceState::ReleaseRunResources() {
   input_names_.clear();
@@ -681,15 +780,29 @@ TRITONSERVER_Error* ModelInstanceState::ValidateInputs() {
 
   triton::common::TritonJson::Value ios;
   RETURN_IF_ERROR(model_state_->ModelConfig().MemberAsArray("input", &ios));
-  if (input_tensor_infos_.size() != ios.ArraySize()) {
+  // The control inputs and the input states of a sequence model are not
+  // listed in the inputs of the configuration
+  const auto& sequence_inputs = model_state_->SequenceInputs();
+  size_t expected_input_count = ios.ArraySize() + sequence_inputs.size();
+  if (input_tensor_infos_.size() != expected_input_count) {
     return TRITONSERVER_ErrorNew(
         TRITONSERVER_ERROR_INVALID_ARG,
         (std::string("unable to load model '") + model_state_->Name() +
-         "', configuration expects " + std::to_string(ios.ArraySize()) +
+         "', configuration expects " + std::to_string(expected_input_count) +
          " inputs, model provides " +
          std::to_string(input_tensor_infos_.size()))
             .c_str());
   }
+  for (const auto& sequence_input : sequence_inputs) {
+    if (GetInfoIndex(sequence_input, input_tensor_infos_) < 0) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          (std::string("unable to load model '") + model_state_->Name() +
+           "', configuration expects sequence input '" + sequence_input +
+           "', which is not provided by the model")
+              .c_str());
+    }
+  }
   for (size_t i = 0; i < ios.ArraySize(); i++) {
     triton::common::TritonJson::Value io;
     RETURN_IF_ERROR(ios.IndexAsObject(i, &io));
@@ -828,6 +941,19 @@ TRITONSERVER_Error* ModelInstanceState::ValidateOutputs() {
       // RETURN_IF_ERROR(CompareDimsSupported());
     }
   }
+
+  // The output states may not be listed in the outputs of the configuration
+  for (const auto& model_output : model_state_->ModelOutputs()) {
+    if (model_output.second.second != -1 &&
+        out_names.find(model_output.first) == out_names.end()) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          (std::string("unable to load model '") + model_state_->Name() +
+           "', configuration expects output state '" + model_output.first +
+           "', which is not provided by the model")
+              .c_str());
+    }
+  }
   return nullptr;  // success
 }
 
@@ -931,6 +1057,7 @@ void ModelInstanceState::ProcessRequests(TRITONBACKEND_Request** requests,
     }
   }
 
+  copied_bytes_ = 0;
   bool cuda_copy = false;
   BackendInputCollector collector(
       requests, request_count, &responses, model_state_->TritonMemoryManager(),
@@ -970,6 +1097,8 @@ void ModelInstanceState::ProcessRequests(TRITONBACKEND_Request** requests,
   uint64_t exec_end_ns = 0;
   SET_TIMESTAMP(exec_end_ns);
 
+  ReportCopiedBytes(total_batch_size);
+
   // Send all the responses that haven't already been sent because of
   // an earlier error. Note that the responses are not set to nullptr
   // here as we need that indication below to determine if the request
@@ -1085,9 +1214,48 @@ TRITONSERVER_Error* ModelInstanceState::SetInputTensors(
                              {TRITONSERVER_MEMORY_CPU, 0}};
     }
 
-    RETURN_IF_ERROR(collector->ProcessTensor(
-        input_name, nullptr, 0, allowed_input_types, &input_buffer,
-        &batchn_byte_size, &memory_type, &memory_type_id));
+    int64_t gather_byte_size = GetByteSize(input_datatype, batchn_shape);
+    bool zero_copy = GetContiguousInputBuffer(
+        input_name, requests, request_count, allowed_input_types,
+        &input_buffer, &batchn_byte_size, &memory_type, &memory_type_id);
+    // The buffer of the requests is bound directly only if its size matches
+    // the batch shape, otherwise the collector checks and reports the error
+    if (zero_copy && (gather_byte_size < 0 ||
+                      batchn_byte_size !=
+                          static_cast<size_t>(gather_byte_size))) {
+      LOG_MESSAGE(TRITONSERVER_LOG_VERBOSE,
+                  (std::string("The byte size ") +
+                   std::to_string(batchn_byte_size) + " of input '" +
+                   in_name + "' doesn't match the expected byte size " +
+                   std::to_string(gather_byte_size) +
+                   ", fall back to the input collector")
+                      .c_str());
+      zero_copy = false;
+    }
+    if (zero_copy) {
+      // Bind the buffer of the requests directly
+    } else if (Kind() != TRITONSERVER_INSTANCEGROUPKIND_GPU &&
+               gather_byte_size > 0) {
+      // Gather to the buffer kept from the previous executions, instead of
+      // allocating a new one every time
+      auto& gather_buffer = gather_buffers_[in_name];
+      if (gather_buffer.size() < static_cast<size_t>(gather_byte_size)) {
+        gather_buffer.resize(gather_byte_size);
+      }
+      *cuda_copy |= collector->ProcessTensor(
+          input_name, gather_buffer.data(), gather_byte_size,
+          TRITONSERVER_MEMORY_CPU, 0);
+      input_buffer = gather_buffer.data();
+      batchn_byte_size = gather_byte_size;
+      memory_type = TRITONSERVER_MEMORY_CPU;
+      memory_type_id = 0;
+      copied_bytes_ += batchn_byte_size;
+    } else {
+      RETURN_IF_ERROR(collector->ProcessTensor(
+          input_name, nullptr, 0, allowed_input_types, &input_buffer,
+          &batchn_byte_size, &memory_type, &memory_type_id));
+      copied_bytes_ += batchn_byte_size;
+    }
 
     int32_t device_id = -1;
     fastdeploy::Device device;
@@ -1156,6 +1324,38 @@ TRITONSERVER_Error* ModelInstanceState::ReadOutputTensors(
         output_tensor->shape,
         reinterpret_cast<char*>(output_tensor->MutableData()), memory_type,
         memory_type_id);
+    copied_bytes_ += output_tensor->Nbytes();
+  }
+
+  // Hand the output states of the sequences back to Triton, which keeps them
+  // resident and feeds them to the next requests of the same correlation IDs
+  for (const auto& model_output : StateForModel()->ModelOutputs()) {
+    if (model_output.second.second == -1) {
+      continue;
+    }
+    auto* output_tensor = runtime_->GetOutputTensor(model_output.first);
+    if (output_tensor == nullptr) {
+      RETURN_IF_ERROR(TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          (std::string("output state '") + model_output.first +
+           "' is not found")
+              .c_str()));
+    }
+    TRITONSERVER_MemoryType memory_type = TRITONSERVER_MEMORY_CPU;
+    int64_t memory_type_id = 0;
+    if (output_tensor->device == fastdeploy::Device::GPU) {
+      memory_type = TRITONSERVER_MEMORY_GPU;
+      memory_type_id = DeviceId();
+    }
+    std::vector<TRITONBACKEND_State*> states = responder.ProcessStateTensor(
+        model_output.first, ConvertFDType(output_tensor->dtype),
+        output_tensor->shape,
+        reinterpret_cast<char*>(output_tensor->MutableData()), memory_type,
+        memory_type_id);
+    for (auto& state : states) {
+      RETURN_IF_ERROR(TRITONBACKEND_StateUpdate(state));
+    }
+    copied_bytes_ += output_tensor->Nbytes();
   }
 
   // Finalize and wait for any pending buffer copies.
@@ -1169,6 +1369,86 @@ TRITONSERVER_Error* ModelInstanceState::ReadOutputTensors(
   return nullptr;
 }
 
+bool ModelInstanceState::GetContiguousInputBuffer(
+    const char* input_name, TRITONBACKEND_Request** requests,
+    const uint32_t request_count,
+    const std::vector<std::pair<TRITONSERVER_MemoryType, int64_t>>&
+        allowed_input_types,
+    const char** buffer, size_t* byte_size,
+    TRITONSERVER_MemoryType* memory_type, int64_t* memory_type_id) {
+  const char* contiguous_buffer = nullptr;
+  size_t contiguous_byte_size = 0;
+  TRITONSERVER_MemoryType contiguous_memory_type = TRITONSERVER_MEMORY_CPU;
+  int64_t contiguous_memory_type_id = 0;
+  for (uint32_t idx = 0; idx < request_count; idx++) {
+    TRITONBACKEND_Input* input;
+    uint32_t buffer_count;
+    TRITONSERVER_Error* err =
+        TRITONBACKEND_RequestInput(requests[idx], input_name, &input);
+    if (err == nullptr) {
+      err = TRITONBACKEND_InputProperties(input, nullptr, nullptr, nullptr,
+                                          nullptr, nullptr, &buffer_count);
+    }
+    if (err == nullptr && buffer_count != 1) {
+      return false;
+    }
+    const void* request_buffer = nullptr;
+    uint64_t request_byte_size = 0;
+    // The preferred memory type, the actual one is returned
+    TRITONSERVER_MemoryType request_memory_type = allowed_input_types[0].first;
+    int64_t request_memory_type_id = allowed_input_types[0].second;
+    if (err == nullptr) {
+      err = TRITONBACKEND_InputBuffer(input, 0, &request_buffer,
+                                      &request_byte_size, &request_memory_type,
+                                      &request_memory_type_id);
+    }
+    if (err != nullptr) {
+      // Let the collector report the error to the response
+      TRITONSERVER_ErrorDelete(err);
+      return false;
+    }
+
+    auto allowed_type = std::make_pair(request_memory_type,
+                                       request_memory_type_id);
+    if (std::find(allowed_input_types.begin(), allowed_input_types.end(),
+                  allowed_type) == allowed_input_types.end()) {
+      return false;
+    }
+    const char* data = reinterpret_cast<const char*>(request_buffer);
+    if (idx == 0) {
+      contiguous_buffer = data;
+      contiguous_memory_type = request_memory_type;
+      contiguous_memory_type_id = request_memory_type_id;
+    } else if (data != contiguous_buffer + contiguous_byte_size ||
+               request_memory_type != contiguous_memory_type ||
+               request_memory_type_id != contiguous_memory_type_id) {
+      return false;
+    }
+    contiguous_byte_size += request_byte_size;
+  }
+
+  *buffer = contiguous_buffer;
+  *byte_size = contiguous_byte_size;
+  *memory_type = contiguous_memory_type;
+  *memory_type_id = contiguous_memory_type_id;
+  return true;
+}
+
+void ModelInstanceState::ReportCopiedBytes(size_t total_batch_size) {
+  LOG_MESSAGE(TRITONSERVER_LOG_VERBOSE,
+              (std::string("FastDeploy backend copied ") +
+               std::to_string(copied_bytes_) + " bytes for the batch size " +
+               std::to_string(total_batch_size) + " of " + Name())
+                  .c_str());
+#ifdef TRITON_ENABLE_CUSTOM_METRICS
+  if (copied_bytes_metric_ != nullptr) {
+    LOG_IF_ERROR(TRITONSERVER_MetricIncrement(copied_bytes_metric_,
+                                              copied_bytes_),
+                 "failed to report the copied bytes metric");
+  }
+#endif
+}
+
 /////////////
 
 extern "C" {
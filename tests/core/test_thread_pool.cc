@@ -0,0 +1,114 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <atomic>
+#include <chrono>  // NOLINT
+#include <mutex>   // NOLINT
+#include <set>
+#include <thread>  // NOLINT
+#include <vector>
+
+#include "fastdeploy/utils/thread_pool.h"
+#include "gtest/gtest.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, thread_pool_runs_every_task_once) {
+  ThreadPool pool(4);
+  ASSERT_EQ(pool.NumThreads(), 4);
+  for (int num_tasks : {0, 1, 3, 4, 17, 100}) {
+    std::vector<std::atomic<int>> counts(num_tasks);
+    for (auto& count : counts) {
+      count = 0;
+    }
+    ASSERT_TRUE(pool.ParallelFor(num_tasks, [&counts](int i) {
+      counts[i] += 1;
+      return true;
+    }));
+    for (int i = 0; i < num_tasks; ++i) {
+      ASSERT_EQ(counts[i], 1);
+    }
+  }
+}
+
+TEST(fastdeploy, thread_pool_uses_all_threads) {
+  ThreadPool pool(4);
+  std::mutex mutex;
+  std::set<std::thread::id> thread_ids;
+  // Every task blocks until all the threads have joined, so the tasks can
+  // only finish if they run on 4 different threads
+  std::atomic<int> started{0};
+  ASSERT_TRUE(pool.ParallelFor(4, [&](int i) {
+    {
+      std::lock_guard<std::mutex> lock(mutex);
+      thread_ids.insert(std::this_thread::get_id());
+    }
+    started += 1;
+    auto deadline =
+        std::chrono::steady_clock::now() + std::chrono::seconds(10);
+    while (started < 4 && std::chrono::steady_clock::now() < deadline) {
+      std::this_thread::yield();
+    }
+    return started == 4;
+  }));
+  ASSERT_EQ(thread_ids.size(), 4);
+  ASSERT_EQ(thread_ids.count(std::this_thread::get_id()), 1);
+}
+
+TEST(fastdeploy, thread_pool_reports_failed_tasks) {
+  ThreadPool pool(3);
+  std::atomic<int> finished{0};
+  ASSERT_FALSE(pool.ParallelFor(10, [&finished](int i) {
+    finished += 1;
+    return i != 7;
+  }));
+  // The other tasks still run
+  ASSERT_EQ(finished, 10);
+  // The pool is reusable after a failure
+  ASSERT_TRUE(pool.ParallelFor(10, [](int i) { return true; }));
+}
+
+TEST(fastdeploy, thread_pool_single_thread) {
+  ThreadPool pool(1);
+  ASSERT_EQ(pool.NumThreads(), 1);
+  std::vector<int> order;
+  ASSERT_TRUE(pool.ParallelFor(5, [&order](int i) {
+    order.push_back(i);
+    return true;
+  }));
+  ASSERT_EQ(order, std::vector<int>({0, 1, 2, 3, 4}));
+  ASSERT_FALSE(pool.ParallelFor(5, [](int i) { return i < 2; }));
+}
+
+TEST(fastdeploy, thread_pool_concurrent_callers) {
+  ThreadPool pool(4);
+  std::atomic<int> total{0};
+  std::vector<std::thread> callers;
+  for (int c = 0; c < 4; ++c) {
+    callers.emplace_back([&pool, &total]() {
+      for (int n = 0; n < 50; ++n) {
+        pool.ParallelFor(8, [&total](int i) {
+          total += 1;
+          return true;
+        });
+      }
+    });
+  }
+  for (auto& caller : callers) {
+    caller.join();
+  }
+  ASSERT_EQ(total, 4 * 50 * 8);
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,122 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <string>
+#include <thread>  // NOLINT
+#include <vector>
+
+#include "fastdeploy/fastdeploy_model.h"
+#include "fastdeploy/utils/trace.h"
+#include "gtest/gtest.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, trace_scope) {
+  PipelineTracer tracer;
+  {
+    // Nothing is recorded before the tracer is enabled
+    TraceScope trace(&tracer, "det", "preprocess", 2);
+  }
+  ASSERT_TRUE(tracer.Events().empty());
+
+  tracer.Enable();
+  {
+    TraceScope pipeline(&tracer, "ppocr", "", 2);
+    { TraceScope trace(&tracer, "det", "preprocess", 2); }
+    { TraceScope trace(&tracer, "det", "runtime", 2); }
+    for (int i = 0; i < 3; ++i) {
+      TraceScope trace(&tracer, "rec", "runtime", 6);
+      if (i == 2) {
+        trace.SetItems(4);
+      }
+    }
+  }
+  { TraceScope trace(nullptr, "det", "runtime"); }
+
+  auto events = tracer.Events();
+  ASSERT_EQ(events.size(), 6);
+  // The inner spans end first
+  ASSERT_EQ(events[0].name, "det.preprocess");
+  ASSERT_EQ(events.back().name, "ppocr");
+  ASSERT_LE(events.back().begin_us, events[0].begin_us);
+
+  auto summary = tracer.Summary();
+  ASSERT_EQ(summary.size(), 4);
+  ASSERT_EQ(summary["rec.runtime"].count, 3);
+  ASSERT_EQ(summary["rec.runtime"].items, 16);
+  ASSERT_EQ(summary["rec.runtime"].max_items, 6);
+  ASSERT_EQ(summary["ppocr"].items, 2);
+
+  std::string chrome_trace = tracer.ToChromeTrace();
+  ASSERT_EQ(chrome_trace.find("{\"displayTimeUnit\":\"ms\",\"traceEvents\":["),
+            0);
+  ASSERT_NE(chrome_trace.find("\"name\":\"rec.runtime\",\"cat\":\"rec\""),
+            std::string::npos);
+
+  tracer.Clear();
+  ASSERT_TRUE(tracer.Events().empty());
+}
+
+TEST(fastdeploy, trace_threads) {
+  PipelineTracer tracer;
+  tracer.Enable();
+  tracer.max_events = 50;
+  std::vector<std::thread> threads;
+  for (int t = 0; t < 4; ++t) {
+    threads.emplace_back([&tracer]() {
+      for (int i = 0; i < 10; ++i) {
+        TraceScope trace(&tracer, "cls", "runtime");
+      }
+    });
+  }
+  for (auto& t : threads) {
+    t.join();
+  }
+  auto events = tracer.Events();
+  ASSERT_EQ(events.size(), 40);
+  int max_thread_id = 0;
+  for (const auto& event : events) {
+    max_thread_id = std::max(max_thread_id, event.thread_id);
+  }
+  ASSERT_LT(max_thread_id, 4);
+
+  // The recording stops once max_events is reached
+  for (int i = 0; i < 20; ++i) {
+    TraceScope trace(&tracer, "cls", "runtime");
+  }
+  ASSERT_EQ(tracer.Events().size(), 50);
+  ASSERT_FALSE(tracer.Enabled());
+}
+
+TEST(fastdeploy, trace_model_shares_tracer) {
+  FastDeployModel model;
+  {
+    // The tracer of a pipeline, which is released before the model
+    auto tracer = std::make_shared<PipelineTracer>();
+    tracer->Enable();
+    model.SetTracer(tracer, "det");
+  }
+  PipelineTracer* tracer = model.GetTracer();
+  ASSERT_NE(tracer, nullptr);
+  {
+    TraceScope trace(tracer, "det", "runtime");
+  }
+  ASSERT_EQ(tracer->Events().size(), 1);
+
+  model.SetTracer(nullptr, "");
+  ASSERT_EQ(model.GetTracer(), nullptr);
+}
+
+}  // namespace fastdeploy
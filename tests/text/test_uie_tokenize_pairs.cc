@@ -0,0 +1,151 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <algorithm>
+#include <cstdio>
+#include <fstream>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "fastdeploy/text.h"
+#include "gtest/gtest.h"
+
+namespace fastdeploy {
+
+// Exposes the tokenization of UIEModel, the runtime is not needed to tokenize
+class UIETokenizeTester : public text::UIEModel {
+ public:
+  UIETokenizeTester(const std::string& vocab_file, size_t max_length)
+      : text::UIEModel("", "", vocab_file, 0.5, max_length,
+                       std::vector<std::string>({"时间"}), 4,
+                       UnloadableOption()) {}
+
+  using text::UIEModel::TokenizedPair;
+  using text::UIEModel::TokenizedText;
+  using text::UIEModel::TokenizePairs;
+
+  // The reference, every (prompt, text) pair is tokenized as a pair
+  void EncodePairs(const std::vector<std::string>& texts,
+                   const std::vector<std::string>& prompts,
+                   std::vector<TokenizedPair>* pairs) {
+    std::vector<fast_tokenizer::core::EncodeInput> pair_input;
+    for (size_t i = 0; i < texts.size(); ++i) {
+      pair_input.emplace_back(
+          std::pair<std::string, std::string>(prompts[i], texts[i]));
+    }
+    std::vector<fast_tokenizer::core::Encoding> encodings;
+    tokenizer_.EncodeBatchStrings(pair_input, &encodings);
+    pairs->resize(texts.size());
+    for (size_t i = 0; i < texts.size(); ++i) {
+      auto&& ids = encodings[i].GetIds();
+      auto&& type_ids = encodings[i].GetTypeIds();
+      auto&& offsets = encodings[i].GetOffsets();
+      auto&& attn_mask = encodings[i].GetAttentionMask();
+      size_t len = std::count_if(attn_mask.begin(), attn_mask.end(),
+                                 [](uint32_t mask) { return mask != 0; });
+      auto& pair = (*pairs)[i];
+      pair.ids_.assign(ids.begin(), ids.begin() + len);
+      pair.type_ids_.assign(type_ids.begin(), type_ids.begin() + len);
+      pair.offsets_.assign(offsets.begin(), offsets.begin() + len);
+    }
+  }
+
+ private:
+  static RuntimeOption UnloadableOption() {
+    // UIEModel doesn't support this backend, so the model is not loaded
+    RuntimeOption option;
+    option.device = Device::SOPHGOTPUD;
+    option.backend = Backend::SOPHGOTPU;
+    return option;
+  }
+};
+
+std::string WriteVocab() {
+  std::vector<std::string> vocab = {"[PAD]", "[CLS]", "[SEP]", "[MASK]",
+                                    "[UNK]", "时",    "间",    "地",
+                                    "点",    "人",    "物",    "的",
+                                    "在",    "年",    "月",    "日",
+                                    "北",    "京",    "上",    "海",
+                                    "2",     "0",     "##0",   "##2",
+                                    "3",     "name",  "city",  "is",
+                                    "in",    "the",   "##s",   "meet"};
+  std::string vocab_file = "uie_tokenize_pairs_vocab.txt";
+  std::ofstream fout(vocab_file);
+  for (auto& token : vocab) {
+    fout << token << "\n";
+  }
+  return vocab_file;
+}
+
+void CheckPairs(
+    const std::vector<UIETokenizeTester::TokenizedPair>& pairs,
+    const std::vector<UIETokenizeTester::TokenizedPair>& expected) {
+  ASSERT_EQ(pairs.size(), expected.size());
+  for (size_t i = 0; i < pairs.size(); ++i) {
+    ASSERT_EQ(pairs[i].ids_, expected[i].ids_) << "pair " << i;
+    ASSERT_EQ(pairs[i].type_ids_, expected[i].type_ids_) << "pair " << i;
+    ASSERT_EQ(pairs[i].offsets_, expected[i].offsets_) << "pair " << i;
+  }
+}
+
+TEST(fastdeploy, uie_tokenize_pairs) {
+  std::string vocab_file = WriteVocab();
+  UIETokenizeTester model(vocab_file, 32);
+  // The same texts are paired with many prompts, and the same prompts with
+  // many texts, as the schema of UIE does
+  std::vector<std::string> texts = {
+      "2023年3月在北京的人物",   "2023年3月在北京的人物", "上海的时间地点",
+      "the names meet in city", "",                      "上海的时间地点",
+      "unknown 字 in the city"};
+  std::vector<std::string> prompts = {"时间", "地点",     "时间", "name",
+                                      "人物", "city的人物", "地点"};
+
+  std::unordered_map<std::string, UIETokenizeTester::TokenizedText> cache;
+  std::vector<UIETokenizeTester::TokenizedPair> pairs;
+  model.TokenizePairs(texts, prompts, &cache, &pairs);
+  std::vector<UIETokenizeTester::TokenizedPair> expected;
+  model.EncodePairs(texts, prompts, &expected);
+  CheckPairs(pairs, expected);
+
+  // The cached tokens give the same pairs
+  std::vector<UIETokenizeTester::TokenizedPair> cached_pairs;
+  model.TokenizePairs(texts, prompts, &cache, &cached_pairs);
+  CheckPairs(cached_pairs, expected);
+  std::remove(vocab_file.c_str());
+}
+
+TEST(fastdeploy, uie_tokenize_pairs_truncation) {
+  std::string vocab_file = WriteVocab();
+  // The long pairs don't fit in max_length and fall back to be tokenized as
+  // pairs with truncation
+  UIETokenizeTester model(vocab_file, 12);
+  std::vector<std::string> texts = {
+      "2023年3月在北京的人物", "上海", "2023年3月在北京的人物上海的时间地点",
+      "北京"};
+  std::vector<std::string> prompts = {"时间", "地点", "人物", "时间地点"};
+
+  std::unordered_map<std::string, UIETokenizeTester::TokenizedText> cache;
+  std::vector<UIETokenizeTester::TokenizedPair> pairs;
+  model.TokenizePairs(texts, prompts, &cache, &pairs);
+  std::vector<UIETokenizeTester::TokenizedPair> expected;
+  model.EncodePairs(texts, prompts, &expected);
+  CheckPairs(pairs, expected);
+  for (auto& pair : pairs) {
+    ASSERT_LE(pair.ids_.size(), 12);
+  }
+  std::remove(vocab_file.c_str());
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,119 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import csv
+import json
+import time
+import tempfile
+import threading
+
+import numpy as np
+
+import fastdeploy.benchmark as fd_benchmark
+
+
+def test_summarize_latency():
+    latencies = [i / 1000.0 for i in range(1, 101)]
+    summary = fd_benchmark.summarize_latency(latencies)
+    assert summary["count"] == 100
+    assert abs(summary["mean"] - 50.5) < 1e-6
+    assert abs(summary["min"] - 1.0) < 1e-6
+    assert abs(summary["max"] - 100.0) < 1e-6
+    for p in [50, 90, 99]:
+        expected = np.percentile(np.arange(1, 101, dtype=np.float64), p)
+        assert abs(summary["p{}".format(p)] - expected) < 1e-6
+
+    empty = fd_benchmark.summarize_latency([], percentiles=(95, ))
+    assert empty["count"] == 0 and empty["p95"] == 0.0
+
+
+def test_run_benchmark_concurrency():
+    calls = []
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def predict(data):
+        with lock:
+            calls.append(data)
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.002)
+        with lock:
+            active["now"] -= 1
+
+    result = fd_benchmark.run_benchmark(
+        predict, ["a", "b"], warmup=2, repeat=40, concurrency=4)
+    # 2 warmup requests of each worker and 40 measured requests
+    assert len(calls) == 4 * 2 + 40
+    assert result["latency_ms"]["count"] == 40
+    assert result["latency_ms"]["p50"] >= 2.0
+    assert active["max"] > 1
+    assert abs(result["throughput"] - 40 / result["wall_time_s"]) < 1e-6
+    if os.path.exists("/proc/self/status"):
+        assert result["memory"]["rss_mb_max"] > 0
+
+
+def test_run_benchmark_raises_worker_error():
+    def predict(data):
+        raise ValueError("predict failed")
+
+    try:
+        fd_benchmark.run_benchmark(
+            [predict, predict], [0], warmup=1, repeat=4, concurrency=2)
+        assert False, "The error of the worker should be raised."
+    except ValueError:
+        pass
+
+
+def test_write_results():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, "result.csv")
+        fd_benchmark.write_csv({
+            "model": "a",
+            "latency_ms": {
+                "p50": 1.0
+            }
+        }, csv_file)
+        fd_benchmark.write_csv({
+            "model": "b",
+            "latency_ms": {
+                "p50": 2.0
+            }
+        }, csv_file)
+        # The new column is added and the old rows are kept
+        fd_benchmark.write_csv(
+            {"model": "c", "latency_ms": {"p50": 3.0, "p99": 4.0}}, csv_file)
+        with open(csv_file) as f:
+            rows = list(csv.DictReader(f))
+        assert [r["model"] for r in rows] == ["a", "b", "c"]
+        assert rows[0]["latency_ms.p99"] == ""
+        assert rows[2]["latency_ms.p99"] == "4.0"
+
+        jsonl_file = os.path.join(tmp_dir, "result.jsonl")
+        fd_benchmark.write_json({"model": "a"}, jsonl_file)
+        fd_benchmark.write_json({"model": "b"}, jsonl_file)
+        with open(jsonl_file) as f:
+            records = [json.loads(line) for line in f]
+        assert [r["model"] for r in records] == ["a", "b"]
+
+    env = fd_benchmark.collect_environment()
+    assert "fastdeploy_version" in env and "timestamp" in env
+
+
+if __name__ == "__main__":
+    test_summarize_latency()
+    test_run_benchmark_concurrency()
+    test_run_benchmark_raises_worker_error()
+    test_write_results()
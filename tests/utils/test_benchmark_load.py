@@ -0,0 +1,134 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fastdeploy.benchmark as fd_benchmark
+
+SERVICE_TIME = 0.01
+NUM_INSTANCES = 2
+
+
+class ServerHandler(BaseHTTPRequestHandler):
+    """Stand-in of SimpleServer, the predictions are served by NUM_INSTANCES
+    instances and each takes SERVICE_TIME seconds.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    instances = threading.Semaphore(NUM_INSTANCES)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(
+            self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path != "/fd/model" or "data" not in request:
+            self.send_error(404)
+            return
+        with ServerHandler.instances:
+            time.sleep(SERVICE_TIME)
+        body = json.dumps({"result": "ok"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ServerHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:{}/fd/model".format(server.server_port)
+
+
+def test_closed_loop_knee():
+    server, url = start_server()
+    try:
+        generator = fd_benchmark.LoadGenerator(
+            fd_benchmark.HttpTargetFactory(url, {"data": {}, "parameters": {}}),
+            mode="closed",
+            duration=0.5,
+            warmup=0.1)
+        report = generator.run_ramp([1, 2, 4, 8], knee_latency="p50")
+    finally:
+        server.shutdown()
+    steps = report["steps"]
+    assert [s["level"] for s in steps] == [1, 2, 4, 8]
+    assert all(s["errors"] == 0 for s in steps)
+    # The throughput saturates once all the instances are busy, and the
+    # latency grows with the queue
+    max_throughput = NUM_INSTANCES / SERVICE_TIME
+    assert steps[1]["throughput"] > 1.5 * steps[0]["throughput"]
+    assert steps[3]["throughput"] < 1.2 * max_throughput
+    assert steps[3]["latency_ms"]["p50"] > 2.5 * steps[1]["latency_ms"]["p50"]
+    assert report["knee"]["level"] == NUM_INSTANCES
+
+
+def test_open_loop_and_errors():
+    server, url = start_server()
+    try:
+        generator = fd_benchmark.LoadGenerator(
+            fd_benchmark.HttpTargetFactory(url, {"data": {}}),
+            mode="open",
+            duration=0.5,
+            warmup=0.1,
+            poisson=False)
+        step = generator.run_step(40)
+        assert step["errors"] == 0
+        assert 15 <= step["requests"] <= 25
+        assert step["latency_ms"]["p50"] >= SERVICE_TIME * 1000
+
+        bad = fd_benchmark.LoadGenerator(
+            fd_benchmark.HttpTargetFactory(url + "/missing", {"data": {}}),
+            duration=0.2,
+            warmup=0.0)
+        step = bad.run_step(2)
+        assert step["requests"] == 0 and step["errors"] > 0
+        assert bad.run_ramp([1, 2], max_error_rate=0.5)["knee"] is None
+    finally:
+        server.shutdown()
+
+
+def test_model_target_factory():
+    class Model(object):
+        def __init__(self):
+            self.inputs = []
+
+        def predict(self, data):
+            self.inputs.append(data)
+
+        def clone(self):
+            return Model()
+
+    model = Model()
+    factory = fd_benchmark.ModelTargetFactory(model, ["a", "b"])
+    generator = fd_benchmark.LoadGenerator(factory, duration=0.1, warmup=0.0)
+    step = generator.run_step(3)
+    assert step["requests"] > 0
+    # The clones are reused by the following steps
+    assert len(factory._models) == 3
+    generator.run_step(2)
+    assert len(factory._models) == 3
+    assert set(model.inputs) == {"a", "b"}
+
+
+if __name__ == "__main__":
+    test_closed_loop_knee()
+    test_open_loop_and_errors()
+    test_model_target_factory()
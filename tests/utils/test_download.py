@@ -0,0 +1,256 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import hashlib
+import time
+import importlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# fastdeploy.download is shadowed by the download function exported by
+# fastdeploy, so the module is imported by name
+fd_download = importlib.import_module("fastdeploy.download")
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 12345)
+CONTENT_MD5 = hashlib.md5(CONTENT).hexdigest()
+
+
+class HubHandler(BaseHTTPRequestHandler):
+    """Stand-in of the hub server, which serves the model file with range requests
+    and answers the search requests.
+    """
+    requests_log = []
+    # Answer the range requests with the whole content
+    ignore_range = False
+    # Seconds to wait between the writes of 64KB pieces of the content
+    write_delay = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_content(self, body_only):
+        start, end = 0, len(CONTENT) - 1
+        range_header = self.headers.get('Range')
+        if range_header is not None and not HubHandler.ignore_range:
+            first, last = range_header.replace('bytes=', '').split('-')
+            start = int(first)
+            end = int(last) if last else len(CONTENT) - 1
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                start, end, len(CONTENT)))
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if body_only and HubHandler.write_delay > 0:
+            try:
+                for offset in range(start, end + 1, 64 * 1024):
+                    self.wfile.write(CONTENT[offset:min(offset + 64 * 1024,
+                                                        end + 1)])
+                    time.sleep(HubHandler.write_delay)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stops downloading
+                pass
+        elif body_only:
+            self.wfile.write(CONTENT[start:end + 1])
+
+    def do_HEAD(self):
+        self._send_content(False)
+
+    def do_GET(self):
+        HubHandler.requests_log.append((self.path, self.headers.get('Range')))
+        if self.path.startswith('/fastdeploy_search'):
+            url = 'http://127.0.0.1:{}/model.onnx'.format(
+                self.server.server_port)
+            body = json.dumps({
+                'status': 0,
+                'data': [{
+                    'url': url,
+                    'format': 'onnx',
+                    'version': '0.0.1',
+                    'md5': CONTENT_MD5
+                }]
+            }).encode()
+        elif self.path.startswith('/stat'):
+            body = json.dumps({'status': 0}).encode()
+        else:
+            self._send_content(True)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+def use_temp_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(fd_download, 'CACHE_INDEX_FILE',
+                        str(tmp_path / 'cache.json'))
+
+
+def test_parallel_download(monkeypatch, tmp_path):
+    monkeypatch.setattr(fd_download, 'PARALLEL_DOWNLOAD_MIN_SIZE', 1024)
+    use_temp_cache(monkeypatch, tmp_path)
+    server = start_server()
+    try:
+        url = 'http://127.0.0.1:{}/model.onnx'.format(server.server_port)
+        path = str(tmp_path)
+        HubHandler.requests_log.clear()
+        fullname = fd_download.download(url, path, md5sum=CONTENT_MD5)
+        with open(fullname, 'rb') as f:
+            assert f.read() == CONTENT
+        ranges = [r for p, r in HubHandler.requests_log if r is not None]
+        assert len(ranges) == fd_download.DOWNLOAD_NUM_CONNECTIONS
+    finally:
+        stop_server(server)
+
+
+def test_parallel_download_stale_partial_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(fd_download, 'PARALLEL_DOWNLOAD_MIN_SIZE', 1024)
+    use_temp_cache(monkeypatch, tmp_path)
+    server = start_server()
+    try:
+        url = 'http://127.0.0.1:{}/model.onnx'.format(server.server_port)
+        path = str(tmp_path)
+        tmp_fullname = os.path.join(path, 'model.onnx_tmp')
+        # A longer partial file of another download, the state doesn't match
+        with open(tmp_fullname, 'wb') as f:
+            f.write(os.urandom(len(CONTENT) + 1000))
+        with open(tmp_fullname + '.state', 'w') as f:
+            json.dump({"size": len(CONTENT) + 1000, "segments": []}, f)
+        fullname = fd_download.download(url, path)
+        with open(fullname, 'rb') as f:
+            assert f.read() == CONTENT
+    finally:
+        stop_server(server)
+
+
+def test_parallel_download_without_range_support(monkeypatch, tmp_path):
+    monkeypatch.setattr(fd_download, 'PARALLEL_DOWNLOAD_MIN_SIZE', 1024)
+    monkeypatch.setattr(HubHandler, 'ignore_range', True)
+    use_temp_cache(monkeypatch, tmp_path)
+    server = start_server()
+    try:
+        url = 'http://127.0.0.1:{}/model.onnx'.format(server.server_port)
+        path = str(tmp_path)
+        fullname = fd_download.download(url, path, md5sum=CONTENT_MD5)
+        with open(fullname, 'rb') as f:
+            assert f.read() == CONTENT
+        assert not os.path.exists(fullname + '_tmp.state')
+    finally:
+        stop_server(server)
+
+
+def test_parallel_download_interrupted(monkeypatch, tmp_path):
+    monkeypatch.setattr(fd_download, 'PARALLEL_DOWNLOAD_MIN_SIZE', 1024)
+    monkeypatch.setattr(fd_download, 'DOWNLOAD_CHUNK_SIZE', 64 * 1024)
+    monkeypatch.setattr(fd_download, 'DOWNLOAD_STATE_INTERVAL', 0)
+    monkeypatch.setattr(HubHandler, 'write_delay', 0.01)
+    use_temp_cache(monkeypatch, tmp_path)
+    path = str(tmp_path)
+    state_file = os.path.join(path, 'model.onnx_tmp.state')
+    saved_progress = []
+    hash_file_range = fd_download._hash_file_range
+
+    def interrupt(*args):
+        hash_file_range(*args)
+        if os.path.exists(state_file):
+            with open(state_file) as f:
+                progress = sum(s[2] for s in json.load(f)["segments"])
+            if progress > 0:
+                # Ctrl-C after the progress is saved by the monitoring loop
+                saved_progress.append(progress)
+                raise KeyboardInterrupt()
+
+    monkeypatch.setattr(fd_download, '_hash_file_range', interrupt)
+    server = start_server()
+    try:
+        url = 'http://127.0.0.1:{}/model.onnx'.format(server.server_port)
+        start = time.time()
+        try:
+            fd_download.download(url, path, md5sum=CONTENT_MD5)
+            assert False, "The download should be interrupted."
+        except KeyboardInterrupt:
+            pass
+        # The workers stop after their current chunks instead of finishing
+        # their ranges
+        assert time.time() - start < 0.5
+        assert len(saved_progress) == 1
+        with open(state_file) as f:
+            segments = json.load(f)["segments"]
+        assert 0 < sum(s[2] for s in segments) < len(CONTENT)
+
+        monkeypatch.setattr(fd_download, '_hash_file_range', hash_file_range)
+        monkeypatch.setattr(HubHandler, 'write_delay', 0)
+        HubHandler.requests_log.clear()
+        fullname = fd_download.download(url, path, md5sum=CONTENT_MD5)
+        with open(fullname, 'rb') as f:
+            assert f.read() == CONTENT
+        # The downloaded ranges are not requested again
+        ranges = [r for p, r in HubHandler.requests_log if r is not None]
+        first_bytes = sorted(
+            int(r.replace('bytes=', '').split('-')[0]) for r in ranges)
+        assert first_bytes == sorted(s[0] + s[2] for s in segments
+                                     if s[0] + s[2] < s[1])
+    finally:
+        stop_server(server)
+
+
+def test_resume_download(monkeypatch, tmp_path):
+    use_temp_cache(monkeypatch, tmp_path)
+    server = start_server()
+    try:
+        url = 'http://127.0.0.1:{}/model.onnx'.format(server.server_port)
+        path = str(tmp_path)
+        with open(os.path.join(path, 'model.onnx_tmp'), 'wb') as f:
+            f.write(CONTENT[:1000000])
+        HubHandler.requests_log.clear()
+        fullname = fd_download.download(
+            url, path, md5sum=CONTENT_MD5, num_connections=1)
+        with open(fullname, 'rb') as f:
+            assert f.read() == CONTENT
+        assert HubHandler.requests_log[-1][1] == 'bytes=1000000-'
+    finally:
+        stop_server(server)
+
+
+def test_download_model_offline(monkeypatch, tmp_path):
+    use_temp_cache(monkeypatch, tmp_path)
+    server = start_server()
+    try:
+        monkeypatch.setattr(fd_download.model_server, '_url',
+                            'http://127.0.0.1:{}'.format(server.server_port))
+        path = str(tmp_path)
+        fullpath = fd_download.download_model('test_model', path=path)
+    finally:
+        stop_server(server)
+    # The hub server is gone, the model is resolved from the cache index
+    assert fd_download.download_model('test_model', path=path) == fullpath
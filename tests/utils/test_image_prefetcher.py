@@ -0,0 +1,107 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+import time
+
+import pytest
+
+from fastdeploy.vision.evaluation.utils.prefetch import ImagePrefetcher
+
+
+class CountingLoader(object):
+    """Load a sample with a random delay, and count the samples which are
+    loaded but not consumed yet."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.lock = threading.Lock()
+        self.loaded = 0
+        self.consumed = 0
+        self.max_ahead = 0
+
+    def __call__(self, sample):
+        time.sleep(random.uniform(0, 0.005))
+        if sample == self.fail_at:
+            raise IOError("Failed to load sample {}".format(sample))
+        with self.lock:
+            self.loaded += 1
+            self.max_ahead = max(self.max_ahead, self.loaded - self.consumed)
+        return sample * 10
+
+    def consume(self):
+        with self.lock:
+            self.consumed += 1
+
+
+@pytest.mark.parametrize("num_workers", [0, 1, 4])
+def test_image_prefetcher_order(num_workers):
+    samples = list(range(50))
+    loader = CountingLoader()
+    prefetcher = ImagePrefetcher(samples, loader, num_workers=num_workers)
+    assert len(prefetcher) == len(samples)
+    results = []
+    for sample, data in prefetcher:
+        loader.consume()
+        results.append((sample, data))
+    assert results == [(i, i * 10) for i in samples]
+    assert prefetcher.decode_time > 0
+    assert prefetcher.wait_time >= 0
+
+
+@pytest.mark.parametrize("num_workers,prefetch_size", [(1, None), (2, 3),
+                                                       (4, None), (4, 6)])
+def test_image_prefetcher_bounded(num_workers, prefetch_size):
+    loader = CountingLoader()
+    prefetcher = ImagePrefetcher(
+        list(range(40)),
+        loader,
+        num_workers=num_workers,
+        prefetch_size=prefetch_size)
+    expected_size = 2 * num_workers if prefetch_size is None else prefetch_size
+    assert prefetcher.prefetch_size == expected_size
+    for _ in prefetcher:
+        # A slow consumer, the workers have to wait for it
+        time.sleep(0.002)
+        loader.consume()
+    # The sample being consumed and the prefetched ones
+    assert loader.max_ahead <= prefetcher.prefetch_size + 1
+    assert loader.consumed == 40
+
+
+def test_image_prefetcher_stops_early():
+    loader = CountingLoader()
+    prefetcher = ImagePrefetcher(
+        list(range(100)), loader, num_workers=2, prefetch_size=4)
+    for i, (sample, data) in enumerate(prefetcher):
+        loader.consume()
+        if i == 4:
+            break
+    # The remaining samples are not loaded after the consumer stops
+    time.sleep(0.05)
+    assert loader.loaded <= 5 + prefetcher.prefetch_size
+
+
+@pytest.mark.parametrize("num_workers", [0, 3])
+def test_image_prefetcher_error(num_workers):
+    loader = CountingLoader(fail_at=7)
+    prefetcher = ImagePrefetcher(
+        list(range(20)), loader, num_workers=num_workers)
+    results = []
+    with pytest.raises(IOError, match="sample 7"):
+        for sample, data in prefetcher:
+            results.append(sample)
+    # The samples before the failed one are yielded in order
+    assert results == list(range(7))
@@ -0,0 +1,153 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from fastdeploy.vision.evaluation.utils import seg_metrics
+
+NUM_CLASSES = 5
+IGNORE_INDEX = 255
+
+
+def naive_areas(preds, labels, num_classes, ignore_index):
+    """Count the areas class by class over all the images."""
+    intersect_area = np.zeros(num_classes)
+    pred_area = np.zeros(num_classes)
+    label_area = np.zeros(num_classes)
+    for pred, label in zip(preds, labels):
+        mask = (label != ignore_index) & (label >= 0) & (label < num_classes)
+        for i in range(num_classes):
+            pred_i = (pred == i) & mask
+            label_i = (label == i) & mask
+            intersect_area[i] += np.sum(pred_i & label_i)
+            pred_area[i] += np.sum(pred_i)
+            label_area[i] += np.sum(label_i)
+    return intersect_area, pred_area, label_area
+
+
+def naive_mean_iou(intersect_area, pred_area, label_area):
+    ious = []
+    for i in range(len(intersect_area)):
+        union = pred_area[i] + label_area[i] - intersect_area[i]
+        ious.append(intersect_area[i] / union if union > 0 else 0)
+    return np.array(ious), np.mean(ious)
+
+
+def naive_kappa(intersect_area, pred_area, label_area):
+    total = np.sum(label_area)
+    po = np.sum(intersect_area) / total
+    pe = sum(pred_area[i] * label_area[i]
+             for i in range(len(pred_area))) / (total * total)
+    return (po - pe) / (1 - pe)
+
+
+def naive_f1_score(intersect_area, pred_area, label_area):
+    f1 = []
+    for i in range(len(intersect_area)):
+        if pred_area[i] == 0 or label_area[i] == 0:
+            f1.append(0)
+            continue
+        prec = intersect_area[i] / pred_area[i]
+        rec = intersect_area[i] / label_area[i]
+        f1.append(2 * prec * rec / (prec + rec) if prec + rec > 0 else 0)
+    return np.array(f1)
+
+
+def random_images(num_images, seed):
+    rng = np.random.RandomState(seed)
+    preds, labels = [], []
+    for _ in range(num_images):
+        shape = (rng.randint(4, 32), rng.randint(4, 32))
+        label = rng.randint(0, NUM_CLASSES, shape)
+        # Most of the pixels are predicted right
+        pred = np.where(
+            rng.rand(*shape) < 0.7, label, rng.randint(0, NUM_CLASSES, shape))
+        label[rng.rand(*shape) < 0.1] = IGNORE_INDEX
+        # The predictions out of the classes, e.g. the background of another
+        # label set, are never right
+        pred[rng.rand(*shape) < 0.05] = NUM_CLASSES + 3
+        pred[rng.rand(*shape) < 0.02] = -1
+        preds.append(pred.astype(np.int32))
+        labels.append(label.astype(np.int64))
+    return preds, labels
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_confusion_matrix_metrics(seed):
+    preds, labels = random_images(6, seed)
+    conf_mat = seg_metrics.ConfusionMatrix(NUM_CLASSES, IGNORE_INDEX)
+    for pred, label in zip(preds, labels):
+        conf_mat.update(pred, label)
+    expected = naive_areas(preds, labels, NUM_CLASSES, IGNORE_INDEX)
+
+    for area, expected_area in zip(conf_mat.areas(), expected):
+        np.testing.assert_array_equal(area, expected_area)
+    class_iou, miou = conf_mat.mean_iou()
+    expected_iou, expected_miou = naive_mean_iou(*expected)
+    np.testing.assert_allclose(class_iou, expected_iou)
+    assert miou == pytest.approx(expected_miou)
+    assert conf_mat.kappa() == pytest.approx(naive_kappa(*expected))
+    np.testing.assert_allclose(conf_mat.f1_score(), naive_f1_score(*expected))
+
+    # The same as the metrics of one image by calculate_area
+    areas = seg_metrics.calculate_area(preds[0], labels[0], NUM_CLASSES,
+                                       IGNORE_INDEX)
+    expected = naive_areas(preds[:1], labels[:1], NUM_CLASSES, IGNORE_INDEX)
+    for area, expected_area in zip(areas, expected):
+        np.testing.assert_array_equal(area, expected_area)
+
+
+def test_confusion_matrix_ignore_index():
+    label = np.array([[0, 1, 255], [2, 255, 1]])
+    pred = np.array([[0, 2, 1], [2, 0, 1]])
+    conf_mat = seg_metrics.ConfusionMatrix(3, ignore_index=255)
+    conf_mat.update(pred, label)
+    intersect_area, pred_area, label_area = conf_mat.areas()
+    np.testing.assert_array_equal(intersect_area, [1, 1, 1])
+    np.testing.assert_array_equal(pred_area, [1, 1, 2])
+    np.testing.assert_array_equal(label_area, [1, 2, 1])
+
+    # Another ignore index, 255 is out of the classes and ignored as well
+    label = np.array([[0, 1, 255], [2, 0, 1]])
+    conf_mat = seg_metrics.ConfusionMatrix(3, ignore_index=0)
+    conf_mat.update(pred, label)
+    intersect_area, pred_area, label_area = conf_mat.areas()
+    np.testing.assert_array_equal(intersect_area, [0, 1, 1])
+    np.testing.assert_array_equal(pred_area, [0, 1, 2])
+    np.testing.assert_array_equal(label_area, [0, 2, 1])
+
+
+def test_confusion_matrix_out_of_range_predictions():
+    label = np.array([0, 1, 1, 2])
+    pred = np.array([0, 7, -1, 2])
+    conf_mat = seg_metrics.ConfusionMatrix(3)
+    conf_mat.update(pred, label)
+    intersect_area, pred_area, label_area = conf_mat.areas()
+    # The out of range predictions are wrong for their labels
+    np.testing.assert_array_equal(intersect_area, [1, 0, 1])
+    np.testing.assert_array_equal(pred_area, [1, 0, 1])
+    np.testing.assert_array_equal(label_area, [1, 2, 1])
+    class_iou, miou = conf_mat.mean_iou()
+    np.testing.assert_allclose(class_iou, [1, 0, 1])
+
+
+def test_confusion_matrix_reset_and_shape_mismatch():
+    conf_mat = seg_metrics.ConfusionMatrix(3)
+    conf_mat.update(np.array([0, 1]), np.array([0, 1]))
+    conf_mat.reset()
+    for area in conf_mat.areas():
+        np.testing.assert_array_equal(area, [0, 0, 0])
+    with pytest.raises(ValueError):
+        conf_mat.update(np.zeros([2, 3]), np.zeros([3, 2]))
@@ -0,0 +1,462 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from fastdeploy.serving.server import SimpleServer
+from fastdeploy.serving import utils as serving_utils
+from fastdeploy.serving.batcher import DynamicBatcher
+from fastdeploy.serving.handler import BaseModelHandler
+from fastdeploy.serving.model_manager import (ModelManager, ServerBusyError,
+                                              DEFAULT_INFLIGHT_PER_SLOT)
+
+WAIT_TIMEOUT = 10
+
+
+class StubPredictor(object):
+    """Stand-in of a FastDeploy model, the result of a request is twice its
+    value. The predictions wait for the gate while it's closed.
+    """
+
+    def __init__(self, parent=None):
+        if parent is None:
+            self.gate = threading.Event()
+            self.gate.set()
+        else:
+            self.gate = parent.gate
+        self.batches = []
+        self.clones = []
+        self.running = 0
+
+    def clone(self):
+        predictor = StubPredictor(self)
+        self.clones.append(predictor)
+        return predictor
+
+    def predict(self, value):
+        return self.batch_predict([value])[0]
+
+    def batch_predict(self, values):
+        self.running += 1
+        self.batches.append(list(values))
+        assert self.gate.wait(WAIT_TIMEOUT), "The gate is never opened."
+        self.running -= 1
+        return [2 * v for v in values]
+
+
+class StubHandler(BaseModelHandler):
+    """The request data is {"value": number}, the values which are not numbers
+    fail on their own. The result is returned in the negotiated format.
+    """
+
+    @classmethod
+    def encode(cls, result, parameters):
+        response_format = parameters.get("response_format", "json")
+        if response_format == "json":
+            return result
+        return serving_utils.ndarrays_to_bytes(
+            {"result": np.array([result], dtype=np.float32)}, response_format)
+
+    @classmethod
+    def check(cls, data):
+        if not isinstance(data.get("value"), (int, float)):
+            raise ValueError("The value is not a number.")
+        return data["value"]
+
+    @classmethod
+    def process(cls, predictor, data, parameters):
+        return cls.encode(predictor.predict(cls.check(data)), parameters)
+
+    @classmethod
+    def batch_process(cls, predictor, data_list, parameters_list):
+        outputs = [None] * len(data_list)
+        values, indices = [], []
+        for i, data in enumerate(data_list):
+            try:
+                values.append(cls.check(data))
+                indices.append(i)
+            except Exception as e:
+                outputs[i] = e
+        if len(values) > 0:
+            for i, result in zip(indices, predictor.batch_predict(values)):
+                outputs[i] = cls.encode(result, parameters_list[i])
+        return outputs
+
+
+class JsonOnlyHandler(StubHandler):
+    """The results can only be returned as JSON."""
+
+    @classmethod
+    def encode(cls, result, parameters):
+        return result
+
+
+def wait_until(condition):
+    deadline = time.time() + WAIT_TIMEOUT
+    while not condition():
+        assert time.time() < deadline, "Timeout while waiting."
+        time.sleep(0.005)
+
+
+def test_dynamic_batcher_coalesces_requests():
+    predictor = StubPredictor()
+    lock = threading.Lock()
+    batcher = DynamicBatcher(
+        StubHandler, predictor, lock, max_batch_size=4,
+        max_queue_delay_ms=1000)
+    try:
+        # The predictor is busy, the requests queue up
+        with lock:
+            futures = [batcher.submit({"value": i}, {}) for i in range(8)]
+        results = [f.result(WAIT_TIMEOUT) for f in futures]
+    finally:
+        batcher.stop()
+    assert results == [2 * i for i in range(8)]
+    assert predictor.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    stats = batcher.get_stats()
+    assert stats["num_batches"] == 2
+    assert stats["num_requests"] == 8
+    assert stats["avg_batch_size"] == 4
+
+
+def test_dynamic_batcher_max_queue_delay():
+    predictor = StubPredictor()
+    batcher = DynamicBatcher(
+        StubHandler, predictor, threading.Lock(), max_batch_size=4,
+        max_queue_delay_ms=50)
+    try:
+        start = time.perf_counter()
+        assert batcher.predict({"value": 3}, {}) == 6
+        elapsed = time.perf_counter() - start
+    finally:
+        batcher.stop()
+    # The batch is not full, it runs once the delay expires
+    assert predictor.batches == [[3]]
+    assert 0.04 < elapsed < WAIT_TIMEOUT
+
+
+def test_dynamic_batcher_fails_only_bad_requests():
+    predictor = StubPredictor()
+    lock = threading.Lock()
+    batcher = DynamicBatcher(
+        StubHandler, predictor, lock, max_batch_size=4,
+        max_queue_delay_ms=1000)
+    try:
+        with lock:
+            futures = [
+                batcher.submit({"value": v}, {}) for v in [1, "x", 3, None]
+            ]
+        assert futures[0].result(WAIT_TIMEOUT) == 2
+        assert futures[2].result(WAIT_TIMEOUT) == 6
+        for i in [1, 3]:
+            with pytest.raises(ValueError):
+                futures[i].result(WAIT_TIMEOUT)
+    finally:
+        batcher.stop()
+    # The bad requests are left out of the batch
+    assert predictor.batches == [[1, 3]]
+
+
+def test_dynamic_batcher_handler_error():
+    class BrokenHandler(StubHandler):
+        @classmethod
+        def batch_process(cls, predictor, data_list, parameters_list):
+            raise RuntimeError("broken")
+
+    batcher = DynamicBatcher(
+        BrokenHandler, StubPredictor(), threading.Lock(), max_batch_size=2,
+        max_queue_delay_ms=1)
+    try:
+        future = batcher.submit({"value": 1}, {})
+        with pytest.raises(RuntimeError):
+            future.result(WAIT_TIMEOUT)
+        # The batcher keeps serving after the error
+        assert batcher.submit({"value": 2}, {}).exception(
+            WAIT_TIMEOUT) is not None
+    finally:
+        batcher.stop()
+
+
+def test_dynamic_batcher_drops_cancelled_requests():
+    predictor = StubPredictor()
+    lock = threading.Lock()
+    batcher = DynamicBatcher(
+        StubHandler, predictor, lock, max_batch_size=2,
+        max_queue_delay_ms=1000)
+    try:
+        with lock:
+            futures = [batcher.submit({"value": i}, {}) for i in range(4)]
+            assert futures[2].cancel()
+        assert futures[3].result(WAIT_TIMEOUT) == 6
+    finally:
+        batcher.stop()
+    assert predictor.batches == [[0, 1], [3]]
+
+
+def test_model_manager_least_loaded_dispatch():
+    predictor = StubPredictor()
+    manager = ModelManager(StubHandler, predictor, num_instances=3)
+    instances = [predictor] + predictor.clones
+    predictor.gate.clear()
+    futures = [manager.submit({"value": i}, {}) for i in range(3)]
+    # Every request goes to an idle instance
+    wait_until(lambda: all(p.running == 1 for p in instances))
+    assert manager.get_load() == [1, 1, 1]
+    futures.append(manager.submit({"value": 3}, {}))
+    assert sorted(manager.get_load()) == [1, 1, 2]
+    predictor.gate.set()
+    assert [f.result(WAIT_TIMEOUT) for f in futures] == [0, 2, 4, 6]
+    wait_until(lambda: manager.get_load() == [0, 0, 0])
+    assert sum(len(p.batches) for p in instances) == 4
+
+
+def test_model_manager_server_busy():
+    predictor = StubPredictor()
+    manager = ModelManager(StubHandler, predictor, max_inflight=2)
+    predictor.gate.clear()
+    futures = [manager.submit({"value": i}, {}) for i in range(2)]
+    with pytest.raises(ServerBusyError):
+        manager.submit({"value": 2}, {})
+    with pytest.raises(ServerBusyError):
+        manager.predict({"value": 2}, {})
+    predictor.gate.set()
+    assert [f.result(WAIT_TIMEOUT) for f in futures] == [0, 2]
+    wait_until(lambda: manager.get_load() == [0])
+    assert manager.predict({"value": 2}, {}) == 4
+
+
+def test_model_manager_default_max_inflight():
+    predictor = StubPredictor()
+    manager = ModelManager(StubHandler, predictor)
+    predictor.gate.clear()
+    futures = [
+        manager.submit({"value": i}, {})
+        for i in range(DEFAULT_INFLIGHT_PER_SLOT)
+    ]
+    with pytest.raises(ServerBusyError):
+        manager.submit({"value": 0}, {})
+    predictor.gate.set()
+    for f in futures:
+        f.result(WAIT_TIMEOUT)
+    # 0 means unlimited
+    manager = ModelManager(StubHandler, predictor, max_inflight=0)
+    predictor.gate.clear()
+    futures = [manager.submit({"value": i}, {}) for i in range(50)]
+    predictor.gate.set()
+    for f in futures:
+        f.result(WAIT_TIMEOUT)
+
+
+def test_model_manager_cancel_queued_request():
+    predictor = StubPredictor()
+    manager = ModelManager(StubHandler, predictor)
+    predictor.gate.clear()
+    running = manager.submit({"value": 1}, {})
+    wait_until(lambda: predictor.running == 1)
+    queued = manager.submit({"value": 2}, {})
+    assert manager.get_load() == [2]
+    assert queued.cancel()
+    # The cancelled request releases its slot at once
+    assert manager.get_load() == [1]
+    predictor.gate.set()
+    assert running.result(WAIT_TIMEOUT) == 2
+    assert predictor.batches == [[1]]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "json"),
+    ("", "json"),
+    ("*/*", "json"),
+    ("application/json", "json"),
+    ("application/x-npz", "npz"),
+    ("application/x-msgpack", "msgpack"),
+    ("text/html, application/x-npz", "npz"),
+    ("application/x-npz;q=0.5, application/json", "json"),
+    ("application/json;q=0.2, application/x-npz;q=0.8", "npz"),
+    ("application/x-npz;q=0, application/json", "json"),
+    ("application/x-msgpack, application/x-npz", "msgpack"),
+])
+def test_negotiate_response_format(accept, expected):
+    assert serving_utils.negotiate_response_format(accept) == expected
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, True),
+    ("application/x-npz", False),
+    ("application/x-npz, */*;q=0.1", True),
+    ("application/x-npz, application/json;q=0", False),
+    ("application/*", True),
+])
+def test_accepts_json(accept, expected):
+    assert serving_utils.accepts_json(accept) == expected
+
+
+def test_ndarrays_to_bytes_round_trip():
+    arrays = {
+        "boxes": np.random.rand(5, 4).astype(np.float32),
+        "label_ids": np.arange(5, dtype=np.int32),
+        "label_map": np.random.randint(0, 255, [7, 9]).astype(np.uint8),
+        "empty": np.zeros([0], dtype=np.float32),
+    }
+    formats = ["npz"]
+    try:
+        import msgpack
+        formats.append("msgpack")
+    except ImportError:
+        pass
+    for response_format in formats:
+        decoded = serving_utils.bytes_to_ndarrays(
+            serving_utils.ndarrays_to_bytes(arrays, response_format),
+            response_format)
+        assert sorted(decoded.keys()) == sorted(arrays.keys())
+        for name, arr in arrays.items():
+            assert decoded[name].dtype == arr.dtype
+            np.testing.assert_array_equal(decoded[name], arr)
+    with pytest.raises(ValueError):
+        serving_utils.ndarrays_to_bytes(arrays, "pickle")
+
+
+def create_client(handler=StubHandler, async_mode=False, **kwargs):
+    from fastapi.testclient import TestClient
+    predictor = StubPredictor()
+    app = SimpleServer()
+    app.register(
+        "fd/model",
+        handler,
+        predictor,
+        async_mode=async_mode,
+        **kwargs)
+    return TestClient(app), predictor, app
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_http_predict(async_mode):
+    client, predictor, _ = create_client(async_mode=async_mode)
+    resp = client.post(
+        "/fd/model", json={"data": {
+            "value": 21
+        },
+                           "parameters": {}})
+    assert resp.status_code == 200
+    assert resp.json() == {"result": 42}
+    resp = client.post(
+        "/fd/model", json={"data": {
+            "value": "x"
+        },
+                           "parameters": {}})
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_http_binary_response(async_mode):
+    client, predictor, _ = create_client(async_mode=async_mode)
+    resp = client.post(
+        "/fd/model",
+        json={"data": {
+            "value": 1.5
+        },
+              "parameters": {}},
+        headers={"Accept": "application/x-npz"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-npz"
+    arrays = serving_utils.bytes_to_ndarrays(resp.content, "npz")
+    np.testing.assert_array_equal(arrays["result"],
+                                  np.array([3.0], dtype=np.float32))
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_http_not_acceptable(async_mode):
+    client, predictor, _ = create_client(
+        handler=JsonOnlyHandler, async_mode=async_mode)
+    body = {"data": {"value": 1}, "parameters": {}}
+    resp = client.post(
+        "/fd/model", json=body, headers={"Accept": "application/x-npz"})
+    assert resp.status_code == 406
+    # JSON is acceptable as the fallback
+    resp = client.post(
+        "/fd/model",
+        json=body,
+        headers={"Accept": "application/x-npz, application/json;q=0.5"})
+    assert resp.status_code == 200
+    assert resp.json() == {"result": 2}
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_http_server_busy(async_mode):
+    client, predictor, _ = create_client(
+        async_mode=async_mode, max_inflight=1)
+    predictor.gate.clear()
+    body = {"data": {"value": 1}, "parameters": {}}
+    responses = []
+    thread = threading.Thread(
+        target=lambda: responses.append(client.post("/fd/model", json=body)))
+    thread.start()
+    try:
+        wait_until(lambda: predictor.running == 1)
+        resp = client.post("/fd/model", json=body)
+        assert resp.status_code == 503
+    finally:
+        predictor.gate.set()
+        thread.join()
+    assert responses[0].status_code == 200
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_http_upload(async_mode):
+    class UploadHandler(StubHandler):
+        @classmethod
+        def check(cls, data):
+            return len(data["image"])
+
+    client, predictor, _ = create_client(
+        handler=UploadHandler, async_mode=async_mode)
+    resp = client.post(
+        "/fd/model/upload",
+        files={"image": ("image.jpg", b"\x00" * 10, "image/jpeg")},
+        data={"parameters": json.dumps({})})
+    assert resp.status_code == 200
+    assert resp.json() == {"result": 20}
+    resp = client.post("/fd/model/upload", data={"parameters": "{}"})
+    assert resp.status_code == 400
+
+
+def test_async_predict_cancelled():
+    _, predictor, app = create_client(async_mode=True)
+    manager = app._model_manager
+    predictor.gate.clear()
+
+    async def run():
+        running = asyncio.ensure_future(
+            app._router_manager._async_predict({"value": 1}, {}))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(
+            app._router_manager._async_predict({"value": 2}, {}))
+        await asyncio.sleep(0.05)
+        assert manager.get_load() == [2]
+        # The client of the queued request is gone
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert manager.get_load() == [1]
+        predictor.gate.set()
+        return await running
+
+    assert asyncio.run(run()) == 2
+    assert predictor.batches == [[1]]
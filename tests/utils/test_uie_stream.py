@@ -0,0 +1,72 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from fastdeploy.text import UIEModel
+
+
+class UIEResult(object):
+    def __init__(self, text):
+        self.text = text
+
+    def get_dict(self):
+        return {"text": self.text}
+
+
+class Predictor(object):
+    """Stand-in of the C++ UIEModel, which records the number of texts read
+    from the input before every prediction.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.num_read = []
+        self.lock = threading.Lock()
+        self.read = 0
+
+    def predict(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+            self.num_read.append(self.read)
+        return [{"name": [UIEResult(text)]} for text in texts]
+
+
+def test_uie_predict_stream():
+    model = UIEModel.__new__(UIEModel)
+    model._model = Predictor()
+
+    def corpus():
+        for i in range(10):
+            model._model.read += 1
+            yield "text{}".format(i)
+
+    results = list(model.predict_stream(corpus(), batch_size=4))
+    assert [r["name"][0].text for r in results] == [
+        "text{}".format(i) for i in range(10)
+    ]
+    assert [len(b) for b in model._model.batches] == [4, 4, 2]
+    # At most one batch is read ahead of the predicted one
+    for i, num_read in enumerate(model._model.num_read):
+        assert num_read <= (i + 2) * 4
+
+    model._model = Predictor()
+    stream = model.predict_stream(
+        ("text{}".format(i) for i in range(1000)),
+        batch_size=8,
+        return_dict=True)
+    assert next(stream) == {"name": [{"text": "text0"}]}
+    stream.close()
+    assert len(model._model.batches) <= 2
+    assert list(model.predict_stream([], batch_size=4)) == []
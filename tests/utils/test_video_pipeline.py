@@ -0,0 +1,115 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import threading
+
+import numpy as np
+import pytest
+
+import fastdeploy as fd
+
+
+class StatelessModel(object):
+    def __init__(self):
+        self.batch_sizes = []
+        self.threads = set()
+
+    def predict(self, frame):
+        self.batch_sizes.append(1)
+        return int(frame[0, 0, 0])
+
+    def batch_predict(self, frames):
+        self.batch_sizes.append(len(frames))
+        self.threads.add(threading.current_thread().name)
+        return [int(frame[0, 0, 0]) for frame in frames]
+
+
+class StatefulModel(object):
+    """Counts the frames, the result depends on all the previous frames."""
+
+    def __init__(self):
+        self.count = 0
+
+    def predict(self, frame):
+        self.count += 1
+        time.sleep(0.001)
+        return (self.count, int(frame[0, 0, 0]))
+
+
+def make_frames(num_frames):
+    for i in range(num_frames):
+        yield np.full((4, 6, 3), i % 256, dtype=np.uint8)
+
+
+def test_video_pipeline_batches_stateless_model():
+    model = StatelessModel()
+    outputs = []
+    pipeline = fd.vision.VideoPipeline(
+        model,
+        make_frames(50),
+        sink=lambda index, frame, result: outputs.append((index, result)),
+        batch_size=8,
+        queue_size=4)
+    stats = pipeline.run()
+    assert outputs == [(i, i) for i in range(50)]
+    assert sum(model.batch_sizes) == 50 and max(model.batch_sizes) == 8
+    assert model.threads == {threading.current_thread().name}
+    for stage in ["decode", "predict", "encode"]:
+        assert stats[stage]["frames"] == 50
+    assert stats["skipped_frames"] == 0 and stats["fps"] > 0
+
+
+def test_video_pipeline_keeps_order_of_stateful_model():
+    model = StatefulModel()
+    outputs = []
+    pipeline = fd.vision.VideoPipeline(
+        model,
+        make_frames(30),
+        sink=lambda index, frame, result: outputs.append(result),
+        visualize=lambda frame, result: frame + 1,
+        batch_size=8,
+        stateful=True)
+    pipeline.run()
+    assert outputs == [(i + 1, i) for i in range(30)]
+
+
+def test_video_pipeline_skip_frames():
+    class SlowModel(StatefulModel):
+        def predict(self, frame):
+            time.sleep(0.02)
+            return super(SlowModel, self).predict(frame)
+
+    outputs = []
+    pipeline = fd.vision.VideoPipeline(
+        SlowModel(),
+        make_frames(40),
+        sink=lambda index, frame, result: outputs.append(index),
+        skip_frames=True,
+        fps=200)
+    stats = pipeline.run()
+    assert stats["skipped_frames"] > 0
+    assert len(outputs) + stats["skipped_frames"] == 40
+    assert outputs == sorted(outputs)
+
+
+def test_video_pipeline_raises_error_of_stage():
+    def sink(index, frame, result):
+        if index == 5:
+            raise ValueError("sink failed")
+
+    pipeline = fd.vision.VideoPipeline(
+        StatelessModel(), make_frames(1000), sink=sink, queue_size=2)
+    with pytest.raises(ValueError):
+        pipeline.run()
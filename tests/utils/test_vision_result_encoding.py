@@ -0,0 +1,183 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import numpy as np
+import pytest
+
+import fastdeploy as fd
+from fastdeploy.vision import utils as vis_utils
+
+
+def make_detection(with_masks=True):
+    rng = np.random.RandomState(0)
+    result = fd.C.vision.DetectionResult()
+    result.boxes = rng.uniform(0, 100, [3, 4]).astype(np.float32).tolist()
+    result.scores = [0.9, 0.5, 0.25]
+    result.label_ids = [1, 0, 7]
+    if with_masks:
+        masks = []
+        for i in range(3):
+            mask = fd.C.vision.Mask()
+            data = np.zeros([4, 5], dtype=np.uint8)
+            data[i:i + 2, 1:4] = 1
+            mask.data = data.ravel().tolist()
+            mask.shape = [4, 5]
+            masks.append(mask)
+        result.masks = masks
+        result.contain_masks = True
+    return result
+
+
+def make_segmentation():
+    rng = np.random.RandomState(1)
+    result = fd.C.vision.SegmentationResult()
+    label_map = np.zeros([6, 8], dtype=np.uint8)
+    label_map[2:5, 3:7] = 3
+    label_map[0, :] = 255
+    result.label_map = label_map.ravel().tolist()
+    result.score_map = rng.uniform(0, 1, [6 * 8]).astype(np.float32).tolist()
+    result.shape = [6, 8]
+    result.contain_score_map = True
+    return result
+
+
+def make_matting():
+    rng = np.random.RandomState(2)
+    result = fd.C.vision.MattingResult()
+    result.alpha = rng.uniform(0, 1, [5 * 7]).astype(np.float32).tolist()
+    result.foreground = rng.uniform(0, 255, [5 * 7 * 3]).astype(
+        np.float32).tolist()
+    result.shape = [5, 7]
+    result.contain_foreground = True
+    return result
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.int32, np.int64])
+def test_rle_round_trip(dtype):
+    rng = np.random.RandomState(3)
+    arr = np.repeat(rng.randint(0, 5, [40]), rng.randint(1, 9, [40]))
+    arr = arr[:96].reshape(8, 12).astype(dtype)
+    encoded = vis_utils.rle_encode(arr)
+    # The encoding must survive the JSON serialization
+    decoded = vis_utils.decode_array(json.loads(json.dumps(encoded)))
+    assert decoded.dtype == arr.dtype
+    np.testing.assert_array_equal(decoded, arr)
+    assert len(encoded["values"]) < arr.size
+
+
+@pytest.mark.parametrize("shape", [[0], [1], [3, 1, 2]])
+def test_rle_round_trip_edge_shapes(shape):
+    arr = np.arange(int(np.prod(shape)), dtype=np.int32).reshape(shape)
+    decoded = vis_utils.decode_array(vis_utils.rle_encode(arr))
+    assert list(decoded.shape) == shape
+    np.testing.assert_array_equal(decoded, arr)
+
+
+def test_float16_round_trip():
+    rng = np.random.RandomState(4)
+    arr = rng.uniform(-10, 10, [6, 9]).astype(np.float32)
+    encoded = vis_utils.float16_encode(arr)
+    decoded = vis_utils.decode_array(json.loads(json.dumps(encoded)))
+    assert decoded.dtype == np.float32
+    assert decoded.shape == arr.shape
+    np.testing.assert_allclose(decoded, arr, rtol=1e-3, atol=1e-3)
+
+
+def test_decode_array_plain_list_and_unknown_encoding():
+    assert vis_utils.decode_array([1, 2, 3]) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        vis_utils.decode_array({"encoding": "zip"})
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json_to_detection(compress):
+    result = make_detection()
+    decoded = vis_utils.json_to_detection(
+        json.loads(vis_utils.fd_result_to_json(result, compress)))
+    np.testing.assert_allclose(decoded.boxes, result.boxes)
+    np.testing.assert_allclose(decoded.scores, result.scores)
+    assert decoded.label_ids == result.label_ids
+    assert decoded.contain_masks
+    assert len(decoded.masks) == len(result.masks)
+    for mask, expected in zip(decoded.masks, result.masks):
+        assert mask.data == expected.data
+        assert mask.shape == expected.shape
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json_to_segmentation(compress):
+    result = make_segmentation()
+    decoded = vis_utils.json_to_segmentation(
+        json.loads(vis_utils.fd_result_to_json(result, compress)))
+    assert decoded.label_map == result.label_map
+    assert decoded.shape == result.shape
+    assert decoded.contain_score_map
+    # The score map is encoded as float16 in the compressed JSON
+    np.testing.assert_allclose(
+        decoded.score_map, result.score_map, rtol=1e-3, atol=1e-3)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json_to_matting(compress):
+    result = make_matting()
+    decoded = vis_utils.json_to_matting(
+        json.loads(vis_utils.fd_result_to_json(result, compress)))
+    assert decoded.shape == result.shape
+    assert decoded.contain_foreground
+    np.testing.assert_allclose(
+        decoded.alpha, result.alpha, rtol=1e-3, atol=1e-3)
+    np.testing.assert_allclose(
+        decoded.foreground, result.foreground, rtol=1e-3, atol=0.1)
+
+
+def test_json_to_classify():
+    result = fd.C.vision.ClassifyResult()
+    result.label_ids = [3, 1]
+    result.scores = [0.75, 0.125]
+    decoded = vis_utils.json_to_classify(
+        json.loads(vis_utils.fd_result_to_json(result)))
+    assert decoded.label_ids == result.label_ids
+    assert decoded.scores == result.scores
+
+
+def test_numpy_views_are_read_only():
+    result = make_segmentation()
+    label_map = result.label_map_numpy()
+    assert not label_map.flags.writeable
+    with pytest.raises(ValueError):
+        label_map[0] = 1
+    np.testing.assert_array_equal(label_map, result.label_map)
+
+
+def test_setter_refuses_while_views_exist():
+    result = make_detection(with_masks=False)
+    scores = result.scores_numpy()
+    with pytest.raises(RuntimeError):
+        result.scores = [0.1]
+    # The other members are not viewed
+    result.label_ids = [2, 2, 2]
+    # The view keeps the result alive
+    expected = np.array(result.scores, dtype=np.float32)
+    del result
+    np.testing.assert_array_equal(scores, expected)
+
+    result = make_detection(with_masks=False)
+    boxes = result.boxes_numpy().reshape(-1)
+    with pytest.raises(RuntimeError):
+        result.boxes = []
+    del boxes
+    result.boxes = []
+    assert result.boxes_numpy().shape == (0, 4)
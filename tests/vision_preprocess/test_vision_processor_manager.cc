@@ -0,0 +1,112 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <memory>
+#include <vector>
+#include "fastdeploy/vision.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+// A preprocessor which runs the processors in order and returns the batched
+// tensor, the same as the preprocessors of the models
+class TestPreprocessor : public vision::ProcessorManager {
+ public:
+  TestPreprocessor() {
+    std::vector<float> mean({0.485, 0.456, 0.406});
+    std::vector<float> std({0.229, 0.224, 0.225});
+    processors_.push_back(std::make_shared<vision::Resize>(40, 32));
+    processors_.push_back(std::make_shared<vision::BGR2RGB>());
+    processors_.push_back(
+        std::make_shared<vision::NormalizeAndPermute>(mean, std));
+  }
+
+  bool Apply(vision::FDMatBatch* image_batch,
+             std::vector<FDTensor>* outputs) override {
+    for (auto& processor : processors_) {
+      image_batch->proc_lib = vision::ProcLib::OPENCV;
+      if (!(*processor)(image_batch)) {
+        return false;
+      }
+    }
+    outputs->resize(1);
+    (*outputs)[0] = std::move(*(image_batch->Tensor()));
+    return true;
+  }
+
+ private:
+  std::vector<std::shared_ptr<vision::Processor>> processors_;
+};
+
+std::vector<cv::Mat> CreateImages(int num) {
+  std::vector<cv::Mat> images;
+  for (int i = 0; i < num; ++i) {
+    // The images are in different sizes before resizing
+    cv::Mat image(48 + 4 * i, 64 + 8 * i, CV_8UC3);
+    cv::randu(image, cv::Scalar::all(0), cv::Scalar::all(255));
+    images.push_back(image);
+  }
+  return images;
+}
+
+TEST(fastdeploy, processor_manager_use_cpu_threads) {
+  TestPreprocessor preprocessor;
+  ASSERT_EQ(preprocessor.CpuThreads(), 1);
+  preprocessor.UseCpuThreads(4);
+  ASSERT_EQ(preprocessor.CpuThreads(), 4);
+  preprocessor.UseCpuThreads(2);
+  ASSERT_EQ(preprocessor.CpuThreads(), 2);
+  // Not greater than 1 disables the thread pool
+  preprocessor.UseCpuThreads(1);
+  ASSERT_EQ(preprocessor.CpuThreads(), 1);
+  preprocessor.UseCpuThreads(0);
+  ASSERT_EQ(preprocessor.CpuThreads(), 1);
+}
+
+TEST(fastdeploy, processor_manager_parallel_run) {
+  CheckShape check_shape;
+  CheckData check_data;
+  CheckType check_type;
+
+  for (int batch_size : {1, 3, 8}) {
+    auto images = CreateImages(batch_size);
+    TestPreprocessor serial;
+    TestPreprocessor parallel;
+    parallel.UseCpuThreads(4);
+
+    // Run several times to reuse the caches of the preprocessors
+    for (int n = 0; n < 3; ++n) {
+      std::vector<vision::FDMat> serial_mats = vision::WrapMat(images);
+      std::vector<vision::FDMat> parallel_mats = vision::WrapMat(images);
+      std::vector<FDTensor> serial_outputs;
+      std::vector<FDTensor> parallel_outputs;
+      ASSERT_TRUE(serial.Run(&serial_mats, &serial_outputs));
+      ASSERT_TRUE(parallel.Run(&parallel_mats, &parallel_outputs));
+
+      ASSERT_EQ(serial_outputs.size(), 1);
+      ASSERT_EQ(parallel_outputs.size(), 1);
+      check_shape(serial_outputs[0].shape,
+                  std::vector<int64_t>({batch_size, 3, 32, 40}));
+      check_shape(serial_outputs[0].shape, parallel_outputs[0].shape);
+      check_type(serial_outputs[0].dtype, parallel_outputs[0].dtype);
+      check_data(reinterpret_cast<const float*>(serial_outputs[0].Data()),
+                 reinterpret_cast<const float*>(parallel_outputs[0].Data()),
+                 serial_outputs[0].Numel());
+    }
+  }
+}
+
+}  // namespace fastdeploy
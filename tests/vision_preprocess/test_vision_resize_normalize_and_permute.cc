@@ -0,0 +1,110 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <vector>
+#include "fastdeploy/vision.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, opencv_resize_normalize_and_permute_letterbox) {
+  CheckShape check_shape;
+  CheckData check_data;
+  CheckType check_type;
+
+  cv::Mat mat(48, 64, CV_8UC3);
+  cv::randu(mat, cv::Scalar::all(0), cv::Scalar::all(255));
+  cv::Mat mat1 = mat.clone();
+
+  vision::Mat mat_separated(mat);
+  vision::Mat mat_fused(mat1);
+
+  std::vector<float> alpha({1.0 / 255, 1.0 / 255, 1.0 / 255});
+  std::vector<float> beta({0.0, 0.0, 0.0});
+  std::vector<float> pad_value({114.0, 114.0, 114.0});
+  vision::Resize::Run(&mat_separated, 32, 24, -1.0, -1.0, 1, false,
+                      vision::ProcLib::OPENCV);
+  vision::Pad::Run(&mat_separated, 4, 4, 0, 0, pad_value,
+                   vision::ProcLib::OPENCV);
+  vision::ConvertAndPermute::Run(&mat_separated, alpha, beta, true,
+                                 vision::ProcLib::OPENCV);
+  vision::ResizeNormalizeAndPermute::Run(&mat_fused, 32, 24, {4, 4, 0, 0},
+                                         pad_value, alpha, beta, true, 1,
+                                         vision::ProcLib::OPENCV);
+
+  FDTensor separated;
+  FDTensor fused;
+
+  mat_separated.ShareWithTensor(&separated);
+  mat_fused.ShareWithTensor(&fused);
+
+  check_shape(separated.shape, fused.shape);
+  check_data(reinterpret_cast<const float*>(separated.Data()),
+             reinterpret_cast<const float*>(fused.Data()), separated.Numel());
+  check_type(separated.dtype, fused.dtype);
+}
+
+TEST(fastdeploy, opencv_resize_normalize_and_permute_fuse_transforms) {
+  CheckShape check_shape;
+  CheckData check_data;
+  CheckType check_type;
+
+  cv::Mat mat(64, 80, CV_8UC3);
+  cv::randu(mat, cv::Scalar::all(0), cv::Scalar::all(255));
+  cv::Mat mat1 = mat.clone();
+
+  vision::Mat mat_separated(mat);
+  vision::Mat mat_fused(mat1);
+
+  std::vector<float> mean({0.485, 0.456, 0.406});
+  std::vector<float> std({0.229, 0.224, 0.225});
+  auto create_processors = [&mean, &std]() {
+    std::vector<std::shared_ptr<vision::Processor>> processors;
+    processors.push_back(std::make_shared<vision::BGR2RGB>());
+    processors.push_back(std::make_shared<vision::ResizeByShort>(40));
+    processors.push_back(std::make_shared<vision::CenterCrop>(32, 32));
+    processors.push_back(
+        std::make_shared<vision::NormalizeAndPermute>(mean, std));
+    return processors;
+  };
+  auto separated_processors = create_processors();
+  auto fused_processors = create_processors();
+  vision::FuseTransforms(&fused_processors);
+  ASSERT_EQ(fused_processors.size(), 1);
+  ASSERT_EQ(fused_processors[0]->Name(), "ResizeNormalizeAndPermute");
+
+  for (auto& processor : separated_processors) {
+    ASSERT_TRUE((*processor)(&mat_separated, vision::ProcLib::OPENCV));
+  }
+  for (auto& processor : fused_processors) {
+    ASSERT_TRUE((*processor)(&mat_fused, vision::ProcLib::OPENCV));
+  }
+
+  FDTensor separated;
+  FDTensor fused;
+
+  mat_separated.ShareWithTensor(&separated);
+  mat_fused.ShareWithTensor(&fused);
+
+  check_shape(separated.shape, fused.shape);
+  check_data(reinterpret_cast<const float*>(separated.Data()),
+             reinterpret_cast<const float*>(fused.Data()), separated.Numel(),
+             1e-05, 1e-05);
+  check_type(separated.dtype, fused.dtype);
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,90 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <vector>
+#include "fastdeploy/vision.h"
+#include "fastdeploy/vision/utils/utils.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, batched_nms_class_aware) {
+  // Box 1 overlaps box 0 in the same class, box 2 overlaps box 0 but in
+  // another class, box 3 doesn't overlap any box.
+  std::vector<float> boxes = {0,  0,  10, 10, 1,  1,  10, 10,
+                              0,  0,  10, 10, 20, 20, 30, 30};
+  std::vector<float> scores = {0.9, 0.8, 0.7, 0.6};
+  std::vector<int32_t> classes = {0, 0, 1, 0};
+  std::vector<int32_t> keep;
+  vision::utils::BatchedNMS(boxes.data(), scores.data(), classes.data(),
+                            nullptr, 4, 0.5, &keep);
+  ASSERT_EQ(keep, std::vector<int32_t>({0, 2, 3}));
+
+  vision::utils::BatchedNMS(boxes.data(), scores.data(), nullptr, nullptr, 4,
+                            0.5, &keep);
+  ASSERT_EQ(keep, std::vector<int32_t>({0, 3}));
+}
+
+TEST(fastdeploy, batched_nms_batch_ids) {
+  // The same boxes in two images never suppress each other
+  std::vector<float> boxes = {0, 0, 10, 10, 0, 0, 10, 10, 1, 1, 10, 10};
+  std::vector<float> scores = {0.5, 0.9, 0.7};
+  std::vector<int32_t> batch_ids = {1, 0, 1};
+  std::vector<int32_t> keep;
+  vision::utils::BatchedNMS(boxes.data(), scores.data(), nullptr,
+                            batch_ids.data(), 3, 0.5, &keep);
+  ASSERT_EQ(keep, std::vector<int32_t>({1, 2}));
+
+  // Candidates not above score_threshold or out of top_k are dropped
+  vision::utils::BatchedNMS(boxes.data(), scores.data(), nullptr,
+                            batch_ids.data(), 3, 0.99, &keep, 0.6, 1);
+  ASSERT_EQ(keep, std::vector<int32_t>({1, 2}));
+}
+
+TEST(fastdeploy, batched_nms_detection_results) {
+  std::vector<vision::DetectionResult> results(2);
+  results[0].boxes = {{0, 0, 10, 10}, {1, 1, 10, 10}, {0, 0, 10, 10}};
+  results[0].scores = {0.9, 0.8, 0.7};
+  results[0].label_ids = {0, 0, 1};
+  results[1].boxes = {{0, 0, 10, 10}, {40, 40, 50, 50}};
+  results[1].scores = {0.3, 0.6};
+  results[1].label_ids = {2, 2};
+  auto agnostic = results;
+
+  vision::utils::BatchedNMS(&results, 0.5, true);
+  ASSERT_EQ(results[0].label_ids, std::vector<int32_t>({0, 1}));
+  ASSERT_EQ(results[0].boxes[1][0], 0);
+  ASSERT_EQ(results[1].scores, std::vector<float>({0.6f, 0.3f}));
+
+  // Only the top 1 candidate of each image is kept
+  vision::utils::BatchedNMS(&agnostic, 0.5, false, 1);
+  ASSERT_EQ(agnostic[0].scores, std::vector<float>({0.9f}));
+  ASSERT_EQ(agnostic[1].scores, std::vector<float>({0.6f}));
+}
+
+TEST(fastdeploy, nms_equal_scores_index) {
+  vision::DetectionResult result;
+  result.boxes = {{0, 0, 10, 10}, {20, 20, 30, 30}, {40, 40, 50, 50}};
+  result.scores = {0.5, 0.8, 0.5};
+  result.label_ids = {0, 1, 2};
+  std::vector<int> index;
+  vision::utils::NMS(&result, 0.5, &index);
+  ASSERT_EQ(index, std::vector<int>({1, 0, 2}));
+  ASSERT_EQ(result.label_ids, std::vector<int32_t>({1, 0, 2}));
+}
+
+}  // namespace fastdeploy
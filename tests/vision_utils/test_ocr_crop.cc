@@ -0,0 +1,92 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <vector>
+#include "fastdeploy/vision.h"
+#include "fastdeploy/vision/ocr/ppocr/utils/ocr_utils.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+static cv::Mat MakeImage() {
+  cv::Mat image(240, 320, CV_8UC3);
+  cv::randu(image, cv::Scalar(0, 0, 0), cv::Scalar(255, 255, 255));
+  return image;
+}
+
+static std::vector<std::array<int, 8>> MakeBoxes() {
+  return {{10, 10, 110, 10, 110, 40, 10, 40},
+          {20, 60, 140, 80, 136, 104, 16, 84},
+          {200, 20, 230, 20, 230, 200, 200, 200},
+          {150, 150, 300, 150, 300, 170, 150, 170}};
+}
+
+TEST(fastdeploy, ocr_crop_text_regions) {
+  cv::Mat image = MakeImage();
+  auto boxes = MakeBoxes();
+  ThreadPool pool(3);
+  std::vector<cv::Mat> crops;
+  ASSERT_TRUE(vision::ocr::GetRotateCropImages(image, boxes, &crops, &pool));
+  ASSERT_EQ(crops.size(), boxes.size());
+  for (size_t i = 0; i < boxes.size(); ++i) {
+    cv::Mat expected = vision::ocr::GetRotateCropImage(image, boxes[i]);
+    ASSERT_EQ(cv::norm(crops[i], expected, cv::NORM_INF), 0);
+  }
+  // The axis-aligned box is exactly the region of the image
+  cv::Mat region = image(cv::Rect(10, 10, 100, 30));
+  ASSERT_EQ(cv::norm(crops[0], region, cv::NORM_INF), 0);
+  // The tall box is rotated
+  ASSERT_EQ(crops[2].rows, 30);
+  ASSERT_EQ(crops[2].cols, 180);
+
+  std::vector<std::array<int, 8>> empty_box = {{5, 5, 5, 5, 5, 9, 5, 9}};
+  ASSERT_FALSE(vision::ocr::GetRotateCropImages(image, empty_box, &crops));
+}
+
+TEST(fastdeploy, ocr_crop_text_regions_to_batch) {
+  cv::Mat image = MakeImage();
+  auto boxes = MakeBoxes();
+  std::vector<int> rec_image_shape = {3, 48, 320};
+  ThreadPool pool(3);
+  FDTensor batch;
+  ASSERT_TRUE(vision::ocr::CropTextRegionsToBatch(image, boxes,
+                                                  rec_image_shape, &batch,
+                                                  &pool));
+
+  std::vector<cv::Mat> crops;
+  ASSERT_TRUE(vision::ocr::GetRotateCropImages(image, boxes, &crops));
+  std::vector<FDMat> mats = vision::WrapMat(crops);
+  std::vector<FDTensor> expected;
+  vision::ocr::RecognizerPreprocessor preprocessor;
+  preprocessor.SetRecImageShape(rec_image_shape);
+  ASSERT_TRUE(preprocessor.Run(&mats, &expected, 0, crops.size(), {}));
+  ASSERT_EQ(batch.Shape(), expected[0].Shape());
+  const float* data = reinterpret_cast<const float*>(batch.Data());
+  const float* expected_data =
+      reinterpret_cast<const float*>(expected[0].Data());
+  for (int i = 0; i < batch.Numel(); ++i) {
+    ASSERT_NEAR(data[i], expected_data[i], 1e-5);
+  }
+
+  // The memory of the batch is reused
+  const void* ptr = batch.Data();
+  ASSERT_TRUE(vision::ocr::CropTextRegionsToBatch(image, boxes,
+                                                  rec_image_shape, &batch));
+  ASSERT_EQ(batch.Data(), ptr);
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,149 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include <cstdlib>
+#include <random>
+#include <vector>
+#include "fastdeploy/vision.h"
+#include "fastdeploy/vision/ocr/ppocr/det_postprocessor.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+// A probability map of a dense document, with axis-aligned text lines, rotated
+// text lines and a few irregular blobs
+static cv::Mat MakeProbabilityMap(int height, int width) {
+  std::mt19937 rng(2022);
+  std::uniform_real_distribution<float> noise(0.0f, 0.05f);
+  cv::Mat prob(height, width, CV_32FC1);
+  for (int y = 0; y < height; ++y) {
+    for (int x = 0; x < width; ++x) {
+      prob.at<float>(y, x) = noise(rng);
+    }
+  }
+  std::uniform_int_distribution<int> len(8, 90);
+  std::uniform_real_distribution<float> score(0.5f, 0.95f);
+  for (int y = 4; y + 12 < height / 2; y += 14) {
+    for (int x = 4; x + 100 < width; x += 110) {
+      cv::rectangle(prob, cv::Rect(x, y, len(rng), 8), cv::Scalar(score(rng)),
+                    cv::FILLED);
+    }
+  }
+  std::uniform_real_distribution<float> angle(-15.0f, 15.0f);
+  for (int y = height / 2 + 20; y + 20 < height; y += 40) {
+    for (int x = 60; x + 60 < width; x += 130) {
+      cv::RotatedRect rect(cv::Point2f(x, y), cv::Size2f(len(rng) + 10, 10),
+                           angle(rng));
+      cv::Point2f corners[4];
+      rect.points(corners);
+      std::vector<cv::Point> polygon(corners, corners + 4);
+      cv::fillConvexPoly(prob, polygon, cv::Scalar(score(rng)));
+    }
+  }
+  cv::circle(prob, cv::Point(width - 40, height - 40), 15, cv::Scalar(0.9),
+             cv::FILLED);
+  return prob;
+}
+
+static std::vector<std::array<int, 8>> RunPostprocess(const cv::Mat& prob,
+                                                     const std::string& mode,
+                                                     bool fast) {
+  FDTensor tensor;
+  tensor.SetExternalData({1, 1, prob.rows, prob.cols}, FDDataType::FP32,
+                         prob.data);
+  vision::ocr::DBDetectorPostprocessor postprocessor;
+  postprocessor.SetDetDBScoreMode(mode);
+  postprocessor.SetUseFastPostprocess(fast);
+  std::vector<std::vector<std::array<int, 8>>> results;
+  std::array<int, 4> info = {prob.cols, prob.rows, prob.cols, prob.rows};
+  EXPECT_TRUE(postprocessor.Run({tensor}, &results, {info}));
+  return results[0];
+}
+
+TEST(fastdeploy, ocr_db_rect_score_integral) {
+  cv::Mat prob = MakeProbabilityMap(320, 480);
+  cv::Mat integral;
+  cv::integral(prob, integral, CV_64F);
+  vision::ocr::PostProcessor postprocessor;
+  std::vector<std::vector<float>> box = {
+      {10, 20}, {50, 20}, {50, 27}, {10, 27}};
+  std::vector<cv::Point> points = {{10, 20}, {50, 20}, {50, 27}, {10, 27}};
+  float score = 0.0f;
+  ASSERT_TRUE(postprocessor.RectScoreIntegral(points, integral, &score));
+  ASSERT_NEAR(score, postprocessor.BoxScoreFast(box, prob), 1e-5);
+  ASSERT_NEAR(score, postprocessor.PolygonScoreAcc(points, prob), 1e-5);
+
+  // Counter-clockwise corners
+  std::vector<cv::Point> reversed(points.rbegin(), points.rend());
+  ASSERT_TRUE(postprocessor.RectScoreIntegral(reversed, integral, &score));
+  ASSERT_NEAR(score, postprocessor.BoxScoreFast(box, prob), 1e-5);
+
+  // Not a rectangle, or out of the map
+  std::vector<cv::Point> skewed = {{10, 20}, {50, 20}, {52, 27}, {10, 27}};
+  ASSERT_FALSE(postprocessor.RectScoreIntegral(skewed, integral, &score));
+  std::vector<cv::Point> crossed = {{10, 20}, {50, 27}, {50, 20}, {10, 27}};
+  ASSERT_FALSE(postprocessor.RectScoreIntegral(crossed, integral, &score));
+  std::vector<cv::Point> outside = {{400, 20}, {480, 20}, {480, 27}, {400, 27}};
+  ASSERT_FALSE(postprocessor.RectScoreIntegral(outside, integral, &score));
+}
+
+TEST(fastdeploy, ocr_db_unclip_rect) {
+  vision::ocr::PostProcessor postprocessor;
+  std::vector<std::vector<std::vector<float>>> boxes = {
+      {{10, 20}, {50, 20}, {50, 28}, {10, 28}},
+      {{3, 7}, {120, 7}, {120, 40}, {3, 40}},
+      {{100, 100}, {140, 120}, {136, 128.5}, {96, 108.5}}};
+  for (const auto& box : boxes) {
+    cv::RotatedRect expected = postprocessor.UnClip(box, 1.5);
+    cv::RotatedRect rect;
+    ASSERT_TRUE(postprocessor.UnClipRect(box, 1.5, &rect));
+    float ssid = 0.0f;
+    auto expected_points = postprocessor.GetMiniBoxes(expected, ssid);
+    auto points = postprocessor.GetMiniBoxes(rect, ssid);
+    for (int i = 0; i < 4; ++i) {
+      ASSERT_NEAR(points[i][0], expected_points[i][0], 1.0);
+      ASSERT_NEAR(points[i][1], expected_points[i][1], 1.0);
+    }
+  }
+  // A quadrilateral far from a rectangle goes through Clipper
+  std::vector<std::vector<float>> trapezoid = {
+      {10, 20}, {50, 20}, {60, 40}, {0, 40}};
+  cv::RotatedRect rect;
+  ASSERT_FALSE(postprocessor.UnClipRect(trapezoid, 1.5, &rect));
+}
+
+TEST(fastdeploy, ocr_db_fast_postprocess_equivalence) {
+  cv::Mat prob = MakeProbabilityMap(320, 480);
+  for (const std::string mode : {"slow", "fast"}) {
+    auto expected = RunPostprocess(prob, mode, false);
+    auto boxes = RunPostprocess(prob, mode, true);
+    ASSERT_GT(expected.size(), 40u);
+    ASSERT_EQ(boxes.size(), expected.size());
+    for (size_t i = 0; i < boxes.size(); ++i) {
+      // The axis-aligned boxes are exactly the same, the rotated ones only
+      // differ from Clipper by its rounding of the offset points
+      const auto& box = expected[i];
+      bool axis_aligned = box[1] == box[3] && box[2] == box[4];
+      for (int j = 0; j < 8; ++j) {
+        ASSERT_LE(std::abs(boxes[i][j] - box[j]), axis_aligned ? 0 : 2)
+            << "box " << i << " of the " << mode << " mode";
+      }
+    }
+  }
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,63 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <vector>
+#include "fastdeploy/vision/ocr/ppocr/utils/ocr_utils.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, ocr_rec_batches_count_limit) {
+  std::vector<float> ratios = {2.0, 1.0, 3.0, 1.5, 2.5};
+  std::vector<int> indices = vision::ocr::ArgSort(ratios);
+  ASSERT_EQ(indices, std::vector<int>({1, 3, 0, 4, 2}));
+  std::vector<size_t> ends = vision::ocr::PlanRecBatches(
+      ratios, indices, {3, 48, 320}, false, 2, -1);
+  ASSERT_EQ(ends, std::vector<size_t>({2, 4, 5}));
+
+  ends = vision::ocr::PlanRecBatches(ratios, indices, {3, 48, 320}, false, -1,
+                                     -1);
+  ASSERT_EQ(ends, std::vector<size_t>({5}));
+
+  ends = vision::ocr::PlanRecBatches({}, {}, {3, 48, 320}, false, 6, -1);
+  ASSERT_TRUE(ends.empty());
+}
+
+TEST(fastdeploy, ocr_rec_batches_pixel_limit) {
+  // Four short crops and a very wide one, which shouldn't pad the others
+  std::vector<float> ratios = {4.0, 4.0, 4.0, 4.0, 40.0};
+  std::vector<int> indices = vision::ocr::ArgSort(ratios);
+  double padding_ratio = 0.0;
+  std::vector<size_t> ends = vision::ocr::PlanRecBatches(
+      ratios, indices, {3, 48, 320}, false, 6, -1, &padding_ratio);
+  ASSERT_EQ(ends, std::vector<size_t>({5}));
+  double unlimited_padding = padding_ratio;
+
+  // The padded width of the short crops is 320, so 4 of them take 61440
+  // pixels, the wide crop is 1920 wide and exceeds the limit by itself
+  ends = vision::ocr::PlanRecBatches(ratios, indices, {3, 48, 320}, false, 6,
+                                     4 * 48 * 320, &padding_ratio);
+  ASSERT_EQ(ends, std::vector<size_t>({4, 5}));
+  ASSERT_LT(padding_ratio, unlimited_padding);
+  // 192 of 320 pixels are valid in the short crops, 1920 in the wide one
+  double expected = 1.0 - (4 * 192.0 + 1920.0) / (4 * 320.0 + 1920.0);
+  ASSERT_NEAR(padding_ratio, expected, 1e-6);
+
+  ends = vision::ocr::PlanRecBatches(ratios, indices, {3, 48, 320}, false, 6,
+                                     3 * 48 * 320, &padding_ratio);
+  ASSERT_EQ(ends, std::vector<size_t>({3, 4, 5}));
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,195 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <float.h>
+#include <algorithm>
+#include <cmath>
+#include <random>
+#include <vector>
+
+#include "fastdeploy/vision.h"
+#include "fastdeploy/vision/tracking/pptracking/lapjv.h"
+#include "fastdeploy/vision/tracking/pptracking/tracker.h"
+#include "gtest/gtest.h"
+
+namespace fastdeploy {
+
+using vision::tracking::Match;
+using vision::tracking::Trajectory;
+using vision::tracking::TrajectoryPool;
+using vision::tracking::TrajectoryPtrPool;
+
+// Exposes the association steps of JDETracker
+class JDETrackerTester : public vision::tracking::JDETracker {
+ public:
+  using vision::tracking::JDETracker::linear_assignment;
+  using vision::tracking::JDETracker::motion_distance;
+};
+
+// The default lambda of JDETracker and the gate of 4 degrees of freedom
+const float kLambda = 0.98f;
+const float kGateThresh = 9.487729f;
+
+// The reference, LAPJV solves the whole (rows + cols) extended matrix
+void FullLinearAssignment(const cv::Mat& cost, float cost_limit,
+                          Match* matches, std::vector<int>* mismatch_row,
+                          std::vector<int>* mismatch_col) {
+  std::vector<int> x(cost.rows);
+  std::vector<int> y(cost.cols);
+  vision::tracking::lapjv_internal(cost, true, cost_limit, x.data(),
+                                   y.data());
+  for (int i = 0; i < cost.rows; ++i) {
+    if (x[i] >= 0) {
+      matches->insert({i, x[i]});
+    } else {
+      mismatch_row->push_back(i);
+    }
+  }
+  for (int j = 0; j < cost.cols; ++j) {
+    if (y[j] < 0) mismatch_col->push_back(j);
+  }
+}
+
+cv::Mat RandomCost(int rows, int cols, std::mt19937* rng) {
+  std::uniform_real_distribution<float> value(0.f, 1.5f);
+  std::uniform_real_distribution<float> prob(0.f, 1.f);
+  cv::Mat cost(rows, cols, CV_32F);
+  for (int i = 0; i < rows; ++i) {
+    for (int j = 0; j < cols; ++j) {
+      // Some pairs are far out of the limit, as the gated pairs are
+      cost.at<float>(i, j) = prob(*rng) < 0.3f ? 1000.f : value(*rng);
+    }
+  }
+  return cost;
+}
+
+TEST(fastdeploy, pptracking_linear_assignment) {
+  JDETrackerTester tracker;
+  std::mt19937 rng(2022);
+  std::uniform_int_distribution<int> size(1, 12);
+  for (float cost_limit : {0.5f, 0.7f}) {
+    for (int n = 0; n < 200; ++n) {
+      cv::Mat cost = RandomCost(size(rng), size(rng), &rng);
+      Match matches;
+      std::vector<int> mismatch_row;
+      std::vector<int> mismatch_col;
+      tracker.linear_assignment(cost, cost_limit, &matches, &mismatch_row,
+                                &mismatch_col);
+
+      Match expected_matches;
+      std::vector<int> expected_mismatch_row;
+      std::vector<int> expected_mismatch_col;
+      FullLinearAssignment(cost, cost_limit, &expected_matches,
+                           &expected_mismatch_row, &expected_mismatch_col);
+      ASSERT_EQ(matches, expected_matches) << "case " << n;
+      ASSERT_EQ(mismatch_row, expected_mismatch_row) << "case " << n;
+      ASSERT_EQ(mismatch_col, expected_mismatch_col) << "case " << n;
+    }
+  }
+
+  // Nothing to match
+  Match matches;
+  std::vector<int> mismatch_row;
+  std::vector<int> mismatch_col;
+  tracker.linear_assignment(cv::Mat(0, 3, CV_32F), 0.7f, &matches,
+                            &mismatch_row, &mismatch_col);
+  ASSERT_TRUE(matches.empty());
+  ASSERT_TRUE(mismatch_row.empty());
+  ASSERT_EQ(mismatch_col, std::vector<int>({0, 1, 2}));
+}
+
+cv::Mat RandomEmbedding(int dim, std::mt19937* rng) {
+  std::normal_distribution<float> normal(0.f, 1.f);
+  cv::Mat embedding(1, dim, CV_32F);
+  for (int k = 0; k < dim; ++k) embedding.at<float>(0, k) = normal(*rng);
+  return embedding;
+}
+
+TEST(fastdeploy, pptracking_motion_distance) {
+  JDETrackerTester tracker;
+  std::mt19937 rng(2023);
+  std::uniform_real_distribution<float> position(0.f, 600.f);
+  std::uniform_real_distribution<float> height(60.f, 200.f);
+  std::normal_distribution<float> noise(0.f, 1.f);
+  const int dim = 128;
+  int num_gated = 0;
+  int num_fused = 0;
+  for (int n = 0; n < 20; ++n) {
+    // The tracked trajectories, with the Kalman filters predicted forward
+    TrajectoryPool trajectories;
+    trajectories.reserve(8);
+    int count = 0;
+    for (int i = 0; i < 8; ++i) {
+      float x = position(rng);
+      float y = position(rng);
+      float h = height(rng);
+      cv::Vec4f ltrb(x, y, x + 0.4f * h, y + h);
+      trajectories.emplace_back(ltrb, 0.9f, RandomEmbedding(dim, &rng));
+      trajectories.back().activate(count, 1);
+      for (int k = 0; k < i % 3; ++k) trajectories.back().predict();
+    }
+    TrajectoryPtrPool a;
+    for (auto& trajectory : trajectories) a.push_back(&trajectory);
+
+    // The detections near the trajectories, some of them are out of the gate
+    TrajectoryPool b;
+    for (int j = 0; j < 10; ++j) {
+      const Trajectory& near = trajectories[j % trajectories.size()];
+      float h = (near.ltrb[3] - near.ltrb[1]) * (1.f + 0.05f * noise(rng));
+      float w = (near.ltrb[2] - near.ltrb[0]) * (1.f + 0.05f * noise(rng));
+      float x = near.ltrb[0] + 0.15f * h * noise(rng);
+      float y = near.ltrb[1] + 0.15f * h * noise(rng);
+      cv::Mat embedding =
+          near.smooth_embedding + 0.05f * RandomEmbedding(dim, &rng);
+      b.emplace_back(cv::Vec4f(x, y, x + w, y + h), 0.8f, embedding);
+    }
+
+    cv::Mat fdists = tracker.motion_distance(a, b);
+    cv::Mat edists = vision::tracking::embedding_distance(a, b);
+    cv::Mat mdists = vision::tracking::mahalanobis_distance(a, b);
+    ASSERT_EQ(fdists.rows, static_cast<int>(a.size()));
+    ASSERT_EQ(fdists.cols, static_cast<int>(b.size()));
+    for (int i = 0; i < fdists.rows; ++i) {
+      for (int j = 0; j < fdists.cols; ++j) {
+        float mdist = mdists.at<float>(i, j);
+        float fdist = fdists.at<float>(i, j);
+        // The distances are computed in double by motion_distance, skip the
+        // pairs right on the gate
+        if (std::abs(mdist - kGateThresh) < 1e-3f * kGateThresh) continue;
+        if (mdist > kGateThresh) {
+          ASSERT_EQ(fdist, FLT_MAX) << i << ", " << j;
+          ++num_gated;
+        } else {
+          float expected =
+              kLambda * edists.at<float>(i, j) + (1 - kLambda) * mdist;
+          ASSERT_NEAR(fdist, expected, 1e-4f * std::max(1.f, expected))
+              << i << ", " << j;
+          ++num_fused;
+        }
+      }
+    }
+  }
+  // Both of the branches are covered
+  ASSERT_GT(num_gated, 0);
+  ASSERT_GT(num_fused, 0);
+
+  // Nothing to match
+  TrajectoryPtrPool empty;
+  TrajectoryPool b(2);
+  cv::Mat fdists = tracker.motion_distance(empty, b);
+  ASSERT_EQ(fdists.rows, 0);
+  ASSERT_EQ(fdists.cols, 2);
+}
+
+}  // namespace fastdeploy
@@ -0,0 +1,59 @@
+// Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include <array>
+#include "fastdeploy/vision.h"
+#include "glog/logging.h"
+#include "gtest/gtest.h"
+#include "gtest_utils.h"
+
+namespace fastdeploy {
+
+TEST(fastdeploy, trail_recorder_bounded_length) {
+  vision::tracking::TrailRecorder recorder;
+  recorder.max_length = 3;
+  for (int i = 0; i < 10; ++i) {
+    recorder.Add(1, {i, i + 1});
+    recorder.NextFrame();
+  }
+  const auto& trail = recorder.records[1];
+  ASSERT_EQ(trail.size(), 3u);
+  // The oldest points are dropped
+  ASSERT_EQ(trail.front()[0], 7);
+  ASSERT_EQ(trail.back()[0], 9);
+  ASSERT_EQ(trail.back()[1], 10);
+}
+
+TEST(fastdeploy, trail_recorder_remove_idle_trails) {
+  vision::tracking::TrailRecorder recorder;
+  recorder.max_idle_frames = 2;
+  recorder.Add(1, {0, 0});
+  recorder.Add(2, {5, 5});
+  recorder.NextFrame();
+  // Only the object 2 is still tracked, and new objects keep coming
+  for (int i = 0; i < 100; ++i) {
+    recorder.Add(2, {i, i});
+    recorder.Add(100 + i, {i, i});
+    recorder.NextFrame();
+  }
+  ASSERT_EQ(recorder.records.count(1), 0u);
+  ASSERT_EQ(recorder.records.count(2), 1u);
+  // The trails of the objects out of the window are all removed
+  ASSERT_LE(recorder.records.size(), 4u);
+
+  recorder.Clear();
+  ASSERT_TRUE(recorder.records.empty());
+}
+
+}  // namespace fastdeploy